@@ -1,22 +1,14 @@
 """
 BulletTrade - 专业的量化交易系统
 完整的本地策略回测系统，兼容聚宽API，支持多数据源和实盘交易
+
+包级接口全部按需加载：`import bullet_trade` 只加载环境变量，核心对象、回测引擎、
+数据 API 与绘图分析在首次访问对应属性时才导入，默认数据源在首次取数时才创建。
+CLI、参数优化子进程与 notebook 内核因此无需为用不到的模块付出启动开销。
 """
 
 from importlib import import_module
-from typing import Any, TYPE_CHECKING
-
-import warnings
-
-try:
-    import matplotlib
-    # 设置非交互式后端，避免程序挂起
-    matplotlib.use('Agg')
-    import matplotlib.pyplot as plt  # noqa: F401
-except Exception as exc:  # pragma: no cover - 兼容运行环境缺少 GUI 依赖的情况
-    warnings.warn(f"Matplotlib 初始化失败，将跳过图形相关功能：{exc!r}")
-    matplotlib = None  # type: ignore
-    plt = None  # type: ignore
+from typing import Any, Dict, TYPE_CHECKING
 
 # 加载环境变量
 from .utils.env_loader import load_env
@@ -26,30 +18,28 @@ load_env()
 # from .utils.font_config import setup_chinese_fonts
 # setup_chinese_fonts()
 
-# 导入数据模块
-from .data.api import *  # noqa: F401,F403
-
-# 导入核心模块
-from .core.models import (
-    Context, Portfolio, SubPortfolio, Position,
-    Trade, Order, OrderStatus, OrderStyle, SecurityUnitData
-)
-from .core.globals import g, log
-from .core.settings import (
-    set_benchmark, set_order_cost, set_commission, set_universe, set_slippage, set_option,
-    OrderCost, PerTrade, FixedSlippage, PriceRelatedSlippage, StepRelatedSlippage
-)
-from .core.orders import (
-    order, order_value, order_target, order_target_value, cancel_order, cancel_all_orders,
-    MarketOrderStyle, LimitOrderStyle
-)
-from .core.scheduler import (
-    run_daily, run_weekly, run_monthly, unschedule_all
-)
-from .core.engine import create_backtest, BacktestEngine
-
 from .__version__ import __version__
 
+# 导出名 -> 所在模块（相对本包），首次访问时导入
+_LAZY_EXPORTS: Dict[str, str] = {
+    # 核心模块
+    **dict.fromkeys((
+        'Context', 'Portfolio', 'SubPortfolio', 'Position',
+        'Trade', 'Order', 'OrderStatus', 'OrderStyle', 'SecurityUnitData',
+    ), '.core.models'),
+    **dict.fromkeys(('g', 'log'), '.core.globals'),
+    **dict.fromkeys((
+        'set_benchmark', 'set_order_cost', 'set_commission', 'set_universe', 'set_slippage', 'set_option',
+        'OrderCost', 'PerTrade', 'FixedSlippage', 'PriceRelatedSlippage', 'StepRelatedSlippage',
+    ), '.core.settings'),
+    **dict.fromkeys((
+        'order', 'order_value', 'order_target', 'order_target_value', 'cancel_order', 'cancel_all_orders',
+        'MarketOrderStyle', 'LimitOrderStyle',
+    ), '.core.orders'),
+    **dict.fromkeys(('run_daily', 'run_weekly', 'run_monthly', 'unschedule_all'), '.core.scheduler'),
+    **dict.fromkeys(('create_backtest', 'BacktestEngine'), '.core.engine'),
+}
+
 _ANALYSIS_EXPORTS = (
     'plot_results',
     'plot_positions',
@@ -58,9 +48,18 @@ _ANALYSIS_EXPORTS = (
     'export_trades',
     'generate_report',
 )
+_LAZY_EXPORTS.update(dict.fromkeys(_ANALYSIS_EXPORTS, '.core.analysis'))
+
+# 子包：`bullet_trade.data` 等属性访问时自动导入
+_SUBPACKAGES = frozenset((
+    'broker', 'cli', 'compat', 'config', 'core', 'data', 'notebook',
+    'remote', 'reporting', 'research', 'server', 'utils',
+))
 
 if TYPE_CHECKING:  # pragma: no cover - 仅用于类型提示
     from .core import analysis as _analysis_module  # noqa: F401,F811
+    from .core.engine import create_backtest, BacktestEngine  # noqa: F401
+    from .data.api import *  # noqa: F401,F403
 
 __all__ = [
     # 数据模型
@@ -84,15 +83,23 @@ __all__ = [
 
 
 def __getattr__(name: str) -> Any:
-    """延迟加载分析绘图相关函数，避免在未安装 matplotlib 时导入失败"""
-    if name in _ANALYSIS_EXPORTS:
-        module = import_module('.core.analysis', __name__)
-        attr = getattr(module, name)
-        globals()[name] = attr
-        return attr
-    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    """按需加载包级接口：显式导出、数据 API（原 `from .data.api import *`）与子包"""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is not None:
+        attr = getattr(import_module(module_name, __name__), name)
+    elif name in _SUBPACKAGES:
+        attr = import_module(f'.{name}', __name__)
+    elif not name.startswith('__'):
+        data_api = import_module('.data.api', __name__)
+        if name not in getattr(data_api, '__all__', ()):
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        attr = getattr(data_api, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = attr
+    return attr
 
 
 def __dir__() -> list[str]:
     """让内建 dir() 同样展示延迟导出的接口"""
-    return sorted(set(globals().keys()) | set(_ANALYSIS_EXPORTS))
+    return sorted(set(globals().keys()) | set(_LAZY_EXPORTS))
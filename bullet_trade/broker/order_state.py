@@ -0,0 +1,89 @@
+"""
+券商订单状态表
+
+券商回调（xttrader 的委托/成交/下单失败推送，运行在 xtquant 自己的线程）写入最新订单快照，
+协程通过 wait() 等待订单进入终态：回调一到即唤醒，不必按固定间隔轮询查询接口。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+TERMINAL_STATUSES = frozenset({"filled", "cancelled", "canceled", "partly_canceled", "rejected"})
+
+
+def is_terminal(snapshot: Optional[Dict[str, Any]]) -> bool:
+    return bool(snapshot) and str(snapshot.get("status") or "").lower() in TERMINAL_STATUSES
+
+
+class OrderStateTable:
+    """线程安全的 order_id -> 最新快照表，附带按订单的终态等待。"""
+
+    def __init__(self, max_orders: int = 5000) -> None:
+        self.max_orders = max(1, int(max_orders))
+        self._lock = threading.Lock()
+        self._orders: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[Dict[str, Any]]"]]] = {}
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            snapshot = self._orders.get(str(order_id))
+            return dict(snapshot) if snapshot is not None else None
+
+    def update(self, order_id: str, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """合并一条快照（可来自任意线程），终态时唤醒该订单的等待者；返回合并后的快照。"""
+        key = str(order_id)
+        with self._lock:
+            merged = dict(self._orders.get(key) or {})
+            if is_terminal(merged) and not is_terminal(snapshot):
+                # 终态之后迟到的在途推送不回退状态，只补充字段
+                snapshot = {k: v for k, v in snapshot.items() if k not in ("status", "raw_status")}
+            merged.update({k: v for k, v in snapshot.items() if v is not None})
+            merged["order_id"] = key
+            self._orders[key] = merged
+            self._orders.move_to_end(key)
+            while len(self._orders) > self.max_orders:
+                self._orders.popitem(last=False)
+            waiters = self._waiters.pop(key, []) if is_terminal(merged) else []
+            result = dict(merged)
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future, dict(result))
+            except RuntimeError:
+                # 等待方的事件循环已关闭
+                pass
+        return result
+
+    async def wait(self, order_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """等待订单终态，返回终态快照；超时返回 None。"""
+        key = str(order_id)
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[Dict[str, Any]]" = loop.create_future()
+        with self._lock:
+            snapshot = self._orders.get(key)
+            if is_terminal(snapshot):
+                return dict(snapshot)  # type: ignore[arg-type]
+            entry = (loop, future)
+            self._waiters.setdefault(key, []).append(entry)
+        try:
+            return await asyncio.wait_for(future, timeout=max(0.0, float(timeout)))
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(key)
+                if waiters and entry in waiters:
+                    waiters.remove(entry)
+                    if not waiters:
+                        self._waiters.pop(key, None)
+
+
+def _resolve(future: "asyncio.Future[Dict[str, Any]]", snapshot: Dict[str, Any]) -> None:
+    if not future.done():
+        future.set_result(snapshot)
+
+
+__all__ = ["OrderStateTable", "TERMINAL_STATUSES", "is_terminal"]
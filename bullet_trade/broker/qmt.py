@@ -14,11 +14,21 @@ from datetime import datetime
 import time
 
 from .base import BrokerBase
+from .order_state import OrderStateTable, is_terminal
 from bullet_trade.core.models import OrderStatus
 from bullet_trade.core.globals import log
 from bullet_trade.utils.env_loader import get_broker_config, get_live_trade_config
 
 
+def _pick(item: Any, *names: str) -> Any:
+    """按顺序读取 dict 键或对象属性，返回第一个非 None 的值。"""
+    for name in names:
+        value = item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+        if value is not None:
+            return value
+    return None
+
+
 class QmtBroker(BrokerBase):
     """
     QMT 券商适配（基于 xtquant/xttrader）。
@@ -43,6 +53,8 @@ class QmtBroker(BrokerBase):
         self._xt_trader = None
         self._xt_account = None
         self._xt_callback = None
+        # 委托/成交回调写入的订单状态表，同步等待据此提前结束
+        self._order_states = OrderStateTable()
         self._data_path = data_path or cfg.get("data_path")
         raw_session = session_id if session_id is not None else cfg.get("session_id")
         self._session_id: Optional[int] = None
@@ -69,6 +81,9 @@ class QmtBroker(BrokerBase):
         except (TypeError, ValueError):
             self._retry_interval = 60
 
+    # 已接入回调时兜底查询的间隔（秒）
+    _FALLBACK_POLL_INTERVAL = 2.0
+
     def _ensure_connected(self):
         if not self._connected:
             raise RuntimeError(f"QMT 未连接，请先调用 connect() 并确保 xtquant 环境可用, account_id: {self.account_id}, account_type: {self.account_type}")
@@ -99,7 +114,12 @@ class QmtBroker(BrokerBase):
                         self.outer = outer
                     def on_disconnected(self):  # noqa: N802
                         self.outer._connected = False
-                    # 其余回调后续接入（订单、成交、持仓变更）
+                    def on_stock_order(self, order):  # noqa: N802
+                        self.outer._on_order_callback(order)
+                    def on_stock_trade(self, trade):  # noqa: N802
+                        self.outer._on_trade_callback(trade)
+                    def on_order_error(self, order_error):  # noqa: N802
+                        self.outer._on_order_error_callback(order_error)
 
                 trader = XtQuantTrader(data_path, session_id)  # type: ignore
                 callback = _Callback(self)
@@ -309,10 +329,18 @@ class QmtBroker(BrokerBase):
         self._ensure_connected()
         if not order_id:
             return {}
+        cached = self._order_states.get(order_id)
+        if is_terminal(cached):
+            # 终态由回调推送后不会再变化，无需再查询柜台
+            return cached  # type: ignore[return-value]
         if not self._xt_trader or not self._xt_account:
             raise RuntimeError("QMT 交易对象未初始化")
         return await asyncio.to_thread(self._query_order_snapshot, order_id)
 
+    async def wait_order_event(self, order_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """等待回调推送订单终态，返回终态快照；超时返回 None（不查询柜台）。"""
+        return await self._order_states.wait(order_id, timeout)
+
     def _query_order_snapshot(self, order_id: str) -> Dict[str, Any]:
         for name in ("query_stock_orders", "get_stock_orders", "query_orders"):
             fn = getattr(self._xt_trader, name, None)
@@ -335,50 +363,75 @@ class QmtBroker(BrokerBase):
                     except Exception:
                         items = []
                 for it in items:
-                    oid = None
-                    status = None
-                    code = None
-                    price = None
-                    qty = None
-                    if isinstance(it, dict):
-                        oid = it.get("order_id") or it.get("orderId") or it.get("entrust_id")
-                        status = it.get("order_status") or it.get("status")
-                        code = it.get("stock_code") or it.get("code")
-                        price = it.get("price")
-                        qty = it.get("order_volume") or it.get("volume")
-                    else:
-                        for attr in ("order_id", "orderId", "entrust_id"):
-                            if hasattr(it, attr):
-                                oid = getattr(it, attr)
-                                break
-                        for attr in ("order_status", "status"):
-                            if hasattr(it, attr):
-                                status = getattr(it, attr)
-                                break
-                        for attr in ("stock_code", "code"):
-                            if hasattr(it, attr):
-                                code = getattr(it, attr)
-                                break
-                        if hasattr(it, "price"):
-                            price = getattr(it, "price")
-                        for attr in ("order_volume", "volume"):
-                            if hasattr(it, attr):
-                                qty = getattr(it, attr)
-                                break
-                    if str(oid) == str(order_id):
-                        mapped_status = self._map_order_status(status)
-                        return {
-                            "order_id": str(oid),
-                            "status": mapped_status.value if isinstance(mapped_status, OrderStatus) else mapped_status,
-                            "raw_status": status,
-                            "security": code,
-                            "price": price,
-                            "amount": qty,
-                        }
+                    snapshot = self._order_snapshot_from(it)
+                    if snapshot and snapshot["order_id"] == str(order_id):
+                        return snapshot
             except Exception:
                 continue
         return {}
 
+    def _order_snapshot_from(self, item: Any) -> Dict[str, Any]:
+        """把 xtquant 委托对象（或 dict）转换为统一快照；缺少订单号时返回空字典。"""
+        oid = _pick(item, "order_id", "orderId", "entrust_id")
+        if oid is None:
+            return {}
+        status = _pick(item, "order_status", "status")
+        mapped_status = self._map_order_status(status)
+        snapshot = {
+            "order_id": str(oid),
+            "status": mapped_status.value if isinstance(mapped_status, OrderStatus) else mapped_status,
+            "raw_status": status,
+            "security": _pick(item, "stock_code", "code"),
+            "price": _pick(item, "price"),
+            "amount": _pick(item, "order_volume", "volume"),
+        }
+        filled = _pick(item, "traded_volume")
+        if filled is not None:
+            snapshot["filled"] = filled
+        return snapshot
+
+    # ---------------- xttrader 回调（运行在 xtquant 线程） ----------------
+    def _on_order_callback(self, order: Any) -> None:
+        try:
+            snapshot = self._order_snapshot_from(order)
+            if snapshot:
+                self._order_states.update(snapshot["order_id"], snapshot)
+        except Exception as exc:  # pragma: no cover - 回调异常不能影响 xtquant 线程
+            log.debug(f"处理 QMT 委托回报失败: {exc}")
+
+    def _on_trade_callback(self, trade: Any) -> None:
+        try:
+            oid = _pick(trade, "order_id", "orderId", "entrust_id")
+            if oid is None:
+                return
+            known = self._order_states.get(oid) or {}
+            # 成交回报逐笔累计；委托回报里的 traded_volume 已是累计值，二者取大
+            traded_sum = float(known.get("traded_sum") or 0) + float(_pick(trade, "traded_volume") or 0)
+            update: Dict[str, Any] = {
+                "traded_sum": traded_sum,
+                "filled": max(float(known.get("filled") or 0), traded_sum),
+                "traded_price": _pick(trade, "traded_price"),
+            }
+            amount = known.get("amount")
+            if amount and traded_sum >= float(amount):
+                update["status"] = OrderStatus.filled.value
+            self._order_states.update(oid, update)
+        except Exception as exc:  # pragma: no cover
+            log.debug(f"处理 QMT 成交回报失败: {exc}")
+
+    def _on_order_error_callback(self, order_error: Any) -> None:
+        try:
+            oid = _pick(order_error, "order_id", "orderId", "entrust_id")
+            if oid is None:
+                return
+            self._order_states.update(oid, {
+                "status": OrderStatus.rejected.value,
+                "raw_status": _pick(order_error, "error_id"),
+                "error": _pick(order_error, "error_msg"),
+            })
+        except Exception as exc:  # pragma: no cover
+            log.debug(f"处理 QMT 下单失败回报失败: {exc}")
+
     def _map_order_status(self, raw_status: Any) -> OrderStatus:
         """将 xtquant 的订单状态映射为内部 OrderStatus。
         - 对未知/处理中状态，统一映射为 OrderStatus.open
@@ -492,7 +545,11 @@ class QmtBroker(BrokerBase):
             return (security, amount, price, side)
 
     async def _maybe_wait(self, order_id: str, override_timeout: Optional[float] = None) -> None:
-        """根据 TRADE_MAX_WAIT_TIME 执行同步等待骨架（协程版）"""
+        """
+        根据 TRADE_MAX_WAIT_TIME 同步等待订单终态（协程版）。
+
+        委托/成交回调写入订单状态表后立即唤醒；查询接口只在回调缺席时兜底。
+        """
         from bullet_trade.utils.env_loader import get_live_trade_config
 
         if override_timeout is not None:
@@ -503,22 +560,37 @@ class QmtBroker(BrokerBase):
             log.info(f"订单 {order_id} 采用异步模式（TRADE_MAX_WAIT_TIME<=0），交由后台同步任务跟踪")
             return
         deadline = time.time() + wait_s
-        interval = 0.5
+        # 接入回调时以回报唤醒为主，查询只作兜底（回调丢失/未订阅）；否则按原间隔轮询
+        callbacks = self._xt_callback is not None
+        interval = self._FALLBACK_POLL_INTERVAL if callbacks else 0.5
         start = time.time()
-        log.info(f"订单 {order_id} 进入同步等待，最长 {wait_s}s 轮询券商回报")
+        log.info(f"订单 {order_id} 进入同步等待，最长 {wait_s}s 等待券商回报")
         last_snapshot: Optional[Dict[str, Any]] = None
         final_status: Optional[str] = None
-        while time.time() < deadline:
-            try:
-                status = await self.get_order_status(order_id)
-                last_snapshot = status or {}
-                st = str(last_snapshot.get("status") or "").lower()
-                if st in ("filled", "cancelled", "canceled", "partly_canceled", "rejected"):
-                    final_status = st
-                    break
-            except Exception:
-                pass
-            await asyncio.sleep(interval)
+        poll = not callbacks
+        while True:
+            snapshot = self._order_states.get(order_id)
+            if not is_terminal(snapshot) and poll:
+                try:
+                    status = await self.get_order_status(order_id)
+                    if status:
+                        snapshot = self._order_states.update(order_id, status)
+                except Exception:
+                    pass
+            if snapshot:
+                last_snapshot = snapshot
+            if is_terminal(snapshot):
+                final_status = str(snapshot.get("status")).lower()  # type: ignore[union-attr]
+                break
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            snapshot = await self._order_states.wait(order_id, min(remaining, interval))
+            if snapshot:
+                last_snapshot = snapshot
+                final_status = str(snapshot.get("status")).lower()
+                break
+            poll = True
         elapsed = time.time() - start
         if final_status:
             level = log.info
@@ -184,7 +184,9 @@ class RemoteQmtBroker(BrokerBase):
             if last_price is None:
                 # 回退到最近一条历史行情
                 hist = self._connection.request("data.history", {"security": security, "count": 1, "frequency": "1m"})
-                records = hist.get("records") or []
+                frame = hist.get("frame")
+                # 协商为二进制列式编码时，协议层已还原为 DataFrame
+                records = frame.values.tolist()[-1:] if frame is not None else hist.get("records") or []
                 if records:
                     last_price = records[-1][-1] if isinstance(records[-1], (list, tuple)) else None
             if last_price is None:
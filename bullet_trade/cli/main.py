@@ -274,6 +274,54 @@ def create_parser():
         default='./optimization_results.csv',
         help='输出CSV文件路径'
     )
+    optimize_parser.add_argument(
+        '--shared-data',
+        action='store_true',
+        help='共享行情模式：只加载一次行情窗口，所有组合以只读方式复用'
+    )
+    optimize_parser.add_argument(
+        '--journal',
+        type=str,
+        default=None,
+        help='结果日志路径 (JSON Lines)，中断后以相同参数重跑可跳过已完成组合'
+    )
+    optimize_parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=None,
+        help='每次派发给子进程的组合数 (默认: 自动)'
+    )
+    optimize_parser.add_argument(
+        '--search',
+        type=str,
+        choices=['grid', 'random', 'halving', 'hyperband', 'tpe'],
+        default='grid',
+        help='搜索方式: grid 全网格 / random 随机 / halving 逐轮淘汰 / hyperband / tpe 贝叶斯 (默认: grid)'
+    )
+    optimize_parser.add_argument(
+        '--n-trials',
+        type=int,
+        default=None,
+        help='非网格搜索评估的组合数'
+    )
+    optimize_parser.add_argument(
+        '--eta',
+        type=int,
+        default=3,
+        help='逐轮淘汰每轮保留前 1/eta (默认: 3)'
+    )
+    optimize_parser.add_argument(
+        '--min-fraction',
+        type=float,
+        default=None,
+        help='逐轮淘汰首轮回测区间占全区间的比例 (默认: 1/eta^2)'
+    )
+    optimize_parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='随机种子'
+    )
     
     # live 命令（待实现）
     live_parser = subparsers.add_parser(
@@ -438,6 +486,27 @@ def create_parser():
         default=None,
         help='单会话 tick 订阅上限'
     )
+    server_parser.add_argument(
+        '--session-concurrency',
+        dest='session_concurrency',
+        type=int,
+        default=None,
+        help='单会话数据查询并发数（交易请求独立通道，不受影响，默认 4）'
+    )
+    server_parser.add_argument(
+        '--session-max-pending',
+        dest='session_max_pending',
+        type=int,
+        default=None,
+        help='单会话未完成请求上限，超过后暂停读取形成背压（默认 64）'
+    )
+    server_parser.add_argument(
+        '--stream-chunk-rows',
+        dest='stream_chunk_rows',
+        type=int,
+        default=None,
+        help='DataFrame 响应分块流式发送的每块行数，0 表示不分块（默认 50000）'
+    )
     server_parser.add_argument(
         '--accounts',
         dest='accounts',
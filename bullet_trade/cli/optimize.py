@@ -140,6 +140,15 @@ def run_optimize(args):
     print(f"参数文件: {params_file}")
     print(f"回测区间: {args.start} 至 {args.end}")
     print(f"并行进程: {args.processes or '自动'}")
+    shared_data = bool(getattr(args, 'shared_data', False))
+    if shared_data:
+        print("共享行情: 开启")
+    journal = getattr(args, 'journal', None)
+    if journal:
+        print(f"结果日志: {journal}")
+    search = getattr(args, 'search', None) or 'grid'
+    if search != 'grid':
+        print(f"搜索方式: {search}")
     print(f"\n参数网格（共 {total_combos} 种组合）:")
     for key, values in param_grid.items():
         # 如果原始值是表达式，显示原始表达式和展开后的值
@@ -168,7 +177,15 @@ def run_optimize(args):
             end_date=args.end,
             param_grid=param_grid,
             processes=args.processes,
-            output_csv=args.output
+            output_csv=args.output,
+            shared_data=shared_data,
+            journal=journal,
+            chunksize=getattr(args, 'chunksize', None),
+            search=search,
+            n_trials=getattr(args, 'n_trials', None),
+            eta=getattr(args, 'eta', 3),
+            min_fraction=getattr(args, 'min_fraction', None),
+            seed=getattr(args, 'seed', None),
         )
         
         # 显示最优参数
@@ -189,6 +206,8 @@ def run_optimize(args):
         # 用户按 Ctrl+C 中断
         print("\n" + "=" * 60)
         print("优化已中断")
+        if journal:
+            print(f"使用相同命令重新运行即可从结果日志继续: {journal}")
         print("=" * 60)
         return 130  # 标准的 SIGINT 退出码
         
@@ -6,6 +6,8 @@
 
 from typing import Dict, Any, Optional, Sequence, List
 import json
+import operator
+import sys
 from datetime import datetime
 import warnings
 
@@ -16,15 +18,30 @@ except ImportError:  # pragma: no cover
     pd = None  # type: ignore
     np = None  # type: ignore
 
-try:
-    import matplotlib.pyplot as plt
-    from matplotlib.pyplot import MultipleLocator
-except ImportError:  # pragma: no cover
-    plt = None  # type: ignore
+from .recording import ColumnBuffer
+
+
+class _LazyPyplot:
+    """matplotlib.pyplot 的延迟代理：首次绘图时才导入（并切换到 Agg 后端），只算指标时不加载绘图库。"""
+
+    _module: Any = None
+
+    def __getattr__(self, name: str) -> Any:
+        module = type(self)._module
+        if module is None:
+            try:
+                import matplotlib
+                if 'matplotlib.pyplot' not in sys.modules:
+                    # 设置非交互式后端，避免程序挂起（用户已自行导入 pyplot 时保留其后端）
+                    matplotlib.use('Agg')
+                import matplotlib.pyplot as module
+            except ImportError as exc:  # pragma: no cover
+                raise RuntimeError("matplotlib 未安装，无法使用分析可视化功能") from exc
+            type(self)._module = module
+        return getattr(module, name)
+
 
-    class MultipleLocator:  # type: ignore
-        def __init__(self, *_args, **_kwargs):
-            raise RuntimeError("matplotlib 未安装，无法使用分析可视化功能")
+plt = _LazyPyplot()
 
 # 忽略警告
 warnings.filterwarnings('ignore')
@@ -54,6 +71,254 @@ def _get_trade_attr(trade: Any, key: str, default: Any = None) -> Any:
     return getattr(trade, key, default)
 
 
+def _to_float_array(values: List[Any], default: float = 0.0) -> "np.ndarray":
+    """把字段列转为 float64 数组，None/空串/无法解析的值记为 default。"""
+    arr = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+    arr[~np.isfinite(arr)] = default
+    return arr
+
+
+def _to_datetime_array(values: List[Any]) -> "np.ndarray":
+    """整列解析时间（datetime64[ns]，无法解析为 NaT）；混合格式时逐个回退解析。"""
+    series = pd.Series(values, dtype=object)
+    try:
+        parsed = pd.to_datetime(series, errors='coerce')
+    except Exception:
+        parsed = series.map(lambda v: pd.to_datetime(v, errors='coerce') if v is not None else pd.NaT)
+        parsed = pd.to_datetime(parsed, errors='coerce')
+    if getattr(parsed.dt, 'tz', None) is not None:
+        parsed = parsed.dt.tz_localize(None)
+    return parsed.to_numpy(dtype='datetime64[ns]')
+
+
+_LEDGER_FIELDS = ('security', 'time', 'amount', 'price', 'commission', 'tax')
+
+
+def _trade_columns(trades: Sequence[Any]) -> Dict[str, Sequence[Any]]:
+    """按列提取成交字段：引擎的 TradeLog 直接取列，字典记录整表取别名列，Trade 对象一次 attrgetter。"""
+    if not trades:
+        return {key: [] for key in _LEDGER_FIELDS}
+    if all(isinstance(t, dict) for t in trades):
+        frame = pd.DataFrame(trades)
+        columns: Dict[str, List[Any]] = {}
+        for key in _LEDGER_FIELDS:
+            alias = next((a for a in _TRADE_KEY_ALIASES.get(key, (key,)) if a in frame.columns), None)
+            if alias is None:
+                columns[key] = [None] * len(frame)
+            else:
+                col = frame[alias]
+                columns[key] = col.astype(object).where(col.notna(), None).tolist()
+        return columns
+    if isinstance(trades, ColumnBuffer):
+        return {key: trades.column(key) for key in _LEDGER_FIELDS}
+    getter = operator.attrgetter(*_LEDGER_FIELDS)
+    try:
+        rows = [getter(t) for t in trades]
+    except AttributeError:
+        rows = [tuple(_get_trade_attr(t, key) for key in _LEDGER_FIELDS) for t in trades]
+    return {key: list(values) for key, values in zip(_LEDGER_FIELDS, zip(*rows))}
+
+
+_EVENT_SPLIT = '拆分/送转'
+_EVENT_DIVIDEND = '现金分红'
+_ROW_TRADE, _ROW_SPLIT, _ROW_DIVIDEND = 0, 1, 2
+
+# 最近一次构建的账本：(trades, events, 长度, 账本)，同一份 results 的指标与各报告共用
+_ledger_memo: Optional[tuple] = None
+
+
+class TradeLedger:
+    """
+    列式成交账本：由 results['trades'] 与 results['events'] 一次构建，供交易胜率、盈亏比、
+    开仓次数、分标的盈亏等指标与报告共用。
+
+    构建时整列解析字段与时间，按 (标的, 时间, 成交先于事件, 原始顺序) 排序后单遍扫描，
+    得到每笔成交的持仓均价与卖出盈亏、按标的的已实现盈亏与回合数：
+    - 买入按加权平均更新成本，卖出盈亏 = (成交价 - 均价) * 数量 - 该笔费用
+    - 拆分/送转按比例调整持仓与均价；现金分红计入已实现盈亏
+    - 标的已实现盈亏另扣除买入费用（与分标的盈亏报表口径一致）
+    """
+
+    def __init__(self, trades: Optional[Sequence[Any]] = None, events: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+        if not isinstance(trades, ColumnBuffer):
+            trades = list(trades or [])
+        events = list(events or [])
+
+        columns = _trade_columns(trades)
+        securities = list(columns['security'])
+        trade_times = _to_datetime_array(columns['time'])
+        amounts = _to_float_array(columns['amount'])
+        prices = _to_float_array(columns['price'])
+        fees = _to_float_array(columns['commission']) + _to_float_array(columns['tax'])
+
+        event_codes: List[Any] = []
+        event_kinds: List[int] = []
+        event_values: List[Any] = []
+        event_times: List[Any] = []
+        for e in events:
+            kind = {_EVENT_SPLIT: _ROW_SPLIT, _EVENT_DIVIDEND: _ROW_DIVIDEND}.get(e.get('event_type'))
+            ts = e.get('strategy_time') or e.get('event_date')
+            if kind is None or not e.get('code') or ts is None:
+                continue
+            event_codes.append(e.get('code'))
+            event_kinds.append(kind)
+            event_values.append(e.get('scale_factor') if kind == _ROW_SPLIT else e.get('cash_in'))
+            event_times.append(ts)
+
+        n_trades = len(trades)
+        codes = np.array([str(c) if c else '' for c in securities + event_codes], dtype=object)
+        kinds = np.concatenate([np.zeros(n_trades, dtype=np.int8), np.array(event_kinds, dtype=np.int8)])
+        times = np.concatenate([trade_times, _to_datetime_array(event_times)])
+        values = _to_float_array(event_values, default=np.nan)
+        seq = np.arange(len(codes))
+        valid = codes != ''
+        # 事件没有时间无法定位，直接丢弃；成交缺少时间时排在该标的最后
+        valid &= (kinds == _ROW_TRADE) | ~np.isnat(times)
+        rows = seq[valid]
+        time_keys = times[rows].astype('int64')
+        time_keys[np.isnat(times[rows])] = np.iinfo(np.int64).max
+        code_keys = pd.factorize(codes[rows], sort=True)[0]
+        order = rows[np.lexsort((rows, kinds[rows] != _ROW_TRADE, time_keys, code_keys))]
+
+        # ---- 单遍扫描：各标的行连续，切换标的时重置状态 ----
+        row_code = codes[order].tolist()
+        row_kind = kinds[order].tolist()
+        trade_idx = [i if i < n_trades else -1 for i in order.tolist()]
+        amt_list = amounts.tolist()
+        price_list = prices.tolist()
+        fee_list = fees.tolist()
+        value_list = values.tolist()
+        n_rows = len(order)
+        avg_before = np.zeros(n_rows)
+        pnl = np.full(n_rows, np.nan)
+        realized = np.zeros(n_rows)
+        closes = np.zeros(n_rows, dtype=bool)
+        current = None
+        qty = avg = 0.0
+        for i in range(n_rows):
+            code = row_code[i]
+            if code != current:
+                current, qty, avg = code, 0.0, 0.0
+            kind = row_kind[i]
+            if kind == _ROW_TRADE:
+                j = trade_idx[i]
+                amt, price, fee = amt_list[j], price_list[j], fee_list[j]
+                avg_before[i] = avg
+                if amt > 0:
+                    new_qty = qty + amt
+                    avg = (avg * qty + price * amt) / new_qty if new_qty > 0 else 0.0
+                    qty = new_qty
+                    realized[i] = -fee
+                else:
+                    sell_qty = -amt
+                    gross = (price - avg) * sell_qty
+                    realized[i] = gross - fee
+                    if amt < 0:
+                        pnl[i] = gross - fee
+                        closes[i] = qty > 0 and qty - sell_qty <= 0
+                    qty = max(0.0, qty - sell_qty)
+            elif kind == _ROW_SPLIT:
+                scale = value_list[order[i] - n_trades]
+                if scale == scale and scale and abs(scale - 1.0) > 1e-9:
+                    qty = float(round(qty * scale))
+                    if avg > 0:
+                        avg = avg / scale
+            else:
+                cash = value_list[order[i] - n_trades]
+                realized[i] = cash if cash == cash else 0.0
+
+        is_trade = kinds[order] == _ROW_TRADE
+        trade_rows = order[is_trade]
+        self.trades = pd.DataFrame(
+            {
+                'time': times[trade_rows],
+                'security': codes[trade_rows],
+                'amount': amounts[trade_rows],
+                'price': prices[trade_rows],
+                'fee': fees[trade_rows],
+                'avg_cost': avg_before[is_trade],
+                'pnl': pnl[is_trade],
+            }
+        )
+
+        # ---- 按标的聚合（行已按标的连续排列）----
+        if n_rows:
+            code_arr = codes[order]
+            starts = np.flatnonzero(np.r_[True, code_arr[1:] != code_arr[:-1]])
+            trade_amt = np.zeros(n_rows)
+            trade_amt[is_trade] = amounts[trade_rows]
+            row_times = times[order].astype('int64')
+            row_times[np.isnat(times[order])] = np.iinfo(np.int64).max
+            first_seen = np.minimum.reduceat(row_times, starts)
+            instruments = pd.DataFrame(
+                {
+                    'realized': np.add.reduceat(realized, starts),
+                    'buys': np.add.reduceat((is_trade & (trade_amt > 0)).astype(np.int64), starts),
+                    'sells': np.add.reduceat((is_trade & (trade_amt < 0)).astype(np.int64), starts),
+                    'round_trips': np.add.reduceat(closes.astype(np.int64), starts),
+                },
+                index=pd.Index(code_arr[starts], name='security'),
+            )
+            self.instruments = instruments.iloc[np.argsort(first_seen, kind='stable')]
+        else:
+            self.instruments = pd.DataFrame(
+                {'realized': [], 'buys': [], 'sells': [], 'round_trips': []},
+                index=pd.Index([], name='security'),
+            )
+
+    @classmethod
+    def from_results(cls, results: Dict[str, Any]) -> "TradeLedger":
+        """由回测结果构建账本；对同一份（未变化的）trades/events 复用上次的构建结果。"""
+        global _ledger_memo
+        trades = results.get('trades')
+        events = results.get('events')
+        sizes = (len(trades or ()), len(events or ()))
+        memo = _ledger_memo
+        if memo is not None and memo[0] is trades and memo[1] is events and memo[2] == sizes:
+            return memo[3]
+        ledger = cls(trades, events)
+        _ledger_memo = (trades, events, sizes, ledger)
+        return ledger
+
+    @property
+    def sell_pnl(self) -> "np.ndarray":
+        """各笔卖出成交的盈亏（按标的、时间排列）。"""
+        pnl = self.trades['pnl'].to_numpy()
+        return pnl[~np.isnan(pnl)]
+
+    def win_stats(self) -> Dict[str, float]:
+        """按卖出成交统计交易胜率与盈亏次数。"""
+        pnl = self.sell_pnl
+        win = int((pnl > 1e-12).sum())
+        loss = int((pnl < -1e-12).sum())
+        total = win + loss
+        return {
+            '交易胜率': (win / total * 100.0) if total > 0 else 0.0,
+            '交易盈利次数': win,
+            '交易亏损次数': loss,
+        }
+
+    def profit_loss_ratio(self) -> float:
+        """盈亏比（聚宽公式：总盈利额 / 总亏损额）。"""
+        pnl = self.sell_pnl
+        total_profit = float(pnl[pnl > 0].sum())
+        total_loss = float(-pnl[pnl <= 0].sum())
+        if total_loss > 1e-12:
+            return total_profit / total_loss
+        if total_profit > 1e-12:
+            return float('inf')  # 只盈利无亏损
+        return 0.0
+
+    def open_counts(self) -> pd.Series:
+        """各标的买入（开仓）次数，降序。"""
+        buys = self.trades[self.trades['amount'] > 0]
+        return buys.groupby('security').size().sort_values(ascending=False)
+
+    def instrument_pnl(self) -> pd.Series:
+        """各标的已实现盈亏（含费用、分红，考虑拆分），按首次出现顺序。"""
+        return self.instruments['realized']
+
+
 def _ensure_plot_fonts():
     """按需配置中文字体，避免在未生成图片时初始化。"""
     global _fonts_ready
@@ -228,163 +493,22 @@ def plot_positions(results: Dict[str, Any], save_path: str = None, show_plots: b
         plt.close(fig)
 
 
-def _compute_trade_win_stats(trades: List[Dict[str, Any]]) -> Dict[str, float]:
+def _compute_trade_win_stats(
+    trades: List[Dict[str, Any]], events: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, float]:
     """按成交（卖出）口径统计交易胜率与次数。"""
-    # 统一访问器
-    def _ga(obj, key, default=None):
-        try:
-            return getattr(obj, key)
-        except Exception:
-            return obj.get(key, default) if isinstance(obj, dict) else default
-
-    def _normalize_trade_time(value):
-        """将各种时间格式统一为可比较的字符串，避免排序报错。"""
-        if value is None:
-            return None
-        if isinstance(value, pd.Timestamp):
-            return value.isoformat()
-        if isinstance(value, datetime):
-            return value.isoformat(sep=' ')
-        try:
-            ts = pd.to_datetime(value, errors='coerce')
-        except Exception:
-            return str(value)
-        if pd.isna(ts):
-            return str(value)
-        return ts.isoformat()
-
-    # 排序确保时间顺序
-    enumerated_trades = list(enumerate(trades or []))
-
-    def _sort_key(item):
-        idx, trade = item
-        normalized = _normalize_trade_time(_ga(trade, 'time'))
-        return (normalized is None, normalized or '', idx)
-
-    enumerated_trades.sort(key=_sort_key)
-    sorted_trades = [trade for _, trade in enumerated_trades]
-    # 按标的维护仓位均价
-    state: Dict[str, Dict[str, float]] = {}
-    def st(code: str):
-        if code not in state:
-            state[code] = {'qty': 0.0, 'avg': 0.0}
-        return state[code]
-
-    win = 0
-    loss = 0
-    for t in sorted_trades:
-        code = _ga(t, 'security')
-        if not code:
-            continue
-        s = st(code)
-        amt = float(_ga(t, 'amount', 0) or 0)
-        price = float(_ga(t, 'price', 0) or 0)
-        commission = float(_ga(t, 'commission', 0) or 0)
-        tax = float(_ga(t, 'tax', 0) or 0)
-        if amt > 0:
-            total = s['avg'] * s['qty'] + price * amt
-            s['qty'] = s['qty'] + amt
-            s['avg'] = (total / s['qty']) if s['qty'] > 0 else 0.0
-        elif amt < 0:
-            sell_qty = abs(amt)
-            pnl = (price - s['avg']) * sell_qty - commission - tax
-            if pnl > 1e-12:
-                win += 1
-            elif pnl < -1e-12:
-                loss += 1
-            s['qty'] = max(0.0, s['qty'] - sell_qty)
-
-    total = win + loss
-    win_rate = (win / total * 100.0) if total > 0 else 0.0
-    return {
-        '交易胜率': win_rate,
-        '交易盈利次数': win,
-        '交易亏损次数': loss,
-    }
+    return TradeLedger.from_results({'trades': trades, 'events': events}).win_stats()
 
 
-def _compute_trade_profit_loss_ratio(trades: List[Dict[str, Any]]) -> float:
+def _compute_trade_profit_loss_ratio(
+    trades: List[Dict[str, Any]], events: Optional[List[Dict[str, Any]]] = None
+) -> float:
     """
     计算基于交易的盈亏比（聚宽公式：总盈利额 / 总亏损额）。
     
     按卖出成交计算每笔交易的盈亏，汇总后计算比率。
     """
-    # 统一访问器
-    def _ga(obj, key, default=None):
-        try:
-            return getattr(obj, key)
-        except Exception:
-            return obj.get(key, default) if isinstance(obj, dict) else default
-
-    def _normalize_trade_time(value):
-        if value is None:
-            return None
-        if isinstance(value, pd.Timestamp):
-            return value.isoformat()
-        if isinstance(value, datetime):
-            return value.isoformat(sep=' ')
-        try:
-            ts = pd.to_datetime(value, errors='coerce')
-        except Exception:
-            return str(value)
-        if pd.isna(ts):
-            return str(value)
-        return ts.isoformat()
-
-    # 排序确保时间顺序
-    enumerated_trades = list(enumerate(trades or []))
-
-    def _sort_key(item):
-        idx, trade = item
-        normalized = _normalize_trade_time(_ga(trade, 'time'))
-        return (normalized is None, normalized or '', idx)
-
-    enumerated_trades.sort(key=_sort_key)
-    sorted_trades = [trade for _, trade in enumerated_trades]
-    
-    # 按标的维护仓位均价
-    state: Dict[str, Dict[str, float]] = {}
-    def st(code: str):
-        if code not in state:
-            state[code] = {'qty': 0.0, 'avg': 0.0}
-        return state[code]
-
-    total_profit = 0.0  # 总盈利额
-    total_loss = 0.0    # 总亏损额（绝对值）
-    
-    for t in sorted_trades:
-        code = _ga(t, 'security')
-        if not code:
-            continue
-        s = st(code)
-        amt = float(_ga(t, 'amount', 0) or 0)
-        price = float(_ga(t, 'price', 0) or 0)
-        commission = float(_ga(t, 'commission', 0) or 0)
-        tax = float(_ga(t, 'tax', 0) or 0)
-        
-        if amt > 0:
-            # 买入：更新加权平均成本
-            total_cost = s['avg'] * s['qty'] + price * amt
-            s['qty'] = s['qty'] + amt
-            s['avg'] = (total_cost / s['qty']) if s['qty'] > 0 else 0.0
-        elif amt < 0:
-            # 卖出：计算盈亏
-            sell_qty = abs(amt)
-            # 盈亏 = (卖出价 - 成本价) * 数量 - 手续费 - 印花税
-            pnl = (price - s['avg']) * sell_qty - commission - tax
-            if pnl > 0:
-                total_profit += pnl
-            else:
-                total_loss += abs(pnl)
-            s['qty'] = max(0.0, s['qty'] - sell_qty)
-    
-    # 盈亏比 = 总盈利额 / 总亏损额
-    if total_loss > 1e-12:
-        return total_profit / total_loss
-    elif total_profit > 1e-12:
-        return float('inf')  # 只盈利无亏损
-    else:
-        return 0.0
+    return TradeLedger.from_results({'trades': trades, 'events': events}).profit_loss_ratio()
 
 
 def calculate_metrics(results: Dict[str, Any]) -> Dict[str, float]:
@@ -529,34 +653,11 @@ def calculate_metrics(results: Dict[str, Any]) -> Dict[str, float]:
     losing_days = int((daily_returns < 0).sum())
     win_rate_daily = winning_days / n * 100 if n > 0 else 0.0
     
-    # ========== 盈亏比（聚宽公式：总盈利额 / 总亏损额）==========
-    # 基于交易记录计算，而非日收益
-    trades = results.get('trades', [])
-    total_profit = 0.0
-    total_loss = 0.0
-    for t in trades:
-        # 兼容对象与字典格式
-        if isinstance(t, dict):
-            amt = float(t.get('amount') or t.get('数量') or 0)
-            price = float(t.get('price') or t.get('价格') or 0)
-            commission = float(t.get('commission') or t.get('手续费') or 0)
-            tax = float(t.get('tax') or t.get('印花税') or 0)
-        else:
-            amt = float(getattr(t, 'amount', 0) or 0)
-            price = float(getattr(t, 'price', 0) or 0)
-            commission = float(getattr(t, 'commission', 0) or 0)
-            tax = float(getattr(t, 'tax', 0) or 0)
-        
-        if amt < 0:  # 卖出交易
-            # 简化计算：卖出金额 - 费用（实际盈亏需要成本，这里用交易金额近似）
-            trade_value = abs(amt) * price - commission - tax
-            # 注：精确盈亏需要成本价，这里用 _compute_trade_win_stats 的逻辑
-    
-    # 使用 _compute_trade_win_stats 计算精确的盈亏比
-    trade_stats = _compute_trade_win_stats(trades)
-    
-    # 计算基于交易的盈亏比（总盈利额 / 总亏损额）
-    profit_loss_ratio = _compute_trade_profit_loss_ratio(trades)
+    # ========== 交易胜率与盈亏比（聚宽公式：总盈利额 / 总亏损额）==========
+    # 基于交易记录（含拆分/分红事件）计算，而非日收益
+    ledger = TradeLedger.from_results(results)
+    trade_stats = ledger.win_stats()
+    profit_loss_ratio = ledger.profit_loss_ratio()
     
     # Calmar比率 = 年化收益 / |最大回撤|
     if max_drawdown < 0:
@@ -1179,23 +1280,10 @@ def export_open_counts(results: Dict[str, Any], img_path: str = None, csv_path:
     if not trades:
         print("无法统计开仓次数：无交易记录")
         return
-    # 构建DataFrame
-    rows = []
-    for t in trades:
-        rows.append(
-            {
-                'time': _get_trade_attr(t, 'time'),
-                'security': _get_trade_attr(t, 'security'),
-                'amount': _get_trade_attr(t, 'amount', 0),
-            }
-        )
-    df = pd.DataFrame(rows)
-    df = df.sort_values('time')
-    open_df = df[df['amount'] > 0]
-    if open_df.empty:
+    counts = TradeLedger.from_results(results).open_counts()
+    if counts.empty:
         print("无法统计开仓次数：无买入记录")
         return
-    counts = open_df.groupby('security').size().sort_values(ascending=False)
     counts_df = counts.rename('开仓次数').to_frame()
     counts_df.index.name = '标的'
     # 获取中文名称映射
@@ -1268,79 +1356,9 @@ def export_instrument_pnl(results: Dict[str, Any], img_path: str = None, csv_pat
     if not trades and not events:
         print("无法统计盈亏：无交易与事件数据")
         return
-    # 合并时间轴（交易与事件）
-    timeline = []
-    for t in trades:
-        timeline.append(
-            {
-                'ts': _get_trade_attr(t, 'time'),
-                'type': 'trade',
-                'security': _get_trade_attr(t, 'security'),
-                'amount': _get_trade_attr(t, 'amount', 0) or 0,
-                'price': _get_trade_attr(t, 'price', 0) or 0,
-                'commission': _get_trade_attr(t, 'commission', 0) or 0,
-                'tax': _get_trade_attr(t, 'tax', 0) or 0,
-            }
-        )
-    for e in events:
-        ts = e.get('strategy_time') or e.get('event_date')
-        timeline.append({'ts': ts, 'type': 'event', **e})
-    # 排序
-    timeline = [x for x in timeline if x['ts'] is not None]
-    timeline.sort(key=lambda x: x['ts'])
-    
-    # 按标的维护持仓与成本
-    state = {}  # code -> {qty, avg_cost, realized}
-    def get_state(code):
-        if code not in state:
-            state[code] = {'qty': 0, 'avg_cost': 0.0, 'realized': 0.0}
-        return state[code]
-    
-    for item in timeline:
-        if item['type'] == 'trade':
-            code = item['security']
-            s = get_state(code)
-            amt = item['amount']
-            price = item['price']
-            fee = (item.get('commission', 0.0) or 0.0) + (item.get('tax', 0.0) or 0.0)
-            if amt > 0:
-                # 买入：更新加权平均成本
-                total_cost_value = s['avg_cost'] * s['qty'] + price * amt
-                new_qty = s['qty'] + amt
-                s['avg_cost'] = (total_cost_value / new_qty) if new_qty > 0 else 0.0
-                s['qty'] = new_qty
-                # 手续费计入支出
-                s['realized'] -= fee
-            else:
-                sell_qty = abs(amt)
-                # 卖出：实现盈亏 = (卖价-均价)*数量 - 费用
-                s['realized'] += (price - s['avg_cost']) * sell_qty
-                s['realized'] -= fee
-                s['qty'] = s['qty'] - sell_qty
-                if s['qty'] < 0:
-                    # 理论上不会发生，防御性处理
-                    s['qty'] = 0
-        else:  # event
-            et = item.get('event_type')
-            code = item.get('code')
-            if not code:
-                continue
-            s = get_state(code)
-            if et == '拆分/送转':
-                scale = float(item.get('scale_factor') or 1.0)
-                if abs(scale - 1.0) > 1e-9:
-                    s['qty'] = int(round(s['qty'] * scale))
-                    if s['avg_cost'] > 0: s['avg_cost'] = s['avg_cost'] / scale
-            elif et == '现金分红':
-                cash_in = float(item.get('cash_in') or 0.0)
-                s['realized'] += cash_in
-            # 其他事件不影响已实现盈亏
-    
-    # 汇总结果
-    rows = []
-    for code, s in state.items():
-        rows.append({'标的': code, '盈亏(元)': s['realized']})
-    pnl_df = pd.DataFrame(rows)
+    # 按标的汇总已实现盈亏（交易 + 分红，考虑拆分）
+    realized = TradeLedger.from_results(results).instrument_pnl()
+    pnl_df = pd.DataFrame({'标的': realized.index, '盈亏(元)': realized.to_numpy()})
     if pnl_df.empty:
         print("无法统计盈亏：结果为空")
         return
@@ -1449,6 +1467,9 @@ def generate_html_report(results: Dict[str, Any] = None, output_file: Optional[s
         raise ValueError('缺少 daily_records 或为空，无法生成HTML报告')
 
     trades = results.get('trades', [])
+    if isinstance(trades, ColumnBuffer):
+        # 下方表格视图逐条展示成交，展开为 Trade 列表
+        trades = list(trades)
     events = results.get('events', [])
     metrics = calculate_metrics(results)
     meta = results.get('meta', {})
@@ -1635,18 +1656,10 @@ def generate_html_report(results: Dict[str, Any] = None, output_file: Optional[s
             fig_monthly.add_annotation(x=xv, y=yv, text=f"{val:.1f}%", showarrow=False, font=dict(size=10, color='black'))
     
     # 图4：开仓次数柱状图，添加数值标注
+    ledger = TradeLedger.from_results(results)
     if len(trades) > 0:
-        trade_df = pd.DataFrame(trades)
-        # 兼容不同来源的字段：优先使用 'date'，否则从 'time' 或中文 '时间' 派生
-        if 'date' in trade_df.columns:
-            trade_df['date'] = pd.to_datetime(trade_df['date']).dt.date
-        elif 'time' in trade_df.columns:
-            trade_df['date'] = pd.to_datetime(trade_df['time']).dt.date
-        elif '时间' in trade_df.columns:
-            trade_df['date'] = pd.to_datetime(trade_df['时间']).dt.date
-        else:
-            trade_df['date'] = pd.NaT
-        open_counts = trade_df.dropna(subset=['date']).groupby('date').size().reset_index(name='count')
+        trade_times = ledger.trades['time'].dropna()
+        open_counts = trade_times.groupby(trade_times.dt.date).size().rename_axis('date').reset_index(name='count')
         fig_open = go.Figure()
         fig_open.add_trace(go.Bar(x=open_counts['date'], y=open_counts['count'], text=[f"{int(v)}" for v in open_counts['count']], textposition='outside', name='开仓次数'))
         fig_open.update_layout(title='开仓次数', xaxis_title='日期', yaxis_title='次数', uniformtext_minsize=8, uniformtext_mode='hide')
@@ -1655,66 +1668,9 @@ def generate_html_report(results: Dict[str, Any] = None, output_file: Optional[s
         fig_open.update_layout(title='开仓次数 (无交易)')
     
     # 图5：分标盈亏柱状图（兼容无pnl字段），融合分红与拆分
-    def _compute_instrument_pnl(trades_list, events_list):
-        state = {}
-        def get_state(code):
-            if code not in state:
-                state[code] = {'qty': 0, 'avg_cost': 0.0, 'realized': 0.0}
-            return state[code]
-        timeline = []
-        for t in trades_list:
-            try:
-                ts = getattr(t, 'time', None) if not isinstance(t, dict) else t.get('time') or t.get('时间')
-                security = getattr(t, 'security', None) if not isinstance(t, dict) else t.get('security') or t.get('标的') or t.get('code')
-                amount = getattr(t, 'amount', 0) if not isinstance(t, dict) else t.get('amount') or t.get('数量') or 0
-                price = getattr(t, 'price', 0.0) if not isinstance(t, dict) else t.get('price') or t.get('价格') or 0.0
-                commission = getattr(t, 'commission', 0.0) if not isinstance(t, dict) else t.get('commission') or t.get('手续费') or 0.0
-                tax = getattr(t, 'tax', 0.0) if not isinstance(t, dict) else t.get('tax') or t.get('印花税') or 0.0
-                if ts and security:
-                    timeline.append({'ts': ts, 'type': 'trade', 'security': security, 'amount': amount, 'price': price, 'commission': commission, 'tax': tax})
-            except Exception:
-                continue
-        for e in events_list:
-            ts = e.get('strategy_time') or e.get('event_date')
-            if ts:
-                timeline.append({'ts': ts, 'type': 'event', **e})
-        timeline.sort(key=lambda x: x['ts'])
-        for item in timeline:
-            if item['type'] == 'trade':
-                code = item['security']
-                s = get_state(code)
-                amt = int(item.get('amount') or 0)
-                price = float(item.get('price') or 0.0)
-                fee = float(item.get('commission') or 0.0) + float(item.get('tax') or 0.0)
-                if amt > 0:
-                    total_cost_value = s['avg_cost'] * s['qty'] + price * amt
-                    new_qty = s['qty'] + amt
-                    s['avg_cost'] = (total_cost_value / new_qty) if new_qty > 0 else 0.0
-                    s['qty'] = new_qty
-                    s['realized'] -= fee
-                else:
-                    sell_qty = abs(amt)
-                    s['realized'] += (price - s['avg_cost']) * sell_qty
-                    s['realized'] -= fee
-                    s['qty'] = max(0, s['qty'] - sell_qty)
-            else:
-                et = item.get('event_type')
-                code = item.get('code')
-                if not code:
-                    continue
-                s = get_state(code)
-                if et == '拆分/送转':
-                    scale = float(item.get('scale_factor') or 1.0)
-                    if abs(scale - 1.0) > 1e-9:
-                        s['qty'] = int(round(s['qty'] * scale))
-                        s['avg_cost'] = (s['avg_cost'] / scale) if s['avg_cost'] > 0 else 0.0
-                elif et == '现金分红':
-                    cash_in = float(item.get('cash_in') or 0.0)
-                    s['realized'] += cash_in
-        rows = [{'code': code, 'pnl': s['realized']} for code, s in state.items()]
-        return pd.DataFrame(rows)
     try:
-        pnl_df = _compute_instrument_pnl(trades, events)
+        realized = ledger.instrument_pnl()
+        pnl_df = pd.DataFrame({'code': realized.index, 'pnl': realized.to_numpy()})
         if pnl_df is not None and not pnl_df.empty:
             pnl_df = pnl_df.sort_values('pnl', ascending=False)
 
@@ -1880,14 +1836,10 @@ def generate_html_report(results: Dict[str, Any] = None, output_file: Optional[s
 
     # open_counts（按标的统计开仓次数）
     try:
-        if len(trades) > 0:
-            tdf = pd.DataFrame(trades)
-            sec_col = 'security' if 'security' in tdf.columns else ('标的' if '标的' in tdf.columns else ('code' if 'code' in tdf.columns else None))
-            amt_col = 'amount' if 'amount' in tdf.columns else ('数量' if '数量' in tdf.columns else None)
-            if sec_col and amt_col:
-                oc_df = tdf[tdf[amt_col].astype(float) > 0].groupby(sec_col).size().sort_values(ascending=False).rename('开仓次数').to_frame()
-                oc_df = oc_df.reset_index().rename(columns={sec_col: '标的'})
-                html_parts.append("<details><summary>开仓次数 open_counts.csv</summary>" + df_html(oc_df) + "</details>")
+        oc = ledger.open_counts()
+        if len(oc) > 0:
+            oc_df = oc.rename('开仓次数').to_frame().reset_index().rename(columns={'security': '标的'})
+            html_parts.append("<details><summary>开仓次数 open_counts.csv</summary>" + df_html(oc_df) + "</details>")
     except Exception:
         pass
 
@@ -2143,23 +2095,10 @@ def export_open_counts(results: Dict[str, Any], img_path: str = None, csv_path:
     if not trades:
         print("无法统计开仓次数：无交易记录")
         return
-    # 构建DataFrame
-    rows = []
-    for t in trades:
-        rows.append(
-            {
-                'time': _get_trade_attr(t, 'time'),
-                'security': _get_trade_attr(t, 'security'),
-                'amount': _get_trade_attr(t, 'amount', 0),
-            }
-        )
-    df = pd.DataFrame(rows)
-    df = df.sort_values('time')
-    open_df = df[df['amount'] > 0]
-    if open_df.empty:
+    counts = TradeLedger.from_results(results).open_counts()
+    if counts.empty:
         print("无法统计开仓次数：无买入记录")
         return
-    counts = open_df.groupby('security').size().sort_values(ascending=False)
     counts_df = counts.rename('开仓次数').to_frame()
     counts_df.index.name = '标的'
     # 获取中文名称映射
@@ -2209,79 +2148,9 @@ def export_instrument_pnl(results: Dict[str, Any], img_path: str = None, csv_pat
     if not trades and not events:
         print("无法统计盈亏：无交易与事件数据")
         return
-    # 合并时间轴（交易与事件）
-    timeline = []
-    for t in trades:
-        timeline.append(
-            {
-                'ts': _get_trade_attr(t, 'time'),
-                'type': 'trade',
-                'security': _get_trade_attr(t, 'security'),
-                'amount': _get_trade_attr(t, 'amount', 0) or 0,
-                'price': _get_trade_attr(t, 'price', 0) or 0,
-                'commission': _get_trade_attr(t, 'commission', 0) or 0,
-                'tax': _get_trade_attr(t, 'tax', 0) or 0,
-            }
-        )
-    for e in events:
-        ts = e.get('strategy_time') or e.get('event_date')
-        timeline.append({'ts': ts, 'type': 'event', **e})
-    # 排序
-    timeline = [x for x in timeline if x['ts'] is not None]
-    timeline.sort(key=lambda x: x['ts'])
-    
-    # 按标的维护持仓与成本
-    state = {}  # code -> {qty, avg_cost, realized}
-    def get_state(code):
-        if code not in state:
-            state[code] = {'qty': 0, 'avg_cost': 0.0, 'realized': 0.0}
-        return state[code]
-    
-    for item in timeline:
-        if item['type'] == 'trade':
-            code = item['security']
-            s = get_state(code)
-            amt = item['amount']
-            price = item['price']
-            fee = (item.get('commission', 0.0) or 0.0) + (item.get('tax', 0.0) or 0.0)
-            if amt > 0:
-                # 买入：更新加权平均成本
-                total_cost_value = s['avg_cost'] * s['qty'] + price * amt
-                new_qty = s['qty'] + amt
-                s['avg_cost'] = (total_cost_value / new_qty) if new_qty > 0 else 0.0
-                s['qty'] = new_qty
-                # 手续费计入支出
-                s['realized'] -= fee
-            else:
-                sell_qty = abs(amt)
-                # 卖出：实现盈亏 = (卖价-均价)*数量 - 费用
-                s['realized'] += (price - s['avg_cost']) * sell_qty
-                s['realized'] -= fee
-                s['qty'] = s['qty'] - sell_qty
-                if s['qty'] < 0:
-                    # 理论上不会发生，防御性处理
-                    s['qty'] = 0
-        else:  # event
-            et = item.get('event_type')
-            code = item.get('code')
-            if not code:
-                continue
-            s = get_state(code)
-            if et == '拆分/送转':
-                scale = float(item.get('scale_factor') or 1.0)
-                if abs(scale - 1.0) > 1e-9:
-                    s['qty'] = int(round(s['qty'] * scale))
-                    if s['avg_cost'] > 0: s['avg_cost'] = s['avg_cost'] / scale
-            elif et == '现金分红':
-                cash_in = float(item.get('cash_in') or 0.0)
-                s['realized'] += cash_in
-            # 其他事件不影响已实现盈亏
-    
-    # 汇总结果
-    rows = []
-    for code, s in state.items():
-        rows.append({'标的': code, '盈亏(元)': s['realized']})
-    pnl_df = pd.DataFrame(rows)
+    # 按标的汇总已实现盈亏（交易 + 分红，考虑拆分）
+    realized = TradeLedger.from_results(results).instrument_pnl()
+    pnl_df = pd.DataFrame({'标的': realized.index, '盈亏(元)': realized.to_numpy()})
     if pnl_df.empty:
         print("无法统计盈亏：结果为空")
         return
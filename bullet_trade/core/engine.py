@@ -13,6 +13,8 @@ from datetime import datetime, timedelta, time as Time, date
 import pandas as pd
 import numpy as np
 import time
+import warnings
+from dataclasses import dataclass
 from decimal import Decimal, ROUND_HALF_UP
 # from pathlib import Path  # removed: use local import in _setup_log_file
 # Optional import: jqdatasdk for fallback in strategy wrapper
@@ -22,7 +24,7 @@ from decimal import Decimal, ROUND_HALF_UP
 jq = None
 
 from .models import Context, Portfolio, Position, Trade, OrderStatus
-from .globals import g, log, reset_globals
+from .globals import close_file_handler, g, log, reset_globals, wrap_file_handler
 from .settings import get_settings, reset_settings, OrderCost, FixedSlippage, PriceRelatedSlippage, StepRelatedSlippage
 from .orders import get_order_queue, clear_order_queue, MarketOrderStyle, LimitOrderStyle
 from .scheduler import (
@@ -39,10 +41,15 @@ from ..data.api import (
     get_trade_days as api_get_trade_days,
     get_data_provider,
     get_security_info,
+    save_security_master,
+    set_bar_store,
 )
+from ..data.bar_store import BarStore, get_shared_bar_store
+from ..data.corporate_actions import CorporateActionCalendar, fetch_paused_frame, paused_on_date
+from .recording import DAILY_POSITION_COLUMNS, DAILY_RECORD_COLUMNS, ColumnBuffer, TradeLog
 from .runtime import set_current_engine
 from . import pricing
-from ..utils.env_loader import get_live_trade_config
+from ..utils.env_loader import get_live_trade_config, get_system_config
 
 _BASE_MARKET_SLIPPAGE = 0.00246
 _DEFAULT_MARKET_BUY_PERCENT = _BASE_MARKET_SLIPPAGE / 2
@@ -51,6 +58,36 @@ _DEFAULT_MARKET_SELL_PERCENT = -_BASE_MARKET_SLIPPAGE / 2
 PRE_MARKET_OFFSET = timedelta(minutes=30)
 
 
+@dataclass
+class _OrderQuote:
+    """撮合前按标的一次性解析的行情、分类、费用与滑点成交价。"""
+    security: str
+    info: Dict[str, Any]
+    category: str
+    current_price: float
+    buy_price: float
+    sell_price: float
+    order_cost: Optional[OrderCost]
+    tplus: int
+
+    def trade_price(self, is_buy: bool) -> float:
+        return self.buy_price if is_buy else self.sell_price
+
+
+def _day_banner_enabled() -> bool:
+    """LOG_DAY_BANNER=summary 时关闭逐日横幅，只输出阶段进度。"""
+    return get_system_config().get('log_day_banner') != 'summary'
+
+
+def _results_spill_config() -> Dict[str, Any]:
+    """BACKTEST_SPILL_DIR 非空时，每日记录/持仓快照每累计 BACKTEST_SPILL_ROWS 行落盘一块。"""
+    config = get_system_config()
+    return {
+        'spill_dir': config.get('results_spill_dir') or None,
+        'spill_rows': config.get('results_spill_rows') or 0,
+    }
+
+
 class BacktestEngine:
     """回测引擎"""
     
@@ -101,6 +138,8 @@ class BacktestEngine:
         self.initial_cash = initial_cash
         self.log_file = log_file
         self.file_handler = None  # 文件处理器
+        # 逐日横幅日志：True 每个交易日输出横幅与账户行；False（LOG_DAY_BANNER=summary）只输出阶段进度
+        self._day_banner = True
         
         # 策略函数：支持直接传递（测试框架）或从文件加载
         self.initialize_func: Optional[Callable] = initialize
@@ -110,13 +149,16 @@ class BacktestEngine:
         self.process_initialize_func: Optional[Callable] = process_initialize
         
         self.context: Optional[Context] = None
-        self.daily_records = []  # 每日记录
-        self.trades = []  # 所有交易记录
+        # 结果记录为列式缓冲区（可按列表下标/迭代访问），BACKTEST_SPILL_DIR 配置时超长回测分块落盘
+        spill = _results_spill_config()
+        self.daily_records = ColumnBuffer(DAILY_RECORD_COLUMNS, **spill)  # 每日记录
+        self.trades = TradeLog()  # 所有交易记录
         self.events = []  # 事件记录（分红/拆分）
         self._processed_dividend_keys = set()  # 已处理的分红事件键（避免重复处理）
+        self._corporate_actions: Optional[CorporateActionCalendar] = None  # 回测期间的权益事件/停牌日历
         self.benchmark_data = None  # 基准数据
         # 新增：每日持仓快照记录
-        self.daily_positions = []
+        self.daily_positions = ColumnBuffer(DAILY_POSITION_COLUMNS, 1024, **spill)
         # 新增：用户自定义参数与初始持仓
         self.extras = extras or None
         self.initial_positions = initial_positions or None
@@ -125,6 +167,9 @@ class BacktestEngine:
         self.start_total_value: Optional[float] = None
         # 新增：回测运行耗时（秒）
         self.runtime_seconds: Optional[float] = None
+        # 分阶段耗时（秒）：setup=策略加载与初始化, data_load=交易日/基准/行情预加载, simulate=逐日回测
+        self.phase_seconds: Dict[str, float] = {}
+        self._bar_store: Optional[BarStore] = None  # 回测期间的行情列存储（preload_bars 开启时）
         self._trade_calendar: Dict[date, Dict[str, Any]] = {}
         market_cfg = get_live_trade_config()
         self._market_buy_percent = float(market_cfg.get('market_buy_price_percent', _DEFAULT_MARKET_BUY_PERCENT))
@@ -549,6 +594,9 @@ class BacktestEngine:
                 log.error(traceback.format_exc())
                 raise
         
+        t_data = time.time()
+        self.phase_seconds = {'setup': round(t_data - t0_run, 3)}
+
         # 获取交易日列表（直接使用Provider，避免上下文限制导致只取到起始日）
         provider = get_data_provider()
         trade_days = provider.get_trade_days(
@@ -604,6 +652,14 @@ class BacktestEngine:
         settings = get_settings()
         if settings.benchmark:
             self._load_benchmark_data(settings.benchmark)
+
+        # 按需预加载标的池行情到内存列存储
+        self._preload_bar_store(trade_days)
+        self._build_corporate_action_calendar(trade_days)
+        self._day_banner = _day_banner_enabled()
+        progress_step = max(1, len(trade_days) // 20)
+        t_simulate = time.time()
+        self.phase_seconds['data_load'] = round(t_simulate - t_data, 3)
         
         # 逐日回测
         for i, trade_day in enumerate(trade_days):
@@ -626,10 +682,11 @@ class BacktestEngine:
             except Exception as ex:
                 log.debug(f"T+1 解锁失败: {ex}")
 
-            log.info(f"\n{'=' * 60}")
-            log.info(f"交易日: {trade_day.strftime('%Y-%m-%d')} ({i+1}/{len(trade_days)})")
-            if self.context.previous_date:
-                log.debug(f"前一交易日: {self.context.previous_date}")
+            if self._day_banner:
+                log.info(f"\n{'=' * 60}")
+                log.info(f"交易日: {trade_day.strftime('%Y-%m-%d')} ({i+1}/{len(trade_days)})")
+                if self.context.previous_date:
+                    log.debug("前一交易日: %s", self.context.previous_date)
 
             market_periods = get_market_periods()
 
@@ -644,7 +701,19 @@ class BacktestEngine:
 
             # 新增：记录每日持仓快照（已是收盘价）
             self._record_daily_positions()
+
+            if not self._day_banner and ((i + 1) % progress_step == 0 or i + 1 == len(trade_days)):
+                portfolio = self.context.portfolio
+                log.info(
+                    f"回测进度 {i + 1}/{len(trade_days)} ({trade_day.strftime('%Y-%m-%d')}): "
+                    f"账户总值 {portfolio.total_value:,.2f}, 累计收益率 {self.daily_records[-1]['returns_pct']:.2f}%"
+                )
         
+        self.phase_seconds['simulate'] = round(time.time() - t_simulate, 3)
+        self._release_bar_store()
+        self._corporate_actions = None
+        save_security_master()
+
         log.info("\n" + "=" * 60)
         log.info("回测完成")
         log.info("=" * 60)
@@ -682,19 +751,21 @@ class BacktestEngine:
                 file_level = logging.INFO
             
             # 创建文件处理器
-            self.file_handler = logging.FileHandler(
+            file_handler = logging.FileHandler(
                 self.log_file, 
                 mode='w', 
                 encoding='utf-8'
             )
-            self.file_handler.setLevel(file_level)
+            file_handler.setLevel(file_level)
             
             # 设置日志格式
             formatter = logging.Formatter(
                 '%(asctime)s [%(levelname)s] %(message)s',
                 datefmt='%Y-%m-%d %H:%M:%S'
             )
-            self.file_handler.setFormatter(formatter)
+            file_handler.setFormatter(formatter)
+            # 默认经队列由后台线程写文件（LOG_FILE_ASYNC）
+            self.file_handler = wrap_file_handler(file_handler)
             
             # 确保 logger 主体级别不高于文件级别，否则消息会被过滤
             if log.logger.level > file_level:
@@ -721,8 +792,6 @@ class BacktestEngine:
         """清理日志文件处理器"""
         try:
             if self.file_handler:
-                self.file_handler.flush()
-                self.file_handler.close()
                 log.logger.removeHandler(self.file_handler)
                 # 同时从 bullet_trade logger 移除
                 try:
@@ -731,6 +800,7 @@ class BacktestEngine:
                     std_logger.removeHandler(self.file_handler)
                 except Exception:
                     pass
+                close_file_handler(self.file_handler)
                 self.file_handler = None
                 log.info(f"日志已保存至: {self.log_file}")
         except Exception as e:
@@ -867,24 +937,23 @@ class BacktestEngine:
                     # 生成事件唯一键，用于避免重复处理
                     event_key = f"{code}_{eff_date}_{split_ratio}_{gross_div}"
                     if event_key in self._processed_dividend_keys:
-                        log.debug(f"{code} 分红/拆分事件已处理过，跳过: {event_key}")
+                        log.debug("%s 分红/拆分事件已处理过，跳过: %s", code, event_key)
                         continue
                     
                     # 记录完整的分红/拆分事件信息
                     log.debug(
-                        f"{code} 分红/拆分事件: 除权日={eff_date}, 当前日={current_date}, "
-                        f"拆分比例={split_ratio:.4f}, 派息={gross_div:.4f}, "
-                        f"当前持仓={pos.total_amount}股, 当前价格={pos.price:.4f}"
+                        "%s 分红/拆分事件: 除权日=%s, 当前日=%s, 拆分比例=%.4f, 派息=%.4f, 当前持仓=%s股, 当前价格=%.4f",
+                        code, eff_date, current_date, split_ratio, gross_div, pos.total_amount, pos.price,
                     )
                     
                     if not self._is_action_effective_today(action, current_date):
-                        log.debug(f"{code} 分红/拆分事件: 除权日 {eff_date} 未到当日 {current_date}，跳过")
+                        log.debug("%s 分红/拆分事件: 除权日 %s 未到当日 %s，跳过", code, eff_date, current_date)
                         continue
                     
                     # 检查除权日当天是否停牌：如果停牌则延迟到复牌日处理
                     # 使用直接调用 provider 的方式绕过 avoid_future_data 限制
                     is_paused = self._is_security_paused_on_date(code, eff_date)
-                    log.debug(f"{code} 停牌检测结果: 除权日 {eff_date} 停牌={is_paused}")
+                    log.debug("%s 停牌检测结果: 除权日 %s 停牌=%s", code, eff_date, is_paused)
                     
                     if is_paused:
                         if eff_date == current_date:
@@ -930,7 +999,7 @@ class BacktestEngine:
                     
                     # 记录已处理的分红事件，避免重复处理
                     self._processed_dividend_keys.add(event_key)
-                    log.debug(f"{code} 分红/拆分事件已处理: {event_key}")
+                    log.debug("%s 分红/拆分事件已处理: %s", code, event_key)
             except Exception as e:
                 log.debug(f"处理分红失败 {code}: {e}")
 
@@ -1376,6 +1445,11 @@ class BacktestEngine:
 
     def _load_corporate_actions(self, code: str, start_date: datetime.date, end_date: datetime.date) -> List[Dict[str, Any]]:
         """加载标的在区间内的分红/拆分等权益事件。失败时返回空列表。"""
+        calendar = self._corporate_actions
+        if calendar is not None:
+            events = calendar.events(code, start_date, end_date)
+            if events is not None:
+                return events
         try:
             from ..data.api import get_split_dividend
 
@@ -1402,78 +1476,193 @@ class BacktestEngine:
         - QMT: 停牌日无数据，返回前一天数据
         
         注意：此函数直接调用 provider.get_price，绕过 avoid_future_data 限制，
-        因为停牌状态是元数据，不是策略交易信号。
+        因为停牌状态是元数据，不是策略交易信号。回测运行期间优先查预加载的停牌日历。
         """
+        calendar = self._corporate_actions
+        if calendar is not None:
+            try:
+                cached = calendar.is_paused(security, check_date)
+            except Exception as e:
+                log.debug(f"停牌日历查询失败 {security}: {e}")
+                cached = None
+            if cached is not None:
+                return cached
         try:
-            from datetime import timedelta
             from bullet_trade.data import api as data_api
-            
+
             # 直接调用 provider 的 get_price，绕过 api 层的 avoid_future_data 检查
             # 这是因为停牌判断是元数据，不应受回测模式限制
             provider = data_api._provider
-            
-            # 获取 check_date 前后的数据
-            start = check_date - timedelta(days=5)
-            end = check_date + timedelta(days=1)  # 多取一天确保包含 check_date
-            
-            df = provider.get_price(
-                security=security,
-                start_date=datetime.combine(start, Time(0, 0)),
-                end_date=datetime.combine(end, Time(15, 0)),
-                frequency='daily',
-                fields=['volume', 'paused'],
-                fq='none',
-                skip_paused=False  # 重要：不跳过停牌日，否则无法判断
+
+            # 获取 check_date 前后的数据（多取一天确保包含 check_date）
+            df = fetch_paused_frame(
+                provider,
+                security,
+                check_date - timedelta(days=5),
+                check_date + timedelta(days=1),
             )
-            
-            if df.empty:
-                log.debug(f"{security} 在 {check_date} 附近无数据")
-                return False  # 无法判断，不阻断
-            
-            # 获取 df 中所有日期
-            dates_in_df = []
-            for idx in df.index:
-                if hasattr(idx, 'date'):
-                    dates_in_df.append(idx.date())
-                elif hasattr(idx, 'to_pydatetime'):
-                    dates_in_df.append(idx.to_pydatetime().date())
-            dates_in_df = sorted(dates_in_df)
-            
-            log.debug(f"{security} 停牌检测: check_date={check_date}, df日期={dates_in_df[-5:] if len(dates_in_df) > 5 else dates_in_df}")
-            
-            # 检查 check_date 是否在数据中
-            if check_date not in dates_in_df:
-                # 数据中没有 check_date（QMT行为），判定为停牌
-                prev_day = check_date - timedelta(days=1)
-                if prev_day in dates_in_df or (dates_in_df and dates_in_df[-1] >= prev_day):
-                    log.debug(f"{security} 在 {check_date} 无数据（数据范围正常），判定为停牌")
-                    return True
-                else:
-                    log.debug(f"{security} 在 {check_date} 无数据，数据范围不足，无法判断")
-                    return False
-            
-            # check_date 在数据中（JQData行为），检查 paused/volume 字段
-            for idx in df.index:
-                idx_date = idx.date() if hasattr(idx, 'date') else idx.to_pydatetime().date()
-                if idx_date == check_date:
-                    row = df.loc[idx]
-                    # 优先使用 paused 字段
-                    if 'paused' in row and pd.notna(row['paused']):
-                        is_paused = bool(row['paused'])
-                        log.debug(f"{security} 在 {check_date} paused={row['paused']}，停牌={is_paused}")
-                        return is_paused
-                    # 其次用成交量判断
-                    if 'volume' in row:
-                        is_paused = float(row['volume'] or 0) == 0
-                        log.debug(f"{security} 在 {check_date} volume={row['volume']}，停牌={is_paused}")
-                        return is_paused
-                    break
-            
-            return False
+            return paused_on_date(df, check_date, security)
         except Exception as e:
             log.debug(f"检查 {security} 停牌状态失败: {e}")
             return False  # 获取失败时不阻断处理
 
+    def _resolve_base_exec_prices(
+        self, securities: Sequence[str], current_dt: datetime, fq_mode: str
+    ) -> Dict[str, Optional[float]]:
+        """批量解析撮合基准价：同一时间窗口的多个标的合并为一次 get_price。
+        批量结果缺失/无效的标的逐个回退到 _resolve_base_exec_price，保证与单标的口径一致。
+        """
+        prices: Dict[str, Optional[float]] = {}
+        if len(securities) > 1:
+            t = current_dt.time() if isinstance(current_dt, datetime) else None
+            if t and (Time(9, 25) <= t < Time(9, 31)):
+                frequency, field = 'daily', 'open'
+            elif t and (Time(9, 31) <= t < Time(15, 0)):
+                frequency, field = 'minute', 'close'
+            else:
+                frequency, field = 'daily', 'close'
+            try:
+                with warnings.catch_warnings():
+                    # 内部批量调用，panel 废弃提示对用户无意义
+                    warnings.simplefilter('ignore', UserWarning)
+                    df = api_get_price(
+                        security=list(securities),
+                        end_date=current_dt,
+                        frequency=frequency,
+                        fields=[field],
+                        count=1,
+                        fq=fq_mode,
+                    )
+                if isinstance(df, pd.DataFrame) and not df.empty and isinstance(df.columns, pd.MultiIndex):
+                    table = df[field] if field in df.columns.get_level_values(0) else None
+                    if table is not None:
+                        for code in securities:
+                            if code in table.columns:
+                                value = table[code].iloc[-1]
+                                if pd.notna(value) and float(value) > 0:
+                                    prices[code] = float(value)
+            except Exception as exc:
+                log.debug(f"批量获取撮合基准价失败，逐个回退: {exc}")
+        for code in securities:
+            if code not in prices:
+                prices[code] = self._resolve_base_exec_price(code, current_dt, fq_mode)
+        return prices
+
+    def _slippage_params(self, security: str, category: str, info: Dict[str, Any]) -> Optional[Tuple[str, float]]:
+        """把显式滑点配置化为 ('mul'|'add', 单边幅度)；无显式配置或非常规配置返回 None。"""
+        subtype = str(info.get('subtype') or '').lower()
+        if category == 'money_market_fund' or subtype in ('mmf', 'money_market_fund'):
+            return ('add', 0.0)
+        cfg = self._select_slippage_config(security, category, info) or get_settings().slippage
+        if isinstance(cfg, PriceRelatedSlippage):
+            return ('mul', float(cfg.ratio) / 2.0)
+        if isinstance(cfg, StepRelatedSlippage):
+            tick = self._tick_step_for_security(security, info=info, category=category)
+            return ('add', float(cfg.steps) * tick / 2.0)
+        if isinstance(cfg, FixedSlippage):
+            return ('add', float(cfg.value) / 2.0)
+        return None
+
+    def _prepare_order_quotes(
+        self, orders: Sequence[Any], current_data: Any, current_dt: datetime, fq_mode: str
+    ) -> Dict[str, _OrderQuote]:
+        """
+        撮合前的批量阶段：对队列中出现的标的一次性解析证券信息、分类、费用、T+N、
+        撮合基准价，并以数组方式计算买/卖两个方向的滑点与最小报价单位取整结果。
+        资金/持仓变更仍在 _process_orders 中按队列顺序执行。
+        无行情、停牌或解析失败的标的不生成报价，由逐单流程按原逻辑处理。
+        """
+        codes: List[str] = []
+        infos: Dict[str, Dict[str, Any]] = {}
+        last_prices: Dict[str, float] = {}
+        for code in dict.fromkeys(o.security for o in orders):
+            try:
+                if code not in current_data:
+                    continue
+                data = current_data[code]
+                if data.paused:
+                    continue
+                try:
+                    info = get_security_info(code)
+                except Exception:
+                    continue
+                infos[code] = info
+                last_prices[code] = float(data.last_price)
+                codes.append(code)
+            except Exception:
+                continue
+        if not codes:
+            return {}
+
+        base_prices = self._resolve_base_exec_prices(codes, current_dt, fq_mode)
+        quotes: Dict[str, _OrderQuote] = {}
+        valid: List[str] = []
+        price_arr: List[float] = []
+        step_arr: List[float] = []
+        kinds: List[Optional[Tuple[str, float]]] = []
+        for code in codes:
+            try:
+                info = infos[code]
+                category = self._infer_security_category(code, info)
+                base = base_prices.get(code)
+                current_price = float(base) if base and base > 0 else last_prices[code]
+                if current_price <= 0:
+                    continue
+                kinds.append(self._slippage_params(code, category, info))
+                step_arr.append(self._tick_step_for_security(code))
+                price_arr.append(current_price)
+                quotes[code] = _OrderQuote(
+                    security=code,
+                    info=info,
+                    category=category,
+                    current_price=current_price,
+                    buy_price=current_price,
+                    sell_price=current_price,
+                    order_cost=self._get_order_cost_config(code),
+                    tplus=self._infer_tplus_from_info(info),
+                )
+                valid.append(code)
+            except Exception as exc:
+                log.debug(f"撮合预处理失败 {code}: {exc}")
+                quotes.pop(code, None)
+        if not valid:
+            return quotes
+
+        prices = np.asarray(price_arr, dtype=float)
+        buy = prices.copy()
+        sell = prices.copy()
+        mul = np.array([k is not None and k[0] == 'mul' for k in kinds])
+        add = np.array([k is not None and k[0] == 'add' for k in kinds])
+        half = np.array([k[1] if k is not None else 0.0 for k in kinds], dtype=float)
+        buy[mul] = prices[mul] * (1 + half[mul])
+        sell[mul] = prices[mul] * (1 - half[mul])
+        buy[add] = prices[add] + half[add]
+        sell[add] = prices[add] - half[add]
+        for i, code in enumerate(valid):
+            quote = quotes[code]
+            if kinds[i] is None:
+                # 未显式配置：走默认滑点（可被子类/测试覆盖）
+                if quote.category == 'money_market_fund':
+                    continue
+                buy[i] = self._apply_slippage_price(quote.current_price, True, code)
+                sell[i] = self._apply_slippage_price(quote.current_price, False, code)
+
+        steps = np.asarray(step_arr, dtype=float)
+        ticked = steps > 0
+        safe_steps = np.where(ticked, steps, 1.0)
+        buy_ticks = np.floor(buy / safe_steps + 0.5)
+        sell_ticks = np.floor(sell / safe_steps + 0.5)
+        for i, code in enumerate(valid):
+            quote = quotes[code]
+            if ticked[i]:
+                digits = 3 if steps[i] == 0.001 else 2
+                quote.buy_price = round(float(buy_ticks[i]) * float(steps[i]), digits)
+                quote.sell_price = round(float(sell_ticks[i]) * float(steps[i]), digits)
+            else:
+                quote.buy_price = float(buy[i])
+                quote.sell_price = float(sell[i])
+        return quotes
+
     def _process_orders(self, current_dt: datetime):
         """处理订单队列"""
         orders = get_order_queue()
@@ -1512,6 +1701,13 @@ class BacktestEngine:
         use_real_price = bool(settings.options.get('use_real_price'))
         fq_mode = 'pre' if use_real_price else 'none'
 
+        # 批量阶段：按标的一次性解析行情/分类/费用/滑点成交价，逐单阶段只做资金与持仓变更
+        try:
+            quotes = self._prepare_order_quotes(orders, current_data, self.context.current_dt, fq_mode)
+        except Exception as ex:
+            log.debug(f"批量撮合预处理失败，逐单处理: {ex}")
+            quotes = {}
+
         for order in orders:
             try:
                 # 获取当前价格
@@ -1521,11 +1717,15 @@ class BacktestEngine:
                     continue
                 
                 security_data = current_data[order.security]
-                try:
-                    sec_info = get_security_info(order.security)
-                except Exception:
-                    sec_info = {}
-                security_category = self._infer_security_category(order.security, sec_info)
+                quote = quotes.get(order.security)
+                if quote is not None:
+                    sec_info = quote.info
+                else:
+                    try:
+                        sec_info = get_security_info(order.security)
+                    except Exception:
+                        sec_info = {}
+                security_category = quote.category if quote is not None else self._infer_security_category(order.security, sec_info)
                 if security_data.paused:
                     log.warning(f"{order.security} 停牌，订单取消")
                     order.status = OrderStatus.canceled
@@ -1533,9 +1733,11 @@ class BacktestEngine:
                 
                 # 解析执行价基准（封装逻辑便于维护与测试）
                 current_dt = self.context.current_dt
-                base_exec_price = self._resolve_base_exec_price(order.security, current_dt, fq_mode)
-
-                current_price = float(base_exec_price) if base_exec_price and base_exec_price > 0 else security_data.last_price
+                if quote is not None:
+                    current_price = quote.current_price
+                else:
+                    base_exec_price = self._resolve_base_exec_price(order.security, current_dt, fq_mode)
+                    current_price = float(base_exec_price) if base_exec_price and base_exec_price > 0 else security_data.last_price
                 if current_price <= 0:
                     log.warning(f"{order.security} 价格无效: {current_price}")
                     order.status = OrderStatus.rejected
@@ -1544,7 +1746,7 @@ class BacktestEngine:
                 # 计算下单数量（普通/目标/价值）——使用 current_price 作为金额换算基准
                 amount = self._calculate_order_amount(order, current_price)
                 if amount == 0:
-                    log.debug(f"{order.security} 无需交易")
+                    log.debug("%s 无需交易", order.security)
                     order.status = OrderStatus.canceled
                     continue
                 
@@ -1579,15 +1781,17 @@ class BacktestEngine:
                         except Exception as exc:
                             log.debug(f"未能计算市价保护价 {order.security}: {exc}")
 
-                if trade_price is None:
+                if quote is not None:
+                    info = quote.info
+                    trade_price = quote.trade_price(is_buy)
+                else:
                     info = get_security_info(order.security)
                     category = self._infer_security_category(order.security, info)
                     if category == 'money_market_fund':
                         trade_price = current_price
                     else:
                         trade_price = self._apply_slippage_price(current_price, is_buy, order.security)
-
-                trade_price = self._round_to_tick(trade_price, order.security, is_buy=None)
+                    trade_price = self._round_to_tick(trade_price, order.security, is_buy=None)
                 
                 # 根据证券分类确定价格精度：stock=2位小数，fund/money_market_fund=3位小数
                 price_decimals = 2 if security_category == 'stock' else 3
@@ -1614,7 +1818,7 @@ class BacktestEngine:
                 fund_check_price = limit_price if limit_price is not None else trade_price
                 
                 # 费用参数
-                order_cost_config = self._get_order_cost_config(order.security)
+                order_cost_config = quote.order_cost if quote is not None else self._get_order_cost_config(order.security)
                 if order_cost_config:
                     open_comm_rate = order_cost_config.open_commission
                     open_tax_rate = order_cost_config.open_tax
@@ -1656,7 +1860,7 @@ class BacktestEngine:
                     # 买入：一手取整 + 最小申报量
                     final_amount = (final_amount // min_trade_size) * min_trade_size
                     if final_amount < min_trade_size:
-                        log.debug(f"{order.security} 买入数量 {final_amount} 不足最小申报量({min_order_amount})")
+                        log.debug("%s 买入数量 %s 不足最小申报量(%s)", order.security, final_amount, min_order_amount)
                         order.status = OrderStatus.canceled
                         continue
                 else:
@@ -1664,11 +1868,11 @@ class BacktestEngine:
                     if pos.closeable_amount >= min_trade_size:
                         final_amount = (final_amount // min_trade_size) * min_trade_size
                         if final_amount < min_trade_size:
-                            log.debug(f"{order.security} 卖出数量 {final_amount} 不足最小申报量({min_order_amount})")
+                            log.debug("%s 卖出数量 %s 不足最小申报量(%s)", order.security, final_amount, min_order_amount)
                             order.status = OrderStatus.canceled
                             continue
                     else:
-                        log.debug(f"{order.security} 可卖持仓 {final_amount} 不足一手，允许碎股卖出")
+                        log.debug("%s 可卖持仓 %s 不足一手，允许碎股卖出", order.security, final_amount)
                         final_amount = final_amount
                 
                 trade_amount = final_amount
@@ -1705,7 +1909,7 @@ class BacktestEngine:
                     position = self.context.portfolio.positions[order.security]
                     position.update_position(trade_amount, trade_price)
                     # T+ 规则：若 tplus=1，将当日买入计入锁定，并从可卖数量中抵消同额增量
-                    tplus = self._infer_tplus_from_info(info)
+                    tplus = quote.tplus if quote is not None else self._infer_tplus_from_info(info)
                     if tplus == 1:
                         # today_buy_t1 仅记录当日买入；抵消 update_position 对 closeable 的递增
                         position.today_buy_t1 = getattr(position, 'today_buy_t1', 0) + trade_amount
@@ -1863,36 +2067,148 @@ class BacktestEngine:
         """记录每日数据"""
         portfolio = self.context.portfolio
         
-        record = {
-            'date': self.context.current_dt,
-            'total_value': portfolio.total_value,
-            'cash': portfolio.available_cash,
-            'positions_value': portfolio.positions_value,
-            'returns': portfolio.total_value - (self.start_total_value if self.start_total_value is not None else self.initial_cash),
-            'returns_pct': (portfolio.total_value / (self.start_total_value if self.start_total_value is not None else self.initial_cash) - 1) * 100,
-        }
-        
-        self.daily_records.append(record)
+        base = self.start_total_value if self.start_total_value is not None else self.initial_cash
+        total_value = portfolio.total_value
+        returns_pct = (total_value / base - 1) * 100
+        
+        self.daily_records.append(
+            self.context.current_dt,
+            total_value,
+            portfolio.available_cash,
+            portfolio.positions_value,
+            total_value - base,
+            returns_pct,
+        )
+        if not self._day_banner:
+            return
         
-        log.info(f"账户总值: {portfolio.total_value:,.2f}, 现金: {portfolio.available_cash:,.2f}, 持仓市值: {portfolio.positions_value:,.2f}")
-        log.info(f"累计收益率: {record['returns_pct']:.2f}%")
+        log.info(f"账户总值: {total_value:,.2f}, 现金: {portfolio.available_cash:,.2f}, 持仓市值: {portfolio.positions_value:,.2f}")
+        log.info(f"累计收益率: {returns_pct:.2f}%")
 
     # 新增：记录每日持仓快照（在更新收盘价后调用）
     def _record_daily_positions(self):
         portfolio = self.context.portfolio
         current_dt = self.context.current_dt
+        append = self.daily_positions.append
         for code, pos in portfolio.positions.items():
-            self.daily_positions.append({
-                'date': current_dt,
-                'code': code,
-                'amount': pos.total_amount,
-                'closeable_amount': pos.closeable_amount,
-                'avg_cost': pos.avg_cost,
-                'acc_avg_cost': pos.acc_avg_cost,
-                'price': pos.price,
-                'value': pos.value,
-            })
+            append(
+                current_dt,
+                code,
+                pos.total_amount,
+                pos.closeable_amount,
+                pos.avg_cost,
+                pos.acc_avg_cost,
+                pos.price,
+                pos.value,
+            )
+
+
+    def _preload_bar_store(self, trade_days: Sequence[datetime]) -> None:
+        """
+        按 set_option('preload_bars', ...) 一次性加载标的池行情到内存列存储。
+
+        标的池 = set_universe 标的 + 基准 + 初始持仓；区间向前多取 preload_lookback_days 个交易日，
+        以便 history/attribute_history 的回看窗口也能命中。未开启或加载失败时保持原有逐次请求路径。
+        若进程已挂载覆盖回测区间的共享列存储（参数优化 shared_data 模式），直接复用而不再加载。
+        """
+        set_bar_store(None)
+        self._bar_store = None
+        shared = get_shared_bar_store()
+        if shared is not None and trade_days and shared.covers(trade_days[0], trade_days[-1]):
+            shared.hits = shared.misses = 0
+            log.info(f"使用共享行情列存储: 标的 {len(shared.securities)} 个")
+            self._bar_store = shared
+            set_bar_store(shared)
+            return
+        options = get_settings().options
+        mode = options.get('preload_bars')
+        if not mode or not trade_days:
+            return
+
+        if mode is True:
+            frequencies = ['daily']
+        elif isinstance(mode, str):
+            frequencies = ['daily', 'minute'] if mode.lower() in ('minute', '1m') else [mode]
+        else:
+            frequencies = list(mode)
+
+        securities: List[str] = list(options.get('universe') or ())
+        settings = get_settings()
+        if settings.benchmark:
+            securities.append(settings.benchmark)
+        for item in self.initial_positions or []:
+            code = item.get('security') if isinstance(item, dict) else None
+            if code:
+                securities.append(code)
+        if not securities:
+            log.warning("preload_bars 已开启，但标的池为空（请先调用 set_universe），跳过预加载")
+            return
+
+        fq_modes = ['none']
+        if not options.get('use_real_price'):
+            fq_modes.append('pre')
+
+        provider = get_data_provider()
+        start = trade_days[0]
+        try:
+            lookback = int(options.get('preload_lookback_days', 60) or 0)
+            if lookback > 0:
+                history_days = provider.get_trade_days(end_date=trade_days[0], count=lookback + 1) or []
+                if history_days:
+                    start = pd.to_datetime(history_days[0])
+        except Exception as exc:
+            log.debug(f"获取预加载回看起点失败: {exc}")
 
+        t0 = time.time()
+        try:
+            store = BarStore(
+                provider,
+                securities,
+                start,
+                trade_days[-1],
+                frequencies=frequencies,
+                fq_modes=fq_modes,
+            ).load()
+        except Exception as exc:
+            log.warning(f"预加载行情失败，回退逐次请求: {exc}")
+            return
+        stats = store.stats()
+        log.info(
+            f"预加载行情完成: 标的 {stats['securities']} 个, 数据块 {stats['blocks']} 个, "
+            f"{stats['rows']} 行, 耗时 {time.time() - t0:.2f} 秒"
+        )
+        self._bar_store = store
+        set_bar_store(store)
+
+    def _build_corporate_action_calendar(self, trade_days: Sequence[datetime]) -> None:
+        """
+        为本次回测建立权益事件/停牌日历：标的池与初始持仓的分红拆分事件一次性拉取，
+        盘前分红处理改为区间查找；中途买入的标的在首次持有时补拉一次。
+        """
+        self._corporate_actions = None
+        if not trade_days:
+            return
+        try:
+            calendar = CorporateActionCalendar(get_data_provider(), trade_days[0], trade_days[-1])
+        except Exception as exc:
+            log.debug(f"建立权益事件日历失败，回退逐日查询: {exc}")
+            return
+        securities: List[str] = list(get_settings().options.get('universe') or ())
+        for item in self.initial_positions or []:
+            code = item.get('security') if isinstance(item, dict) else None
+            if code:
+                securities.append(code)
+        calendar.preload(securities)
+        self._corporate_actions = calendar
+
+    def _release_bar_store(self) -> None:
+        """回测结束后卸载行情列存储并输出命中统计。"""
+        store = getattr(self, '_bar_store', None)
+        set_bar_store(None)
+        self._bar_store = None
+        if store is not None:
+            stats = store.stats()
+            log.info(f"行情列存储命中 {stats['hits']} 次, 回退数据源 {stats['misses']} 次")
 
     def _load_benchmark_data(self, benchmark: str):
         """
@@ -1942,6 +2258,7 @@ class BacktestEngine:
                 'algorithm_id': self.algorithm_id,
                 'extras': self.extras,
                 'runtime_seconds': getattr(self, 'runtime_seconds', 0.0),
+                'phase_seconds': dict(self.phase_seconds),
                 'initial_total_value': float(self.initial_cash),
                 'final_total_value': float(self.initial_cash),
             }
@@ -1959,7 +2276,7 @@ class BacktestEngine:
     
     def _generate_results(self) -> Dict[str, Any]:
         """生成回测结果"""
-        df = pd.DataFrame(self.daily_records)
+        df = self.daily_records.to_frame()
         
         # 检查是否有数据
         if df.empty or 'date' not in df.columns:
@@ -1994,7 +2311,7 @@ class BacktestEngine:
         # 交易胜率（基于卖出回合）
         try:
             from .analysis import _compute_trade_win_stats
-            trade_stats = _compute_trade_win_stats(self.trades)
+            trade_stats = _compute_trade_win_stats(self.trades, self.events)
         except Exception:
             trade_stats = {'交易胜率': 0.0}
 
@@ -2031,7 +2348,7 @@ class BacktestEngine:
             'daily_records': df,
             'trades': self.trades,
             'events': self.events,
-            'daily_positions': pd.DataFrame(self.daily_positions) if self.daily_positions else pd.DataFrame(columns=['date','code','amount','closeable_amount','avg_cost','acc_avg_cost','price','value']),
+            'daily_positions': self.daily_positions.to_frame(),
             'custom_plot': custom_plot_obj,
             'meta': {
                 'strategy_file': self.strategy_file,
@@ -2040,6 +2357,7 @@ class BacktestEngine:
                 'algorithm_id': self.algorithm_id,
                 'extras': self.extras,
                 'runtime_seconds': self.runtime_seconds,
+                'phase_seconds': dict(self.phase_seconds),
                 'initial_total_value': float(self.start_total_value if self.start_total_value is not None else self.initial_cash),
                 'final_total_value': float(df['total_value'].iloc[-1] if len(df) > 0 else 0.0),
             }
@@ -1,14 +1,23 @@
 """
 全局对象
 
-提供全局变量 g 和日志系统 log
+提供全局变量 g 和日志系统 log。
+
+log 的各级别方法先做级别判断再格式化：被过滤的消息不会拼接策略时间前缀；
+消息可以是 lambda 或 lazy(func) 包装，只在级别开启时才求值（其他可调用对象按原样 str() 输出），
+也可以沿用 logging 的 %-style 参数。
+文件日志默认经队列交给后台线程写入（LOG_FILE_ASYNC=false 可改回同步写）。
 """
 
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
-from typing import Any, Optional
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from types import FunctionType
+from typing import Any, Callable, Optional, Union
 from datetime import datetime
 
 
@@ -81,6 +90,120 @@ class _ColorFormatter(logging.Formatter):
         return f"{prefix}{msg}{self.RESET}"
 
 
+class _AsyncFileSink(QueueHandler):
+    """
+    后台写文件的日志 handler：调用线程只把记录放入队列，由 QueueListener 线程写入目标 handler。
+    setLevel 同步到目标 handler；flush() 会等待队列写完。
+    """
+
+    def __init__(self, target: logging.Handler) -> None:
+        super().__init__(queue.SimpleQueue())
+        self.target = target
+        self.setLevel(target.level)
+        self._listener: Optional[QueueListener] = QueueListener(self.queue, target, respect_handler_level=True)
+        # flush/close 会重启监听线程，多线程同时调用时需串行
+        self._listener_lock = threading.Lock()
+        self._listener.start()
+        _ASYNC_SINKS.add(self)
+
+    def setLevel(self, level) -> None:  # noqa: N802 - 与 logging 接口保持一致
+        super().setLevel(level)
+        target = getattr(self, "target", None)
+        if target is not None:
+            target.setLevel(level)
+
+    def flush(self) -> None:
+        with self._listener_lock:
+            listener = self._listener
+            if listener is None:
+                return
+            # stop() 会处理完队列中已有的记录再返回
+            listener.stop()
+            listener.start()
+        try:
+            self.target.flush()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        with self._listener_lock:
+            listener, self._listener = self._listener, None
+            if listener is not None:
+                listener.stop()
+        _ASYNC_SINKS.discard(self)
+        try:
+            self.target.close()
+        except Exception:
+            pass
+        super().close()
+
+
+_ASYNC_SINKS: "set[_AsyncFileSink]" = set()
+
+
+@atexit.register
+def _drain_async_sinks() -> None:
+    for sink in list(_ASYNC_SINKS):
+        try:
+            sink.close()
+        except Exception:
+            pass
+
+
+def wrap_file_handler(handler: logging.Handler, enabled: Optional[bool] = None) -> logging.Handler:
+    """按系统配置 log_file_async（LOG_FILE_ASYNC，默认开启）把文件 handler 包装为后台写入的队列 handler。"""
+    if enabled is None:
+        try:
+            from bullet_trade.utils.env_loader import get_system_config  # type: ignore
+            enabled = bool((get_system_config() or {}).get('log_file_async', True))
+        except Exception:
+            enabled = True
+    return _AsyncFileSink(handler) if enabled else handler
+
+
+def close_file_handler(handler: Optional[logging.Handler]) -> None:
+    """写完并关闭由 wrap_file_handler 返回的 handler（或普通 handler）。"""
+    if handler is None:
+        return
+    try:
+        handler.flush()
+    except Exception:
+        pass
+    try:
+        handler.close()
+    except Exception:
+        pass
+
+
+class lazy:
+    """
+    延迟求值的日志消息：log.debug(lazy(func, *args)) 只在 DEBUG 开启时调用 func(*args)。
+    lambda 消息等价于 lazy(lambda_func)。
+    """
+
+    __slots__ = ('func', 'args', 'kwargs')
+
+    def __init__(self, func: Callable[..., Any], *args, **kwargs) -> None:
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self) -> Any:
+        return self.func(*self.args, **self.kwargs)
+
+    def __str__(self) -> str:
+        return str(self())
+
+
+Message = Union[str, lazy, Callable[[], Any]]
+
+
+def _is_lazy(msg: Any) -> bool:
+    # 只对 lazy 包装和 lambda 求值，其他可调用对象（类、实例方法等）保持原样交给 logging
+    cls = type(msg)
+    return cls is lazy or (cls is FunctionType and msg.__name__ == '<lambda>')
+
+
 class Logger:
     """
     日志系统
@@ -92,7 +215,10 @@ class Logger:
         self.logger = logging.getLogger('jq_strategy')
         self.logger.setLevel(logging.INFO)
         self.strategy_time = None  # 策略时间（回测时间）
+        self._strategy_time_text: Optional[str] = None
         self._file_handler: Optional[RotatingFileHandler] = None
+        # 实际挂在 logger 上的文件 handler（异步模式下为包装 _file_handler 的队列 handler）
+        self._file_sink: Optional[logging.Handler] = None
         # 统一格式
         self._formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
         self._color_enabled = self._detect_color_support()
@@ -129,8 +255,7 @@ class Logger:
                 fh = RotatingFileHandler(os.path.join(log_dir, 'app.log'), maxBytes=5*1024*1024, backupCount=3, encoding='utf-8')
                 fh.setLevel(file_level)
                 fh.setFormatter(self._formatter)
-                self.logger.addHandler(fh)
-                self._file_handler = fh
+                self._install_file_handler(fh)
             except Exception:
                 # 文件日志失败不阻断
                 pass
@@ -169,6 +294,8 @@ class Logger:
         self.logger.setLevel(target_level)
         for handler in self.logger.handlers:
             handler.setLevel(target_level)
+        if self._file_handler:
+            self._file_handler.setLevel(target_level)
 
         if not log_dir and not file_path:
             return
@@ -189,21 +316,41 @@ class Logger:
             )
             fh.setLevel(target_level)
             fh.setFormatter(self._formatter)
-            if self._file_handler:
-                try:
-                    self.logger.removeHandler(self._file_handler)
-                except Exception:
-                    pass
-                try:
-                    self._file_handler.close()
-                except Exception:
-                    pass
-            self.logger.addHandler(fh)
-            self._file_handler = fh
+            self._install_file_handler(fh)
             self._sync_standard_logger()
         except Exception:
             pass
 
+    def _install_file_handler(self, fh: RotatingFileHandler) -> None:
+        """替换当前文件 handler（先写完并关闭旧的）。"""
+        self.remove_file_handler()
+        sink = wrap_file_handler(fh)
+        self.logger.addHandler(sink)
+        self._file_handler = fh
+        self._file_sink = sink
+
+    def remove_file_handler(self) -> None:
+        """移除并关闭文件日志（如参数优化子进程中禁用文件写入）。"""
+        sink = self._file_sink or self._file_handler
+        if sink is not None:
+            try:
+                self.logger.removeHandler(sink)
+            except Exception:
+                pass
+            close_file_handler(sink)
+            if self._file_handler is not None and self._file_handler is not sink:
+                close_file_handler(self._file_handler)
+        self._file_handler = None
+        self._file_sink = None
+
+    def flush(self) -> None:
+        """等待已记录的日志全部写入（异步文件日志会在此处写完队列）。"""
+        for handler in list(self.logger.handlers):
+            try:
+                handler.flush()
+            except Exception:
+                pass
+
     def _detect_color_support(self) -> bool:
         if os.getenv("LOG_FORCE_COLOR"):
             return True
@@ -246,10 +393,12 @@ class Logger:
 
         self.logger.setLevel(min(console_level, file_level))
         for handler in self.logger.handlers:
-            if self._file_handler and handler is self._file_handler:
+            if handler is self._file_sink:
                 handler.setLevel(file_level)
             else:
                 handler.setLevel(console_level)
+        if self._file_handler:
+            self._file_handler.setLevel(file_level)
 
         log_dir = sys_cfg.get('log_dir') or './logs'
         if log_dir:
@@ -269,17 +418,7 @@ class Logger:
                     )
                     fh.setLevel(file_level)
                     fh.setFormatter(self._formatter)
-                    if self._file_handler:
-                        try:
-                            self.logger.removeHandler(self._file_handler)
-                        except Exception:
-                            pass
-                        try:
-                            self._file_handler.close()
-                        except Exception:
-                            pass
-                    self.logger.addHandler(fh)
-                    self._file_handler = fh
+                    self._install_file_handler(fh)
             except Exception:
                 pass
 
@@ -287,18 +426,22 @@ class Logger:
     
     def set_strategy_time(self, dt):
         """设置策略时间（回测时间）"""
+        if dt is not self.strategy_time:
+            self._strategy_time_text = None
         self.strategy_time = dt
-    
+
     def _format_message(self, msg: str) -> str:
         """格式化消息，添加策略时间"""
         try:
             if not self.strategy_time:
                 return msg
-            now = datetime.now()
-            from .globals import g as _g  # type: ignore
-            is_live = bool(getattr(_g, 'live_trade', False))
-            strategy_str = self.strategy_time.strftime("%Y-%m-%d %H:%M:%S")
-            if is_live:
+            strategy_str = self._strategy_time_text
+            if strategy_str is None:
+                # 同一策略时间内的多条日志复用格式化结果
+                strategy_str = self.strategy_time.strftime("%Y-%m-%d %H:%M:%S")
+                self._strategy_time_text = strategy_str
+            if bool(getattr(g, 'live_trade', False)):
+                now = datetime.now()
                 delay = (now - self.strategy_time).total_seconds()
                 current_str = now.strftime("%Y-%m-%d %H:%M:%S")
                 return (
@@ -310,31 +453,44 @@ class Logger:
         except Exception:
             return msg
 
+    def is_enabled_for(self, level: Union[str, int]) -> bool:
+        """判断某级别日志是否会输出，供需要预先计算日志内容的热点路径提前跳过。"""
+        if isinstance(level, str):
+            level = self._levels.get(level.lower(), getattr(logging, level.upper(), logging.INFO))
+        return self.logger.isEnabledFor(level)
 
-    def debug(self, msg: str, *args, **kwargs):
+    def _log(self, level: int, msg: Message, args: tuple, kwargs: dict) -> None:
+        logger = self.logger
+        if not logger.isEnabledFor(level):
+            return
+        if _is_lazy(msg):
+            msg = msg()
+        logger.log(level, self._format_message(msg), *args, **kwargs)
+
+    def debug(self, msg: Message, *args, **kwargs):
         """输出DEBUG级别日志"""
-        self.logger.debug(self._format_message(msg), *args, **kwargs)
-    
-    def info(self, msg: str, *args, **kwargs):
+        self._log(logging.DEBUG, msg, args, kwargs)
+
+    def info(self, msg: Message, *args, **kwargs):
         """输出INFO级别日志"""
-        self.logger.info(self._format_message(msg), *args, **kwargs)
-    
-    def warn(self, msg: str, *args, **kwargs):
+        self._log(logging.INFO, msg, args, kwargs)
+
+    def warn(self, msg: Message, *args, **kwargs):
         """输出WARNING级别日志"""
-        self.logger.warning(self._format_message(msg), *args, **kwargs)
-    
-    def warning(self, msg: str, *args, **kwargs):
+        self._log(logging.WARNING, msg, args, kwargs)
+
+    def warning(self, msg: Message, *args, **kwargs):
         """输出WARNING级别日志（别名）"""
-        self.logger.warning(self._format_message(msg), *args, **kwargs)
-    
-    def error(self, msg: str, *args, **kwargs):
+        self._log(logging.WARNING, msg, args, kwargs)
+
+    def error(self, msg: Message, *args, **kwargs):
         """输出ERROR级别日志"""
-        self.logger.error(self._format_message(msg), *args, **kwargs)
-    
-    def critical(self, msg: str, *args, **kwargs):
+        self._log(logging.ERROR, msg, args, kwargs)
+
+    def critical(self, msg: Message, *args, **kwargs):
         """输出CRITICAL级别日志"""
-        self.logger.critical(self._format_message(msg), *args, **kwargs)
-    
+        self._log(logging.CRITICAL, msg, args, kwargs)
+
     def set_level(self, module: str, level: str):
         """
         设置日志级别（聚宽兼容）
@@ -364,6 +520,8 @@ class Logger:
                 self.logger.setLevel(self._levels[level])
                 for handler in self.logger.handlers:
                     handler.setLevel(self._levels[level])
+                if self._file_handler:
+                    self._file_handler.setLevel(self._levels[level])
                 self._sync_standard_logger()
 
 
@@ -377,4 +535,4 @@ def reset_globals():
     g.clear()
 
 
-__all__ = ['g', 'log', 'reset_globals']
+__all__ = ['g', 'lazy', 'log', 'reset_globals']
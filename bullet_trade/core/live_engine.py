@@ -11,6 +11,7 @@ from __future__ import annotations
 
 import asyncio
 import sys
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta, time as Time, date
 import importlib
@@ -86,6 +87,9 @@ from .risk_control import get_global_risk_controller
 from .engine import PRE_MARKET_OFFSET, BacktestEngine
 from . import pricing
 
+# 无批量快照接口时，tick 轮询逐个获取的并发上限
+_TICK_FETCH_CONCURRENCY = 8
+
 
 @dataclass
 class LiveConfig:
@@ -111,6 +115,8 @@ class LiveConfig:
     calendar_skip_weekend: bool = True
     calendar_retry_minutes: int = 20
     portfolio_refresh_throttle_ms: int = 200
+    order_concurrency: int = 1
+    tick_batch_enabled: bool = False
 
     @classmethod
     def load(cls, overrides: Optional[Dict[str, Any]] = None) -> "LiveConfig":
@@ -138,6 +144,8 @@ class LiveConfig:
             buy_price_percent=float(raw.get('market_buy_price_percent', 0.015)),
             sell_price_percent=float(raw.get('market_sell_price_percent', -0.015)),
             portfolio_refresh_throttle_ms=int(raw.get('portfolio_refresh_throttle_ms', 200)),
+            order_concurrency=max(1, int(raw.get('order_concurrency', 1) or 1)),
+            tick_batch_enabled=bool(raw.get('tick_batch_enabled', False)),
         )
 
 
@@ -152,6 +160,24 @@ class _ResolvedOrder:
     is_market: bool
 
 
+class _CashLedger:
+    """并发买入的准入账本：gather 之前逐笔预留，保证放行的买单合计不超过可用资金。"""
+
+    def __init__(self, available: float) -> None:
+        self.available = max(0.0, float(available))
+        self.reserved = 0.0
+
+    @property
+    def remaining(self) -> float:
+        return self.available - self.reserved
+
+    def reserve(self, amount: float) -> bool:
+        if amount > self.remaining + 1e-6:
+            return False
+        self.reserved += amount
+        return True
+
+
 class LiveEngine:
     """
     实盘事件引擎。
@@ -591,74 +617,220 @@ class LiveEngine:
                 return
             open_position_symbols = self._get_open_position_symbols()
             pending_new_positions: Set[str] = set()
-            for order in orders:
-                plan = self._build_order_plan(order, current_data)
-                if not plan:
-                    continue
-                try:
-                    price_basis = plan.price if plan.price and plan.price > 0 else plan.last_price
-                    order_value = float(plan.amount * max(price_basis, 0.0))
-                    if order_value <= 0:
-                        log.warning(f"订单 {plan.security} 价值异常，忽略执行")
+            if self.config.order_concurrency > 1:
+                await self._process_orders_concurrently(orders, current_data, open_position_symbols, pending_new_positions)
+            else:
+                for order in orders:
+                    plan = self._build_order_plan(order, current_data)
+                    if not plan:
                         continue
-                    action = 'buy' if plan.is_buy else 'sell'
-                    risk = self._risk
-                    if risk:
-                        positions_count = len(open_position_symbols | pending_new_positions)
-                        total_value = float(getattr(self.context.portfolio, "total_value", 0.0) or 0.0)
-                        try:
-                            risk.check_order(
-                                order_value=order_value,
-                                current_positions_count=positions_count,
-                                security=plan.security,
-                                total_value=total_value,
-                                action=action,
-                            )
-                        except ValueError as risk_exc:
-                            log.error(f"风控拒绝委托[{action}] {plan.security}: {risk_exc}")
-                            continue
-                    price_arg = plan.price if plan.price and plan.price > 0 else None
-                    market_flag = bool(plan.is_market)
-                    style_obj = getattr(order, "style", None)
-                    style_name = style_obj.__class__.__name__ if style_obj else "MarketOrderStyle"
-                    price_value = plan.price if plan.price is not None else price_arg
-                    price_repr = f"{price_value:.4f}" if price_value else "未指定"
-                    price_mode = "市价" if market_flag else "限价"
-                    action_label = "买入" if plan.is_buy else "卖出"
-                    log.info(
-                        f"执行委托[{action_label}] {plan.security}: 行情价={plan.last_price:.4f}, "
-                        f"委托价={price_repr}（{price_mode}），风格={style_name}, 数量={plan.amount}"
-                    )
-                    order_id: Optional[str] = None
-                    if plan.is_buy:
-                        order_id = await self.broker.buy(
-                            plan.security, plan.amount, price_arg, wait_timeout=plan.wait_timeout, market=market_flag
-                        )
-                    else:
-                        order_id = await self.broker.sell(
-                            plan.security, plan.amount, price_arg, wait_timeout=plan.wait_timeout, market=market_flag
-                        )
                     try:
-                        setattr(order, "_broker_order_id", order_id)
-                    except Exception:
-                        pass
-                    log.info(
-                        f"委托[{action_label}] {plan.security} 已提交，订单ID={order_id or '未知'}，"
-                        f"数量={plan.amount}"
-                    )
-                    if risk:
-                        try:
-                            risk.record_trade(order_value, action=action)
-                        except Exception as record_exc:
-                            log.debug(f"记录风控交易失败: {record_exc}")
-                        if plan.is_buy and plan.security not in open_position_symbols:
-                            pending_new_positions.add(plan.security)
+                        order_value = self._plan_order_value(plan)
+                        if order_value is None:
+                            continue
+                        if not self._check_order_risk(plan, order_value, open_position_symbols, pending_new_positions):
+                            continue
+                        await self._submit_order_plan(order, plan)
+                        self._record_order_risk(plan, order_value, open_position_symbols, pending_new_positions)
+                    except Exception as exc:
+                        log.error(f"委托失败 {order.security}: {exc}")
+            try:
+                self.refresh_account_snapshot(force=True)
+            except Exception as exc:
+                log.debug(f"订单执行后刷新账户快照失败: {exc}")
+
+    async def _process_orders_concurrently(
+        self,
+        orders: List[Order],
+        current_data,
+        open_position_symbols: Set[str],
+        pending_new_positions: Set[str],
+    ) -> None:
+        """
+        并发下单（ORDER_CONCURRENCY>1）：
+        1. 卖单整批并发提交，等待全部返回（同步模式下即等待成交回款），随后刷新账户；
+        2. 买单按预留资金账本逐笔预留后并发提交，在途数不超过 ORDER_CONCURRENCY，
+           风控在预留时按顺序检查，合计委托金额不会超过可用资金。
+
+        风控检查通过即记入当日交易次数/金额，后续委托的检查据此判断，提交失败时回滚。
+        """
+        plans: List[Tuple[Order, _ResolvedOrder, float]] = []
+        for order in orders:
+            plan = self._build_order_plan(order, current_data)
+            if not plan:
+                continue
+            order_value = self._plan_order_value(plan)
+            if order_value is not None:
+                plans.append((order, plan, order_value))
+        if not plans:
+            return
+        slots = asyncio.Semaphore(self.config.order_concurrency)
+
+        async def _submit(order: Order, plan: _ResolvedOrder, order_value: float, new_position: bool = False) -> bool:
+            async with slots:
+                try:
+                    await self._submit_order_plan(order, plan)
                 except Exception as exc:
                     log.error(f"委托失败 {order.security}: {exc}")
+                    self._release_order_risk(plan, order_value)
+                    if new_position:
+                        # 仅撤回由本单占用的新开仓名额
+                        pending_new_positions.discard(plan.security)
+                    return False
+            return True
+
+        sells = [
+            item for item in plans
+            if not item[1].is_buy and self._reserve_order_risk(item[1], item[2], open_position_symbols, pending_new_positions)
+        ]
+        if sells:
+            started = time.perf_counter()
+            results = await asyncio.gather(*(_submit(order, plan, value) for order, plan, value in sells))
+            log.info(
+                f"批量委托[卖出] {sum(results)}/{len(sells)} 笔已提交，"
+                f"耗时 {(time.perf_counter() - started) * 1000:.1f}ms"
+            )
             try:
                 self.refresh_account_snapshot(force=True)
             except Exception as exc:
-                log.debug(f"订单执行后刷新账户快照失败: {exc}")
+                log.debug(f"卖出后刷新账户快照失败: {exc}")
+
+        buys = [item for item in plans if item[1].is_buy]
+        if not buys:
+            return
+        ledger = _CashLedger(float(getattr(self.context.portfolio, "available_cash", 0.0) or 0.0))
+        accepted: List[Tuple[Order, _ResolvedOrder, float, bool]] = []
+        for order, plan, order_value in buys:
+            if not self._check_order_risk(plan, order_value, open_position_symbols, pending_new_positions):
+                continue
+            if not ledger.reserve(order_value):
+                log.error(
+                    f"可用资金不足，跳过委托[买入] {plan.security}: 需 {order_value:.2f}，"
+                    f"剩余可预留 {ledger.remaining:.2f}"
+                )
+                continue
+            new_position = (
+                plan.security not in open_position_symbols and plan.security not in pending_new_positions
+            )
+            # 预留阶段即记入风控与持仓数，后续买单的检查据此判断
+            self._record_order_risk(plan, order_value, open_position_symbols, pending_new_positions)
+            accepted.append((order, plan, order_value, new_position))
+        if not accepted:
+            return
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(_submit(order, plan, value, new_position) for order, plan, value, new_position in accepted)
+        )
+        log.info(
+            f"批量委托[买入] {sum(results)}/{len(accepted)} 笔已提交，并发上限 {self.config.order_concurrency}，"
+            f"耗时 {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+    @staticmethod
+    def _plan_order_value(plan: _ResolvedOrder) -> Optional[float]:
+        price_basis = plan.price if plan.price and plan.price > 0 else plan.last_price
+        order_value = float(plan.amount * max(price_basis, 0.0))
+        if order_value <= 0:
+            log.warning(f"订单 {plan.security} 价值异常，忽略执行")
+            return None
+        return order_value
+
+    def _check_order_risk(
+        self,
+        plan: _ResolvedOrder,
+        order_value: float,
+        open_position_symbols: Set[str],
+        pending_new_positions: Set[str],
+    ) -> bool:
+        risk = self._risk
+        if not risk:
+            return True
+        action = 'buy' if plan.is_buy else 'sell'
+        positions_count = len(open_position_symbols | pending_new_positions)
+        total_value = float(getattr(self.context.portfolio, "total_value", 0.0) or 0.0)
+        try:
+            risk.check_order(
+                order_value=order_value,
+                current_positions_count=positions_count,
+                security=plan.security,
+                total_value=total_value,
+                action=action,
+            )
+        except ValueError as risk_exc:
+            log.error(f"风控拒绝委托[{action}] {plan.security}: {risk_exc}")
+            return False
+        return True
+
+    def _reserve_order_risk(
+        self,
+        plan: _ResolvedOrder,
+        order_value: float,
+        open_position_symbols: Set[str],
+        pending_new_positions: Set[str],
+    ) -> bool:
+        """风控检查通过后立即记录，供并发下单逐笔预留。"""
+        if not self._check_order_risk(plan, order_value, open_position_symbols, pending_new_positions):
+            return False
+        self._record_order_risk(plan, order_value, open_position_symbols, pending_new_positions)
+        return True
+
+    def _release_order_risk(self, plan: _ResolvedOrder, order_value: float) -> None:
+        risk = self._risk
+        if not risk:
+            return
+        try:
+            risk.release_trade(order_value, action='buy' if plan.is_buy else 'sell')
+        except Exception as release_exc:
+            log.debug(f"回滚风控交易记录失败: {release_exc}")
+
+    def _record_order_risk(
+        self,
+        plan: _ResolvedOrder,
+        order_value: float,
+        open_position_symbols: Set[str],
+        pending_new_positions: Set[str],
+    ) -> None:
+        risk = self._risk
+        if not risk:
+            return
+        try:
+            risk.record_trade(order_value, action='buy' if plan.is_buy else 'sell')
+        except Exception as record_exc:
+            log.debug(f"记录风控交易失败: {record_exc}")
+        if plan.is_buy and plan.security not in open_position_symbols:
+            pending_new_positions.add(plan.security)
+
+    async def _submit_order_plan(self, order: Order, plan: _ResolvedOrder) -> Optional[str]:
+        price_arg = plan.price if plan.price and plan.price > 0 else None
+        market_flag = bool(plan.is_market)
+        style_obj = getattr(order, "style", None)
+        style_name = style_obj.__class__.__name__ if style_obj else "MarketOrderStyle"
+        price_value = plan.price if plan.price is not None else price_arg
+        price_repr = f"{price_value:.4f}" if price_value else "未指定"
+        price_mode = "市价" if market_flag else "限价"
+        action_label = "买入" if plan.is_buy else "卖出"
+        log.info(
+            f"执行委托[{action_label}] {plan.security}: 行情价={plan.last_price:.4f}, "
+            f"委托价={price_repr}（{price_mode}），风格={style_name}, 数量={plan.amount}"
+        )
+        order_id: Optional[str] = None
+        if plan.is_buy:
+            order_id = await self.broker.buy(
+                plan.security, plan.amount, price_arg, wait_timeout=plan.wait_timeout, market=market_flag
+            )
+        else:
+            order_id = await self.broker.sell(
+                plan.security, plan.amount, price_arg, wait_timeout=plan.wait_timeout, market=market_flag
+            )
+        try:
+            setattr(order, "_broker_order_id", order_id)
+        except Exception:
+            pass
+        log.info(
+            f"委托[{action_label}] {plan.security} 已提交，订单ID={order_id or '未知'}，"
+            f"数量={plan.amount}"
+        )
+        return order_id
 
     def _build_order_plan(self, order: Order, current_data) -> Optional[_ResolvedOrder]:
         try:
@@ -887,6 +1059,56 @@ class LiveEngine:
             return None
         return None
 
+    def _fetch_tick_snapshots(self, symbols: Sequence[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        一次调用批量获取多个标的快照（券商或数据源提供 get_current_ticks 时）。
+        行情来源与 _fetch_tick_snapshot 一致：券商提供快照接口时只用券商，
+        券商只有逐个接口、或批量接口失败时返回 None，由调用方逐个获取。
+        """
+        broker = self.broker
+        if broker is not None and (
+            callable(getattr(broker, "get_current_ticks", None)) or hasattr(broker, "get_current_tick")
+        ):
+            source = broker
+        else:
+            try:
+                source = get_data_provider()
+            except Exception:
+                return None
+        batch_fn = getattr(source, "get_current_ticks", None) if source is not None else None
+        if not callable(batch_fn):
+            return None
+        try:
+            ticks = batch_fn(list(symbols))
+        except Exception as exc:
+            log.debug("批量获取 tick 快照失败: %s", exc)
+            return None
+        if isinstance(ticks, dict):
+            return {sym: tick for sym, tick in ticks.items() if tick}
+        return None
+
+    async def _poll_tick_snapshots(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """轮询一轮 tick：优先批量接口，否则按 _TICK_FETCH_CONCURRENCY 并发逐个获取。"""
+        assert self._loop is not None
+        try:
+            ticks = await self._loop.run_in_executor(None, self._fetch_tick_snapshots, symbols)
+        except Exception:
+            ticks = None
+        if ticks is not None:
+            return ticks
+
+        semaphore = asyncio.Semaphore(_TICK_FETCH_CONCURRENCY)
+
+        async def _fetch(sym: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self._loop.run_in_executor(None, self._fetch_tick_snapshot, sym)  # type: ignore[union-attr]
+                except Exception:
+                    return None
+
+        results = await asyncio.gather(*(_fetch(sym) for sym in symbols))
+        return {sym: tick for sym, tick in zip(symbols, results) if tick}
+
     def _sync_provider_subscription(
         self,
         initial: bool = False,
@@ -948,14 +1170,18 @@ class LiveEngine:
                 continue
 
             if self._tick_symbols:
-                for sym in list(self._tick_symbols):
-                    try:
-                        tick = await self._loop.run_in_executor(None, self._fetch_tick_snapshot, sym)
-                    except Exception:
-                        tick = None
-                    if tick:
-                        self._latest_ticks[sym] = tick
-                        await self._call_hook(self.handle_tick_func, tick)
+                symbols = list(self._tick_symbols)
+                ticks = await self._poll_tick_snapshots(symbols)
+                self._latest_ticks.update(ticks)
+                if self.config.tick_batch_enabled:
+                    # 同一轮的截面快照一次性交给策略：handle_tick(context, {标的: tick})
+                    if ticks:
+                        await self._call_hook(self.handle_tick_func, ticks)
+                else:
+                    for sym in symbols:
+                        tick = ticks.get(sym)
+                        if tick:
+                            await self._call_hook(self.handle_tick_func, tick)
             try:
                 await asyncio.wait_for(self._stop_event.wait(), timeout=interval)
             except asyncio.TimeoutError:
@@ -2,14 +2,47 @@
 核心数据模型
 
 定义回测系统中使用的所有核心数据结构
+
+持仓市值合计（positions_value）由 PositionBook 增量维护：持仓的 value 每次写入都把差额记到所在的持仓字典，
+增删持仓时加减其市值，update_value 不再逐个求和；DEBUG 日志级别下每 VALUE_CHECK_INTERVAL 次读取
+与逐个求和对账一次，不一致时告警并校正。
 """
 
+import logging
+import math
 from enum import Enum
-from dataclasses import dataclass, field
-from typing import Dict, Optional, Any
+from dataclasses import dataclass, field, fields
+from typing import Dict, Optional, Any, Tuple
 from datetime import datetime, date
 import pandas as pd
 
+from .globals import log
+
+
+# DEBUG 模式下持仓市值合计的对账间隔（按读取次数）
+VALUE_CHECK_INTERVAL = 1000
+
+
+def _with_slots(cls, extra: Tuple[str, ...] = (), exclude: Tuple[str, ...] = ()):
+    """
+    为 dataclass 重建带 __slots__ 的类（等价于 Python 3.10 的 dataclass(slots=True)，兼容 3.8）。
+
+    Args:
+        cls: 已经过 @dataclass 处理的类
+        extra: 字段之外额外的槽位
+        exclude: 不生成槽位的字段（由类上的 property 接管）
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    for name in names:
+        namespace.pop(name, None)
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    namespace['__slots__'] = tuple(n for n in names if n not in exclude) + tuple(extra)
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
 
 class OrderStatus(Enum):
     """订单状态枚举
@@ -99,6 +132,173 @@ class Position:
                 self.avg_cost = 0
                 self.acc_avg_cost = 0
 
+    def _get_value(self) -> float:
+        return self._value
+
+    def _set_value(self, value: float) -> None:
+        # 市值差额记入所在的持仓字典（通常只有一个），合计无需重新求和
+        try:
+            books = self._books
+        except AttributeError:  # __init__ 期间尚未登记
+            books = self._books = ()
+        if books:
+            delta = value - self._value
+            if math.isfinite(delta):
+                for book in books:
+                    book._total += delta
+            else:
+                # NaN/inf 无法按差额抵消，标记所在持仓字典下次读取时重新求和
+                for book in books:
+                    book._stale = True
+        self._value = value
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 不序列化所属持仓字典，反序列化后由持仓字典重新登记
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._books = ()
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+Position = _with_slots(Position, extra=('_value', '_books'), exclude=('value',))
+Position.value = property(Position._get_value, Position._set_value, doc='市值')
+
+
+class PositionBook(dict):
+    """
+    持仓字典：security -> Position，同时维护全部持仓的市值合计 value_total。
+
+    增删持仓时加减其市值，持仓 value 变化时由 Position 回写差额；
+    非 Position 的条目无法跟踪，存在时 value_total 退回逐个求和；
+    出现非有限市值（NaN/inf）时不做增量，下次读取时重新求和。
+    """
+
+    __slots__ = ('_total', '_untracked', '_reads', '_stale')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._total = 0.0
+        self._untracked = 0
+        self._reads = 0
+        self._stale = False
+        self.update(*args, **kwargs)
+
+    def _apply(self, delta: float) -> None:
+        if math.isfinite(delta):
+            self._total += delta
+        else:
+            self._stale = True
+
+    def _attach(self, pos) -> None:
+        try:
+            pos._books += (self,)
+        except AttributeError:
+            self._untracked += 1
+            return
+        self._apply(pos.value)
+
+    def _detach(self, pos) -> None:
+        try:
+            books = pos._books
+        except AttributeError:
+            self._untracked -= 1
+            return
+        if self in books:
+            i = books.index(self)
+            pos._books = books[:i] + books[i + 1:]
+        self._apply(-pos.value)
+        if not self:
+            self._total = 0.0
+            self._stale = False
+
+    def __setitem__(self, key, pos) -> None:
+        old = dict.get(self, key)
+        if old is pos and key in self:
+            return
+        if key in self:
+            dict.__delitem__(self, key)
+            self._detach(old)
+        dict.__setitem__(self, key, pos)
+        self._attach(pos)
+
+    def __delitem__(self, key) -> None:
+        pos = dict.pop(self, key)
+        self._detach(pos)
+
+    def pop(self, key, *default):
+        if key in self:
+            pos = dict.pop(self, key)
+            self._detach(pos)
+            return pos
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def popitem(self):
+        key, pos = dict.popitem(self)
+        self._detach(pos)
+        return key, pos
+
+    def clear(self) -> None:
+        positions = list(dict.values(self))
+        dict.clear(self)
+        for pos in positions:
+            self._detach(pos)
+        self._total = 0.0
+        self._stale = False
+
+    def update(self, *args, **kwargs) -> None:
+        for key, pos in dict(*args, **kwargs).items():
+            self[key] = pos
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def recompute(self) -> float:
+        """逐个求和并校正合计，返回精确值。"""
+        values = [pos.value for pos in dict.values(self)]
+        try:
+            exact = math.fsum(values)
+        except ValueError:  # inf 与 -inf 相加
+            exact = sum(values)
+        self._total = exact
+        self._stale = False
+        return exact
+
+    @property
+    def value_total(self) -> float:
+        """全部持仓市值合计。"""
+        if self._untracked:
+            return sum(pos.value for pos in dict.values(self))
+        if self._stale:
+            return self.recompute()
+        self._reads += 1
+        if self._reads % VALUE_CHECK_INTERVAL == 0 and log.is_enabled_for(logging.DEBUG):
+            tracked = self._total
+            exact = self.recompute()
+            if math.isfinite(exact) and not math.isclose(tracked, exact, rel_tol=1e-9, abs_tol=1e-6):
+                log.warning(f"持仓市值合计与逐个求和不一致: 增量 {tracked:.6f}，实际 {exact:.6f}，已校正")
+        return self._total
+
+
+def _position_book(owner) -> PositionBook:
+    """返回 owner.positions，若被整体替换为普通 dict 则就地换回 PositionBook。"""
+    positions = owner.positions
+    if type(positions) is not PositionBook:
+        positions = owner.positions = PositionBook(positions)
+    return positions
+
 
 @dataclass
 class SubPortfolio:
@@ -119,10 +319,13 @@ class SubPortfolio:
     total_value: float = 0.0
     positions: Dict[str, Position] = field(default_factory=dict)
     positions_value: float = 0.0
-    
+
+    def __post_init__(self):
+        _position_book(self)
+
     def update_value(self):
         """更新账户总价值"""
-        self.positions_value = sum(pos.value for pos in self.positions.values())
+        self.positions_value = _position_book(self).value_total
         self.total_value = self.available_cash + self.positions_value
 
 
@@ -156,6 +359,7 @@ class Portfolio:
     
     def __post_init__(self):
         """初始化子账户"""
+        _position_book(self)
         if not self.subportfolios:
             self.subportfolios['stock'] = SubPortfolio(
                 type='stock',
@@ -166,7 +370,7 @@ class Portfolio:
     
     def update_value(self):
         """更新账户总价值"""
-        self.positions_value = sum(pos.value for pos in self.positions.values())
+        self.positions_value = _position_book(self).value_total
         self.total_value = self.available_cash + self.positions_value + self.locked_cash
         
         # 更新子账户
@@ -197,6 +401,9 @@ class Trade:
     tax: float = 0.0
 
 
+Trade = _with_slots(Trade)
+
+
 @dataclass
 class Order:
     """
@@ -227,6 +434,13 @@ class Order:
     wait_timeout: Optional[float] = None
 
 
+# 下单函数与实盘引擎会在订单上附加目标值/券商委托号等私有属性
+Order = _with_slots(
+    Order,
+    extra=('_target_value', '_is_target_value', '_target_amount', '_is_target_amount', '_broker_order_id'),
+)
+
+
 @dataclass
 class SecurityUnitData:
     """
@@ -248,6 +462,9 @@ class SecurityUnitData:
     is_st: bool = False
 
 
+SecurityUnitData = _with_slots(SecurityUnitData)
+
+
 @dataclass
 class Context:
     """
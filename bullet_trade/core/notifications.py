@@ -3,26 +3,216 @@
 
 提供聚宽风格的 send_msg API，并在配置 MESSAGE_KEY 时
 通过企业微信机器人 webhook 发送消息。
+
+webhook 投递由后台线程完成，策略回调中的 send_msg 只做入队，不会因网络阻塞：
+- 有界队列（NOTIFY_QUEUE_SIZE），溢出时丢弃最早的消息并计数
+- 短时间内的连续消息合并为一条（NOTIFY_COALESCE_SECONDS），单条不超过企业微信长度上限
+- 按 NOTIFY_RATE_PER_MINUTE 限速（企业微信机器人默认 20 条/分钟），失败按指数退避重试
+- get_notification_stats() 返回投递统计；flush_messages() 等待队列发送完毕（进程退出时自动调用）
 """
 
 from __future__ import annotations
 
+import atexit
+import collections
 import logging
-from typing import Callable, Optional
-
-try:
-    import requests
-except ImportError:  # pragma: no cover - requests 是必装依赖，防御性降级
-    requests = None  # type: ignore
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 from .globals import log
-from ..utils.env_loader import get_env, load_env
+from ..utils.env_loader import get_env, get_env_float, get_env_int, load_env
 
 _LOGGER = logging.getLogger(__name__)
 _WEBHOOK_TEMPLATE = "https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key={key}"
 _DEFAULT_TIMEOUT = 5
+# 企业微信文本消息 content 上限 2048 字节，留出余量
+_MAX_CONTENT_BYTES = 2000
+# 企业微信接口频率超限错误码
+_ERRCODE_RATE_LIMITED = 45009
 _message_handler: Optional[Callable[[str], None]] = None
 _ENV_LOADED = False
+# requests 在首次发送时才导入，避免拖慢 import bullet_trade
+requests: Any = None
+
+
+def _http_client() -> Any:
+    global requests
+    if requests is None:
+        try:
+            import requests as _requests
+        except ImportError:  # pragma: no cover - requests 是必装依赖，防御性降级
+            return None
+        requests = _requests
+    return requests
+
+
+class _WebhookDispatcher:
+    """企业微信 webhook 的后台投递队列（单线程，按需启动）。"""
+
+    def __init__(self) -> None:
+        self.queue_size = max(1, get_env_int("NOTIFY_QUEUE_SIZE", 200))
+        self.coalesce_seconds = max(0.0, get_env_float("NOTIFY_COALESCE_SECONDS", 1.0))
+        self.rate_per_minute = max(0.0, get_env_float("NOTIFY_RATE_PER_MINUTE", 20.0))
+        self.max_retries = max(0, get_env_int("NOTIFY_MAX_RETRIES", 3))
+        self.retry_backoff = max(0.0, get_env_float("NOTIFY_RETRY_BACKOFF", 1.0))
+        self._pending: Deque[Tuple[str, str]] = collections.deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._thread: Optional[threading.Thread] = None
+        self._sent_at: Deque[float] = collections.deque()
+        self.stats: Dict[str, Any] = {
+            "enqueued": 0,
+            "delivered": 0,
+            "requests": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "failed": 0,
+            "retries": 0,
+            "last_error": None,
+            "last_latency_ms": None,
+        }
+
+    def submit(self, key: str, text: str) -> None:
+        with self._cond:
+            if len(self._pending) >= self.queue_size:
+                self._pending.popleft()
+                self.stats["dropped"] += 1
+            self._pending.append((key, text))
+            self.stats["enqueued"] += 1
+            self._ensure_worker()
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待队列清空；超时返回 False。"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            data = dict(self.stats)
+            data["pending"] = len(self._pending)
+        return data
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="notify-webhook", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                self._busy = True
+            try:
+                if self.coalesce_seconds > 0:
+                    # 等待一小段时间，把同一批连续消息合并发送
+                    time.sleep(self.coalesce_seconds)
+                with self._cond:
+                    batch = list(self._pending)
+                    self._pending.clear()
+                for key, content, count in self._coalesce(batch):
+                    self._deliver(key, content, count)
+            except Exception as exc:  # pragma: no cover - 防御性保护，避免后台线程退出
+                _LOGGER.exception("消息投递线程异常: %s", exc)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    @staticmethod
+    def _coalesce(batch: List[Tuple[str, str]]) -> List[Tuple[str, str, int]]:
+        """按 key 合并相邻消息，单条 content 不超过长度上限。"""
+        merged: List[Tuple[str, str, int]] = []
+        for key, text in batch:
+            if merged and merged[-1][0] == key:
+                last_key, content, count = merged[-1]
+                candidate = f"{content}\n{text}"
+                if len(candidate.encode("utf-8")) <= _MAX_CONTENT_BYTES:
+                    merged[-1] = (last_key, candidate, count + 1)
+                    continue
+            merged.append((key, text, 1))
+        return merged
+
+    def _acquire_rate_slot(self) -> None:
+        if self.rate_per_minute <= 0:
+            return
+        limit = max(1, int(self.rate_per_minute))
+        while True:
+            now = time.monotonic()
+            while self._sent_at and now - self._sent_at[0] >= 60.0:
+                self._sent_at.popleft()
+            if len(self._sent_at) < limit:
+                self._sent_at.append(now)
+                return
+            time.sleep(60.0 - (now - self._sent_at[0]))
+
+    def _deliver(self, key: str, content: str, count: int) -> None:
+        http = _http_client()
+        if http is None:
+            _LOGGER.error("requests 未安装，无法发送企业微信消息")
+            self._record_failure(count, "requests 未安装")
+            return
+
+        url = _WEBHOOK_TEMPLATE.format(key=key)
+        payload = {
+            "msgtype": "text",
+            "text": {"content": content, "mentioned_list": ["@all"]},
+        }
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._cond:
+                    self.stats["retries"] += 1
+                time.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+            self._acquire_rate_slot()
+            started = time.monotonic()
+            try:
+                response = http.post(url, json=payload, timeout=_DEFAULT_TIMEOUT)
+                response.raise_for_status()
+                data = response.json()
+            except Exception as exc:  # pragma: no cover - 网络异常路径不固定
+                error = f"{type(exc).__name__}: {exc}"
+                retryable = True
+            else:
+                errcode = data.get("errcode") if isinstance(data, dict) else 0
+                if not errcode:
+                    with self._cond:
+                        self.stats["requests"] += 1
+                        self.stats["delivered"] += count
+                        self.stats["coalesced"] += count - 1
+                        self.stats["last_latency_ms"] = round((time.monotonic() - started) * 1000.0, 1)
+                    return
+                error = f"企业微信返回错误: {data}"
+                retryable = errcode == _ERRCODE_RATE_LIMITED
+            if not retryable:
+                break
+        _LOGGER.error("发送企业微信消息失败: %s", error)
+        self._record_failure(count, error)
+
+    def _record_failure(self, count: int, error: str) -> None:
+        with self._cond:
+            self.stats["failed"] += count
+            self.stats["last_error"] = error
+
+
+_dispatcher: Optional[_WebhookDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def _get_dispatcher() -> _WebhookDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = _WebhookDispatcher()
+    return _dispatcher
 
 
 def set_message_handler(handler: Optional[Callable[[str], None]]) -> None:
@@ -37,7 +227,7 @@ def send_msg(message: str) -> None:
 
     - 始终记录 `[策略消息]` 日志。
     - 存在自定义 handler 时优先调用，异常不会向外抛出。
-    - 配置 MESSAGE_KEY 时，会尝试调用企业微信 webhook。
+    - 配置 MESSAGE_KEY 时，消息进入后台队列异步推送企业微信 webhook，本函数不等待网络。
     """
     text = str(message)
     log.info(f"[策略消息] {text}")
@@ -60,24 +250,29 @@ def send_msg(message: str) -> None:
     if not key:
         return
 
-    if requests is None:
-        _LOGGER.error("requests 未安装，无法发送企业微信消息")
-        return
+    _get_dispatcher().submit(key, text)
+
+
+def flush_messages(timeout: Optional[float] = None) -> bool:
+    """等待已入队的通知发送完毕（含重试）；超时返回 False。"""
+    if _dispatcher is None:
+        return True
+    return _dispatcher.flush(timeout)
+
+
+def get_notification_stats() -> Dict[str, Any]:
+    """
+    返回 webhook 投递统计：enqueued/delivered/requests/coalesced/dropped/failed/retries/pending，
+    以及 last_error、last_latency_ms。
+    """
+    if _dispatcher is None:
+        return _WebhookDispatcher().snapshot()
+    return _dispatcher.snapshot()
 
-    url = _WEBHOOK_TEMPLATE.format(key=key)
-    payload = {
-        "msgtype": "text",
-        "text": {"content": text, "mentioned_list": ["@all"]},
-    }
 
-    try:
-        response = requests.post(url, json=payload, timeout=_DEFAULT_TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
-        if isinstance(data, dict) and data.get("errcode") != 0:
-            _LOGGER.error("企业微信返回错误: %s", data)
-    except Exception as exc:  # pragma: no cover - 网络异常路径不固定
-        _LOGGER.exception("发送企业微信消息失败: %s", exc)
+@atexit.register
+def _flush_on_exit() -> None:
+    flush_messages(timeout=get_env_float("NOTIFY_EXIT_FLUSH_SECONDS", 5.0))
 
 
-__all__ = ["send_msg", "set_message_handler"]
+__all__ = ["send_msg", "set_message_handler", "flush_messages", "get_notification_stats"]
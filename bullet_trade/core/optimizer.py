@@ -3,25 +3,34 @@
 
 提供在多CPU上并行运行参数组合的回测，并将每个组合的风险指标导出到CSV。
 该过程不生成报告文件（不调用 generate_report），仅返回与保存CSV。
+
+shared_data 模式下父进程只加载一次行情窗口（BarStore），以只读内存映射共享给所有子进程，
+子进程只运行策略逻辑；CSV 中附带数据加载/模拟/指标计算的分阶段耗时。
 """
 from typing import Dict, Any, List, Optional, Iterable, Tuple
 import itertools
+import math
 import os
+import random
 import signal
 import sys
 import time
 import traceback
 import json
+import shutil
+import tempfile
 import multiprocessing as mp
 import pandas as pd
 import numpy as np
 
 
-def _worker_init():
+def _worker_init(shared_dir: Optional[str] = None):
     """
     子进程初始化函数：
     1. 让子进程忽略 SIGINT 信号，由主进程统一处理中断
     2. 禁用文件日志，避免多进程同时写入同一个日志文件导致冲突
+    3. shared_data 模式下以只读内存映射挂载父进程导出的行情列存储
+    4. 预先构造并认证数据源
     """
     # Windows 上 signal.SIGINT 可能不存在或行为不同，需要容错处理
     try:
@@ -33,16 +42,22 @@ def _worker_init():
     # 这是多进程优化时的常见问题，尤其在 Windows 上会导致 PermissionError
     try:
         from .globals import log
-        if log._file_handler:
-            try:
-                log.logger.removeHandler(log._file_handler)
-            except Exception:
-                pass
-            try:
-                log._file_handler.close()
-            except Exception:
-                pass
-            log._file_handler = None
+        log.remove_file_handler()
+    except Exception:
+        pass
+
+    if shared_dir:
+        try:
+            set_shared_bar_store(BarStore.attach(shared_dir))
+        except Exception as e:
+            # 挂载失败时子进程退回各自加载数据，不影响结果
+            print(f"挂载共享行情失败，子进程将自行加载数据: {e}")
+
+    # 预热数据源：子进程常驻期间复用同一个已认证的 provider，避免首个组合承担连接开销
+    try:
+        from ..data import api as data_api
+        data_api.get_data_provider()
+        data_api._ensure_auth()
     except Exception:
         pass
 
@@ -54,6 +69,9 @@ except Exception:
 
 from .engine import create_backtest
 from .analysis import calculate_metrics
+from .settings import get_settings
+from ..data.api import get_data_provider
+from ..data.bar_store import BarStore, set_shared_bar_store
 
 
 def _expand_param_grid(param_grid: Dict[str, Iterable]) -> List[Dict[str, Any]]:
@@ -70,6 +88,11 @@ def _expand_param_grid(param_grid: Dict[str, Iterable]) -> List[Dict[str, Any]]:
 
 def _worker_task(task: Dict[str, Any]) -> Dict[str, Any]:
     """子进程任务：运行一次回测并计算指标。"""
+    return _run_task(task)[0]
+
+
+def _run_task(task: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """运行一次回测并计算指标，返回 (结果行, 回测结果)；失败时回测结果为 None。"""
     strategy_file = task['strategy_file']
     start_date = task['start_date']
     end_date = task['end_date']
@@ -98,6 +121,7 @@ def _worker_task(task: Dict[str, Any]) -> Dict[str, Any]:
 
     start_ts = time.time()
     row: Dict[str, Any] = {}
+    results: Optional[Dict[str, Any]] = None
     try:
         # 运行回测（不写任何日志文件）
         results = create_backtest(
@@ -113,7 +137,9 @@ def _worker_task(task: Dict[str, Any]) -> Dict[str, Any]:
             algorithm_id=algorithm_id,
         )
         # 计算风险指标
+        t_metrics = time.time()
         metrics = calculate_metrics(results)
+        metrics_seconds = time.time() - t_metrics
 
         # 行数据：参数与指标合并
         row.update(combo_params)
@@ -143,8 +169,12 @@ def _worker_task(task: Dict[str, Any]) -> Dict[str, Any]:
         row['频率'] = frequency
         row['初始资金'] = float(results['daily_records']['total_value'].iloc[0]) if len(results['daily_records']) else initial_cash
 
-        # 运行耗时
+        # 运行耗时（总耗时 + 分阶段耗时）
+        phases = meta.get('phase_seconds') or {}
         row['耗时秒'] = round(time.time() - start_ts, 3)
+        row['数据加载秒'] = phases.get('data_load')
+        row['模拟秒'] = phases.get('simulate')
+        row['指标秒'] = round(metrics_seconds, 3)
         row['错误'] = ''
     except Exception as e:
         # 错误行：标记错误并写入组合参数
@@ -157,7 +187,581 @@ def _worker_task(task: Dict[str, Any]) -> Dict[str, Any]:
         row['结束日期'] = end_date
         row['频率'] = frequency
         row['初始资金'] = initial_cash
-    return row
+        results = None
+    return row, results
+
+
+def _keyed_worker_task(item: Tuple[str, Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    """带任务键的子进程任务，便于乱序返回时对应到组合。"""
+    key, task = item
+    return key, _worker_task(task)
+
+
+def _task_key(task: Dict[str, Any]) -> str:
+    """组合的稳定标识：策略文件 + 回测区间 + 基础参数 + 组合参数。"""
+    ident = {
+        'strategy_file': os.path.abspath(str(task.get('strategy_file'))),
+        'start_date': str(task.get('start_date')),
+        'end_date': str(task.get('end_date')),
+        'frequency': task.get('frequency'),
+        'initial_cash': task.get('initial_cash'),
+        'benchmark': task.get('benchmark'),
+        'initial_positions': task.get('initial_positions'),
+        'extras_base': task.get('extras_base') or {},
+        'combo_params': task.get('combo_params') or {},
+    }
+    return json.dumps(ident, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return str(value)
+
+
+class _ResultJournal:
+    """
+    结果日志（JSON Lines）：每完成一个组合追加一行 {"key": ..., "row": ...}。
+
+    重新运行同一寻优时读取日志，已成功的组合直接复用结果，只运行剩余组合；
+    失败的组合会被重跑。进程被强杀导致的半行记录会被忽略。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = None
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        done: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                row = record.get('row') or {}
+                key = record.get('key')
+                if not key:
+                    continue
+                if row.get('错误'):
+                    done.pop(key, None)
+                else:
+                    done[key] = row
+        return done
+
+    def append(self, key: str, row: Dict[str, Any]) -> None:
+        if self._fh is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._fh = open(self.path, 'a', encoding='utf-8')
+        self._fh.write(json.dumps({'key': key, 'row': row}, ensure_ascii=False, default=_json_default) + '\n')
+        self._fh.flush()
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class _WorkerPool:
+    """
+    常驻进程池：一次寻优只启动一次子进程，策略依赖模块与已认证的数据源在组合之间复用。
+
+    任务按 chunksize 分块派发，结果按完成顺序回调 on_result(key, row)，慢组合不会阻塞进度。
+    processes == 1 时在当前进程内串行执行。
+    """
+
+    def __init__(self, processes: int, shared_dir: Optional[str] = None, chunksize: Optional[int] = None):
+        self.processes = max(1, int(processes or 1))
+        self.shared_dir = shared_dir
+        self.chunksize = chunksize
+        self._pool = None
+
+    def __enter__(self) -> "_WorkerPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _chunksize(self, n_items: int) -> int:
+        if self.chunksize and self.chunksize > 0:
+            return int(self.chunksize)
+        # 每个进程约分到 8 块以上，兼顾派发开销与进度粒度
+        return max(1, min(16, n_items // (self.processes * 8)))
+
+    def run(self, items: List[Tuple[str, Dict[str, Any]]], on_result) -> bool:
+        """执行任务，返回是否被用户中断（Ctrl+C）。"""
+        if not items:
+            return False
+        if self.processes == 1:
+            try:
+                for item in items:
+                    on_result(*_keyed_worker_task(item))
+            except KeyboardInterrupt:
+                print("\n\n⚠️ 用户中断优化")
+                return True
+            return False
+
+        try:
+            if self._pool is None:
+                # 使用 initializer 让子进程忽略 SIGINT，由主进程统一处理
+                self._pool = mp.Pool(processes=self.processes, initializer=_worker_init, initargs=(self.shared_dir,))
+            iterator = self._pool.imap_unordered(_keyed_worker_task, items, chunksize=self._chunksize(len(items)))
+            # 注意：Windows 上阻塞的迭代器无法响应 Ctrl+C，因此使用带超时的 next() 轮询
+            while True:
+                try:
+                    key, row = iterator.next(timeout=0.5)
+                except mp.TimeoutError:
+                    continue
+                except StopIteration:
+                    break
+                on_result(key, row)
+        except KeyboardInterrupt:
+            print("\n\n⚠️ 用户中断优化，正在停止子进程...")
+            self._pool.terminate()  # 强制终止所有子进程
+            self._pool.join()
+            self._pool = None
+            return True
+        return False
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()  # 等待所有子进程结束
+            self._pool = None
+
+
+def _probe_securities(results: Dict[str, Any], initial_positions: Optional[List[Dict[str, Any]]]) -> List[str]:
+    """从探测回测推断需要共享的标的：标的池 + 基准 + 初始持仓 + 实际成交/持有过的标的。"""
+    settings = get_settings()
+    codes: List[str] = list(settings.options.get('universe') or ())
+    if settings.benchmark:
+        codes.append(settings.benchmark)
+    for item in initial_positions or []:
+        if isinstance(item, dict) and item.get('security'):
+            codes.append(item['security'])
+    for trade in results.get('trades') or []:
+        code = getattr(trade, 'security', None)
+        if code:
+            codes.append(code)
+    positions = results.get('daily_positions')
+    if isinstance(positions, pd.DataFrame) and 'code' in positions.columns:
+        codes.extend(str(c) for c in positions['code'].dropna().unique())
+    return list(dict.fromkeys(codes))
+
+
+def _prepare_shared_store(task: Dict[str, Any], window_task: Optional[Dict[str, Any]] = None):
+    """
+    shared_data 模式的父进程准备：先在本进程运行第一个组合（结果计入输出），
+    据此确定标的池与复权口径，再一次性加载回测区间（含回看窗口）的行情列存储。
+    window_task 指定加载区间（默认同 task），逐轮淘汰时首轮区间较短，需按全区间加载。
+
+    Returns:
+        (BarStore 或 None, 第一个组合的结果行)
+    """
+    row, results = _run_task(task)
+    if results is None:
+        print(f"⚠️ 探测回测失败，shared_data 模式退回逐组合加载数据：{row.get('错误')}")
+        return None, row
+
+    securities = _probe_securities(results, task.get('initial_positions'))
+    if not securities:
+        print("⚠️ 未能推断标的池（请在策略中调用 set_universe），shared_data 模式退回逐组合加载数据")
+        return None, row
+
+    window_task = window_task or task
+    options = get_settings().options
+    frequencies = ['daily', 'minute'] if str(task.get('frequency')).lower() == 'minute' else ['daily']
+    fq_modes = ['none'] if options.get('use_real_price') else ['none', 'pre']
+    t0 = time.time()
+    try:
+        provider = get_data_provider()
+        trade_days = provider.get_trade_days(
+            start_date=window_task['start_date'], end_date=window_task['end_date']
+        ) or []
+        if not trade_days:
+            return None, row
+        start = pd.to_datetime(trade_days[0])
+        lookback = int(options.get('preload_lookback_days', 60) or 0)
+        if lookback > 0:
+            history_days = provider.get_trade_days(end_date=trade_days[0], count=lookback + 1) or []
+            if history_days:
+                start = pd.to_datetime(history_days[0])
+        store = BarStore(
+            provider,
+            securities,
+            start,
+            pd.to_datetime(trade_days[-1]),
+            frequencies=frequencies,
+            fq_modes=fq_modes,
+        ).load()
+    except Exception as e:
+        print(f"⚠️ 共享行情加载失败，shared_data 模式退回逐组合加载数据：{e}")
+        return None, row
+    stats = store.stats()
+    print(
+        f"共享行情已加载：标的 {stats['securities']} 个，数据块 {stats['blocks']} 个，"
+        f"{stats['rows']} 行，耗时 {time.time() - t0:.2f} 秒"
+    )
+    return store, row
+
+
+class _SearchRunner:
+    """
+    寻优执行器：各搜索策略按批提交组合，统一处理结果日志复用、共享行情、常驻进程池与进度显示。
+
+    同一进程内重复提交的 (组合, 回测区间) 直接复用已有结果，不会重复回测。
+    """
+
+    def __init__(
+        self,
+        base_task: Dict[str, Any],
+        processes: int,
+        *,
+        shared_data: bool = False,
+        journal: Optional[str] = None,
+        chunksize: Optional[int] = None,
+        show_progress: bool = True,
+        progress_desc: Optional[str] = None,
+    ):
+        self.base_task = base_task
+        self.processes = processes
+        self.chunksize = chunksize
+        self.show_progress = show_progress
+        self.progress_desc = progress_desc
+        self.journal_path = journal
+        self._journal = _ResultJournal(journal) if journal else None
+        self._done: Dict[str, Dict[str, Any]] = self._journal.load() if self._journal else {}
+        self._shared_pending = shared_data
+        self._shared_store = None
+        self._shared_dir: Optional[str] = None
+        self._pool: Optional[_WorkerPool] = None
+        self._pbar = None
+        self._progress_done = 0
+        self._progress_total = 0
+        self._last_emit = time.time()
+        self.interrupted = False
+        self.reused = 0
+        self.executed = 0
+
+    def make_task(self, combo: Dict[str, Any], end_date: Optional[str] = None) -> Dict[str, Any]:
+        task = dict(self.base_task)
+        task['combo_params'] = combo
+        if end_date is not None:
+            task['end_date'] = end_date
+        return task
+
+    def _advance(self, n: int = 1) -> None:
+        self._progress_done += n
+        if self._pbar is not None:
+            self._pbar.update(n)
+        elif self.show_progress:
+            now = time.time()
+            if now - self._last_emit >= 1.0 or self._progress_done == self._progress_total:
+                pct = (self._progress_done / self._progress_total) * 100 if self._progress_total else 100.0
+                print(f"进度: {self._progress_done}/{self._progress_total} ({pct:.1f}%)")
+                self._last_emit = now
+
+    def _extend_total(self, n: int) -> None:
+        self._progress_total += n
+        if self.show_progress and tqdm and self._pbar is None:
+            self._pbar = tqdm(total=self._progress_total, desc=self.progress_desc or '参数优化', unit='组')
+        elif self._pbar is not None:
+            self._pbar.total = self._progress_total
+            self._pbar.refresh()
+
+    def run(self, combos: List[Dict[str, Any]], end_date: Optional[str] = None) -> List[Optional[Dict[str, Any]]]:
+        """运行一批组合（可指定较短的结束日期），返回与 combos 对齐的结果行；中断后未完成的为 None。"""
+        keys: List[str] = []
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: List[Tuple[str, Dict[str, Any]]] = []
+        queued = set()
+        for combo in combos:
+            task = self.make_task(combo, end_date)
+            key = _task_key(task)
+            keys.append(key)
+            if key in self._done:
+                results[key] = self._done[key]
+            elif key not in queued:
+                queued.add(key)
+                pending.append((key, task))
+        if self.interrupted:
+            return [results.get(k) for k in keys]
+
+        self._extend_total(len(set(keys)))
+        reused = len(set(keys)) - len(pending)
+        self.reused += reused
+        if reused:
+            self._advance(reused)
+
+        def _on_result(key: str, row: Dict[str, Any]) -> None:
+            results[key] = row
+            self.executed += 1
+            if not row.get('错误'):
+                self._done[key] = row
+            if self._journal:
+                self._journal.append(key, row)
+            self._advance()
+
+        try:
+            if self._shared_pending and pending:
+                self._shared_pending = False
+                first_key, first_task = pending.pop(0)
+                full_task = self.make_task(first_task['combo_params'])
+                self._shared_store, first_row = _prepare_shared_store(first_task, full_task)
+                _on_result(first_key, first_row)
+                if self._shared_store is not None:
+                    if self.processes == 1:
+                        set_shared_bar_store(self._shared_store)
+                    else:
+                        self._shared_dir = self._shared_store.export(tempfile.mkdtemp(prefix='bt_shared_bars_'))
+            if pending:
+                if self._pool is None:
+                    self._pool = _WorkerPool(self.processes, shared_dir=self._shared_dir, chunksize=self.chunksize)
+                self.interrupted = self._pool.run(pending, _on_result)
+        except KeyboardInterrupt:
+            print("\n\n⚠️ 用户中断优化")
+            self.interrupted = True
+        return [results.get(k) for k in keys]
+
+    def close(self) -> None:
+        if self._pbar is not None:
+            self._pbar.close()
+            self._pbar = None
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        if self._journal:
+            self._journal.close()
+        if self._shared_store is not None:
+            set_shared_bar_store(None)
+            self._shared_store = None
+        if self._shared_dir:
+            shutil.rmtree(self._shared_dir, ignore_errors=True)
+            self._shared_dir = None
+
+
+# -------------------------- 搜索策略 --------------------------
+
+SEARCH_MODES = ('grid', 'random', 'halving', 'hyperband', 'tpe')
+
+
+def _grid_size(param_grid: Dict[str, List[Any]]) -> int:
+    size = 1
+    for values in param_grid.values():
+        size *= len(values)
+    return size
+
+
+def _combo_key(combo: Dict[str, Any]) -> str:
+    return json.dumps(combo, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _sample_combos(
+    param_grid: Dict[str, List[Any]],
+    n: int,
+    rng: random.Random,
+    exclude: Optional[set] = None,
+) -> List[Dict[str, Any]]:
+    """从网格中无放回随机抽取 n 个组合（不展开全网格）；n 不小于剩余组合数时返回全部剩余组合。"""
+    exclude = exclude or set()
+    keys = list(param_grid.keys())
+    if n >= _grid_size(param_grid) - len(exclude):
+        combos = [c for c in _expand_param_grid(param_grid) if _combo_key(c) not in exclude]
+        rng.shuffle(combos)
+        return combos
+    picked: Dict[str, Dict[str, Any]] = {}
+    while len(picked) < n:
+        combo = {k: rng.choice(param_grid[k]) for k in keys}
+        ck = _combo_key(combo)
+        if ck not in exclude and ck not in picked:
+            picked[ck] = combo
+    return list(picked.values())
+
+
+def _score(row: Optional[Dict[str, Any]], sort_by: str) -> float:
+    """排序得分：失败/缺失的组合记为 -inf。"""
+    if not row or row.get('错误'):
+        return float('-inf')
+    for col in (sort_by, 'Calmar比率'):
+        if col in row:
+            try:
+                value = float(row[col])
+            except (TypeError, ValueError):
+                continue
+            return value if np.isfinite(value) else float('-inf')
+    return float('-inf')
+
+
+def _window_end(start_date: str, end_date: str, fraction: float) -> str:
+    """按比例截取回测区间的前段，返回新的结束日期；fraction >= 1 时返回原结束日期。"""
+    if fraction >= 1:
+        return end_date
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    return (start + (end - start) * fraction).strftime('%Y-%m-%d')
+
+
+def _rung_fractions(eta: int, min_fraction: float) -> List[float]:
+    """逐轮回测区间比例：min_fraction, min_fraction*eta, ..., 1。"""
+    s = max(0, int(math.floor(math.log(1.0 / min_fraction) / math.log(eta) + 1e-9)))
+    return [float(eta) ** (i - s) for i in range(s + 1)]
+
+
+def _successive_halving(
+    runner: _SearchRunner,
+    combos: List[Dict[str, Any]],
+    fractions: List[float],
+    eta: int,
+    sort_by: str,
+) -> List[Dict[str, Any]]:
+    """在逐渐加长的回测区间上评估候选，每轮只保留前 1/eta 晋级，返回全区间的结果行。"""
+    start_date = runner.base_task['start_date']
+    end_date = runner.base_task['end_date']
+    candidates = list(combos)
+    for i, fraction in enumerate(fractions):
+        window_end = _window_end(start_date, end_date, fraction)
+        rows = runner.run(candidates, end_date=window_end)
+        if runner.interrupted or fraction >= 1:
+            return [r for r in rows if r is not None]
+        keep = max(1, int(math.ceil(len(candidates) / eta)))
+        ranked = sorted(range(len(candidates)), key=lambda j: _score(rows[j], sort_by), reverse=True)
+        print(f"逐轮淘汰 第{i + 1}/{len(fractions)}轮：区间 {start_date} 至 {window_end}，候选 {len(candidates)} 个，晋级 {keep} 个")
+        candidates = [candidates[j] for j in ranked[:keep]]
+    return []
+
+
+def _search_halving(runner, param_grid, sort_by, rng, n_trials, eta, min_fraction) -> List[Dict[str, Any]]:
+    fractions = _rung_fractions(eta, min_fraction)
+    n = n_trials or eta ** len(fractions)
+    return _successive_halving(runner, _sample_combos(param_grid, n, rng), fractions, eta, sort_by)
+
+
+def _search_hyperband(runner, param_grid, sort_by, rng, n_trials, eta, min_fraction) -> List[Dict[str, Any]]:
+    """Hyperband：多组不同起始区间的逐轮淘汰，兼顾“多候选短区间”与“少候选长区间”。"""
+    s_max = len(_rung_fractions(eta, min_fraction)) - 1
+    rows: List[Dict[str, Any]] = []
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        fractions = [float(eta) ** (i - s) for i in range(s + 1)]
+        print(f"Hyperband 分组 s={s}：候选 {n} 个，起始区间比例 {fractions[0]:.3f}")
+        rows.extend(_successive_halving(runner, _sample_combos(param_grid, n, rng), fractions, eta, sort_by))
+        if runner.interrupted:
+            break
+    return rows
+
+
+def _search_random(runner, param_grid, sort_by, rng, n_trials, eta, min_fraction) -> List[Dict[str, Any]]:
+    rows = runner.run(_sample_combos(param_grid, n_trials or 50, rng))
+    return [r for r in rows if r is not None]
+
+
+def _tpe_weights(param_values: List[Any], observed: List[Any]) -> np.ndarray:
+    """
+    离散参数的 Parzen 估计：每个取值有 1 个单位的先验，每个观测在其取值处加核。
+    数值型参数使用按取值顺序的高斯核（相邻取值互相“借力”），其他类型按类别计数。
+    """
+    n = len(param_values)
+    weights = np.ones(n, dtype=float)
+    if not observed:
+        return weights / weights.sum()
+    index = {_combo_key(v): i for i, v in enumerate(param_values)}
+    positions = np.array([index[_combo_key(v)] for v in observed if _combo_key(v) in index], dtype=float)
+    numeric = all(isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool) for v in param_values)
+    grid = np.arange(n, dtype=float)
+    if numeric and n > 1:
+        bandwidth = max(1.0, n / 10.0)
+        for pos in positions:
+            weights += np.exp(-0.5 * ((grid - pos) / bandwidth) ** 2)
+    else:
+        for pos in positions:
+            weights[int(pos)] += 1.0
+    return weights / weights.sum()
+
+
+def _tpe_suggest(
+    param_grid: Dict[str, List[Any]],
+    history: List[Tuple[Dict[str, Any], float]],
+    n: int,
+    rng: random.Random,
+    seen: set,
+    gamma: float = 0.25,
+    n_candidates: int = 24,
+) -> List[Dict[str, Any]]:
+    """按 l(x)/g(x) 最大化生成 n 个未评估过的组合（l/g 分别为较优/较差观测的密度）。"""
+    ordered = sorted(history, key=lambda item: item[1], reverse=True)
+    n_good = max(1, int(math.ceil(gamma * len(ordered))))
+    good = [c for c, _ in ordered[:n_good]]
+    bad = [c for c, _ in ordered[n_good:]]
+    densities = {}
+    for name, values in param_grid.items():
+        densities[name] = (
+            _tpe_weights(values, [c[name] for c in good]),
+            _tpe_weights(values, [c[name] for c in bad]),
+        )
+    np_rng = np.random.default_rng(rng.getrandbits(32))
+    suggestions: List[Dict[str, Any]] = []
+    taken = set(seen)
+    for _ in range(n):
+        best, best_score = None, float('-inf')
+        for _ in range(n_candidates):
+            combo, score = {}, 0.0
+            for name, values in param_grid.items():
+                l_w, g_w = densities[name]
+                j = int(np_rng.choice(len(values), p=l_w))
+                combo[name] = values[j]
+                score += math.log(l_w[j]) - math.log(g_w[j])
+            if _combo_key(combo) not in taken and score > best_score:
+                best, best_score = combo, score
+        if best is None:
+            fallback = _sample_combos(param_grid, 1, rng, exclude=taken)
+            if not fallback:
+                break
+            best = fallback[0]
+        taken.add(_combo_key(best))
+        suggestions.append(best)
+    return suggestions
+
+
+def _search_tpe(runner, param_grid, sort_by, rng, n_trials, eta, min_fraction) -> List[Dict[str, Any]]:
+    """TPE：先随机探索，再按批（批大小=进程数）根据已有结果生成更有希望的组合。"""
+    total = min(n_trials or 50, _grid_size(param_grid))
+    n_startup = min(total, max(10, 2 * runner.processes))
+    rows: List[Dict[str, Any]] = []
+    history: List[Tuple[Dict[str, Any], float]] = []
+    seen: set = set()
+
+    def _evaluate(combos: List[Dict[str, Any]]) -> None:
+        for combo, row in zip(combos, runner.run(combos)):
+            seen.add(_combo_key(combo))
+            if row is None:
+                continue
+            rows.append(row)
+            score = _score(row, sort_by)
+            history.append((combo, score if np.isfinite(score) else -1e12))
+
+    _evaluate(_sample_combos(param_grid, n_startup, rng))
+    while not runner.interrupted and len(seen) < total:
+        batch = min(max(1, runner.processes), total - len(seen))
+        combos = _tpe_suggest(param_grid, history, batch, rng, seen)
+        if not combos:
+            break
+        _evaluate(combos)
+    return rows
+
+
+_SEARCHERS = {
+    'random': _search_random,
+    'halving': _search_halving,
+    'hyperband': _search_hyperband,
+    'tpe': _search_tpe,
+}
 
 
 def run_param_grid(
@@ -179,6 +783,14 @@ def run_param_grid(
     quiet_level: str = 'error',
     show_progress: bool = True,
     progress_desc: Optional[str] = None,
+    shared_data: bool = False,
+    journal: Optional[str] = None,
+    chunksize: Optional[int] = None,
+    search: str = 'grid',
+    n_trials: Optional[int] = None,
+    eta: int = 3,
+    min_fraction: Optional[float] = None,
+    seed: Optional[int] = None,
 ) -> pd.DataFrame:
     """
     并行运行参数组合回测并返回/保存指标CSV。
@@ -196,13 +808,37 @@ def run_param_grid(
         benchmark: 基准标的（可选）
         algorithm_id: 算法ID（可选）
         output_csv: 保存CSV路径（可选，不传则不保存）
-        sort_by: 排序指标，默认按 '收益回撤比'（Calmar比率）降序
+        sort_by: 排序指标，默认按 '收益回撤比'（Calmar比率）降序；非网格搜索也按此指标择优
         top_n: 控制台输出的Top建议数量（默认10）
+        shared_data: 共享行情模式。父进程先运行第一个组合以确定标的池，随后一次性加载行情窗口，
+            子进程以只读内存映射挂载后只运行策略逻辑；未被共享数据覆盖的请求仍回退数据源
+        journal: 结果日志路径（JSON Lines，可选）。每完成一个组合即追加记录；中断后以相同参数重跑
+            会跳过已成功的组合，只运行剩余部分
+        chunksize: 每次派发给子进程的组合数（默认按组合数与进程数自动选择）
+        search: 搜索方式
+            - 'grid': 全网格（默认）
+            - 'random': 随机抽取 n_trials 个组合（默认 50）
+            - 'halving': 逐轮淘汰。n_trials 个候选（默认 eta^轮数）先在区间前 min_fraction 段回测，
+              每轮保留前 1/eta 并把区间放大 eta 倍，直至全区间
+            - 'hyperband': 多组不同起始比例的逐轮淘汰（忽略 n_trials）
+            - 'tpe': 贝叶斯（TPE）采样，共评估 n_trials 个组合（默认 50）
+        n_trials: 评估的组合数（含义见 search）
+        eta: 逐轮淘汰的淘汰比例（默认 3）
+        min_fraction: 逐轮淘汰的最短区间比例（默认 1/eta^2）
+        seed: 随机种子（random/halving/hyperband/tpe）
 
     Returns:
-        包含参数与风险指标的DataFrame（已按 sort_by 排序）
+        包含参数与风险指标的DataFrame（已按 sort_by 排序）。非网格搜索只包含全区间回测的组合。
     """
-    combos = _expand_param_grid(param_grid or {})
+    search = (search or 'grid').lower()
+    if search not in SEARCH_MODES:
+        raise ValueError(f"不支持的搜索方式: {search}，可选: {', '.join(SEARCH_MODES)}")
+    eta = max(2, int(eta or 3))
+    if min_fraction is None:
+        min_fraction = float(eta) ** -2
+    if not 0 < min_fraction <= 1:
+        raise ValueError("min_fraction 必须在 (0, 1] 区间内")
+
     if processes is None or processes <= 0:
         try:
             processes = os.cpu_count() or 1
@@ -218,105 +854,45 @@ def run_param_grid(
         print(f"{YELLOW}   如需调试单个参数组合，请使用单次回测命令{RESET}")
         print()
 
-    tasks = []
-    for combo in combos:
-        tasks.append({
-            'strategy_file': strategy_file,
-            'start_date': start_date,
-            'end_date': end_date,
-            'frequency': frequency,
-            'initial_cash': initial_cash,
-            'benchmark': benchmark,
-            'initial_positions': initial_positions,
-            'extras_base': extras_base or {},
-            'combo_params': combo,
-            'algorithm_id': algorithm_id,
-            'quiet': quiet,
-            'quiet_level': quiet_level,
-        })
-
-    rows: List[Dict[str, Any]] = []
-    interrupted = False
-    
-    if processes == 1:
-        # 单进程模式：直接处理中断
-        iterator = map(_worker_task, tasks)
-        try:
-            if show_progress and tqdm:
-                for r in tqdm(iterator, total=len(tasks), desc=progress_desc or '参数优化', unit='组'):
-                    rows.append(r)
-            else:
-                for r in iterator:
-                    rows.append(r)
-        except KeyboardInterrupt:
-            interrupted = True
-            print("\n\n⚠️ 用户中断优化，已完成 {}/{} 组合".format(len(rows), len(tasks)))
-    else:
-        # 多进程模式：需要手动管理 Pool 以正确处理中断
-        # 注意：Windows 上 imap_unordered 迭代器阻塞时无法响应 Ctrl+C
-        # 因此使用 apply_async + 带超时的 get() 轮询，让主进程能定期检查中断信号
-        pool = None
-        try:
-            # 使用 initializer 让子进程忽略 SIGINT，由主进程统一处理
-            pool = mp.Pool(processes=processes, initializer=_worker_init)
-            
-            # 使用 apply_async 提交所有任务，返回 AsyncResult 列表
-            async_results = [pool.apply_async(_worker_task, (task,)) for task in tasks]
-            
-            # 关闭 pool，不再接受新任务（但已提交的任务继续执行）
-            pool.close()
-            
-            # 带超时轮询等待结果，这样主进程能响应 Ctrl+C
-            total = len(async_results)
-            if show_progress and tqdm:
-                pbar = tqdm(total=total, desc=progress_desc or '参数优化', unit='组')
-                for ar in async_results:
-                    # 使用带超时的 get()，每 0.5 秒检查一次，让主进程能响应中断
-                    while True:
-                        try:
-                            r = ar.get(timeout=0.5)
-                            break
-                        except mp.TimeoutError:
-                            continue  # 超时但任务未完成，继续等待
-                    rows.append(r)
-                    pbar.update(1)
-                pbar.close()
-            elif show_progress and not tqdm:
-                done = 0
-                last_emit = time.time()
-                emit_interval = 1.0
-                for ar in async_results:
-                    while True:
-                        try:
-                            r = ar.get(timeout=0.5)
-                            break
-                        except mp.TimeoutError:
-                            continue
-                    rows.append(r)
-                    done += 1
-                    now = time.time()
-                    if now - last_emit >= emit_interval or done == total:
-                        pct = (done / total) * 100
-                        print(f"进度: {done}/{total} ({pct:.1f}%)")
-                        last_emit = now
-            else:
-                for ar in async_results:
-                    while True:
-                        try:
-                            r = ar.get(timeout=0.5)
-                            break
-                        except mp.TimeoutError:
-                            continue
-                    rows.append(r)
-        except KeyboardInterrupt:
-            interrupted = True
-            print("\n\n⚠️ 用户中断优化，正在停止子进程...")
-            if pool:
-                pool.terminate()  # 强制终止所有子进程
-            print("已完成 {}/{} 组合".format(len(rows), len(tasks)))
-        finally:
-            if pool:
-                pool.join()  # 等待所有子进程结束
+    base_task = {
+        'strategy_file': strategy_file,
+        'start_date': start_date,
+        'end_date': end_date,
+        'frequency': frequency,
+        'initial_cash': initial_cash,
+        'benchmark': benchmark,
+        'initial_positions': initial_positions,
+        'extras_base': extras_base or {},
+        'combo_params': {},
+        'algorithm_id': algorithm_id,
+        'quiet': quiet,
+        'quiet_level': quiet_level,
+    }
+    grid = {k: list(v) for k, v in (param_grid or {}).items()}
+    runner = _SearchRunner(
+        base_task,
+        processes,
+        shared_data=shared_data,
+        journal=journal,
+        chunksize=chunksize,
+        show_progress=show_progress,
+        progress_desc=progress_desc,
+    )
+    try:
+        if search == 'grid':
+            rows = [r for r in runner.run(_expand_param_grid(grid)) if r is not None]
+        else:
+            print(f"搜索方式: {search}（网格共 {_grid_size(grid)} 种组合）")
+            rng = random.Random(seed)
+            rows = _SEARCHERS[search](runner, grid, sort_by, rng, n_trials, eta, min_fraction)
+    finally:
+        runner.close()
+    if runner.reused and journal:
+        print(f"从结果日志复用 {runner.reused} 个已完成组合：{journal}")
+    if runner.interrupted:
+        print(f"已完成 {runner.executed + runner.reused} 个组合")
+        if journal:
+            print(f"可使用相同参数与结果日志重新运行以继续：{journal}")
 
     df = pd.DataFrame(rows)
     # 排序（降序）
@@ -447,7 +1023,10 @@ def generate_param_search_report(
 
     # 推断参数列（排除明显的指标与元信息）
     if not param_columns:
-        meta_cols = {'算法ID', '策略文件', '起始日期', '结束日期', '频率', '初始资金', '耗时秒', '错误'}
+        meta_cols = {
+            '算法ID', '策略文件', '起始日期', '结束日期', '频率', '初始资金', '耗时秒', '错误',
+            '数据加载秒', '模拟秒', '指标秒',
+        }
         metric_keywords = ['收益', '回撤', '夏普', '胜率', '波动', 'Calmar', '卡玛']
         param_columns = [
             c for c in df.columns
@@ -547,4 +1126,4 @@ def generate_param_search_report(
     return output_file
 
 
-__all__ = ['run_param_grid', 'generate_param_search_report']
\ No newline at end of file
+__all__ = ['run_param_grid', 'generate_param_search_report', 'SEARCH_MODES']
\ No newline at end of file
@@ -0,0 +1,301 @@
+"""
+回测结果列式记录
+
+逐日记录（daily_records）、每日持仓快照（daily_positions）与成交（trades）原先每行一个 dict/dataclass，
+10 年、300 只持仓的回测约有 75 万个 dict 常驻内存，结束时再整体转 DataFrame。
+这里改为按列预分配、倍增扩容的 NumPy 缓冲区，结束时一次性转为 DataFrame；
+行数超过 spill_rows 且配置了 spill_dir 时，已记录的行分块落盘（Parquet，缺少 pyarrow 时回退 pickle），
+内存只保留最近一块。
+
+ColumnBuffer 仍支持 len()/下标/迭代（返回单行 dict），TradeLog 下标/迭代返回 Trade，
+引擎与测试中按列表使用的代码无需修改。
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import uuid
+import weakref
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .models import Trade
+
+_MIN_CAPACITY = 64
+
+# 各缓冲区的列定义（列名, dtype），顺序即 append 的参数顺序
+DAILY_RECORD_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('date', 'datetime64[ns]'),
+    ('total_value', 'float64'),
+    ('cash', 'float64'),
+    ('positions_value', 'float64'),
+    ('returns', 'float64'),
+    ('returns_pct', 'float64'),
+)
+DAILY_POSITION_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('date', 'datetime64[ns]'),
+    ('code', 'object'),
+    ('amount', 'int64'),
+    ('closeable_amount', 'int64'),
+    ('avg_cost', 'float64'),
+    ('acc_avg_cost', 'float64'),
+    ('price', 'float64'),
+    ('value', 'float64'),
+)
+TRADE_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('order_id', 'object'),
+    ('security', 'object'),
+    ('amount', 'int64'),
+    ('price', 'float64'),
+    ('time', 'datetime64[ns]'),
+    ('commission', 'float64'),
+    ('tax', 'float64'),
+)
+
+
+def _to_python(value: Any) -> Any:
+    """把 NumPy 标量还原为 Python 对象（datetime64 -> datetime，NaT -> None）。"""
+    if isinstance(value, np.datetime64):
+        if np.isnat(value):
+            return None
+        return pd.Timestamp(value).to_pydatetime()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class ColumnBuffer:
+    """
+    按列存储的可增长记录表。
+
+    Args:
+        columns: (列名, dtype) 序列
+        capacity: 初始容量，满时倍增
+        spill_dir: 落盘目录；为空时全部保存在内存
+        spill_rows: 内存中累计到该行数即落盘一块（需同时配置 spill_dir）
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[Tuple[str, str]],
+        capacity: int = 256,
+        *,
+        spill_dir: Optional[str] = None,
+        spill_rows: int = 0,
+    ) -> None:
+        self.names: Tuple[str, ...] = tuple(name for name, _ in columns)
+        self.dtypes: Tuple[np.dtype, ...] = tuple(np.dtype(dtype) for _, dtype in columns)
+        self._capacity = max(_MIN_CAPACITY, int(capacity))
+        self._size = 0
+        self._data: List[np.ndarray] = [np.empty(self._capacity, dtype=dt) for dt in self.dtypes]
+        self.spill_rows = max(0, int(spill_rows or 0))
+        self._spill_root = spill_dir if spill_dir and self.spill_rows > 0 else None
+        self._spill_dir: Optional[str] = None
+        self._chunks: List[Tuple[str, int]] = []  # (文件路径, 行数)
+        self._spilled = 0
+        # 最近读取的落盘块（文件路径, 各列数组），按下标顺序访问时不必每行重读
+        self._chunk_cache: Optional[Tuple[str, List[np.ndarray]]] = None
+
+    # ------------------------------------------------------------------ 写入
+    def append(self, *values: Any) -> None:
+        """按列顺序追加一行。"""
+        if self._size == self._capacity:
+            self._grow()
+        i = self._size
+        for column, value in zip(self._data, values):
+            column[i] = value
+        self._size = i + 1
+        if self._spill_root is not None and self._size >= self.spill_rows:
+            self._spill()
+
+    def clear(self) -> None:
+        self._size = 0
+        self._chunks.clear()
+        self._spilled = 0
+        self._chunk_cache = None
+        self._remove_spill_dir()
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        for k, column in enumerate(self._data):
+            grown = np.empty(self._capacity, dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._data[k] = grown
+
+    def _spill(self) -> None:
+        if self._spill_dir is None:
+            os.makedirs(self._spill_root, exist_ok=True)
+            self._spill_dir = tempfile.mkdtemp(prefix='results-', dir=self._spill_root)
+            weakref.finalize(self, shutil.rmtree, self._spill_dir, True)
+        frame = self._frame_in_memory()
+        stem = os.path.join(self._spill_dir, uuid.uuid4().hex)
+        try:
+            path = stem + '.parquet'
+            frame.to_parquet(path)
+        except Exception:
+            path = stem + '.pkl'
+            frame.to_pickle(path)
+        self._chunks.append((path, len(frame)))
+        self._spilled += len(frame)
+        self._size = 0
+        # 落盘后释放多余容量，内存只保留一块
+        self._capacity = max(_MIN_CAPACITY, min(self._capacity, self.spill_rows))
+        self._data = [np.empty(self._capacity, dtype=dt) for dt in self.dtypes]
+
+    def _remove_spill_dir(self) -> None:
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    # ------------------------------------------------------------------ 读取
+    def __len__(self) -> int:
+        return self._spilled + self._size
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def column(self, name: str) -> np.ndarray:
+        """返回某列全部数据（含已落盘部分）；内存部分为只读视图。"""
+        k = self.names.index(name)
+        current = self._data[k][: self._size]
+        if not self._chunks:
+            view = current.view()
+            view.flags.writeable = False
+            return view
+        parts = [_read_chunk(path)[name].to_numpy(dtype=self.dtypes[k]) for path, _ in self._chunks]
+        return np.concatenate(parts + [current])
+
+    def row(self, index: int) -> Tuple[Any, ...]:
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('记录下标越界')
+        if index >= self._spilled:
+            i = index - self._spilled
+            return tuple(_to_python(column[i]) for column in self._data)
+        for path, rows in self._chunks:
+            if index < rows:
+                return tuple(_to_python(column[index]) for column in self._chunk_columns(path))
+            index -= rows
+        raise IndexError('记录下标越界')  # pragma: no cover - 上面已覆盖全部区间
+
+    def _chunk_columns(self, path: str) -> List[np.ndarray]:
+        cached = self._chunk_cache
+        if cached is not None and cached[0] == path:
+            return cached[1]
+        frame = _read_chunk(path)
+        columns = [frame[name].to_numpy(dtype=dt) for name, dt in zip(self.names, self.dtypes)]
+        self._chunk_cache = (path, columns)
+        return columns
+
+    def _iter_rows(self) -> Iterator[Tuple[Any, ...]]:
+        # 逐块读取落盘部分，每块只读一次
+        for path, rows in self._chunks:
+            columns = self._chunk_columns(path)
+            for i in range(rows):
+                yield tuple(_to_python(column[i]) for column in columns)
+        for i in range(self._size):
+            yield tuple(_to_python(column[i]) for column in self._data)
+
+    def _wrap(self, row: Tuple[Any, ...]) -> Any:
+        return dict(zip(self.names, row))
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self._wrap(self.row(index))
+
+    def __iter__(self) -> Iterator[Any]:
+        for row in self._iter_rows():
+            yield self._wrap(row)
+
+    def _frame_in_memory(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {name: column[: self._size].copy() for name, column in zip(self.names, self._data)},
+            columns=list(self.names),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """一次性转为 DataFrame（列名与 dtype 同定义；含已落盘部分）。"""
+        frame = self._frame_in_memory()
+        if not self._chunks:
+            return frame
+        parts = [_read_chunk(path) for path, _ in self._chunks]
+        return pd.concat(parts + [frame], ignore_index=True)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 跨进程传递（参数优化）时先把落盘部分读回内存
+        frame = self.to_frame()
+        return {
+            'names': self.names,
+            'dtypes': self.dtypes,
+            'columns': [frame[name].to_numpy(dtype=dt) for name, dt in zip(self.names, self.dtypes)],
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.names = state['names']
+        self.dtypes = state['dtypes']
+        self._data = [np.array(col, dtype=dt) for col, dt in zip(state['columns'], self.dtypes)]
+        self._size = len(self._data[0]) if self._data else 0
+        self._capacity = max(self._size, 1)
+        self.spill_rows = 0
+        self._spill_root = None
+        self._spill_dir = None
+        self._chunks = []
+        self._spilled = 0
+        self._chunk_cache = None
+
+
+class TradeLog(ColumnBuffer):
+    """成交记录：列式存储，下标与迭代返回 Trade，可直接当作 List[Trade] 使用。"""
+
+    def __init__(self, capacity: int = 256) -> None:
+        super().__init__(TRADE_COLUMNS, capacity)
+
+    def append(self, trade: Trade) -> None:  # type: ignore[override]
+        super().append(
+            trade.order_id,
+            trade.security,
+            trade.amount,
+            trade.price,
+            trade.time,
+            trade.commission,
+            trade.tax,
+        )
+
+    def extend(self, trades: Sequence[Trade]) -> None:
+        for trade in trades:
+            self.append(trade)
+
+    def _wrap(self, row: Tuple[Any, ...]) -> Trade:
+        return Trade(*row)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, tuple, TradeLog)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"TradeLog({len(self)} trades)"
+
+
+def _read_chunk(path: str) -> pd.DataFrame:
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+__all__ = [
+    'ColumnBuffer',
+    'DAILY_POSITION_COLUMNS',
+    'DAILY_RECORD_COLUMNS',
+    'TRADE_COLUMNS',
+    'TradeLog',
+]
@@ -169,6 +169,29 @@ class RiskController:
             f"累计: ¥{self.stats.daily_trade_value:,.2f}"
         )
     
+    def release_trade(self, order_value: float, action: str = 'buy'):
+        """
+        撤销一笔已记录的交易（预先记录的委托最终未能提交时回滚）
+
+        Args:
+            order_value: 订单金额
+            action: 操作类型 'buy' 或 'sell'
+        """
+        self._check_and_reset_daily()
+
+        self.stats.daily_trades = max(0, self.stats.daily_trades - 1)
+        self.stats.daily_trade_value = max(0.0, self.stats.daily_trade_value - order_value)
+
+        if action == 'buy':
+            self.stats.daily_buy_value = max(0.0, self.stats.daily_buy_value - order_value)
+        else:
+            self.stats.daily_sell_value = max(0.0, self.stats.daily_sell_value - order_value)
+
+        logger.info(
+            f"↩️ 已撤销交易记录: 金额: ¥{order_value:,.2f}, "
+            f"当日剩余 {self.stats.daily_trades} 笔"
+        )
+
     def check_stop_loss(self, current_price: float, cost_price: float) -> bool:
         """
         检查是否触发止损
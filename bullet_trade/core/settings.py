@@ -302,6 +302,9 @@ def set_option(key: str, value: Any):
             - 'order_volume_ratio': 成交量比例
             - 'order_match_mode': 下单撮合模式（'bar_end'|'immediate'）
             - 'match_by_signal': 限价资金检查使用信号价(True)或撮合价(False)
+            - 'preload_bars': 回测开始时一次性预加载标的池行情到内存列存储
+              （True/'daily' 仅日线，'minute' 日线+分钟线，也可传频率列表；默认关闭）
+            - 'preload_lookback_days': 预加载时向前多取的交易日数（供 history 等回看窗口使用，默认 60）
         value: 选项值
     """
     _settings.options[key] = value
@@ -0,0 +1,251 @@
+"""
+复权因子存储
+
+真实价格模式下每个回测日都以当天为参考日请求前复权行情（pre_factor_ref_date=当天），参考日进入缓存键，
+同一段 K 线每天都会被重新拉取、重新复权。本模块按标的缓存一条累计复权因子序列 F(t)：
+
+    以 D 为参考日的前复权价格 = 未复权价格(t) * F(t) / F(D)
+
+未复权 K 线走与参考日无关的缓存键，任意参考日的视图在读取时做一次向量化缩放即可。
+各数据源只需提供因子加载函数（JQData 后复权 factor、Tushare adj_factor、MiniQMT front_ratio/权益事件）。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import date as Date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS: Tuple[str, ...] = ("open", "high", "low", "close")
+# 因子区间向后多取的自然日数（不超过今天），逐日推进的回测不必每天扩展一次
+DEFAULT_PREFETCH_DAYS = 365
+
+FactorLoader = Callable[[str, Date, Date], Optional[pd.Series]]
+
+
+def _as_date(value: Any) -> Optional[Date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, Date):
+        return value
+    try:
+        return pd.Timestamp(value).date()
+    except Exception:
+        return None
+
+
+def _day_keys(index: Any) -> Optional[np.ndarray]:
+    """把行索引转换为日序号（datetime64[D] 的整数值）；非时间索引返回 None。"""
+    try:
+        idx = pd.DatetimeIndex(index)
+    except Exception:
+        return None
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.values.astype("datetime64[D]").astype("int64")
+
+
+def event_multipliers(
+    index: Any,
+    events: Iterable[Dict[str, Any]],
+    close: Optional[pd.Series] = None,
+    preclose: Optional[pd.Series] = None,
+) -> np.ndarray:
+    """
+    由分红/拆分事件计算每行的前复权乘数：除权日晚于该行日期的所有事件因子之积。
+
+    单个事件因子 = (1 / 送转比例) * (除权前收盘 - 每股派息) / 除权前收盘；
+    除权前收盘优先取除权日的 preclose，否则取除权日之前最后一行的 close。
+    """
+    keys = _day_keys(index)
+    if keys is None or len(keys) == 0:
+        return np.ones(0 if keys is None else len(keys))
+    close_values = (
+        pd.to_numeric(close, errors="coerce").to_numpy(dtype=float) if close is not None else None
+    )
+    preclose_values = (
+        pd.to_numeric(preclose, errors="coerce").to_numpy(dtype=float) if preclose is not None else None
+    )
+
+    dated: List[Tuple[int, float]] = []
+    for event in events:
+        day = _as_date(event.get("date"))
+        if day is None:
+            continue
+        day_key = int(np.datetime64(day, "D").astype("int64"))
+        try:
+            scale = float(event.get("scale_factor") or 1.0)
+        except Exception:
+            scale = 1.0
+        scale_factor = 1.0 / scale if scale and scale > 0 else 1.0
+        try:
+            cash = float(event.get("bonus_pre_tax") or 0.0)
+        except Exception:
+            cash = 0.0
+        try:
+            per_base = float(event.get("per_base") or 10.0)
+        except Exception:
+            per_base = 10.0
+        cash_per_share = cash / per_base if per_base > 0 else 0.0
+
+        ref_close = None
+        if preclose_values is not None:
+            hit = np.flatnonzero(keys == day_key)
+            if hit.size and np.isfinite(preclose_values[hit[0]]) and preclose_values[hit[0]] != 0.0:
+                ref_close = float(preclose_values[hit[0]])
+        if ref_close is None and close_values is not None:
+            prev = int(np.searchsorted(keys, day_key, side="left")) - 1
+            if prev >= 0 and np.isfinite(close_values[prev]):
+                ref_close = float(close_values[prev])
+        cash_factor = 1.0
+        if cash_per_share and ref_close and ref_close > 0:
+            cash_factor = max((ref_close - cash_per_share) / ref_close, 0.0)
+        dated.append((day_key, scale_factor * cash_factor))
+
+    if not dated:
+        return np.ones(len(keys))
+    dated.sort(key=lambda item: item[0])
+    event_keys = np.array([k for k, _ in dated], dtype="int64")
+    factors = np.array([f for _, f in dated], dtype=float)
+    # suffix[j] = factors[j] * factors[j+1] * ...；行 t 取除权日 > t 的事件之积
+    suffix = np.ones(len(factors) + 1)
+    suffix[:-1] = np.cumprod(factors[::-1])[::-1]
+    return suffix[np.searchsorted(event_keys, keys, side="right")]
+
+
+class AdjustmentFactorStore:
+    """
+    按标的缓存累计复权因子序列，提供任意参考日的前复权缩放。
+
+    loader(security, start, end) 返回以交易日为索引、随时间累计的因子 Series（比例不变即可，
+    无需归一化）；返回 None 或空表示不可用，调用方应回退到原有的逐次复权路径。
+    """
+
+    def __init__(self, loader: FactorLoader, *, prefetch_days: int = DEFAULT_PREFETCH_DAYS) -> None:
+        self._loader = loader
+        self.prefetch_days = max(0, int(prefetch_days))
+        self._lock = threading.Lock()
+        # code -> (覆盖起始日, 覆盖结束日, 日序号数组, 因子数组)
+        self._entries: Dict[str, Tuple[Date, Date, np.ndarray, np.ndarray]] = {}
+        self.loads = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def factors(self, security: str, start: Any, end: Any) -> Optional[pd.Series]:
+        """返回覆盖 [start, end] 的因子序列（可能更长）；不可用时返回 None。"""
+        entry = self._ensure(security, _as_date(start), _as_date(end))
+        if entry is None:
+            return None
+        _, _, keys, values = entry
+        return pd.Series(values, index=pd.DatetimeIndex(keys.astype("datetime64[D]")), name="factor")
+
+    def rescale(
+        self,
+        frame: Optional[pd.DataFrame],
+        security: str,
+        ref_date: Any,
+        *,
+        price_columns: Sequence[str] = PRICE_COLUMNS,
+        volume_columns: Sequence[str] = (),
+    ) -> Optional[pd.DataFrame]:
+        """
+        把未复权行情缩放为以 ref_date 为参考日的前复权行情：价格列乘 F(t)/F(D)，成交量列除以该比例。
+        因子不可用或索引不是时间索引时返回 None。
+        """
+        if frame is None or frame.empty:
+            return frame
+        keys = _day_keys(frame.index)
+        ref = _as_date(ref_date)
+        if keys is None or ref is None:
+            return None
+        ref_key = int(np.datetime64(ref, "D").astype("int64"))
+        lo = min(int(keys.min()), ref_key)
+        hi = max(int(keys.max()), ref_key)
+        entry = self._ensure(
+            security,
+            Date(1970, 1, 1) + timedelta(days=lo),
+            Date(1970, 1, 1) + timedelta(days=hi),
+        )
+        if entry is None:
+            return None
+        _, _, factor_keys, factor_values = entry
+        pos = np.searchsorted(factor_keys, np.append(keys, ref_key), side="right") - 1
+        # 因子序列之前的日期沿用首个因子（此前没有已知权益事件）
+        picked = factor_values[np.clip(pos, 0, None)]
+        ref_factor = picked[-1]
+        if not np.isfinite(ref_factor) or ref_factor == 0.0:
+            return None
+        ratio = picked[:-1] / ref_factor
+        out = frame.copy()
+        for col in price_columns:
+            if col in out.columns:
+                out[col] = pd.to_numeric(out[col], errors="coerce").to_numpy(dtype=float) * ratio
+        for col in volume_columns:
+            if col in out.columns:
+                out[col] = pd.to_numeric(out[col], errors="coerce").to_numpy(dtype=float) / ratio
+        return out
+
+    def _ensure(
+        self, security: str, start: Optional[Date], end: Optional[Date]
+    ) -> Optional[Tuple[Date, Date, np.ndarray, np.ndarray]]:
+        if not security or start is None or end is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(security)
+        if entry is not None and entry[0] <= start and end <= entry[1]:
+            return entry
+        lo = min(start, entry[0]) if entry is not None else start
+        hi = max(end, entry[1]) if entry is not None else end
+        hi = max(hi, min(hi + timedelta(days=self.prefetch_days), Date.today()))
+        try:
+            series = self._loader(security, lo, hi)
+        except Exception as exc:
+            logger.debug("加载复权因子失败 %s: %s", security, exc)
+            series = None
+        if series is None or len(series) == 0:
+            return None
+        values = pd.to_numeric(pd.Series(series), errors="coerce")
+        keys = _day_keys(values.index)
+        if keys is None:
+            return None
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        factor_values = values.to_numpy(dtype=float)[order]
+        valid = np.isfinite(factor_values) & (factor_values > 0)
+        keys, factor_values = keys[valid], factor_values[valid]
+        if keys.size == 0:
+            return None
+        # 同一天多条（分钟因子等）保留最后一条
+        last = np.append(keys[1:] != keys[:-1], True)
+        entry = (lo, hi, keys[last], factor_values[last])
+        with self._lock:
+            self._entries[security] = entry
+            self.loads += 1
+        return entry
+
+
+def is_real_price_request(fq: Optional[str], pre_factor_ref_date: Any, frequency: Optional[str]) -> bool:
+    """是否为可由因子存储承接的请求：前复权 + 指定参考日 + 日线/分钟线。"""
+    if pre_factor_ref_date is None or str(fq or "").lower() != "pre":
+        return False
+    return str(frequency or "daily").lower() in {"daily", "1d", "minute", "1m"}
+
+
+__all__ = [
+    "AdjustmentFactorStore",
+    "DEFAULT_PREFETCH_DAYS",
+    "PRICE_COLUMNS",
+    "event_multipliers",
+    "is_real_price_request",
+]
@@ -6,6 +6,7 @@
 
 from typing import Union, List, Optional, Dict, Any, Callable
 import importlib
+import threading
 from datetime import datetime, timedelta, date as Date, time as Time
 import pandas as pd
 import re
@@ -25,6 +26,7 @@ _current_context = None
 
 # 引入可插拔数据提供者，并设置默认Provider
 from .providers.base import DataProvider
+from .security_master import SECURITY_MASTER_FILE, SecurityMaster
 
 # 记录是否已在实盘强制关缓存并提醒过
 _cache_forced_off_warned = False
@@ -227,13 +229,43 @@ def _bind_sdk_fallback(provider: DataProvider, provider_name: str) -> None:
     setattr(provider, "_sdk_fallback", _resolver)
 
 
-_provider: DataProvider = _create_provider()
-_bind_sdk_fallback(_provider, _normalize_provider_name(getattr(_provider, "name", None)))
-_provider_cache[_normalize_provider_name(getattr(_provider, "name", None))] = _provider
+class _DeferredProvider:
+    """
+    默认数据源占位对象：首次访问属性时才按环境配置创建真实 provider 并替换全局 _provider，
+    避免 import 阶段加载 jqdatasdk/xtquant 等 SDK。
+    """
+
+    __slots__ = ()
+
+    def _resolve(self) -> DataProvider:
+        global _provider
+        with _provider_init_lock:
+            if _provider is self:
+                provider = _create_provider()
+                normalized = _normalize_provider_name(getattr(provider, "name", None))
+                _bind_sdk_fallback(provider, normalized)
+                _provider_cache[normalized] = provider
+                _provider = provider
+            return _provider
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __repr__(self) -> str:
+        return "<DeferredProvider: 首次使用时创建>"
+
+
+_provider_init_lock = threading.Lock()
+_provider: DataProvider = _DeferredProvider()  # type: ignore[assignment]
 _auth_attempted = False
+# (标的, 区间键) -> 已合并覆盖项的 SecurityInfo；区间由 _security_master 维护
 _security_info_cache: Dict[Any, "SecurityInfo"] = {}
+_security_master: Optional[SecurityMaster] = None
+_security_master_owner: Optional[DataProvider] = None
 _security_overrides_loaded = False
 _security_overrides: Dict[str, Any] = {}
+# 回测期间的行情列存储（由引擎在回测开始时注入，结束后清空）
+_bar_store = None
 
 
 class SecurityInfo(dict):
@@ -279,7 +311,7 @@ def set_data_provider(provider: Union[DataProvider, str], **provider_kwargs) ->
     设置当前数据提供者。
     支持直接传入 DataProvider 实例，或传入 provider 名称（如 'jqdata'、'tushare'、'miniqmt'）。
     """
-    global _provider, _auth_attempted, _security_info_cache, _cache_forced_off_warned
+    global _provider, _auth_attempted, _security_info_cache, _cache_forced_off_warned, _bar_store
     if isinstance(provider, DataProvider):
         _provider = provider
     else:
@@ -291,6 +323,7 @@ def set_data_provider(provider: Union[DataProvider, str], **provider_kwargs) ->
     _provider_auth_attempted[normalized] = False
     _auth_attempted = False
     _security_info_cache = {}
+    _bar_store = None
     _cache_forced_off_warned = False
     try:
         _provider.auth()
@@ -304,7 +337,7 @@ def reload_data_provider_from_env(provider_name: Optional[str] = None) -> None:
     """
     根据最新环境变量刷新数据提供者实例。
     """
-    global _provider, _auth_attempted, _security_info_cache, _cache_forced_off_warned
+    global _provider, _auth_attempted, _security_info_cache, _cache_forced_off_warned, _bar_store
     _provider = _create_provider(provider_name=provider_name, overrides=None)
     normalized = _normalize_provider_name(getattr(_provider, "name", None))
     _bind_sdk_fallback(_provider, normalized)
@@ -312,8 +345,65 @@ def reload_data_provider_from_env(provider_name: Optional[str] = None) -> None:
     _provider_auth_attempted[normalized] = False
     _auth_attempted = False
     _security_info_cache = {}
+    _bar_store = None
     _cache_forced_off_warned = False
 
+def set_bar_store(store: Optional[Any]) -> None:
+    """
+    注入回测行情列存储（BarStore）；传 None 关闭。
+    命中时 get_price/history/get_current_data 直接切片返回，未命中回退到数据提供者。
+    """
+    global _bar_store
+    _bar_store = store
+
+
+def get_bar_store() -> Optional[Any]:
+    """获取当前注入的行情列存储（未启用时为 None）。"""
+    return _bar_store
+
+
+def _query_bar_store(
+    security: Union[str, List[str]],
+    *,
+    end_date: datetime,
+    frequency: str,
+    fields: Optional[List[str]],
+    fq: Optional[str],
+    count: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    panel: bool = True,
+    skip_paused: bool = False,
+    fill_paused: bool = True,
+) -> Optional[pd.DataFrame]:
+    """
+    尝试从行情列存储回答 get_price 请求，无法精确回答时返回 None（调用方回退到数据提供者）。
+    真实价格模式下前复权以当日为基准，仅当切片全部落在当日时才等价于未复权数据。
+    """
+    store = _bar_store
+    if store is None or skip_paused or not fill_paused:
+        return None
+    same_day_as = None
+    fq_key = fq
+    if fq == 'pre' and panel and _get_setting('use_real_price'):
+        fq_key = 'none'
+        same_day_as = end_date.date() if isinstance(end_date, datetime) else end_date
+    try:
+        return store.get_price(
+            security,
+            end_date,
+            frequency=frequency,
+            fields=fields,
+            fq=fq_key,
+            count=count,
+            start_dt=start_date,
+            panel=panel,
+            same_day_as=same_day_as,
+        )
+    except Exception as exc:
+        log.debug(f"行情列存储查询失败，回退数据源: {exc}")
+        return None
+
+
 def get_data_provider(provider_name: Optional[str] = None) -> DataProvider:
     """
     获取指定数据提供者实例（若未认证则触发一次认证）。
@@ -321,10 +411,11 @@ def get_data_provider(provider_name: Optional[str] = None) -> DataProvider:
     - 传入 provider_name：按名称缓存并返回对应实例，不修改全局默认。
     """
     if provider_name is None:
+        provider = _provider._resolve() if isinstance(_provider, _DeferredProvider) else _provider
         _maybe_disable_cache_for_live()
         _ensure_auth()
-        _bind_sdk_fallback(_provider, _normalize_provider_name(getattr(_provider, "name", None)))
-        return _provider
+        _bind_sdk_fallback(provider, _normalize_provider_name(getattr(provider, "name", None)))
+        return provider
 
     normalized = _normalize_provider_name(provider_name)
     provider = _provider_cache.get(normalized)
@@ -537,10 +628,17 @@ class BacktestCurrentData:
                     kw.update(prefer_engine=True, pre_factor_ref_date=pre_ref)
                 return kw
 
-            if use_minute:
-                df = _provider.get_price(**_build_fetch_kwargs('minute'))
-            else:
-                df = _provider.get_price(**_build_fetch_kwargs('daily'))
+            freq_text = 'minute' if use_minute else 'daily'
+            df = _query_bar_store(
+                security,
+                end_date=current_dt,
+                frequency=freq_text,
+                fields=fields,
+                fq='pre',
+                count=1,
+            )
+            if df is None:
+                df = _provider.get_price(**_build_fetch_kwargs(freq_text))
 
             if not df.empty:
                 if 'time' in df.columns and 'code' in df.columns:
@@ -861,37 +959,75 @@ def get_security_info(security: str, date: Optional[Union[str, datetime]] = None
 
     resolved_date = _resolve_context_date(date, default_to_context=True)
     resolved_date = _ensure_not_future_date(resolved_date, "get_security_info.date")
-    cache_key = (security, resolved_date)
-
-    cached = _security_info_cache.get(cache_key)
-    if cached is not None:
-        return cached
 
-    _ensure_auth()
+    master = _current_security_master()
+    hit = master.lookup(security, resolved_date)
+    if hit is not None:
+        cache_key = (security, hit[0])
+        cached = _security_info_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        normalized = hit[1]
+    else:
+        _ensure_auth()
 
-    info_fn = getattr(_provider, 'get_security_info', None)
-    if not callable(info_fn):
-        empty = SecurityInfo(security, {})
-        _security_info_cache[cache_key] = empty
-        return empty
+        info_fn = getattr(_provider, 'get_security_info', None)
+        if not callable(info_fn):
+            return SecurityInfo(security, {})
 
-    try:
         try:
-            raw_info = info_fn(security, date=resolved_date)
-        except TypeError:
-            raw_info = info_fn(security)
-    except Exception as exc:
-        log.debug(f"获取{security}基本信息失败: {exc}")
-        raw_info = {}
+            try:
+                raw_info = info_fn(security, date=resolved_date)
+            except TypeError:
+                raw_info = info_fn(security)
+        except Exception as exc:
+            log.debug(f"获取{security}基本信息失败: {exc}")
+            raw_info = None
+
+        if not raw_info:
+            # 获取失败或返回空信息：不写入区间索引也不缓存，下次查询重试
+            return SecurityInfo(security, _merge_overrides(security, _normalize_security_info(security, {})))
+        normalized = _normalize_security_info(security, raw_info)
+        cache_key = (security, master.add(security, resolved_date, normalized, Date.today()))
 
-    normalized = _normalize_security_info(security, raw_info)
     # 应用配置覆盖（分类/tplus/slippage等）
-    normalized = _merge_overrides(security, normalized)
-    info_obj = SecurityInfo(security, normalized)
+    info_obj = SecurityInfo(security, _merge_overrides(security, normalized))
     _security_info_cache[cache_key] = info_obj
     return info_obj
 
 
+def _security_master_path() -> Optional[str]:
+    """数据源开启磁盘缓存（且非实盘）时，索引保存在缓存目录下。"""
+    if _is_live_mode():
+        return None
+    cache_obj = getattr(_provider, "_cache", None)
+    if cache_obj is None or not getattr(cache_obj, "enabled", False):
+        return None
+    cache_dir = getattr(cache_obj, "cache_dir", "")
+    return os.path.join(cache_dir, SECURITY_MASTER_FILE) if cache_dir else None
+
+
+def _current_security_master() -> SecurityMaster:
+    """返回与当前数据源绑定的元数据区间索引；数据源切换后重新加载。"""
+    global _security_master, _security_master_owner
+    provider = _provider._resolve() if isinstance(_provider, _DeferredProvider) else _provider
+    if _security_master is None or _security_master_owner is not provider:
+        path = _security_master_path()
+        _security_master = SecurityMaster.load(path) if path else SecurityMaster()
+        _security_master_owner = provider
+    return _security_master
+
+
+def save_security_master() -> None:
+    """把新增的元数据区间写回缓存目录（回测结束时由引擎调用）。"""
+    master = _security_master
+    if master is None or not master.dirty or _security_master_owner is not _provider:
+        return
+    path = _security_master_path()
+    if path:
+        master.save(path)
+
+
 def _coerce_price_result_to_dataframe(result: Any) -> pd.DataFrame:
     """将 provider.get_price 的返回结果统一为 DataFrame，容忍 Panel/长表/宽表/字典等形式。
     不负责最终的字段 MultiIndex 兼容变换，仅做基础整形。
@@ -1062,6 +1198,24 @@ def get_price(
     
     # 限制 end_date 不超过当前时间
     end_date = min(end_date, current_dt)
+
+    # 回测行情列存储：命中时直接切片返回，未命中回退到数据提供者
+    cached = _query_bar_store(
+        security,
+        end_date=end_date,
+        frequency=frequency,
+        fields=fields,
+        fq=fq,
+        count=count,
+        start_date=start_date,
+        panel=panel,
+        skip_paused=skip_paused,
+        fill_paused=fill_paused,
+    )
+    if cached is not None:
+        if not panel and 'time' in cached.columns and 'code' in cached.columns:
+            return cached
+        return _make_compatible_dataframe(cached, fields)
     
     # 真实价格模式：使用当前回测时间作为复权参考日期
     # 注意：当 panel=False 时跳过真实价格模式，因为 get_price_engine 不支持 panel 参数
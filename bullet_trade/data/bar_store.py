@@ -0,0 +1,413 @@
+"""
+回测行情列存储
+
+回测开始时按标的池一次性加载 [start_date, end_date] 区间的日线/分钟线（OHLCV、涨跌停、停牌、复权因子），
+以 NumPy 列数组保存；回测期间 get_price/history/attribute_history/get_current_data 及引擎撮合
+按 (标的, 时间) 二分切片直接返回，不再逐次请求 provider。
+
+无法由列存储精确回答的请求（未预加载的标的/字段、覆盖区间不足、skip_paused 等）返回 None，
+调用方应回退到 provider 原路径。
+
+参数优化等多进程场景下，父进程可用 export() 把列数组落盘为 .npy，子进程用 attach() 以只读内存映射
+挂载并通过 set_shared_bar_store() 共享给每次回测，避免每个组合重复加载行情。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime, date as Date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# 预加载字段：factor 为尽力获取，数据源不支持时自动去掉
+PRELOAD_FIELDS: Tuple[str, ...] = (
+    'open', 'close', 'high', 'low', 'volume', 'money',
+    'high_limit', 'low_limit', 'paused', 'factor',
+)
+DEFAULT_PRICE_FIELDS: Tuple[str, ...] = ('open', 'close', 'high', 'low', 'volume', 'money')
+
+_FREQUENCY_ALIASES = {
+    'daily': 'daily',
+    '1d': 'daily',
+    'minute': 'minute',
+    '1m': 'minute',
+}
+
+
+def normalize_frequency(frequency: Optional[str]) -> Optional[str]:
+    """归一化频率写法，不支持的频率返回 None。"""
+    if not frequency:
+        return None
+    return _FREQUENCY_ALIASES.get(str(frequency).lower())
+
+
+def normalize_fq(fq: Optional[str]) -> str:
+    """归一化复权方式：None/'none' -> 'none'。"""
+    if fq is None:
+        return 'none'
+    text = str(fq).lower()
+    return 'none' if text in ('none', '') else text
+
+
+class _SeriesBlock:
+    """单个标的在某频率/复权口径下的列数组。"""
+
+    __slots__ = ('times', 'keys', 'values', 'columns')
+
+    def __init__(self, times: np.ndarray, keys: np.ndarray, values: np.ndarray, columns: Dict[str, int]):
+        self.times = times  # 原始时间戳（datetime64[ns]），用于输出索引
+        self.keys = keys  # 检索键：日线为归一化到 00:00 的日期，分钟线同 times
+        self.values = values  # shape=(n_rows, n_fields)，float64
+        self.columns = columns
+
+
+class BarStore:
+    """
+    回测期间的行情列存储。
+
+    Args:
+        provider: 数据提供者（直接调用，不经过 api 层的未来函数检查）
+        securities: 预加载标的列表
+        start_date: 加载起点（应包含策略历史窗口的回看区间）
+        end_date: 加载终点（回测结束日）
+        frequencies: 预加载频率，取值 'daily' / 'minute'
+        fq_modes: 预加载复权口径，取值 'none' / 'pre'
+    """
+
+    def __init__(
+        self,
+        provider: Any,
+        securities: Iterable[str],
+        start_date: Union[str, datetime, Date],
+        end_date: Union[str, datetime, Date],
+        *,
+        frequencies: Sequence[str] = ('daily',),
+        fq_modes: Sequence[str] = ('none',),
+    ) -> None:
+        self._provider = provider
+        seen = set()
+        self.securities: List[str] = []
+        for code in securities:
+            if code and code not in seen:
+                seen.add(code)
+                self.securities.append(code)
+        self.start = pd.Timestamp(start_date).normalize()
+        self.end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+        self.frequencies = tuple(f for f in (normalize_frequency(x) for x in frequencies) if f)
+        self.fq_modes = tuple(normalize_fq(x) for x in fq_modes)
+        self._blocks: Dict[Tuple[str, str, str], _SeriesBlock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # -------------------------- 加载 --------------------------
+    def load(self) -> "BarStore":
+        """按 (频率, 复权, 标的) 逐一加载全区间行情。单个标的失败不影响其余标的。"""
+        for frequency in self.frequencies:
+            for fq in self.fq_modes:
+                for code in self.securities:
+                    try:
+                        block = self._load_block(code, frequency, fq)
+                    except Exception as exc:
+                        logger.debug("预加载行情失败 %s %s fq=%s: %s", code, frequency, fq, exc)
+                        continue
+                    if block is not None:
+                        self._blocks[(code, frequency, fq)] = block
+        return self
+
+    def _fetch_frame(self, code: str, frequency: str, fq: str) -> pd.DataFrame:
+        attempts = (
+            list(PRELOAD_FIELDS),
+            [f for f in PRELOAD_FIELDS if f != 'factor'],
+            list(DEFAULT_PRICE_FIELDS),
+        )
+        last_error: Optional[Exception] = None
+        for fields in attempts:
+            try:
+                return self._provider.get_price(
+                    security=code,
+                    start_date=self.start.to_pydatetime(),
+                    end_date=self.end.to_pydatetime(),
+                    frequency=frequency,
+                    fields=fields,
+                    skip_paused=False,
+                    fq=fq,
+                    panel=True,
+                    fill_paused=True,
+                )
+            except Exception as exc:
+                last_error = exc
+        if last_error is not None:
+            raise last_error
+        return pd.DataFrame()
+
+    def _load_block(self, code: str, frequency: str, fq: str) -> Optional[_SeriesBlock]:
+        df = self._fetch_frame(code, frequency, fq)
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            return None
+        if 'time' in df.columns:
+            if 'code' in df.columns:
+                df = df[df['code'] == code]
+            df = df.drop(columns=[c for c in ('code',) if c in df.columns]).set_index('time')
+        if isinstance(df.columns, pd.MultiIndex):
+            for level in range(df.columns.nlevels):
+                if code in df.columns.get_level_values(level):
+                    df = df.xs(code, axis=1, level=level)
+                    break
+        index = pd.DatetimeIndex(pd.to_datetime(df.index))
+        order = np.argsort(index.values, kind='stable')
+        columns: Dict[str, int] = {}
+        arrays: List[np.ndarray] = []
+        for name in df.columns:
+            series = pd.to_numeric(df[name], errors='coerce')
+            if series.isna().all() and not df[name].isna().all():
+                continue
+            columns[str(name)] = len(arrays)
+            arrays.append(series.to_numpy(dtype='float64')[order])
+        if not arrays:
+            return None
+        times = index.values[order].astype('datetime64[ns]')
+        keys = times.astype('datetime64[D]').astype('datetime64[ns]') if frequency == 'daily' else times
+        values = np.column_stack(arrays) if len(arrays) > 1 else arrays[0].reshape(-1, 1)
+        return _SeriesBlock(times, keys, values, columns)
+
+    # -------------------------- 查询 --------------------------
+    def has(self, security: str, frequency: str, fq: str) -> bool:
+        return (security, normalize_frequency(frequency), normalize_fq(fq)) in self._blocks
+
+    @staticmethod
+    def _cutoff(end_dt: pd.Timestamp, frequency: str) -> np.datetime64:
+        """返回检索键：分钟线按时间戳截止；日线与数据源一致，按 end_dt 所在自然日截止（含当日）。"""
+        if frequency == 'minute':
+            return np.datetime64(end_dt.to_datetime64(), 'ns')
+        return np.datetime64(end_dt.normalize().to_datetime64(), 'ns')
+
+    def _slice(
+        self,
+        block: _SeriesBlock,
+        frequency: str,
+        end_dt: pd.Timestamp,
+        count: Optional[int],
+        start_dt: Optional[pd.Timestamp],
+    ) -> Optional[Tuple[int, int]]:
+        if end_dt > self.end:
+            return None
+        hi = int(np.searchsorted(block.keys, self._cutoff(end_dt, frequency), side='right'))
+        if count is not None:
+            lo = hi - int(count)
+            if lo < 0:
+                # 覆盖区间不足（可能是回看窗口未包含），交由 provider 处理
+                return None
+            return lo, hi
+        if start_dt is None or start_dt < self.start:
+            return None
+        start_key = start_dt.normalize() if frequency == 'daily' else start_dt
+        lo = int(np.searchsorted(block.keys, np.datetime64(start_key.to_datetime64(), 'ns'), side='left'))
+        return lo, max(lo, hi)
+
+    def get_frame(
+        self,
+        security: str,
+        end_dt: Union[str, datetime, pd.Timestamp],
+        *,
+        frequency: str = 'daily',
+        fields: Optional[Sequence[str]] = None,
+        fq: Optional[str] = 'pre',
+        count: Optional[int] = None,
+        start_dt: Optional[Union[str, datetime, pd.Timestamp]] = None,
+        same_day_as: Optional[Date] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        返回单标的切片（index=时间, columns=字段），与 provider 单标的返回结构一致。
+        same_day_as: 要求切片内所有行都落在该日期（真实价格模式下用未复权数据代替当日前复权）。
+        无法精确回答时返回 None。
+        """
+        freq = normalize_frequency(frequency)
+        if freq is None:
+            return None
+        block = self._blocks.get((security, freq, normalize_fq(fq)))
+        if block is None:
+            return None
+        wanted = list(fields) if fields else list(DEFAULT_PRICE_FIELDS)
+        try:
+            col_idx = [block.columns[name] for name in wanted]
+        except KeyError:
+            return None
+        bounds = self._slice(
+            block,
+            freq,
+            pd.Timestamp(end_dt),
+            count,
+            pd.Timestamp(start_dt) if start_dt is not None else None,
+        )
+        if bounds is None:
+            return None
+        lo, hi = bounds
+        if same_day_as is not None and hi > lo:
+            day = np.datetime64(pd.Timestamp(same_day_as).to_datetime64(), 'D')
+            if (block.times[lo:hi].astype('datetime64[D]') != day).any():
+                return None
+        return pd.DataFrame(
+            block.values[lo:hi, col_idx],
+            index=pd.DatetimeIndex(block.times[lo:hi]),
+            columns=wanted,
+        )
+
+    def get_price(
+        self,
+        security: Union[str, Sequence[str]],
+        end_dt: Union[str, datetime, pd.Timestamp],
+        *,
+        frequency: str = 'daily',
+        fields: Optional[Sequence[str]] = None,
+        fq: Optional[str] = 'pre',
+        count: Optional[int] = None,
+        start_dt: Optional[Union[str, datetime, pd.Timestamp]] = None,
+        panel: bool = True,
+        same_day_as: Optional[Date] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        get_price 语义的切片查询：
+        - 单标的：返回 index=时间, columns=字段
+        - 多标的 + panel=True：返回列为 MultiIndex(field, code) 的宽表
+        - 多标的 + panel=False：返回包含 time/code 列的长表
+        任一标的无法回答时整体返回 None。
+        """
+        single = isinstance(security, str)
+        codes = [security] if single else list(security)
+        if not codes:
+            return None
+        wanted = list(fields) if fields else list(DEFAULT_PRICE_FIELDS)
+        frames: List[pd.DataFrame] = []
+        for code in codes:
+            frame = self.get_frame(
+                code,
+                end_dt,
+                frequency=frequency,
+                fields=wanted,
+                fq=fq,
+                count=count,
+                start_dt=start_dt,
+                same_day_as=same_day_as,
+            )
+            if frame is None:
+                self.misses += 1
+                return None
+            frames.append(frame)
+        self.hits += 1
+
+        if single:
+            return frames[0]
+        if not panel:
+            parts = []
+            for code, frame in zip(codes, frames):
+                part = frame.copy()
+                part.insert(0, 'code', code)
+                part.insert(0, 'time', part.index)
+                parts.append(part.reset_index(drop=True))
+            return pd.concat(parts, ignore_index=True)
+        wide = pd.concat(frames, axis=1, keys=codes)
+        wide = wide.swaplevel(0, 1, axis=1)
+        wide = wide.reindex(columns=pd.MultiIndex.from_product([wanted, codes]))
+        wide.columns.names = ['field', 'code']
+        return wide
+
+    def covers(self, start_date: Union[str, datetime, Date], end_date: Union[str, datetime, Date]) -> bool:
+        """判断 [start_date, end_date] 是否落在加载区间内。"""
+        return self.start <= pd.Timestamp(start_date).normalize() and pd.Timestamp(end_date) <= self.end
+
+    # -------------------------- 共享 --------------------------
+    def export(self, directory: str) -> str:
+        """
+        将列数组写入 directory（manifest.json + 每个数据块三个 .npy），供 attach() 以内存映射方式挂载。
+        返回 directory。
+        """
+        os.makedirs(directory, exist_ok=True)
+        blocks = []
+        for i, ((code, frequency, fq), block) in enumerate(self._blocks.items()):
+            prefix = f"b{i:05d}"
+            np.save(os.path.join(directory, f"{prefix}_times.npy"), block.times.view('int64'))
+            np.save(os.path.join(directory, f"{prefix}_keys.npy"), block.keys.view('int64'))
+            np.save(os.path.join(directory, f"{prefix}_values.npy"), np.ascontiguousarray(block.values))
+            blocks.append({
+                'code': code,
+                'frequency': frequency,
+                'fq': fq,
+                'prefix': prefix,
+                'columns': block.columns,
+            })
+        manifest = {
+            'securities': self.securities,
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'frequencies': list(self.frequencies),
+            'fq_modes': list(self.fq_modes),
+            'blocks': blocks,
+        }
+        with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        return directory
+
+    @classmethod
+    def attach(cls, directory: str) -> "BarStore":
+        """以只读内存映射挂载 export() 写出的列存储；多个进程挂载同一目录时共享操作系统页缓存。"""
+        with open(os.path.join(directory, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        store = cls(
+            None,
+            manifest['securities'],
+            manifest['start'],
+            manifest['end'],
+            frequencies=manifest['frequencies'],
+            fq_modes=manifest['fq_modes'],
+        )
+        store.end = pd.Timestamp(manifest['end'])
+        for item in manifest['blocks']:
+            prefix = os.path.join(directory, item['prefix'])
+            times = np.load(f"{prefix}_times.npy", mmap_mode='r').view('datetime64[ns]')
+            keys = np.load(f"{prefix}_keys.npy", mmap_mode='r').view('datetime64[ns]')
+            values = np.load(f"{prefix}_values.npy", mmap_mode='r')
+            store._blocks[(item['code'], item['frequency'], item['fq'])] = _SeriesBlock(
+                times, keys, values, {str(k): int(v) for k, v in item['columns'].items()}
+            )
+        return store
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'securities': len(self.securities),
+            'blocks': len(self._blocks),
+            'rows': int(sum(len(b.times) for b in self._blocks.values())),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+# 进程级共享列存储：参数优化子进程挂载一次，之后每个组合的回测直接复用
+_shared_store: Optional[BarStore] = None
+
+
+def set_shared_bar_store(store: Optional[BarStore]) -> None:
+    """设置（或清除）进程级共享列存储，回测引擎预加载阶段优先使用。"""
+    global _shared_store
+    _shared_store = store
+
+
+def get_shared_bar_store() -> Optional[BarStore]:
+    return _shared_store
+
+
+__all__ = [
+    'BarStore',
+    'PRELOAD_FIELDS',
+    'DEFAULT_PRICE_FIELDS',
+    'normalize_frequency',
+    'normalize_fq',
+    'set_shared_bar_store',
+    'get_shared_bar_store',
+]
@@ -2,14 +2,111 @@ from __future__ import annotations
 
 import os
 import json
+import uuid
 import hashlib
 from datetime import datetime, date as Date, timezone
-from typing import Any, Dict, Optional, Callable, List
+from typing import Any, Dict, Optional, Callable, List, Tuple
 
 import pandas as pd
 import numpy as np
 
 
+_SEGMENT_FREQUENCIES = {
+    "daily": "D",
+    "1d": "D",
+    "minute": "ns",
+    "1m": "ns",
+}
+_NS_PER_DAY = 24 * 3600 * 10**9
+
+
+class _PriceSegments:
+    """
+    单个 (provider, method, security, frequency, fq, 其余参数) 的区间缓存。
+    - intervals: 已覆盖的闭区间列表（整数键：日线为日序号，分钟线为纳秒时间戳），有序且互不相邻
+    - frame: 覆盖区间内的全部行情（按时间升序、去重）
+    - keys: 与 frame 行一一对应的整数键
+    """
+
+    __slots__ = ("unit", "intervals", "frame", "keys", "chunks")
+
+    def __init__(self, unit: str) -> None:
+        self.unit = unit
+        self.intervals: List[Tuple[int, int]] = []
+        self.frame: Optional[pd.DataFrame] = None
+        self.keys = np.empty(0, dtype="int64")
+        self.chunks: List[str] = []
+
+    def index_keys(self, index: pd.Index) -> np.ndarray:
+        idx = pd.DatetimeIndex(pd.to_datetime(index))
+        if idx.tz is not None:
+            idx = idx.tz_convert("UTC").tz_localize(None)
+        if self.unit == "D":
+            return idx.values.astype("datetime64[D]").astype("int64")
+        return idx.values.astype("datetime64[ns]").astype("int64")
+
+    def find(self, key: int) -> Optional[Tuple[int, int]]:
+        for lo, hi in self.intervals:
+            if lo <= key <= hi:
+                return lo, hi
+        return None
+
+    def gaps(self, lo: int, hi: int) -> List[Tuple[int, int]]:
+        """返回 [lo, hi] 内未覆盖的子区间。"""
+        missing: List[Tuple[int, int]] = []
+        cursor = lo
+        for a, b in self.intervals:
+            if b < cursor:
+                continue
+            if a > hi:
+                break
+            if a > cursor:
+                missing.append((cursor, a - 1))
+            cursor = max(cursor, b + 1)
+            if cursor > hi:
+                break
+        if cursor <= hi:
+            missing.append((cursor, hi))
+        return missing
+
+    def add(self, lo: int, hi: int, frame: pd.DataFrame) -> None:
+        """登记新覆盖区间并合并行情，相交或相邻的区间合并为一段。"""
+        merged = sorted(self.intervals + [(lo, hi)])
+        out: List[Tuple[int, int]] = []
+        for a, b in merged:
+            if out and a <= out[-1][1] + 1:
+                out[-1] = (out[-1][0], max(out[-1][1], b))
+            else:
+                out.append((a, b))
+        self.intervals = out
+        if frame is None or frame.empty:
+            return
+        combined = frame if self.frame is None or self.frame.empty else pd.concat([self.frame, frame])
+        combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+        self.frame = combined
+        self.keys = self.index_keys(combined.index)
+
+    def slice(self, start_key: Optional[int], end_key: int, count: Optional[int]) -> Optional[pd.DataFrame]:
+        """按区间或 count 切片；覆盖不足时返回 None。"""
+        segment = self.find(end_key)
+        if segment is None:
+            return None
+        seg_lo, _ = segment
+        hi = int(np.searchsorted(self.keys, end_key, side="right"))
+        if count is not None:
+            lo = int(np.searchsorted(self.keys, seg_lo, side="left"))
+            if hi - lo < count:
+                return None
+            lo = hi - count
+        else:
+            if start_key is None or start_key < seg_lo:
+                return None
+            lo = int(np.searchsorted(self.keys, start_key, side="left"))
+        if self.frame is None:
+            return pd.DataFrame()
+        return self.frame.iloc[lo:hi].copy()
+
+
 class CacheManager:
     """
     文件缓存管理器：基于环境变量 DATA_CACHE_DIR 开启/关闭。
@@ -17,6 +114,7 @@ class CacheManager:
     - 键生成包含 provider、method 以及归一化后的参数，避免误复用
     - 历史区间永久缓存；包含今天/动态区间采用 TTL（默认 1 天，可用 JQDATA_CACHE_EXPIRE_DAYS 配置）
     - DataFrame 优先 parquet（若失败则自动回退到 pickle），列表/字典使用 json
+    - 单标的历史 K 线走区间缓存（cached_price_call）：按已覆盖时间段切片返回，只拉取缺口
     """
 
     def __init__(
@@ -38,6 +136,9 @@ class CacheManager:
         self.default_df_format = os.getenv("JQDATA_CACHE_FORMAT", "parquet").lower()
         # 缓存版本：当数据结构/口径调整时可通过环境变量强制失效（默认'2'）
         self.schema_version = os.getenv("JQDATA_CACHE_VERSION", "2")
+        # 区间缓存向后预取的自然日数，减少逐日推进时的缺口拉取次数
+        self.segment_prefetch_days = max(0, int(os.getenv("DATA_CACHE_PREFETCH_DAYS", "30") or 0))
+        self._segments: Dict[str, _PriceSegments] = {}
         if self.enabled:
             os.makedirs(self.cache_dir, exist_ok=True)
 
@@ -71,6 +172,230 @@ class CacheManager:
         self._atomic_write(method_name, data_path, meta_path, result, result_type, norm_params, dynamic_ttl)
         return result
 
+    def cached_price_call(
+        self,
+        method_name: str,
+        kwargs: Dict[str, Any],
+        fetch_fn: Callable[[Dict[str, Any]], Any],
+    ) -> Any:
+        """
+        单标的历史 K 线的区间缓存入口。
+
+        按 (provider, method, security, frequency, fields, fq, 其余参数) 维护已覆盖的连续时间段，
+        start_date/end_date 或 count 请求只要落在已覆盖段内即直接切片；否则只拉取缺口，
+        并向后预取 DATA_CACHE_PREFETCH_DAYS 个自然日（不超过昨日）。
+        多标的、包含今日的动态区间、复权行情等不适用的请求回退到 cached_call。
+        """
+        if not self.enabled:
+            return fetch_fn(kwargs)
+
+        plan = self._plan_segment_request(kwargs)
+        if plan is None:
+            return self.cached_call(method_name, kwargs, fetch_fn, "df")
+        seg_params, unit, start_key, end_key, count = plan
+        key_hash = self._build_key_hash(method_name + ":segments", seg_params)
+        segments = self._segments.get(key_hash)
+        if segments is None:
+            segments = self._load_segments(method_name, key_hash, unit)
+            self._segments[key_hash] = segments
+
+        hit = segments.slice(start_key, end_key, count)
+        if hit is not None:
+            return hit
+
+        limit_key = self._segment_limit_key(unit)
+        prefetch = self.segment_prefetch_days * (1 if unit == "D" else _NS_PER_DAY)
+        ahead_key = max(end_key, min(end_key + prefetch, limit_key))
+        new_chunks: List[pd.DataFrame] = []
+        direct_result: Any = None
+
+        if count is not None:
+            direct_result = fetch_fn(kwargs)
+            if not self._is_segmentable(direct_result):
+                return direct_result
+            if not direct_result.empty:
+                first_key = int(segments.index_keys(direct_result.index[:1])[0])
+                segments.add(first_key, end_key, direct_result)
+                new_chunks.append(direct_result)
+            missing = segments.gaps(end_key + 1, ahead_key) if ahead_key > end_key else []
+        else:
+            missing = segments.gaps(start_key, ahead_key)
+
+        for lo, hi in missing:
+            kw = dict(kwargs)
+            kw["start_date"] = self._segment_key_to_value(lo, unit, is_start=True)
+            kw["end_date"] = self._segment_key_to_value(hi, unit, is_start=False)
+            kw["count"] = None
+            part = fetch_fn(kw)
+            if not self._is_segmentable(part):
+                if count is not None:
+                    return direct_result
+                return self.cached_call(method_name, kwargs, fetch_fn, "df")
+            if part.empty:
+                # 空结果可能来自临时故障，不登记覆盖
+                continue
+            segments.add(lo, hi, part)
+            new_chunks.append(part)
+
+        if new_chunks:
+            self._persist_segments(method_name, key_hash, segments, new_chunks, seg_params)
+
+        hit = segments.slice(start_key, end_key, count)
+        if hit is not None:
+            return hit
+        if direct_result is not None:
+            return direct_result
+        return self.cached_call(method_name, kwargs, fetch_fn, "df")
+
+    # -------------------------- 区间缓存辅助 --------------------------
+    def _plan_segment_request(
+        self, kwargs: Dict[str, Any]
+    ) -> Optional[Tuple[Dict[str, Any], str, Optional[int], int, Optional[int]]]:
+        """判断请求是否适用区间缓存，返回 (分段参数, 键单位, 起始键, 结束键, count)。"""
+        security = kwargs.get("security")
+        if not isinstance(security, str):
+            return None
+        unit = _SEGMENT_FREQUENCIES.get(str(kwargs.get("frequency") or "daily").lower())
+        if unit is None:
+            return None
+        # 复权价格取决于取数当日的最新因子和窗口内的参考日，不同日期、不同窗口取到的段拼在一起
+        # 会在段边界出现价格跳变；只对未复权行情做区间缓存（真实价格模式已改为未复权 + 因子缩放）
+        if str(kwargs.get("fq") or "none").lower() != "none":
+            return None
+        end_value = kwargs.get("end_date")
+        start_value = kwargs.get("start_date")
+        count = kwargs.get("count")
+        if end_value is None or (count is None) == (start_value is None):
+            return None
+        try:
+            end_ts = pd.Timestamp(pd.to_datetime(end_value))
+            start_ts = pd.Timestamp(pd.to_datetime(start_value)) if start_value is not None else None
+            count = int(count) if count is not None else None
+        except Exception:
+            return None
+        if count is not None and count <= 0:
+            return None
+        if end_ts.tzinfo is not None or (start_ts is not None and start_ts.tzinfo is not None):
+            return None
+        # 仅历史区间：包含今日的数据仍在变化，交给 TTL 缓存
+        if end_ts.normalize() >= pd.Timestamp.today().normalize():
+            return None
+
+        if unit == "D":
+            end_key = int(np.datetime64(end_ts.normalize().to_datetime64(), "D").astype("int64"))
+            start_key = (
+                int(np.datetime64(start_ts.normalize().to_datetime64(), "D").astype("int64"))
+                if start_ts is not None
+                else None
+            )
+        else:
+            end_key = int(end_ts.value)
+            start_key = int(start_ts.value) if start_ts is not None else None
+        if start_key is not None and start_key > end_key:
+            return None
+
+        seg_params = {
+            k: v
+            for k, v in self._normalize_params(kwargs).items()
+            if k not in ("start_date", "end_date", "count")
+        }
+        return seg_params, unit, start_key, end_key, count
+
+    @staticmethod
+    def _segment_limit_key(unit: str) -> int:
+        today = pd.Timestamp.today().normalize()
+        if unit == "D":
+            return int(np.datetime64(today.to_datetime64(), "D").astype("int64")) - 1
+        return int(today.value) - 1
+
+    @staticmethod
+    def _segment_key_to_value(key: int, unit: str, *, is_start: bool) -> Any:
+        if unit == "D":
+            return pd.Timestamp(np.datetime64(key, "D")).date()
+        ts = pd.Timestamp(key)
+        return (ts.ceil("s") if is_start else ts.floor("s")).to_pydatetime()
+
+    @staticmethod
+    def _is_segmentable(result: Any) -> bool:
+        if not isinstance(result, pd.DataFrame):
+            return False
+        if result.empty:
+            return True
+        return isinstance(result.index, pd.DatetimeIndex) and not isinstance(result.columns, pd.MultiIndex)
+
+    def _segment_dir(self, method_name: str, key_hash: str) -> str:
+        return os.path.join(self.cache_dir, self.provider_name, f"{method_name}_segments", key_hash)
+
+    def _load_segments(self, method_name: str, key_hash: str, unit: str) -> _PriceSegments:
+        segments = _PriceSegments(unit)
+        base_dir = self._segment_dir(method_name, key_hash)
+        meta_path = os.path.join(base_dir, "meta.json")
+        try:
+            if not os.path.exists(meta_path):
+                return segments
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if str(meta.get("ver")) != str(self.schema_version) or meta.get("unit") != unit:
+                return segments
+            frames = []
+            for name in meta.get("chunks") or []:
+                path = os.path.join(base_dir, name)
+                frames.append(pd.read_parquet(path) if name.endswith(".parquet") else pd.read_pickle(path))
+            frame = pd.concat(frames) if frames else pd.DataFrame()
+            if not frame.empty:
+                frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+                segments.frame = frame
+                segments.keys = segments.index_keys(frame.index)
+            segments.intervals = [(int(a), int(b)) for a, b in meta.get("intervals") or []]
+            segments.chunks = list(meta.get("chunks") or [])
+        except Exception:
+            # 任一分片损坏则整体丢弃，重新拉取
+            return _PriceSegments(unit)
+        return segments
+
+    def _persist_segments(
+        self,
+        method_name: str,
+        key_hash: str,
+        segments: _PriceSegments,
+        new_chunks: List[pd.DataFrame],
+        seg_params: Dict[str, Any],
+    ) -> None:
+        try:
+            base_dir = self._segment_dir(method_name, key_hash)
+            os.makedirs(base_dir, exist_ok=True)
+            for chunk in new_chunks:
+                stem = uuid.uuid4().hex
+                tmp_path = os.path.join(base_dir, stem + ".tmp")
+                name = stem + ".parquet"
+                try:
+                    if self.default_df_format != "parquet":
+                        raise ValueError("pickle")
+                    chunk.to_parquet(tmp_path)
+                except Exception:
+                    name = stem + ".pkl"
+                    chunk.to_pickle(tmp_path)
+                os.replace(tmp_path, os.path.join(base_dir, name))
+                segments.chunks.append(name)
+            meta = {
+                "provider": self.provider_name,
+                "method": self._safe_str(method_name),
+                "params": seg_params,
+                "ver": self.schema_version,
+                "unit": segments.unit,
+                "intervals": [[a, b] for a, b in segments.intervals],
+                "chunks": segments.chunks,
+                "updated_at": datetime.now().isoformat(),
+            }
+            meta_path = os.path.join(base_dir, "meta.json")
+            tmp_meta_path = meta_path + ".tmp"
+            with open(tmp_meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_meta_path, meta_path)
+        except Exception:
+            # 忽略缓存写入失败
+            pass
+
     # -------------------------- 归一化/键 --------------------------
     @staticmethod
     def _normalize_temporal(value: Optional[Any]) -> Optional[str]:
@@ -0,0 +1,189 @@
+"""
+回测权益事件日历
+
+回测开始时按标的一次性拉取整个回测区间（向前多取 lookback_days 天）的分红/拆分事件与日线停牌数据，
+回测期间的盘前分红处理只做区间查找，不再每天对每个持仓调用 get_split_dividend 与停牌检测 get_price。
+回测中途新买入的标的在首次需要时按同样区间补拉一次。
+
+停牌判断与逐次查询口径一致：对除权日前 5 天到后 1 天的日线切片做判断（兼容 JQData 停牌日有数据、
+QMT 停牌日无数据两种行为）。
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+from datetime import datetime, date as Date, time as Time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# 停牌检测窗口：除权日前 PAUSED_WINDOW_BEFORE 天 ~ 后 PAUSED_WINDOW_AFTER 天
+PAUSED_WINDOW_BEFORE = 5
+PAUSED_WINDOW_AFTER = 1
+_DAY_CLOSE = Time(15, 0)
+
+
+def _as_date(value: Any) -> Optional[Date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, Date):
+        return value
+    try:
+        return pd.Timestamp(value).date()
+    except Exception:
+        return None
+
+
+def paused_on_date(df: Optional[pd.DataFrame], check_date: Date, security: str = '') -> bool:
+    """
+    根据 check_date 附近的日线（含 volume/paused 字段，不跳过停牌日）判断当日是否停牌。
+
+    - JQData: 停牌日有数据，paused=1, volume=0
+    - QMT: 停牌日无数据，返回前一天数据
+    无法判断时返回 False（不阻断分红处理）。
+    """
+    if df is None or df.empty:
+        logger.debug("%s 在 %s 附近无数据", security, check_date)
+        return False
+
+    dates_in_df = sorted(_as_date(idx) for idx in df.index if _as_date(idx) is not None)
+    logger.debug(
+        "%s 停牌检测: check_date=%s, df日期=%s",
+        security, check_date, dates_in_df[-5:] if len(dates_in_df) > 5 else dates_in_df,
+    )
+
+    if check_date not in dates_in_df:
+        # 数据中没有 check_date（QMT行为），判定为停牌
+        prev_day = check_date - timedelta(days=1)
+        if prev_day in dates_in_df or (dates_in_df and dates_in_df[-1] >= prev_day):
+            logger.debug("%s 在 %s 无数据（数据范围正常），判定为停牌", security, check_date)
+            return True
+        logger.debug("%s 在 %s 无数据，数据范围不足，无法判断", security, check_date)
+        return False
+
+    # check_date 在数据中（JQData行为），检查 paused/volume 字段
+    for idx in df.index:
+        if _as_date(idx) != check_date:
+            continue
+        row = df.loc[idx]
+        if 'paused' in row and pd.notna(row['paused']):
+            return bool(row['paused'])
+        if 'volume' in row:
+            return float(row['volume'] or 0) == 0
+        break
+    return False
+
+
+def fetch_paused_frame(provider: Any, security: str, start: Date, end: Date) -> pd.DataFrame:
+    """直接从 provider 取 [start, end] 的日线停牌字段（不复权、不跳过停牌日，绕过未来数据检查）。"""
+    return provider.get_price(
+        security=security,
+        start_date=datetime.combine(start, Time(0, 0)),
+        end_date=datetime.combine(end, _DAY_CLOSE),
+        frequency='daily',
+        fields=['volume', 'paused'],
+        fq='none',
+        skip_paused=False,
+    )
+
+
+class CorporateActionCalendar:
+    """
+    单次回测的权益事件与停牌日历索引。
+
+    events()/is_paused() 在标的数据拉取失败时返回 None，调用方应回退到逐次查询路径。
+    """
+
+    def __init__(self, provider: Any, start: Any, end: Any, *, lookback_days: int = 10) -> None:
+        self.provider = provider
+        self.start = _as_date(start) - timedelta(days=max(0, int(lookback_days)))
+        self.end = _as_date(end)
+        # code -> (事件日期列表, 事件列表)，按日期升序；None 表示拉取失败
+        self._events: Dict[str, Optional[Tuple[List[Date], List[Dict[str, Any]]]]] = {}
+        # code -> 日线停牌数据；None 表示拉取失败
+        self._paused: Dict[str, Optional[pd.DataFrame]] = {}
+        self.loads = 0
+
+    def preload(self, securities: Iterable[str]) -> None:
+        """预先拉取一批标的（标的池、初始持仓）的事件，停牌日历在首次出现待处理事件时再取。"""
+        for code in dict.fromkeys(s for s in securities if s):
+            self._ensure_events(code)
+
+    def events(self, security: str, start: Any, end: Any) -> Optional[List[Dict[str, Any]]]:
+        """返回日期落在 [start, end] 内的事件（保持数据源原始结构）。"""
+        indexed = self._ensure_events(security)
+        if indexed is None:
+            return None
+        start_d, end_d = _as_date(start), _as_date(end)
+        if start_d < self.start or end_d > self.end:
+            return None
+        dates, items = indexed
+        lo = bisect.bisect_left(dates, start_d)
+        hi = bisect.bisect_right(dates, end_d)
+        return items[lo:hi]
+
+    def is_paused(self, security: str, check_date: Any) -> Optional[bool]:
+        """判断标的在 check_date 是否停牌；区间超出日历范围或数据不可用时返回 None。"""
+        check = _as_date(check_date)
+        window_start = check - timedelta(days=PAUSED_WINDOW_BEFORE)
+        window_end = check + timedelta(days=PAUSED_WINDOW_AFTER)
+        if window_start < self._paused_start or window_end > self._paused_end:
+            return None
+        frame = self._ensure_paused(security)
+        if frame is None:
+            return None
+        if frame.empty:
+            return paused_on_date(frame, check, security)
+        index = pd.DatetimeIndex(frame.index)
+        mask = (index >= pd.Timestamp(window_start)) & (index <= pd.Timestamp(datetime.combine(window_end, _DAY_CLOSE)))
+        return paused_on_date(frame[mask], check, security)
+
+    @property
+    def _paused_start(self) -> Date:
+        return self.start - timedelta(days=PAUSED_WINDOW_BEFORE)
+
+    @property
+    def _paused_end(self) -> Date:
+        return self.end + timedelta(days=PAUSED_WINDOW_AFTER)
+
+    def _ensure_events(self, security: str) -> Optional[Tuple[List[Date], List[Dict[str, Any]]]]:
+        if security in self._events:
+            return self._events[security]
+        indexed: Optional[Tuple[List[Date], List[Dict[str, Any]]]]
+        try:
+            raw = self.provider.get_split_dividend(security, start_date=self.start, end_date=self.end) or []
+            dated = sorted(
+                ((_as_date(ev.get('date')), ev) for ev in raw if _as_date(ev.get('date')) is not None),
+                key=lambda item: item[0],
+            )
+            indexed = ([d for d, _ in dated], [ev for _, ev in dated])
+            self.loads += 1
+        except Exception as exc:
+            logger.debug("预加载权益事件失败 %s: %s", security, exc)
+            indexed = None
+        self._events[security] = indexed
+        return indexed
+
+    def _ensure_paused(self, security: str) -> Optional[pd.DataFrame]:
+        if security in self._paused:
+            return self._paused[security]
+        frame: Optional[pd.DataFrame]
+        try:
+            frame = fetch_paused_frame(self.provider, security, self._paused_start, self._paused_end)
+            if frame is None:
+                frame = pd.DataFrame()
+            self.loads += 1
+        except Exception as exc:
+            logger.debug("预加载停牌日历失败 %s: %s", security, exc)
+            frame = None
+        self._paused[security] = frame
+        return frame
+
+
+__all__ = ["CorporateActionCalendar", "fetch_paused_frame", "paused_on_date"]
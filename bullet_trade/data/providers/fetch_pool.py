@@ -0,0 +1,115 @@
+"""
+多标的并发拉取工具
+
+供逐标的请求行情的数据源（MiniQMT/Tushare）使用：有界线程池 + 全局限速，
+结果按输入顺序返回，保证 panel/长表输出与串行一致。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RateLimiter:
+    """
+    简单的请求限速器：相邻两次请求的启动间隔不小于 1/rate 秒。
+    rate <= 0 表示不限速。线程安全。
+    """
+
+    def __init__(self, rate: float = 0.0) -> None:
+        self.rate = float(rate or 0.0)
+        self._interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self) -> None:
+        if self._interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self._interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def fetch_many(
+    keys: Sequence[Hashable],
+    fetch_fn: Callable[[Hashable], T],
+    *,
+    max_workers: int = 1,
+    rate_limiter: Optional[RateLimiter] = None,
+    label: str = "fetch",
+    progress_every: int = 50,
+) -> Dict[Hashable, T]:
+    """
+    并发执行 fetch_fn(key)，返回按 keys 原始顺序（去重后）组织的结果字典。
+
+    - max_workers <= 1 或只有一个标的时串行执行，行为与原循环一致
+    - 任一标的失败即取消未开始的任务并抛出首个异常（与串行语义一致）
+    - 每完成 progress_every 个标的输出一次进度，结束时输出批次耗时与平均延迟
+    """
+    unique: List[Hashable] = list(dict.fromkeys(keys))
+    results: Dict[Hashable, T] = {}
+    if not unique:
+        return results
+
+    def _call(key: Hashable) -> T:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        return fetch_fn(key)
+
+    workers = max(1, min(int(max_workers or 1), len(unique)))
+    if workers == 1:
+        for key in unique:
+            results[key] = _call(key)
+        return results
+
+    t0 = time.perf_counter()
+    latencies: List[float] = []
+
+    def _timed(key: Hashable) -> T:
+        start = time.perf_counter()
+        try:
+            return _call(key)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    done_count = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{label}-fetch") as pool:
+        futures = {pool.submit(_timed, key): key for key in unique}
+        try:
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                done_count += 1
+                if progress_every > 0 and done_count % progress_every == 0 and done_count < len(unique):
+                    logger.debug("%s 并发拉取进度 %d/%d", label, done_count, len(unique))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    elapsed = time.perf_counter() - t0
+    avg_ms = (sum(latencies) / len(latencies) * 1000.0) if latencies else 0.0
+    level = logging.INFO if len(unique) >= progress_every > 0 else logging.DEBUG
+    logger.log(
+        level,
+        "%s 并发拉取 %d 个标的完成：并发 %d，总耗时 %.2fs，单标的平均 %.1fms",
+        label,
+        len(unique),
+        workers,
+        elapsed,
+        avg_ms,
+    )
+    return {key: results[key] for key in unique}
+
+
+__all__ = ["RateLimiter", "fetch_many"]
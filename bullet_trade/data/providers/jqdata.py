@@ -7,6 +7,7 @@ import jqdatasdk as jq
 from jqdatasdk import finance, query
 
 from .base import DataProvider
+from ..adjustment import AdjustmentFactorStore, is_real_price_request
 from ..cache import CacheManager
 
 # 动态补丁：修复 jqdatasdk 的 get_price_engine 忽略 pre_factor_ref_date 的问题
@@ -66,6 +67,8 @@ class JQDataProvider(DataProvider):
         self._security_info_cache: Dict[str, Dict[str, Any]] = {}
         self._fund_membership_cache: Dict[str, Set[str]] = {}
         self._price_engine_supported: Optional[bool] = None
+        # 真实价格模式：未复权 K 线 + 后复权因子，按参考日读时缩放
+        self._factor_store = AdjustmentFactorStore(self._load_adjust_factors)
 
     @staticmethod
     def _sanitize_env_value(value: str) -> str:
@@ -219,13 +222,27 @@ class JQDataProvider(DataProvider):
                 fill_paused=kw.get('fill_paused', True),
             )
 
+        # 单标的真实价格请求：未复权 K 线的缓存键不含参考日，前复权视图由因子缩放得到
+        if isinstance(security, str) and is_real_price_request(fq, pre_factor_ref_date, frequency):
+            raw_kwargs = dict(kwargs, fq='none', pre_factor_ref_date=None, prefer_engine=False)
+            raw = self._cache.cached_price_call('get_price', raw_kwargs, _fetch_price)
+            adjusted = self._factor_store.rescale(
+                raw,
+                security,
+                pre_factor_ref_date,
+                price_columns=tuple(self._PRICE_SCALE_FIELDS),
+                volume_columns=('volume',),
+            )
+            if adjusted is not None:
+                return adjusted
+
         # If a pre_factor_ref_date is explicitly provided for forward-adjusted data,
         # route to get_price_engine so the parameter is honored by jqdatasdk.
         should_try_engine = (prefer_engine or pre_factor_ref_date is not None) and fq == 'pre'
 
         if should_try_engine and self._price_engine_supported is not False:
             try:
-                result = self._cache.cached_call('get_price_engine', kwargs, _fetch_price_engine, result_type='df')
+                result = self._cache.cached_price_call('get_price_engine', kwargs, _fetch_price_engine)
                 if self._price_engine_supported is None:
                     self._price_engine_supported = True
                 return result
@@ -252,7 +269,7 @@ class JQDataProvider(DataProvider):
                 fq,
             )
 
-        return self._cache.cached_call('get_price', kwargs, _fetch_price, result_type='df')
+        return self._cache.cached_price_call('get_price', kwargs, _fetch_price)
 
     def get_security_info(
         self,
@@ -810,6 +827,37 @@ class JQDataProvider(DataProvider):
 
         return self._cache.cached_call('get_split_dividend', kwargs, _fetch, result_type='list_dict')
 
+    def _load_adjust_factors(self, security: str, start: Date, end: Date) -> Optional[pd.Series]:
+        """后复权 factor 即累计复权因子 F(t)。"""
+        kwargs = {
+            'security': security,
+            'start_date': start,
+            'end_date': end,
+            'frequency': 'daily',
+            'fields': ['factor'],
+            'skip_paused': False,
+            'fq': 'post',
+            'count': None,
+            'panel': True,
+            'fill_paused': True,
+        }
+
+        def _fetch(kw: Dict[str, Any]) -> pd.DataFrame:
+            return jq.get_price(
+                security=kw['security'],
+                start_date=kw['start_date'],
+                end_date=kw['end_date'],
+                frequency='daily',
+                fields=['factor'],
+                skip_paused=False,
+                fq='post',
+            )
+
+        df = self._cache.cached_call('get_price', kwargs, _fetch, result_type='df')
+        if df is None or df.empty or 'factor' not in df.columns:
+            return None
+        return df['factor']
+
     def _manual_prefactor_fallback(
         self,
         kwargs: Dict[str, Any],
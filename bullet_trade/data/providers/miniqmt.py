@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import os
+import threading
 from datetime import datetime, date as Date
 from typing import Any, Dict, List, Optional, Union, Tuple
 
+import numpy as np
 import pandas as pd
 import logging
 
 from .base import DataProvider
+from .fetch_pool import RateLimiter, fetch_many
+from ..adjustment import AdjustmentFactorStore, event_multipliers, is_real_price_request
 from ..cache import CacheManager
 
 logger = logging.getLogger(__name__)
@@ -58,6 +62,18 @@ class MiniQMTProvider(DataProvider):
             fallback_to_env=not cache_dir_set,
         )
         self._tick_callback = None
+        # 标的 -> xtdata.subscribe_quote 返回的订阅号，退订须按订阅号进行
+        self._tick_seqs: Dict[str, int] = {}
+        self._tick_lock = threading.Lock()
+        # 真实价格模式：未复权 K 线 + 复权因子，按参考日读时缩放
+        self._factor_store = AdjustmentFactorStore(self._load_adjust_factors)
+        # 市场 -> (覆盖起始日, 覆盖结束日, 交易日数组)，供停牌日填充使用
+        self._calendar_cache: Dict[str, Tuple[Date, Date, np.ndarray]] = {}
+        # 多标的 get_price 并发度与限速（次/秒，0 表示不限速）
+        self.fetch_workers = max(1, int(self.config.get("fetch_workers") or os.getenv("MINIQMT_FETCH_WORKERS") or 1))
+        self._rate_limiter = RateLimiter(
+            float(self.config.get("fetch_rate_limit") or os.getenv("MINIQMT_FETCH_RATE_LIMIT") or 0.0)
+        )
 
     # ------------------------ 工具函数 ------------------------
     @staticmethod
@@ -145,17 +161,9 @@ class MiniQMTProvider(DataProvider):
             xtdata = self._ensure_xtdata()
             code = self._normalize_security_code(security)
             quote = xtdata.get_last_quote(code)  # type: ignore[attr-defined]
-            if quote:
-                if isinstance(quote, dict):
-                    last = quote.get("lastPrice") or quote.get("last_price") or quote.get("price")
-                    ts = quote.get("time") or quote.get("datetime")
-                else:
-                    last = getattr(quote, "lastPrice", None) or getattr(quote, "last_price", None) or getattr(quote, "price", None)
-                    ts = getattr(quote, "time", None) or getattr(quote, "datetime", None)
-                if ts is None:
-                    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                if last is not None:
-                    return {"sid": self._to_jq_code(code), "last_price": float(last), "dt": ts}
+            tick = self._simplify_quote(code, quote)
+            if tick is not None:
+                return tick
         except Exception:
             pass
         try:
@@ -168,6 +176,51 @@ class MiniQMTProvider(DataProvider):
             return None
         return None
 
+    def get_current_ticks(self, securities: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量返回简化 tick（键为传入的标的代码）：一次 xtdata.get_full_tick 取全部标的，
+        批量接口不可用或缺失的标的逐个回退到 get_current_tick。
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        mapping: Dict[str, List[str]] = {}
+        for security in securities:
+            mapping.setdefault(self._normalize_security_code(security), []).append(security)
+        try:
+            xtdata = self._ensure_xtdata()
+            tick_map = xtdata.get_full_tick(list(mapping))  # type: ignore[attr-defined]
+        except Exception as exc:
+            logger.debug("MiniQMT get_full_tick 批量获取失败，逐个回退: %s", exc)
+            tick_map = None
+        if isinstance(tick_map, dict):
+            for code, quote in tick_map.items():
+                tick = self._simplify_quote(code, quote)
+                if tick is None:
+                    continue
+                for security in mapping.get(code, ()):
+                    result[security] = tick
+        for security in securities:
+            if security not in result:
+                tick = self.get_current_tick(security)
+                if tick:
+                    result[security] = tick
+        return result
+
+    def _simplify_quote(self, code: str, quote: Any) -> Optional[Dict[str, Any]]:
+        """把 xtdata 行情（dict 或对象）转换为 {sid, last_price, dt}；无最新价时返回 None。"""
+        if not quote:
+            return None
+        if isinstance(quote, dict):
+            last = quote.get("lastPrice") or quote.get("last_price") or quote.get("price")
+            ts = quote.get("time") or quote.get("datetime")
+        else:
+            last = getattr(quote, "lastPrice", None) or getattr(quote, "last_price", None) or getattr(quote, "price", None)
+            ts = getattr(quote, "time", None) or getattr(quote, "datetime", None)
+        if last is None:
+            return None
+        if ts is None:
+            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return {"sid": self._to_jq_code(code), "last_price": float(last), "dt": ts}
+
     @staticmethod
     def _normalize_period(frequency: Optional[str]) -> str:
         """
@@ -210,8 +263,16 @@ class MiniQMTProvider(DataProvider):
         try:
             xtdata = self._ensure_xtdata()
             mapped = [self._normalize_security_code(s) for s in symbols]
-            for code in mapped:
-                xtdata.subscribe_quote(code, period="tick", callback=self._tick_callback)  # type: ignore[attr-defined]
+            with self._tick_lock:
+                for code in mapped:
+                    if code in self._tick_seqs:
+                        # 已订阅，重复订阅会产生多份推送
+                        continue
+                    seq = xtdata.subscribe_quote(code, period="tick", callback=self._tick_callback)  # type: ignore[attr-defined]
+                    if isinstance(seq, int) and seq >= 0:
+                        self._tick_seqs[code] = seq
+                    else:
+                        logger.warning("MiniQMT 订阅 tick %s 未返回有效订阅号: %s", code, seq)
             logger.info("MiniQMT 订阅 tick: %s", mapped)
         except Exception as exc:
             logger.error("MiniQMT 订阅 tick 失败: %s", exc)
@@ -230,16 +291,26 @@ class MiniQMTProvider(DataProvider):
     def unsubscribe_ticks(self, symbols: Optional[List[str]] = None) -> None:
         try:
             xtdata = self._ensure_xtdata()
+        except Exception as exc:
+            logger.warning("MiniQMT 退订 tick 失败: %s", exc)
+            return
+        with self._tick_lock:
             if symbols:
-                mapped = [self._normalize_security_code(s) for s in symbols]
-                if hasattr(xtdata, "unsubscribe_quote"):
-                    xtdata.unsubscribe_quote(mapped)  # type: ignore[attr-defined]
+                codes = [self._normalize_security_code(s) for s in symbols]
             else:
-                if hasattr(xtdata, "unsubscribe_all"):
-                    xtdata.unsubscribe_all()  # type: ignore[attr-defined]
-            logger.info("MiniQMT 退订 tick: %s", symbols if symbols else "ALL")
-        except Exception:
-            pass
+                codes = list(self._tick_seqs)
+            seqs = [(code, self._tick_seqs.pop(code)) for code in codes if code in self._tick_seqs]
+        for code, seq in seqs:
+            try:
+                xtdata.unsubscribe_quote(seq)  # type: ignore[attr-defined]
+            except Exception as exc:
+                logger.warning("MiniQMT 退订 tick %s（订阅号 %s）失败: %s", code, seq, exc)
+        if not symbols and hasattr(xtdata, "unsubscribe_all"):
+            try:
+                xtdata.unsubscribe_all()  # type: ignore[attr-defined]
+            except Exception as exc:
+                logger.warning("MiniQMT 退订全部 tick 失败: %s", exc)
+        logger.info("MiniQMT 退订 tick: %s", symbols if symbols else "ALL")
 
     def unsubscribe_markets(self, markets: Optional[List[str]] = None) -> None:
         try:
@@ -285,8 +356,22 @@ class MiniQMTProvider(DataProvider):
             if normalized not in unique_normalized:
                 unique_normalized.append(normalized)
 
-        cached_frames: Dict[str, pd.DataFrame] = {}
-        for normalized in unique_normalized:
+        def _fetch_single(kw: Dict[str, Any]) -> pd.DataFrame:
+            return self._get_price_single(
+                kw["security"],
+                start_date=kw.get("start_date"),
+                end_date=kw.get("end_date"),
+                frequency=kw.get("frequency", "daily"),
+                fields=kw.get("fields"),
+                skip_paused=kw.get("skip_paused", False),
+                fq=kw.get("fq"),
+                count=kw.get("count"),
+                pre_factor_ref_date=kw.get("pre_factor_ref_date"),
+            )
+
+        real_price = is_real_price_request(fq, pre_factor_ref_date, normalized_frequency)
+
+        def _fetch_cached(normalized: str) -> pd.DataFrame:
             kwargs = {
                 "security": normalized,
                 "start_date": start_date,
@@ -298,21 +383,23 @@ class MiniQMTProvider(DataProvider):
                 "count": count,
                 "pre_factor_ref_date": pre_factor_ref_date,
             }
-
-            def _fetch_single(kw: Dict[str, Any]) -> pd.DataFrame:
-                return self._get_price_single(
-                    kw["security"],
-                    start_date=kw.get("start_date"),
-                    end_date=kw.get("end_date"),
-                    frequency=kw.get("frequency", "daily"),
-                    fields=kw.get("fields"),
-                    skip_paused=kw.get("skip_paused", False),
-                    fq=kw.get("fq"),
-                    count=kw.get("count"),
-                    pre_factor_ref_date=kw.get("pre_factor_ref_date"),
+            if real_price:
+                # 缓存键不含参考日：同一段未复权 K 线只取一次，前复权视图由因子缩放得到
+                raw = self._cache.cached_price_call(
+                    "get_price", {**kwargs, "fq": "none", "pre_factor_ref_date": None}, _fetch_single
                 )
-
-            cached_frames[normalized] = self._cache.cached_call("get_price", kwargs, _fetch_single, result_type="df")
+                adjusted = self._factor_store.rescale(raw, normalized, pre_factor_ref_date)
+                if adjusted is not None:
+                    return self._round_price_columns(adjusted, self._infer_price_decimals_from_raw(raw))
+            return self._cache.cached_price_call("get_price", kwargs, _fetch_single)
+
+        cached_frames = fetch_many(
+            unique_normalized,
+            _fetch_cached,
+            max_workers=self.fetch_workers,
+            rate_limiter=self._rate_limiter,
+            label="MiniQMT get_price",
+        )
 
         for sec in securities:
             normalized = normalized_map[sec]
@@ -430,132 +517,94 @@ class MiniQMTProvider(DataProvider):
         填充停牌日数据，使 QMT 行为与 JQData 的 skip_paused=False 一致。
         
         QMT 的 get_local_data 不返回停牌日的数据，但 JQData 会返回（volume=0, paused=1）。
-        此方法检查日期范围内缺失的交易日，并用前一天的收盘价填充。
+        此方法对照（按市场缓存的）交易日历找出缺失的交易日，整列向量化地用此前最近一行的收盘价填充。
         """
-        if df.empty:
+        if df.empty or not isinstance(df.index, pd.DatetimeIndex):
             return df
         
         try:
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index()
             # 使用 df 的实际日期范围，而不是传入的 start_date/end_date
             # 因为传入的 end_date 可能被 _fetch_local_data 往后推了
-            df_min_date = df.index.min()
-            df_max_date = df.index.max()
-            
-            # 转换为日期对象
-            if hasattr(df_min_date, 'date'):
-                actual_start = df_min_date.date()
-            elif hasattr(df_min_date, 'to_pydatetime'):
-                actual_start = df_min_date.to_pydatetime().date()
-            else:
-                actual_start = df_min_date
-                
-            if hasattr(df_max_date, 'date'):
-                actual_end = df_max_date.date()
-            elif hasattr(df_max_date, 'to_pydatetime'):
-                actual_end = df_max_date.to_pydatetime().date()
-            else:
-                actual_end = df_max_date
+            index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+            existing = index.values.astype("datetime64[D]")
+            actual_start = existing[0]
+            actual_end = existing[-1]
             
             # 如果有 end_date 参数，使用它作为实际结束日期（确保包含请求的 end_date）
             if end_date:
                 try:
-                    req_end = pd.to_datetime(end_date).date()
+                    req_end = np.datetime64(pd.to_datetime(end_date).date(), "D")
                     # 只在 req_end 在合理范围内时使用（不能是未来的日期）
-                    from datetime import date as Date
-                    today = Date.today()
-                    if req_end <= today and req_end >= actual_start:
+                    if actual_start <= req_end <= np.datetime64(Date.today(), "D"):
                         actual_end = max(actual_end, req_end)
                 except Exception:
                     pass
             
-            # 获取日期范围内的所有交易日
-            start_str = self._format_time(actual_start, "1d")
-            end_str = self._format_time(actual_end, "1d")
-            
-            logger.debug(f"QMT _fill_paused_days: 查询交易日范围 {start_str} - {end_str}")
-            
-            trade_days_ts = xt.get_trading_dates(
-                self.market, 
-                start_time=start_str, 
-                end_time=end_str, 
-                count=-1
-            )
-            if not trade_days_ts:
+            calendar = self._trading_calendar(xt, actual_start.astype(Date), actual_end.astype(Date))
+            if calendar.size == 0:
                 return df
-            
-            # 转换为日期集合
-            from datetime import datetime as dt
-            trade_days = set()
-            for ts in trade_days_ts:
-                d = dt.fromtimestamp(ts / 1000.0).date()
-                trade_days.add(d)
-            
-            # 获取 df 中已有的日期
-            existing_dates = set()
-            for idx in df.index:
-                if hasattr(idx, 'date'):
-                    existing_dates.add(idx.date())
-                elif hasattr(idx, 'to_pydatetime'):
-                    existing_dates.add(idx.to_pydatetime().date())
-            
+            trade_days = calendar[(calendar >= actual_start) & (calendar <= actual_end)]
             # 找出缺失的交易日（停牌日）
-            missing_dates = trade_days - existing_dates
-            if not missing_dates:
+            missing = np.setdiff1d(trade_days, existing, assume_unique=False)
+            if missing.size == 0:
                 return df
             
-            logger.debug(f"QMT _fill_paused_days: 发现 {len(missing_dates)} 个停牌日需要填充: {sorted(missing_dates)}")
-            
-            # 为缺失的日期创建填充行
-            fill_rows = []
-            for missing_date in sorted(missing_dates):
-                # 找到该日期之前最近的数据行作为参考
-                ref_row = None
-                missing_ts = pd.Timestamp(missing_date)
-                earlier_rows = df[df.index < missing_ts]
-                if not earlier_rows.empty:
-                    ref_row = earlier_rows.iloc[-1]
-                elif not df.empty:
-                    # 如果没有更早的数据，用第一行作为参考
-                    ref_row = df.iloc[0]
-                
-                if ref_row is not None:
-                    # 创建停牌日数据行
-                    fill_data = {}
-                    close_price = ref_row.get('close', 0.0)
-                    for col in df.columns:
-                        if col in ('open', 'high', 'low', 'close'):
-                            fill_data[col] = close_price
-                        elif col == 'volume':
-                            fill_data[col] = 0.0
-                        elif col == 'money':
-                            fill_data[col] = 0.0
-                        elif col == 'paused':
-                            fill_data[col] = 1.0  # 标记为停牌
-                        else:
-                            fill_data[col] = 0.0
-                    
-                    fill_rows.append((pd.Timestamp(missing_date).normalize(), fill_data))
+            logger.debug(f"QMT _fill_paused_days: 发现 {missing.size} 个停牌日需要填充")
             
-            if fill_rows:
-                # 添加 paused 列（如果不存在）
-                if 'paused' not in df.columns:
-                    df = df.copy()
-                    df['paused'] = 0.0
-                
-                # 创建填充 DataFrame 并合并
-                fill_df = pd.DataFrame(
-                    [row[1] for row in fill_rows],
-                    index=[row[0] for row in fill_rows]
-                )
-                df = pd.concat([df, fill_df]).sort_index()
-                logger.debug(f"QMT _fill_paused_days: 填充后 df.index={df.index.tolist()[-5:] if len(df) > 5 else df.index.tolist()}")
+            # 每个停牌日取其之前最近一行的收盘价（没有更早的数据时用第一行）
+            missing_index = pd.DatetimeIndex(missing.astype("datetime64[ns]"))
+            ref_pos = np.clip(np.searchsorted(index.values, missing_index.values, side="left") - 1, 0, None)
+            if "close" in df.columns:
+                ref_close = pd.to_numeric(df["close"], errors="coerce").to_numpy(dtype=float)[ref_pos]
+            else:
+                ref_close = np.zeros(missing.size)
             
+            if "paused" not in df.columns:
+                df = df.copy()
+                df["paused"] = 0.0
+            # 停牌日：OHLC=前收盘，volume/money 等其余列为 0，paused=1
+            fill_df = pd.DataFrame(0.0, index=missing_index, columns=df.columns)
+            for col in ("open", "high", "low", "close"):
+                if col in fill_df.columns:
+                    fill_df[col] = ref_close
+            fill_df["paused"] = 1.0
+            df = pd.concat([df, fill_df]).sort_index(kind="stable")
             return df
             
         except Exception as e:
             logger.debug(f"QMT _fill_paused_days: 填充失败 {e}")
             return df
 
+    def _trading_calendar(self, xt, start: Date, end: Date) -> np.ndarray:
+        """
+        返回本市场的交易日历（datetime64[D]，升序），按市场缓存。
+
+        缓存覆盖 [起始日, 今天]，逐日推进的回测不会每次取数都调用 xt.get_trading_dates；
+        请求更早的起始日或日期翻过一天时才重新拉取。
+        """
+        today = Date.today()
+        cached = self._calendar_cache.get(self.market)
+        if cached is not None and cached[0] <= start and end <= cached[1]:
+            return cached[2]
+        lo = min(start, cached[0]) if cached is not None else start
+        hi = max(end, today)
+        logger.debug(f"QMT 交易日历: 拉取 {self.market} {lo} - {hi}")
+        raw = xt.get_trading_dates(
+            self.market,
+            start_time=self._format_time(lo, "1d"),
+            end_time=self._format_time(hi, "1d"),
+            count=-1,
+        )
+        if not raw:
+            return np.array([], dtype="datetime64[D]")
+        days = np.unique(
+            np.array([datetime.fromtimestamp(ts / 1000.0).date() for ts in raw], dtype="datetime64[D]")
+        )
+        self._calendar_cache[self.market] = (lo, hi, days)
+        return days
+
     @staticmethod
     def _round_price_columns(df: pd.DataFrame, decimals: int) -> pd.DataFrame:
         if df.empty or decimals is None:
@@ -791,63 +840,49 @@ class MiniQMTProvider(DataProvider):
         if not price_cols:
             return pd.DataFrame()
         adj_df = raw_df.copy()
-        # Build multiplicative forward-adjust factors series
-        factors = pd.Series(1.0, index=adj_df.index)
-        sorted_events = sorted(
-            (
-                {
-                    **event,
-                    "date": pd.to_datetime(event.get("date"), errors="coerce"),
-                }
-                for event in events
-            ),
-            key=lambda item: item["date"] if item["date"] is not pd.NaT else pd.Timestamp.max,
+        multipliers = event_multipliers(
+            adj_df.index,
+            events,
+            close=adj_df["close"] if "close" in adj_df.columns else None,
+            preclose=adj_df["preClose"] if "preClose" in adj_df.columns else None,
         )
-        for event in sorted_events:
-            event_date = event.get("date")
-            if event_date is pd.NaT or event_date is None:
-                continue
-            event_day = event_date.date()
-            mask = adj_df.index.date < event_day
-            if not mask.any():
-                continue
-            # scale factor: for share bonus/split, forward-adjust multiply earlier prices by 1/scale
-            try:
-                scale = float(event.get("scale_factor") or 1.0)
-            except Exception:
-                scale = 1.0
-            scale_factor = 1.0 / scale if scale and scale > 0 else 1.0
-            # cash dividend: forward-adjust multiply earlier prices by (preclose - cash_per_share)/preclose
-            try:
-                cash = float(event.get("bonus_pre_tax") or 0.0)
-            except Exception:
-                cash = 0.0
-            try:
-                per_base = float(event.get("per_base") or 10.0)
-            except Exception:
-                per_base = 10.0
-            # 将 bonus_pre_tax 转换为每股分红
-            cash_per_share = cash / per_base if per_base > 0 else 0.0
-            # Determine preclose for the ex-date
-            preclose = None
-            if "preClose" in adj_df.columns and event_day in adj_df.index.date:
-                preclose = float(adj_df.loc[adj_df.index.date == event_day, "preClose"].iloc[0])
-            if preclose is None or preclose == 0.0:
-                # fallback to previous day's close
-                prev = adj_df.index[adj_df.index.date < event_day]
-                if len(prev) > 0 and "close" in adj_df.columns:
-                    preclose = float(adj_df.loc[prev.max(), "close"])
-            cash_factor = 1.0
-            if cash_per_share and preclose and preclose > 0:
-                cash_factor = max((preclose - cash_per_share) / preclose, 0.0)
-            total_factor = scale_factor * cash_factor
-            if total_factor != 1.0:
-                factors.loc[mask] = factors.loc[mask] * total_factor
-        # Apply factors to OHLC
         for col in price_cols:
-            adj_df[col] = adj_df[col].astype(float) * factors
+            adj_df[col] = adj_df[col].astype(float) * multipliers
         return adj_df
 
+    def _load_adjust_factors(self, security: str, start: Date, end: Date) -> Optional[pd.Series]:
+        """
+        日线累计复权因子 F(t)：优先 xtquant front_ratio / 未复权收盘价，
+        本地无复权数据时由权益事件推算。
+        """
+        xt = self._ensure_xtdata()
+        code = self._normalize_security_code(security)
+        start_str = self._format_time(start, "1d")
+        end_str = self._format_time(end, "1d")
+        if self.auto_download:
+            xt.download_history_data(stock_code=code, period="1d")
+        raw = self._fetch_local_data(
+            xt, security=code, period="1d", start_time=start_str, end_time=end_str, count=None, dividend_type="none"
+        )
+        if raw.empty or "close" not in raw.columns:
+            return None
+        raw_close = pd.to_numeric(raw["close"], errors="coerce").replace(0.0, np.nan)
+        front = self._fetch_local_data(
+            xt, security=code, period="1d", start_time=start_str, end_time=end_str, count=None, dividend_type="front_ratio"
+        )
+        if not front.empty and "close" in front.columns:
+            ratio = (pd.to_numeric(front["close"], errors="coerce").reindex(raw_close.index) / raw_close).dropna()
+            if not ratio.empty:
+                return ratio
+        events = self._collect_dividend_events(code, raw)
+        multipliers = event_multipliers(
+            raw.index,
+            events,
+            close=raw_close,
+            preclose=raw["preClose"] if "preClose" in raw.columns else None,
+        )
+        return pd.Series(multipliers, index=raw.index)
+
     def _align_reference(
         self,
         raw_df: pd.DataFrame,
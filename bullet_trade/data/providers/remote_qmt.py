@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import os
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 
 import pandas as pd
 
 from .base import DataProvider
 from ...remote import RemoteQmtConnection
+from ...server.columnar import frame_from_payload
 
 
 def _env(key: str, default: Optional[str] = None) -> Optional[str]:
@@ -15,12 +16,8 @@ def _env(key: str, default: Optional[str] = None) -> Optional[str]:
 
 
 def _dataframe_from_payload(payload: Dict[str, Any]) -> pd.DataFrame:
-    if not payload or payload.get("dtype") != "dataframe":
-        return pd.DataFrame()
-    columns = payload.get("columns") or []
-    records = payload.get("records") or []
-    df = pd.DataFrame(records, columns=columns)
-    return df
+    # 列式编码与 JSON records 还原后的列类型一致（时间列均为 datetime64）
+    return frame_from_payload(payload)
 
 
 class RemoteQmtProvider(DataProvider):
@@ -46,6 +43,8 @@ class RemoteQmtProvider(DataProvider):
         self._subscription_key = "remote-provider"
         self._tick_callback: Optional[Callable[[Any, Dict[str, Any]], None]] = None
         self._tick_context: Optional[Any] = None
+        # 旧版 server 没有 data.snapshots，首次失败后不再尝试
+        self._batch_snapshots = True
 
     def get_price(
         self,
@@ -62,7 +61,40 @@ class RemoteQmtProvider(DataProvider):
         pre_factor_ref_date: Optional[str] = None,
         prefer_engine: bool = False,
     ) -> pd.DataFrame:
-        payload = {
+        payload = self._history_payload(security, start_date, end_date, frequency, fields, fq, count)
+        # 服务端分块发送的大结果由连接层合并后返回
+        resp = self._connection.request("data.history", payload)
+        return _dataframe_from_payload(resp)
+
+    def iter_price(
+        self,
+        security: Union[str, List[str]],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        frequency: str = "daily",
+        fields: Optional[List[str]] = None,
+        fq: str = "pre",
+        count: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        按服务端分块逐块产出 get_price 结果，适合超大区间的分钟线：收到首块即可开始处理，
+        无需等待并持有完整结果。服务端未分块时只产出一个 DataFrame。
+        """
+        payload = self._history_payload(security, start_date, end_date, frequency, fields, fq, count)
+        for part in self._connection.request_stream("data.history", payload):
+            yield _dataframe_from_payload(part)
+
+    @staticmethod
+    def _history_payload(
+        security: Union[str, List[str]],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        frequency: str,
+        fields: Optional[List[str]],
+        fq: str,
+        count: Optional[int],
+    ) -> Dict[str, Any]:
+        return {
             "security": security if isinstance(security, str) else ",".join(security),
             "start": start_date,
             "end": end_date,
@@ -71,8 +103,6 @@ class RemoteQmtProvider(DataProvider):
             "fq": fq,
             "count": count,
         }
-        resp = self._connection.request("data.history", payload)
-        return _dataframe_from_payload(resp)
 
     def get_trade_days(
         self,
@@ -154,6 +184,26 @@ class RemoteQmtProvider(DataProvider):
         resp = self._connection.request("data.snapshot", payload)
         return resp or {}
 
+    def get_current_ticks(self, securities: List[str]) -> Dict[str, Dict[str, Any]]:
+        """一次 data.snapshots 请求取多个标的快照；服务端不支持时逐个 data.snapshot。"""
+        securities = [s for s in securities if s]
+        if self._batch_snapshots:
+            try:
+                resp = self._connection.request("data.snapshots", {"securities": securities})
+                ticks = resp.get("ticks") if isinstance(resp, dict) else None
+                if isinstance(ticks, dict):
+                    return {code: tick for code, tick in ticks.items() if tick}
+                self._batch_snapshots = False
+            except Exception as exc:
+                if "未实现" in str(exc):
+                    self._batch_snapshots = False
+        result: Dict[str, Dict[str, Any]] = {}
+        for security in securities:
+            tick = self.get_current_tick(security)
+            if tick:
+                result[security] = tick
+        return result
+
     def _handle_tick_event(self, payload: Dict[str, Any]) -> None:
         callback = self._tick_callback
         if not callback:
@@ -7,6 +7,8 @@ from typing import Any, Dict, List, Optional, Union
 import pandas as pd
 
 from .base import DataProvider
+from .fetch_pool import RateLimiter, fetch_many
+from ..adjustment import AdjustmentFactorStore, event_multipliers, is_real_price_request
 from ..cache import CacheManager
 
 
@@ -29,6 +31,13 @@ class TushareProvider(DataProvider):
             fallback_to_env=not cache_dir_set,
         )
         self._pro = None
+        # 多标的 get_price 并发度与限速（次/秒，0 表示不限速；注意 tushare 账户的每分钟调用上限）
+        self.fetch_workers = max(1, int(self.config.get("fetch_workers") or os.getenv("TUSHARE_FETCH_WORKERS") or 1))
+        # 真实价格模式：未复权 K 线 + adj_factor，按参考日读时缩放
+        self._factor_store = AdjustmentFactorStore(self._load_adjust_factors)
+        self._rate_limiter = RateLimiter(
+            float(self.config.get("fetch_rate_limit") or os.getenv("TUSHARE_FETCH_RATE_LIMIT") or 0.0)
+        )
 
     # ------------------------ 公共工具 ------------------------
     @classmethod
@@ -136,9 +145,23 @@ class TushareProvider(DataProvider):
         prefer_engine: bool = False,
     ) -> pd.DataFrame:
         securities = security if isinstance(security, (list, tuple)) else [security]
-        frames: Dict[str, pd.DataFrame] = {}
 
-        for sec in securities:
+        def _fetch_single(kw: Dict[str, Any]) -> pd.DataFrame:
+            return self._get_price_single(
+                kw["security"],
+                start_date=kw.get("start_date"),
+                end_date=kw.get("end_date"),
+                frequency=kw.get("frequency", "daily"),
+                fields=kw.get("fields"),
+                skip_paused=kw.get("skip_paused", False),
+                fq=kw.get("fq"),
+                count=kw.get("count"),
+                pre_factor_ref_date=kw.get("pre_factor_ref_date"),
+            )
+
+        real_price = is_real_price_request(fq, pre_factor_ref_date, frequency)
+
+        def _fetch_cached(sec: str) -> pd.DataFrame:
             kwargs = {
                 "security": sec,
                 "start_date": start_date,
@@ -150,21 +173,23 @@ class TushareProvider(DataProvider):
                 "count": count,
                 "pre_factor_ref_date": pre_factor_ref_date,
             }
-
-            def _fetch_single(kw: Dict[str, Any]) -> pd.DataFrame:
-                return self._get_price_single(
-                    kw["security"],
-                    start_date=kw.get("start_date"),
-                    end_date=kw.get("end_date"),
-                    frequency=kw.get("frequency", "daily"),
-                    fields=kw.get("fields"),
-                    skip_paused=kw.get("skip_paused", False),
-                    fq=kw.get("fq"),
-                    count=kw.get("count"),
-                    pre_factor_ref_date=kw.get("pre_factor_ref_date"),
+            if real_price:
+                # 缓存键不含参考日：同一段未复权 K 线只取一次，前复权视图由 adj_factor 缩放得到
+                raw = self._cache.cached_price_call(
+                    "get_price", {**kwargs, "fq": "none", "pre_factor_ref_date": None}, _fetch_single
                 )
-
-            frames[sec] = self._cache.cached_call("get_price", kwargs, _fetch_single, result_type="df")
+                adjusted = self._factor_store.rescale(raw, sec, pre_factor_ref_date)
+                if adjusted is not None:
+                    return adjusted
+            return self._cache.cached_price_call("get_price", kwargs, _fetch_single)
+
+        frames: Dict[str, pd.DataFrame] = fetch_many(
+            securities,
+            _fetch_cached,
+            max_workers=self.fetch_workers,
+            rate_limiter=self._rate_limiter,
+            label="Tushare get_price",
+        )
 
         if len(frames) == 1:
             return next(iter(frames.values()))
@@ -351,60 +376,20 @@ class TushareProvider(DataProvider):
             return pd.DataFrame()
 
         adj_df = raw_df.copy()
-        factors = pd.Series(1.0, index=adj_df.index)
-        # 基于分红/送转事件构建前复权因子
-        sorted_events = sorted(
-            (
-                {
-                    **event,
-                    "date": pd.to_datetime(event.get("date"), errors="coerce"),
-                }
-                for event in events
-            ),
-            key=lambda item: item["date"] if item["date"] is not pd.NaT else pd.Timestamp.max,
+        preclose = None
+        if "pre_close" in adj_df.columns:
+            preclose = adj_df["pre_close"]
+        elif "preClose" in adj_df.columns:
+            preclose = adj_df["preClose"]
+        # 基于分红/送转事件构建前复权乘数
+        multipliers = event_multipliers(
+            adj_df.index,
+            events,
+            close=adj_df["close"] if "close" in adj_df.columns else None,
+            preclose=preclose,
         )
-        for event in sorted_events:
-            event_date = event.get("date")
-            if event_date is pd.NaT or event_date is None:
-                continue
-            event_day = event_date.date()
-            mask = adj_df.index.date < event_day
-            if not mask.any():
-                continue
-            try:
-                scale = float(event.get("scale_factor") or 1.0)
-            except Exception:
-                scale = 1.0
-            scale_factor = 1.0 / scale if scale and scale > 0 else 1.0
-            try:
-                cash = float(event.get("bonus_pre_tax") or 0.0)
-            except Exception:
-                cash = 0.0
-            try:
-                per_base = float(event.get("per_base") or 10.0)
-            except Exception:
-                per_base = 10.0
-            cash_per_share = cash / per_base if per_base > 0 else 0.0
-
-            preclose = None
-            if "pre_close" in adj_df.columns and event_day in adj_df.index.date:
-                preclose = float(adj_df.loc[adj_df.index.date == event_day, "pre_close"].iloc[0])
-            elif "preClose" in adj_df.columns and event_day in adj_df.index.date:
-                preclose = float(adj_df.loc[adj_df.index.date == event_day, "preClose"].iloc[0])
-            if preclose is None or preclose == 0.0:
-                prev = adj_df.index[adj_df.index.date < event_day]
-                if len(prev) > 0 and "close" in adj_df.columns:
-                    preclose = float(adj_df.loc[prev.max(), "close"])
-
-            cash_factor = 1.0
-            if cash_per_share and preclose and preclose > 0:
-                cash_factor = max((preclose - cash_per_share) / preclose, 0.0)
-            total_factor = scale_factor * cash_factor
-            if total_factor != 1.0:
-                factors.loc[mask] = factors.loc[mask] * total_factor
-
         for col in price_cols:
-            adj_df[col] = adj_df[col].astype(float) * factors
+            adj_df[col] = adj_df[col].astype(float) * multipliers
 
         return self._align_reference(raw_df, adj_df, pre_factor_ref_date)
 
@@ -462,6 +447,20 @@ class TushareProvider(DataProvider):
 
         return self._cache.cached_call("adj_factor", kwargs, _fetch, result_type="df")
 
+    def _load_adjust_factors(self, security: str, start: Date, end: Date) -> Optional[pd.Series]:
+        """adj_factor 即累计复权因子 F(t)；不可用时返回 None，回退到逐次复权。"""
+        factor_df = self._fetch_adj_factor(
+            security,
+            datetime.combine(start, datetime.min.time()),
+            datetime.combine(end, datetime.min.time()),
+        )
+        if factor_df is None or factor_df.empty or "adj_factor" not in factor_df.columns:
+            return None
+        return pd.Series(
+            pd.to_numeric(factor_df["adj_factor"], errors="coerce").to_numpy(),
+            index=pd.to_datetime(factor_df["trade_date"]).dt.normalize(),
+        )
+
     # ------------------------ 交易日/基础信息 ------------------------
     def get_trade_days(
         self,
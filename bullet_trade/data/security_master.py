@@ -0,0 +1,147 @@
+"""
+标的元数据区间索引
+
+get_security_info 原先按 (标的, 日期) 缓存，多年回测中每个新交易日都会对每个用到的标的重新请求 provider。
+本索引按标的保存若干条 [valid_from, valid_to] 区间记录：
+
+- provider 返回的一条元数据在该标的上市区间 [start_date, end_date] 内视为不变；
+  查询日早于上市日/晚于退市日时各自另取一条记录，因此每个标的通常只请求 1~3 次
+- 区间右端截止到记录的获取日期：获取日之后的日期重新请求，退市等后续变化不会被旧快照掩盖
+- 只保存 provider 原始（归一化后）元数据，security_overrides 在查询层合并，覆盖项变化无需重建索引
+
+数据源开启磁盘缓存时，索引以 pickle 形式保存在缓存目录，跨进程/跨次回测复用。
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import pickle
+import tempfile
+from datetime import date as Date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+SECURITY_MASTER_FILE = "security_master.pkl"
+_SCHEMA_VERSION = 1
+_MIN_DATE = Date.min
+_MAX_DATE = Date.max
+# 查询日期为空（无回测上下文且未指定日期）时使用的独立槽位
+UNDATED = None
+
+Interval = Tuple[Date, Date]
+
+
+class SecurityMaster:
+    """按标的维护元数据有效区间，lookup 为一次二分查找。"""
+
+    def __init__(self) -> None:
+        # code -> 按 valid_from 升序的 (valid_from, valid_to, info)
+        self._intervals: Dict[str, List[Tuple[Date, Date, Dict[str, Any]]]] = {}
+        self._starts: Dict[str, List[Date]] = {}
+        self._undated: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def lookup(self, security: str, day: Optional[Date]) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """
+        返回 (区间键, 原始元数据)；未覆盖时返回 None。
+        区间键在同一标的内唯一，可作为上层对象缓存的键。
+        """
+        if day is UNDATED:
+            info = self._undated.get(security)
+            return (UNDATED, info) if info is not None else None
+        starts = self._starts.get(security)
+        if not starts:
+            return None
+        pos = bisect.bisect_right(starts, day) - 1
+        if pos < 0:
+            return None
+        valid_from, valid_to, info = self._intervals[security][pos]
+        if day > valid_to:
+            return None
+        return valid_from, info
+
+    def add(self, security: str, day: Optional[Date], info: Dict[str, Any], fetched_on: Date) -> Any:
+        """记录 provider 在 day 返回的元数据，返回其区间键。"""
+        self.dirty = True
+        if day is UNDATED:
+            self._undated[security] = info
+            return UNDATED
+        valid_from, valid_to = self._interval_for(day, info, fetched_on)
+        rows = [row for row in self._intervals.get(security, []) if row[1] < valid_from or row[0] > valid_to]
+        rows.append((valid_from, valid_to, info))
+        rows.sort(key=lambda row: row[0])
+        self._intervals[security] = rows
+        self._starts[security] = [row[0] for row in rows]
+        return valid_from
+
+    @staticmethod
+    def _interval_for(day: Date, info: Dict[str, Any], fetched_on: Date) -> Interval:
+        start = info.get('start_date') if isinstance(info.get('start_date'), Date) else None
+        end = info.get('end_date') if isinstance(info.get('end_date'), Date) else None
+        listed_from = start or _MIN_DATE
+        listed_to = end or _MAX_DATE
+        if day < listed_from:
+            valid_from, valid_to = _MIN_DATE, listed_from - timedelta(days=1)
+        elif day > listed_to:
+            valid_from, valid_to = listed_to + timedelta(days=1), _MAX_DATE
+        else:
+            valid_from, valid_to = listed_from, listed_to
+        # 获取日之后的状态未知（可能退市/更名），不外推
+        valid_to = min(valid_to, max(fetched_on, day))
+        return valid_from, valid_to
+
+    # ------------------------------------------------------------ 持久化
+    def save(self, path: str) -> None:
+        """原子写入 pickle；失败只记录日志。"""
+        payload = {
+            'version': _SCHEMA_VERSION,
+            'intervals': self._intervals,
+        }
+        directory = os.path.dirname(path) or '.'
+        tmp = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as fh:
+                pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            tmp = None
+            self.dirty = False
+        except Exception as exc:
+            logger.debug("保存标的元数据索引失败 %s: %s", path, exc)
+        finally:
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+
+    @classmethod
+    def load(cls, path: str) -> "SecurityMaster":
+        """读取持久化索引；文件不存在或版本不符时返回空索引。"""
+        master = cls()
+        if not path or not os.path.exists(path):
+            return master
+        try:
+            with open(path, 'rb') as fh:
+                payload = pickle.load(fh)
+            if not isinstance(payload, dict) or payload.get('version') != _SCHEMA_VERSION:
+                return master
+            for code, rows in (payload.get('intervals') or {}).items():
+                rows = sorted(rows, key=lambda row: row[0])
+                master._intervals[code] = rows
+                master._starts[code] = [row[0] for row in rows]
+        except Exception as exc:
+            logger.debug("读取标的元数据索引失败 %s: %s", path, exc)
+            return cls()
+        return master
+
+
+__all__ = ["SecurityMaster", "SECURITY_MASTER_FILE"]
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import asyncio
+import queue
 import ssl
 import threading
 import time
 import uuid
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 from bullet_trade.core.globals import log
+from bullet_trade.server.columnar import (
+    FEATURE_COLUMNAR,
+    FEATURE_STREAM,
+    FEATURE_ZLIB,
+    is_stream_summary,
+    merge_frame_chunks,
+)
 from bullet_trade.server.protocol import ProtocolError, encode_message, read_message
+from bullet_trade.utils.env_loader import get_env
 
 
 class RemoteQmtConnection:
@@ -26,6 +35,7 @@ class RemoteQmtConnection:
         *,
         tls_cert: Optional[str] = None,
         tls_enabled: bool = False,
+        wire_format: Optional[str] = None,
     ) -> None:
         self.host = host
         self.port = port
@@ -41,10 +51,14 @@ class RemoteQmtConnection:
         self._connected = threading.Event()
         self._stop = threading.Event()
         self._pending: Dict[str, asyncio.Future] = {}
+        self._chunk_sinks: Dict[str, Callable[[Dict[str, Any]], None]] = {}
         self._event_handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
         self._subscriptions: Dict[str, set] = {}
         self._session_id: Optional[str] = None
         self._keepalive: float = 20.0
+        # DataFrame 传输格式：columnar（默认，服务端不支持时自动回退 JSON）或 json
+        self.wire_format = (wire_format or get_env("QMT_SERVER_WIRE_FORMAT", "columnar") or "columnar").lower()
+        self.server_features: List[str] = []
 
     def start(self) -> None:
         if self._thread:
@@ -83,6 +97,37 @@ class RemoteQmtConnection:
                 # 仍在重连，继续等待远程协程完成
                 continue
 
+    def request_stream(
+        self, action: str, payload: Optional[Dict[str, Any]] = None, timeout: Optional[float] = 30.0
+    ) -> Iterator[Dict]:
+        """
+        以迭代器形式获取响应：服务端分块发送时逐块产出分块负载，未分块时只产出完整响应一次。
+
+        timeout 为相邻两块之间的最长等待时间；提前结束迭代会取消该请求，后续分块被丢弃。
+        """
+        if not self._loop:
+            raise RuntimeError("remote connection 尚未启动")
+        parts: "queue.Queue[Any]" = queue.Queue()
+        finished = object()
+        coro = self._request_async(action, payload or {}, on_chunk=parts.put)
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        future.add_done_callback(lambda _f: parts.put(finished))
+        try:
+            while True:
+                try:
+                    item = parts.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"等待 {action} 分块响应超时") from None
+                if item is finished:
+                    result = future.result()
+                    if not is_stream_summary(result):
+                        yield result
+                    return
+                yield item
+        finally:
+            if not future.done():
+                future.cancel()
+
     def subscribe(self, key: str, symbols: List[str]) -> Dict:
         current = self._subscriptions.setdefault(key, set())
         new = {s.strip().upper() for s in symbols if s} - current
@@ -147,11 +192,15 @@ class RemoteQmtConnection:
         reader, writer = await asyncio.open_connection(self.host, self.port, ssl=ssl_context)
         self._reader = reader
         self._writer = writer
-        await self._send({"type": "handshake", "token": self.token, "protocol": 1, "features": ["tick", "order_stream"]})
+        features = ["tick", "order_stream", FEATURE_STREAM]
+        if self.wire_format != "json":
+            features += [FEATURE_COLUMNAR, FEATURE_ZLIB]
+        await self._send({"type": "handshake", "token": self.token, "protocol": 1, "features": features})
         ack = await read_message(reader)
         if ack.get("type") != "handshake_ack":
             raise ProtocolError("握手失败")
         self._session_id = ack.get("session_id")
+        self.server_features = list(ack.get("features") or [])
         self._keepalive = ack.get("keepalive", 20)
         self._connected.set()
         log.info(f"已连接远程 server，session={self._session_id}")
@@ -165,7 +214,11 @@ class RemoteQmtConnection:
             while not self._stop.is_set():
                 msg = await read_message(self._reader)
                 msg_type = msg.get("type")
-                if msg_type == "response":
+                if msg_type == "chunk":
+                    sink = self._chunk_sinks.get(msg.get("id"))
+                    if sink is not None:
+                        sink(msg.get("payload"))
+                elif msg_type == "response":
                     req_id = msg.get("id")
                     if req_id in self._pending:
                         self._pending.pop(req_id).set_result(msg.get("payload"))
@@ -214,6 +267,7 @@ class RemoteQmtConnection:
             if not fut.done():
                 fut.set_exception(RuntimeError("连接已断开"))
         self._pending.clear()
+        self._chunk_sinks.clear()
         self._reader = None
         self._writer = None
 
@@ -226,26 +280,54 @@ class RemoteQmtConnection:
                 raise RuntimeError("等待远程连接就绪超时")
             await asyncio.sleep(0.2)
 
-    async def _request_async(self, action: str, payload: Dict) -> Dict:
+    async def _request_async(
+        self,
+        action: str,
+        payload: Dict,
+        on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict:
+        """
+        发送请求并等待响应。服务端分块发送时：未指定 on_chunk 则在本地合并为完整响应返回，
+        指定 on_chunk 则逐块回调、返回结尾的 stream 元信息。
+        """
         last_error: Optional[Exception] = None
         while not self._stop.is_set():
             await self._wait_until_connected()
             req_id = str(uuid.uuid4())
             loop = asyncio.get_running_loop()
             future: asyncio.Future = loop.create_future()
+            chunks: List[Dict[str, Any]] = []
+            forwarded = False
+
+            def _on_chunk(part: Dict[str, Any]) -> None:
+                nonlocal forwarded
+                if on_chunk is None:
+                    chunks.append(part)
+                else:
+                    forwarded = True
+                    on_chunk(part)
+
             self._pending[req_id] = future
+            self._chunk_sinks[req_id] = _on_chunk
             try:
                 await self._send({"type": "request", "id": req_id, "action": action, "payload": payload})
-                return await future
+                result = await future
             except asyncio.CancelledError:
                 self._pending.pop(req_id, None)
                 raise
             except Exception as exc:
                 self._pending.pop(req_id, None)
-                if not self._should_retry(exc):
+                # 已交给调用方的分块无法撤回，断线后不再自动重试
+                if forwarded or not self._should_retry(exc):
                     raise
                 last_error = exc
                 await asyncio.sleep(0.2)
+                continue
+            finally:
+                self._chunk_sinks.pop(req_id, None)
+            if on_chunk is None and is_stream_summary(result):
+                return merge_frame_chunks(chunks)
+            return result
         raise last_error or RuntimeError("连接已停止")
 
     async def _send(self, message: Dict[str, Any]) -> None:
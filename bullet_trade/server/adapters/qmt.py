@@ -6,13 +6,16 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import partial
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import pandas as pd
 
 from bullet_trade.broker.qmt import QmtBroker
 from bullet_trade.core.globals import log
 from bullet_trade.data.providers.miniqmt import MiniQMTProvider
 from bullet_trade.utils.env_loader import get_data_provider_config
 
+from ..columnar import dataframe_records
 from ..config import AccountConfig, ServerConfig
 from .base import (
     AccountContext,
@@ -91,6 +94,9 @@ def _provider_config() -> Dict[str, Any]:
 class QmtDataAdapter(RemoteDataAdapter):
     def __init__(self) -> None:
         self.provider = MiniQMTProvider(_provider_config())
+        # xtdata tick 推送：xt 代码 -> 客户端订阅时使用的标的代码
+        self._push_symbols: Dict[str, Set[str]] = {}
+        self._push_handler: Optional[Callable[[Dict[str, Dict]], None]] = None
 
     async def get_history(self, payload: Dict) -> Dict:
         """
@@ -127,7 +133,7 @@ class QmtDataAdapter(RemoteDataAdapter):
             df = await _run_in_qmt_executor(_call)
             logger.debug(f"[QmtDataAdapter.get_history] 返回数据: shape={df.shape if df is not None else None}, "
                          f"columns={list(df.columns) if df is not None and hasattr(df, 'columns') else None}")
-            return dataframe_to_payload(df)
+            return dataframe_to_payload(df, lazy=True)
         except KeyError as e:
             # KeyError 通常表示数据格式问题（如缺少 time 列）
             error_msg = f"数据格式错误，缺少字段 {e}: security={security}, frequency={frequency}"
@@ -213,6 +219,76 @@ class QmtDataAdapter(RemoteDataAdapter):
     async def get_current_tick(self, symbol: str) -> Optional[Dict]:
         return await _run_in_qmt_executor(self.provider.get_current_tick, symbol)
 
+    async def get_current_ticks(self, symbols: List[str]) -> Dict[str, Dict]:
+        """一次 get_full_tick 批量取多个标的的最新 tick。"""
+        ticks = await _run_in_qmt_executor(self.provider.get_current_ticks, list(symbols))
+        return ticks or {}
+
+    async def get_snapshots(self, payload: Dict) -> Dict:
+        """data.snapshots：批量快照，返回 {"ticks": {标的: tick}}。"""
+        securities = payload.get("securities") or []
+        if isinstance(securities, str):
+            securities = [securities]
+        return {"ticks": await self.get_current_ticks([str(s) for s in securities if s])}
+
+    async def subscribe_tick_push(self, symbols: List[str], handler: Callable[[Dict[str, Dict]], None]) -> None:
+        """
+        通过 xtdata.subscribe_quote 订阅 tick 推送。
+        handler 在 xtquant 回调线程中以 {标的: tick} 调用，订阅失败时抛出异常由调用方回退到轮询。
+        """
+        self._push_handler = handler
+        self.provider.set_tick_callback(self._on_tick_push)
+        added: Dict[str, str] = {}
+        for symbol in symbols:
+            code = self.provider._normalize_security_code(symbol)
+            bucket = self._push_symbols.setdefault(code, set())
+            if not bucket:
+                added[code] = symbol
+            bucket.add(symbol)
+        if not added:
+            return
+        try:
+            await _run_in_qmt_executor(self.provider.subscribe_ticks, list(added.values()))
+        except Exception:
+            for code, symbol in added.items():
+                bucket = self._push_symbols.get(code)
+                if bucket is not None:
+                    bucket.discard(symbol)
+                    if not bucket:
+                        self._push_symbols.pop(code, None)
+            raise
+
+    async def unsubscribe_tick_push(self, symbols: List[str]) -> None:
+        removed: List[str] = []
+        for symbol in symbols:
+            code = self.provider._normalize_security_code(symbol)
+            bucket = self._push_symbols.get(code)
+            if bucket is None:
+                continue
+            bucket.discard(symbol)
+            if not bucket:
+                self._push_symbols.pop(code, None)
+                removed.append(code)
+        if removed:
+            await _run_in_qmt_executor(self.provider.unsubscribe_ticks, removed)
+
+    def _on_tick_push(self, datas: Any) -> None:
+        handler = self._push_handler
+        if handler is None or not isinstance(datas, dict):
+            return
+        ticks: Dict[str, Dict] = {}
+        for code, quote in datas.items():
+            if isinstance(quote, list):
+                # 同一回调可能带多笔，只取最新一笔
+                quote = quote[-1] if quote else None
+            tick = self.provider._simplify_quote(code, quote)
+            if tick is None:
+                continue
+            for symbol in tuple(self._push_symbols.get(code, ())):
+                ticks[symbol] = tick
+        if ticks:
+            handler(ticks)
+
     async def get_all_securities(self, payload: Dict) -> Dict:
         types = payload.get("types") or "stock"
         date = payload.get("date")
@@ -221,7 +297,7 @@ class QmtDataAdapter(RemoteDataAdapter):
             return self.provider.get_all_securities(types=types, date=date)
 
         df = await _run_in_qmt_executor(_call)
-        return dataframe_to_payload(df)
+        return dataframe_to_payload(df, lazy=True)
 
     async def get_index_stocks(self, payload: Dict) -> Dict:
         index_symbol = payload.get("index_symbol")
@@ -491,7 +567,12 @@ class QmtBrokerAdapter(RemoteBrokerAdapter):
                 if st in ("filled", "cancelled", "canceled", "partly_canceled", "rejected"):
                     final_snapshot = status
                     break
-            await asyncio.sleep(interval)
+            wait_event = getattr(broker, "wait_order_event", None)
+            if callable(wait_event):
+                # 撤单回报到达即唤醒，下一轮查询直接命中终态
+                await wait_event(order_id, min(interval, max(0.0, deadline - time.monotonic())))
+            else:
+                await asyncio.sleep(interval)
 
         snapshot = final_snapshot or last_snapshot
         if snapshot:
@@ -502,46 +583,16 @@ class QmtBrokerAdapter(RemoteBrokerAdapter):
         return response
 
 
-def dataframe_to_payload(df):
-    if df is None:
-        return {"dtype": "dataframe", "columns": [], "records": []}
-    def _coerce_value(value):
-        if value is None:
-            return None
-        try:
-            import pandas as pd
-            if value is pd.NaT:
-                return None
-            if isinstance(value, pd.Timestamp):
-                return value.isoformat()
-        except Exception:
-            pass
-        try:
-            from datetime import datetime, date as Date
-            if isinstance(value, (datetime, Date)):
-                return value.isoformat()
-        except Exception:
-            pass
-        try:
-            if hasattr(value, "item"):
-                return value.item()
-        except Exception:
-            pass
-        return value
-
-    try:
-        columns = list(df.columns)
-        raw = df.reset_index().values.tolist() if df.index.name else df.values.tolist()
-        records = [[_coerce_value(v) for v in row] for row in raw]
-    except Exception:
-        columns = getattr(df, "columns", [])
-        raw = getattr(df, "values", [])
-        records = [[_coerce_value(v) for v in row] for row in raw]
-    return {
-        "dtype": "dataframe",
-        "columns": [str(col) for col in columns],
-        "records": records,
-    }
+def dataframe_to_payload(df, *, lazy: bool = False):
+    """
+    DataFrame -> 响应负载。
+
+    lazy=True 时返回 {"dtype": "dataframe", "frame": df}，由会话发送时按协商结果选择
+    二进制列式编码或 JSON records；否则直接返回 JSON records。
+    """
+    if lazy and isinstance(df, pd.DataFrame):
+        return {"dtype": "dataframe", "frame": df}
+    return dataframe_records(df)
 
 
 def build_qmt_bundle(config: ServerConfig, router: AccountRouter) -> AdapterBundle:
@@ -8,7 +8,9 @@ from bullet_trade.core.globals import log
 from bullet_trade.utils.portfolio_printer import render_account_overview
 
 from .adapters.base import AccountRouter, AdapterBundle, AccountContext, SubAccountConfig, VirtualAccountManager
+from .columnar import materialize
 from .config import ServerConfig
+from .order_events import OrderEventWatcher
 from .session import ClientSession
 from .tick import TickSubscriptionManager
 
@@ -23,9 +25,15 @@ class ServerApplication:
         if adapters.data_adapter:
             self.tick_manager = TickSubscriptionManager(
                 adapters.data_adapter,
-                interval=1.0,
+                interval=config.tick_interval,
                 max_subscriptions=config.max_subscriptions,
+                queue_size=config.tick_queue_size,
+                push=config.tick_push,
             )
+        # 协商 order_events 的会话，其委托状态由服务端跟踪并推送
+        self.order_watcher: Optional[OrderEventWatcher] = None
+        if adapters.broker_adapter:
+            self.order_watcher = OrderEventWatcher(adapters.broker_adapter)
         self._server: Optional[asyncio.AbstractServer] = None
         self._sessions: Set[ClientSession] = set()
         self._ip_allowlist = self._prepare_allowlist(config.allowlist)
@@ -51,6 +59,8 @@ class ServerApplication:
         self._shutdown.set()
         if self.tick_manager:
             await self.tick_manager.stop()
+        if self.order_watcher:
+            await self.order_watcher.stop()
         for session in list(self._sessions):
             await session.close()
         if self._server:
@@ -81,6 +91,8 @@ class ServerApplication:
     async def unregister_session(self, session: ClientSession) -> None:
         if session in self._sessions:
             self._sessions.remove(session)
+        if self.order_watcher:
+            self.order_watcher.cancel_session(session)
         if self.tick_manager:
             await self.tick_manager.remove_session(session)
 
@@ -185,6 +197,10 @@ class ServerApplication:
                 pass
         if sub_cfg:
             result["sub_account_id"] = sub_cfg.sub_account_id
+        if impl == "place_order" and self.order_watcher and getattr(session, "order_events", False):
+            order_id = result.get("order_id") if isinstance(result, dict) else None
+            if order_id:
+                self.order_watcher.watch(session, ctx, order_id, sub_cfg.sub_account_id if sub_cfg else None)
         return result
 
     async def _maybe_fill_price(self, payload: Dict) -> None:
@@ -216,6 +232,7 @@ class ServerApplication:
                 price = snapshot.get("last_price") or snapshot.get("lastPrice") or snapshot.get("price")
             if price is None and callable(getattr(data_adapter, "get_history", None)):
                 hist = await data_adapter.get_history({"security": security, "count": 1, "frequency": "1m"})
+                hist = materialize({"payload": hist})["payload"]
                 records = hist.get("records") if isinstance(hist, dict) else None
                 if records:
                     last = records[-1]
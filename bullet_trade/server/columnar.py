@@ -0,0 +1,279 @@
+"""
+DataFrame 二进制列式编码
+
+握手双方都声明 ``columnar`` 特性时，响应中的 DataFrame 以 NumPy 列缓冲区传输，
+避免逐单元格 JSON 编解码；未协商时回退到原 JSON ``records`` 格式。
+
+帧体布局（外层仍为 4 字节长度头）::
+
+    MAGIC(4) | flags(1) | header_len(4, big-endian) | header(JSON) | data
+
+- header 为原消息，其中 DataFrame 负载替换为列描述（dtype、在 data 中的偏移/长度）
+- data 为各数值列缓冲区的拼接；flags 的 FLAG_ZLIB 位表示 data 经过 zlib 压缩
+- object/字符串列直接以 JSON 列表写入 header
+
+JSON 回退格式中时间列是 ISO 字符串，负载附带 ``datetime_columns``（列名 -> 时区或 null），
+客户端用 frame_from_payload 还原为 datetime64，两种格式得到的 DataFrame 列类型一致。
+
+双方声明 ``stream`` 特性时，超过分块行数的 DataFrame 响应拆为若干 ``chunk`` 帧
+（{"type": "chunk", "id", "seq", "payload"}），最后以带 ``stream`` 元信息的 ``response`` 帧结束，
+单帧大小与两端编解码峰值内存都由分块行数限定。
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from datetime import date as Date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"BTC1"
+FLAG_ZLIB = 0x01
+FEATURE_COLUMNAR = "columnar"
+FEATURE_ZLIB = "zlib"
+FEATURE_STREAM = "stream"
+# data 段小于该字节数时不压缩（压缩收益不抵 CPU 开销）
+COMPRESS_MIN_BYTES = 64 * 1024
+_PREFIX_SIZE = len(MAGIC) + 1 + 4
+
+
+def coerce_json_value(value: Any) -> Any:
+    """将单元格值转换为 JSON 可序列化的值（时间转 ISO 字符串，NumPy 标量转 Python 标量）。"""
+    if value is None:
+        return None
+    if value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, Date)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        try:
+            return value.item()
+        except Exception:
+            pass
+    return value
+
+
+def frame_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """返回实际传输的列：具名索引作为首列保留，未命名索引丢弃（与 JSON records 格式一致）。"""
+    return df.reset_index() if df.index.name else df
+
+
+def _datetime_columns(table: pd.DataFrame) -> Dict[str, Optional[str]]:
+    """时间列 -> 时区（无时区为 None），供 JSON 回退格式在客户端还原列类型。"""
+    result: Dict[str, Optional[str]] = {}
+    for name, dtype in table.dtypes.items():
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            result[str(name)] = str(dtype.tz)
+        elif isinstance(dtype, np.dtype) and dtype.kind == "M":
+            result[str(name)] = None
+    return result
+
+
+def dataframe_records(df: Optional[pd.DataFrame]) -> Dict[str, Any]:
+    """DataFrame -> JSON records 负载（协商失败时的回退格式）。"""
+    if df is None:
+        return {"dtype": "dataframe", "columns": [], "records": []}
+    datetime_columns: Dict[str, Optional[str]] = {}
+    try:
+        table = frame_columns(df)
+        columns = list(table.columns)
+        raw = table.values.tolist()
+        datetime_columns = _datetime_columns(table)
+    except Exception:
+        columns = list(getattr(df, "columns", []))
+        raw = getattr(df, "values", [])
+    payload: Dict[str, Any] = {
+        "dtype": "dataframe",
+        "columns": [str(col) for col in columns],
+        "records": [[coerce_json_value(v) for v in row] for row in raw],
+    }
+    if datetime_columns:
+        payload["datetime_columns"] = datetime_columns
+    return payload
+
+
+def frame_from_payload(payload: Dict[str, Any]) -> pd.DataFrame:
+    """
+    响应负载 -> DataFrame：列式编码直接返回已还原的 DataFrame；
+    JSON records 按 datetime_columns 把 ISO 字符串还原为时间列（旧版 server 未提供时按 time 列处理）。
+    """
+    if not payload or payload.get("dtype") != "dataframe":
+        return pd.DataFrame()
+    frame = payload.get("frame")
+    if isinstance(frame, pd.DataFrame):
+        return frame
+    columns = payload.get("columns") or []
+    df = pd.DataFrame(payload.get("records") or [], columns=columns)
+    datetime_columns = payload.get("datetime_columns")
+    if datetime_columns is None:
+        datetime_columns = {"time": None} if "time" in df.columns else {}
+    for name, tz in datetime_columns.items():
+        if name not in df.columns or df[name].dtype.kind == "M":
+            continue
+        try:
+            if tz:
+                df[name] = pd.to_datetime(df[name], utc=True).dt.tz_convert(tz)
+            else:
+                df[name] = pd.to_datetime(df[name])
+        except Exception:
+            # 无法解析时保留原值
+            continue
+    return df
+
+
+def is_frame_payload(payload: Any) -> bool:
+    """判断是否为延迟编码的 DataFrame 负载（{"dtype": "dataframe", "frame": DataFrame}）。"""
+    return (
+        isinstance(payload, dict)
+        and payload.get("dtype") == "dataframe"
+        and isinstance(payload.get("frame"), pd.DataFrame)
+    )
+
+
+def materialize(message: Dict[str, Any]) -> Dict[str, Any]:
+    """把消息中延迟编码的 DataFrame 负载展开为 JSON records。"""
+    payload = message.get("payload")
+    if not is_frame_payload(payload):
+        return message
+    body = dict(payload)
+    body.update(dataframe_records(body.pop("frame")))
+    return {**message, "payload": body}
+
+
+def split_frame_payload(payload: Any, chunk_rows: int) -> Optional[List[Dict[str, Any]]]:
+    """把超过 chunk_rows 行的 DataFrame 负载切分为分块负载列表；无需分块时返回 None。"""
+    if chunk_rows <= 0 or not is_frame_payload(payload):
+        return None
+    frame = payload["frame"]
+    if len(frame) <= chunk_rows:
+        return None
+    meta = {k: v for k, v in payload.items() if k != "frame"}
+    return [{**meta, "frame": frame.iloc[start:start + chunk_rows]} for start in range(0, len(frame), chunk_rows)]
+
+
+def stream_summary(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """分块发送结束后的 response 负载：只带元信息，不含数据。"""
+    rows = sum(len(chunk["frame"]) for chunk in chunks)
+    return {"dtype": "dataframe", "stream": {"chunks": len(chunks), "rows": rows}}
+
+
+def is_stream_summary(payload: Any) -> bool:
+    return isinstance(payload, dict) and payload.get("dtype") == "dataframe" and "stream" in payload
+
+
+def merge_frame_chunks(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """把收到的分块负载合并为单个 DataFrame 负载（列式分块拼接 DataFrame，JSON 分块拼接 records）。"""
+    if not chunks:
+        return {"dtype": "dataframe", "columns": [], "records": []}
+    first = chunks[0]
+    if isinstance(first.get("frame"), pd.DataFrame):
+        return {**first, "frame": pd.concat([chunk["frame"] for chunk in chunks], ignore_index=True)}
+    records: List[Any] = []
+    for chunk in chunks:
+        records.extend(chunk.get("records") or [])
+    return {**first, "records": records}
+
+
+def _encode_frame(df: pd.DataFrame, buffers: List[bytes], offset: int) -> Tuple[Dict[str, Any], int]:
+    table = frame_columns(df)
+    columns: List[Dict[str, Any]] = []
+    for name in table.columns:
+        series = table[name]
+        spec: Dict[str, Any] = {"name": str(name)}
+        dtype = series.dtype
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            spec["tz"] = str(dtype.tz)
+            values = series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+        elif isinstance(dtype, np.dtype) and dtype.kind in "biufM":
+            values = series.to_numpy()
+            if dtype.kind == "M":
+                values = values.astype("datetime64[ns]")
+        else:
+            spec["values"] = [coerce_json_value(v) for v in series.tolist()]
+            columns.append(spec)
+            continue
+        data = np.ascontiguousarray(values)
+        raw = data.tobytes()
+        spec.update({"dtype": data.dtype.str, "offset": offset, "nbytes": len(raw)})
+        buffers.append(raw)
+        offset += len(raw)
+        columns.append(spec)
+    return {"length": int(len(table)), "columns": columns}, offset
+
+
+def encode_binary(message: Dict[str, Any], *, compress: bool = False) -> bytes:
+    """将含 DataFrame 负载的消息编码为二进制帧体。"""
+    payload = message.get("payload")
+    buffers: List[bytes] = []
+    header = dict(message)
+    if is_frame_payload(payload):
+        body = {k: v for k, v in payload.items() if k != "frame"}
+        body["columnar"], _ = _encode_frame(payload["frame"], buffers, 0)
+        header["payload"] = body
+    data = b"".join(buffers)
+    flags = 0
+    if compress and len(data) >= COMPRESS_MIN_BYTES:
+        data = zlib.compress(data, 1)
+        flags |= FLAG_ZLIB
+    head = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    return MAGIC + bytes([flags]) + len(head).to_bytes(4, "big") + head + data
+
+
+def is_binary(body: bytes) -> bool:
+    return body[: len(MAGIC)] == MAGIC
+
+
+def _decode_frame(spec: Dict[str, Any], data: memoryview) -> pd.DataFrame:
+    length = int(spec.get("length") or 0)
+    columns: Dict[str, Any] = {}
+    for col in spec.get("columns") or []:
+        name = col["name"]
+        if "values" in col:
+            columns[name] = col["values"]
+            continue
+        start = int(col["offset"])
+        values = np.frombuffer(data[start:start + int(col["nbytes"])], dtype=np.dtype(col["dtype"]), count=length)
+        if col.get("tz"):
+            columns[name] = pd.DatetimeIndex(values).tz_localize("UTC").tz_convert(col["tz"])
+        else:
+            # frombuffer 得到只读视图，复制一份交给调用方自由修改
+            columns[name] = values.copy()
+    return pd.DataFrame(columns, columns=[c["name"] for c in spec.get("columns") or []])
+
+
+def decode_binary(body: bytes) -> Dict[str, Any]:
+    """解码二进制帧体；DataFrame 负载还原为 {"dtype": "dataframe", "columns": [...], "frame": DataFrame}。"""
+    flags = body[len(MAGIC)]
+    head_len = int.from_bytes(body[len(MAGIC) + 1:_PREFIX_SIZE], "big")
+    header = json.loads(body[_PREFIX_SIZE:_PREFIX_SIZE + head_len].decode("utf-8"))
+    data = body[_PREFIX_SIZE + head_len:]
+    if flags & FLAG_ZLIB:
+        data = zlib.decompress(data)
+    payload = header.get("payload")
+    if isinstance(payload, dict) and "columnar" in payload:
+        spec = payload.pop("columnar")
+        payload["frame"] = _decode_frame(spec, memoryview(data))
+        payload["columns"] = [c["name"] for c in spec.get("columns") or []]
+    return header
+
+
+__all__ = [
+    "FEATURE_COLUMNAR",
+    "FEATURE_STREAM",
+    "FEATURE_ZLIB",
+    "coerce_json_value",
+    "dataframe_records",
+    "decode_binary",
+    "encode_binary",
+    "frame_from_payload",
+    "is_binary",
+    "is_frame_payload",
+    "is_stream_summary",
+    "materialize",
+    "merge_frame_chunks",
+    "split_frame_payload",
+    "stream_summary",
+]
@@ -9,6 +9,7 @@ from typing import Dict, List, Optional
 from bullet_trade.utils.env_loader import (
     get_env,
     get_env_bool,
+    get_env_float,
     get_env_int,
     get_env_optional_bool,
 )
@@ -51,6 +52,9 @@ class ServerConfig:
     max_connections: int = 64
     heartbeat_enabled: bool = True
     max_subscriptions: int = 200
+    tick_interval: float = 1.0
+    tick_queue_size: int = 256
+    tick_push: bool = True
     allow_full_market: bool = False
     accounts: List[AccountConfig] = field(default_factory=list)
     sub_accounts: List[SubAccountConfig] = field(default_factory=list)
@@ -58,6 +62,9 @@ class ServerConfig:
     log_file: Optional[str] = None
     log_account_snapshot: bool = False
     access_log_enabled: bool = True
+    session_concurrency: int = 4
+    session_max_pending: int = 64
+    stream_chunk_rows: int = 50000
 
 
 def _split_items(raw: Optional[str]) -> List[str]:
@@ -169,6 +176,18 @@ def build_server_config(args) -> ServerConfig:
     if max_subscriptions is None:
         max_subscriptions = get_env_int("QMT_SERVER_MAX_SUBSCRIPTIONS", 200)
     allow_full_market = get_env_bool("QMT_SERVER_ALLOW_FULL_MARKET", False)
+    tick_interval = get_env_float("QMT_SERVER_TICK_INTERVAL", 1.0)
+    tick_queue_size = get_env_int("QMT_SERVER_TICK_QUEUE_SIZE", 256)
+    tick_push = get_env_bool("QMT_SERVER_TICK_PUSH", True)
+    session_concurrency = getattr(args, "session_concurrency", None)
+    if session_concurrency is None:
+        session_concurrency = get_env_int("QMT_SERVER_SESSION_CONCURRENCY", 4)
+    session_max_pending = getattr(args, "session_max_pending", None)
+    if session_max_pending is None:
+        session_max_pending = get_env_int("QMT_SERVER_SESSION_MAX_PENDING", 64)
+    stream_chunk_rows = getattr(args, "stream_chunk_rows", None)
+    if stream_chunk_rows is None:
+        stream_chunk_rows = get_env_int("QMT_SERVER_STREAM_CHUNK_ROWS", 50000)
     log_file = getattr(args, "log_file", None) or get_env("QMT_SERVER_LOG_FILE")
     log_account_snapshot = getattr(args, "log_account_snapshot", None)
     if log_account_snapshot is None:
@@ -222,6 +241,9 @@ def build_server_config(args) -> ServerConfig:
         max_connections=max_connections,
         heartbeat_enabled=getattr(args, "heartbeat_enabled", True),
         max_subscriptions=max_subscriptions,
+        tick_interval=max(0.2, float(tick_interval)),
+        tick_queue_size=max(1, int(tick_queue_size)),
+        tick_push=bool(tick_push),
         allow_full_market=allow_full_market,
         accounts=list(accounts_map.values()),
         sub_accounts=sub_accounts,
@@ -229,5 +251,8 @@ def build_server_config(args) -> ServerConfig:
         log_file=log_file,
         log_account_snapshot=bool(log_account_snapshot),
         access_log_enabled=bool(access_log_enabled),
+        session_concurrency=max(1, int(session_concurrency)),
+        session_max_pending=max(1, int(session_max_pending)),
+        stream_chunk_rows=max(0, int(stream_chunk_rows)),
     )
     return cfg
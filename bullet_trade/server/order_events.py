@@ -0,0 +1,94 @@
+"""
+订单状态推送
+
+客户端握手声明 ``order_events`` 特性后，该会话经 broker.place_order 提交的委托由服务端就近轮询状态
+（与券商同机，开销远小于客户端走网络轮询），状态变化时推送::
+
+    {"type": "event", "event": "order", "payload": {...状态快照, "order_id": ...}}
+
+直到订单进入终态、超出跟踪时长或会话关闭。客户端据此等待成交，无需再反复请求 broker.order_status。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from bullet_trade.core.globals import log
+
+from .adapters.base import AccountContext
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .session import ClientSession
+
+FEATURE_ORDER_EVENTS = "order_events"
+EVENT_ORDER = "order"
+TERMINAL_STATUSES = frozenset({"filled", "cancelled", "canceled", "rejected", "partly_canceled"})
+
+
+class OrderEventWatcher:
+    """按 (会话, 订单) 跟踪委托状态并推送变化，每个订单一个轻量任务。"""
+
+    def __init__(self, broker_adapter: Any, *, interval: float = 0.5, max_watch_seconds: float = 300.0) -> None:
+        self.broker_adapter = broker_adapter
+        self.interval = max(0.05, float(interval))
+        self.max_watch_seconds = max(self.interval, float(max_watch_seconds))
+        self._tasks: Dict[Tuple[str, str], "asyncio.Task[None]"] = {}
+
+    def watch(
+        self,
+        session: "ClientSession",
+        ctx: AccountContext,
+        order_id: str,
+        sub_account_id: Optional[str] = None,
+    ) -> None:
+        key = (session.session_id, str(order_id))
+        if key in self._tasks:
+            return
+        task = asyncio.create_task(self._run(session, ctx, str(order_id), sub_account_id))
+        self._tasks[key] = task
+        task.add_done_callback(lambda _t: self._tasks.pop(key, None))
+
+    def cancel_session(self, session: "ClientSession") -> None:
+        for (session_id, _), task in list(self._tasks.items()):
+            if session_id == session.session_id:
+                task.cancel()
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _run(
+        self,
+        session: "ClientSession",
+        ctx: AccountContext,
+        order_id: str,
+        sub_account_id: Optional[str],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_watch_seconds
+        last: Optional[Dict[str, Any]] = None
+        while loop.time() < deadline:
+            try:
+                status = await self.broker_adapter.get_order_status(ctx, order_id)
+            except Exception as exc:
+                log.debug(f"[ORDER_EVENT] 查询订单 {order_id} 状态失败: {exc}")
+                status = None
+            if isinstance(status, dict) and status:
+                snapshot = dict(status)
+                snapshot.setdefault("order_id", order_id)
+                if sub_account_id:
+                    snapshot["sub_account_id"] = sub_account_id
+                if snapshot != last:
+                    last = snapshot
+                    await session.send_event(EVENT_ORDER, snapshot)
+                if str(snapshot.get("status") or "").lower() in TERMINAL_STATUSES:
+                    return
+            await asyncio.sleep(self.interval)
+
+
+__all__ = ["EVENT_ORDER", "FEATURE_ORDER_EVENTS", "OrderEventWatcher", "TERMINAL_STATUSES"]
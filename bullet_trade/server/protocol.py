@@ -4,6 +4,8 @@ import asyncio
 import json
 from typing import Any, Dict
 
+from .columnar import decode_binary, encode_binary, is_binary, is_frame_payload, materialize
+
 HEADER_SIZE = 4
 MAX_FRAME_SIZE = 32 * 1024 * 1024  # 32MB
 
@@ -12,8 +14,15 @@ class ProtocolError(Exception):
     """Framing 或 JSON 解析异常"""
 
 
-def encode_message(message: Dict[str, Any]) -> bytes:
-    body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+def encode_message(message: Dict[str, Any], *, columnar: bool = False, compress: bool = False) -> bytes:
+    """
+    编码一帧消息。columnar=True（握手已协商）且负载为 DataFrame 时使用二进制列式编码，
+    否则使用 JSON（DataFrame 负载展开为 records）。
+    """
+    if columnar and is_frame_payload(message.get("payload")):
+        body = encode_binary(message, compress=compress)
+    else:
+        body = json.dumps(materialize(message), ensure_ascii=False).encode("utf-8")
     if len(body) > MAX_FRAME_SIZE:
         raise ProtocolError("消息过大")
     header = len(body).to_bytes(HEADER_SIZE, "big")
@@ -26,13 +35,24 @@ async def read_message(reader: asyncio.StreamReader) -> Dict[str, Any]:
     if size > MAX_FRAME_SIZE:
         raise ProtocolError(f"帧大小 {size} 超过限制 {MAX_FRAME_SIZE}")
     payload = await reader.readexactly(size)
+    if is_binary(payload):
+        try:
+            return decode_binary(payload)
+        except Exception as exc:
+            raise ProtocolError("二进制帧解析失败") from exc
     try:
         return json.loads(payload.decode("utf-8"))
     except json.JSONDecodeError as exc:
         raise ProtocolError("JSON 解析失败") from exc
 
 
-async def write_message(writer: asyncio.StreamWriter, message: Dict[str, Any]) -> None:
-    frame = encode_message(message)
+async def write_message(
+    writer: asyncio.StreamWriter,
+    message: Dict[str, Any],
+    *,
+    columnar: bool = False,
+    compress: bool = False,
+) -> None:
+    frame = encode_message(message, columnar=columnar, compress=compress)
     writer.write(frame)
     await writer.drain()
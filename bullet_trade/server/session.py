@@ -7,16 +7,45 @@ from typing import Any, Dict, Optional
 
 from bullet_trade.core.globals import log
 
+from .columnar import FEATURE_COLUMNAR, FEATURE_STREAM, FEATURE_ZLIB, split_frame_payload, stream_summary
+from .order_events import FEATURE_ORDER_EVENTS
 from .protocol import ProtocolError, read_message, write_message
 
 
+# 请求通道：
+# - trade:   broker.*，串行且保持到达顺序，不会排在数据查询之后
+# - control: 订阅/退订与 admin.*，串行保序（subscribe/unsubscribe 不能乱序）
+# - data:    其余数据查询，按 session_concurrency 并发执行
+LANE_TRADE = "trade"
+LANE_CONTROL = "control"
+LANE_DATA = "data"
+
+
+def request_lane(action: Optional[str]) -> str:
+    """根据 action 返回请求所属通道。"""
+    name = action or ""
+    if name.startswith("broker."):
+        return LANE_TRADE
+    if name.startswith("admin.") or name.startswith("data.subscribe") or name.startswith("data.unsubscribe"):
+        return LANE_CONTROL
+    return LANE_DATA
+
+
 class ClientSession:
     """
     维护单个 TCP 连接的状态：握手、请求处理、事件推送等。
+
+    请求按到达顺序读取后立即派发为独立任务，响应按 request id 回传（客户端已按 id 关联），
+    慢数据查询不会阻塞同一连接上的下单/撤单。未完成请求数达到 session_max_pending 时暂停读取，
+    由 TCP 向客户端施加背压。
     """
 
     # 请求超时时间（秒），超过此时间未完成的请求会被取消
     REQUEST_TIMEOUT = 60.0
+    # 数据通道默认并发数、单会话未完成请求上限（可由 ServerConfig 覆盖）
+    DEFAULT_CONCURRENCY = 4
+    DEFAULT_MAX_PENDING = 64
+    DEFAULT_STREAM_CHUNK_ROWS = 50000
 
     def __init__(self, app: "ServerApplication", reader: asyncio.StreamReader, writer: asyncio.StreamWriter, peername: str):
         self.app = app
@@ -27,10 +56,28 @@ class ClientSession:
         self.account_key: Optional[str] = None
         self.sub_account_id: Optional[str] = None
         self.features = {}
+        # 握手协商的 DataFrame 编码：双方都支持 columnar 时用二进制列式，否则 JSON records
+        self.columnar = False
+        self.compress = False
+        # 握手协商 stream 后，大 DataFrame 响应按 stream_chunk_rows 分块发送
+        self.stream = False
+        # 握手协商 order_events 后，本会话下的委托状态变化以 order 事件推送
+        self.order_events = False
         self._active = False
         self._send_lock = asyncio.Lock()
         self._last_ping = time.time()
-        self._current_request: Optional[str] = None  # 当前正在处理的请求 action
+        config = getattr(app, "config", None)
+        concurrency = int(getattr(config, "session_concurrency", 0) or self.DEFAULT_CONCURRENCY)
+        max_pending = int(getattr(config, "session_max_pending", 0) or self.DEFAULT_MAX_PENDING)
+        chunk_rows = getattr(config, "stream_chunk_rows", None)
+        self.stream_chunk_rows = int(self.DEFAULT_STREAM_CHUNK_ROWS if chunk_rows is None else chunk_rows)
+        self._lanes = {
+            LANE_TRADE: asyncio.Semaphore(1),
+            LANE_CONTROL: asyncio.Semaphore(1),
+            LANE_DATA: asyncio.Semaphore(max(1, concurrency)),
+        }
+        self._pending_slots = asyncio.Semaphore(max(1, max_pending))
+        self._inflight: Dict["asyncio.Task[None]", Optional[str]] = {}  # 未完成请求 -> action
 
     async def run(self) -> None:
         try:
@@ -56,13 +103,26 @@ class ClientSession:
             raise ProtocolError("token 不匹配")
         client_features = message.get("features") or []
         self.features["client"] = client_features
+        self.columnar = FEATURE_COLUMNAR in client_features
+        self.compress = self.columnar and FEATURE_ZLIB in client_features
+        self.stream = FEATURE_STREAM in client_features and self.stream_chunk_rows > 0
+        self.order_events = FEATURE_ORDER_EVENTS in client_features and getattr(self.app, "order_watcher", None) is not None
         self.account_key = message.get("account_key")
         self.sub_account_id = message.get("sub_account_id")
+        features = list(self.app.active_features())
+        if self.columnar:
+            features.append(FEATURE_COLUMNAR)
+        if self.compress:
+            features.append(FEATURE_ZLIB)
+        if self.stream:
+            features.append(FEATURE_STREAM)
+        if self.order_events:
+            features.append(FEATURE_ORDER_EVENTS)
         ack = {
             "type": "handshake_ack",
             "session_id": self.session_id,
             "keepalive": 20,
-            "features": self.app.active_features(),
+            "features": features,
         }
         try:
             self.app.register_session(self)
@@ -83,10 +143,23 @@ class ClientSession:
             if msg_type != "request":
                 await self._send_error(message.get("id"), "UNSUPPORTED", f"不支持的消息类型 {msg_type}")
                 continue
-            request_id = message.get("id")
-            action = message.get("action")
-            payload = message.get("payload") or {}
-            self._current_request = action
+            # 背压：未完成请求达到上限时暂停读取，直到有请求完成
+            await self._pending_slots.acquire()
+            task = asyncio.create_task(self._process_request(message))
+            self._inflight[task] = message.get("action")
+            task.add_done_callback(self._on_request_done)
+
+    def _on_request_done(self, task: "asyncio.Task[None]") -> None:
+        self._inflight.pop(task, None)
+        self._pending_slots.release()
+        if not task.cancelled() and task.exception() is not None:
+            log.error(f"[SESSION] {self.session_id} 请求处理异常: {task.exception()}")
+
+    async def _process_request(self, message: Dict[str, Any]) -> None:
+        request_id = message.get("id")
+        action = message.get("action")
+        payload = message.get("payload") or {}
+        async with self._lanes[request_lane(action)]:
             start = time.time()
             try:
                 # 使用 asyncio.wait_for 添加超时控制
@@ -108,13 +181,24 @@ class ClientSession:
                 elapsed = time.time() - start
                 self.app.log_access(self, action, payload, "ok", elapsed, request_id=request_id)
                 await self._send_response(request_id, result)
-            finally:
-                self._current_request = None
 
     async def _send_response(self, request_id: Optional[str], payload: Any) -> None:
         if request_id is None:
             return
-        await self._safe_send({"type": "response", "id": request_id, "payload": payload})
+        chunks = split_frame_payload(payload, self.stream_chunk_rows) if self.stream else None
+        if chunks is None:
+            await self._safe_send(
+                {"type": "response", "id": request_id, "payload": payload},
+                columnar=self.columnar,
+            )
+            return
+        # 逐块发送，块之间释放发送锁，其他请求（如下单回报）可以插入
+        for seq, chunk in enumerate(chunks):
+            await self._safe_send(
+                {"type": "chunk", "id": request_id, "seq": seq, "payload": chunk},
+                columnar=self.columnar,
+            )
+        await self._safe_send({"type": "response", "id": request_id, "payload": stream_summary(chunks)})
 
     async def _send_error(self, request_id: Optional[str], code: str, message: str) -> None:
         body = {"type": "error", "code": code, "message": message}
@@ -131,11 +215,11 @@ class ClientSession:
             return
         await self._safe_send({"type": "event", "event": event, "payload": payload})
 
-    async def _safe_send(self, message: Dict[str, Any]) -> None:
+    async def _safe_send(self, message: Dict[str, Any], *, columnar: bool = False) -> None:
         if self.writer.is_closing():
             return
         async with self._send_lock:
-            await write_message(self.writer, message)
+            await write_message(self.writer, message, columnar=columnar, compress=self.compress)
 
     async def close(self) -> None:
         if not self._active:
@@ -146,9 +230,11 @@ class ClientSession:
                 except Exception:
                     pass
             return
-        current_req = self._current_request
-        if current_req:
-            log.warning(f"[SESSION] {self.session_id} 关闭时仍有请求在处理: {current_req}")
+        if self._inflight:
+            pending = ", ".join(sorted({str(action) for action in self._inflight.values()}))
+            log.warning(f"[SESSION] {self.session_id} 关闭时仍有 {len(self._inflight)} 个请求在处理: {pending}")
+            for task in list(self._inflight):
+                task.cancel()
         self._active = False
         await self.app.unregister_session(self)
         try:
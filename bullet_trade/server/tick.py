@@ -1,32 +1,100 @@
 from __future__ import annotations
 
 import asyncio
-from collections import defaultdict
-from typing import Dict, Iterable, Optional, Set
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
 
 from bullet_trade.core.globals import log
 
+# 不支持批量接口时，单轮逐个拉取 tick 的并发上限
+_POLL_CONCURRENCY = 8
+# 推送模式下，超过该轮数未收到推送的标的回退为轮询
+_PUSH_STALE_INTERVALS = 3
+
+
+class _SessionOutbox:
+    """
+    单个会话的 tick 发送队列：有界，满时丢弃最旧的 tick，由一个后台任务按序发送，
+    慢客户端只会丢行情，不会让服务端内存随积压增长。
+    """
+
+    def __init__(self, session: "ClientSession", maxlen: int) -> None:
+        self.session = session
+        self.queue: Deque[Dict[str, Any]] = deque(maxlen=max(1, int(maxlen)))
+        self.dropped = 0
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._drain(), name="tick-outbox")
+
+    def put(self, payload: Dict[str, Any]) -> None:
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                log.warning(f"Tick 推送积压，会话 {getattr(self.session, 'session_id', '?')} 已丢弃 {self.dropped} 条旧 tick")
+        self.queue.append(payload)
+        self._ready.set()
+
+    async def close(self) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _drain(self) -> None:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self.queue:
+                payload = self.queue.popleft()
+                try:
+                    await self.session.send_event("tick", payload)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    log.debug(f"推送 tick 失败: {exc}")
+
 
 class TickSubscriptionManager:
     """
-    简单的轮询式 tick 分发器：为订阅过的标的定期拉取最新行情并推送给 session。
+    tick 分发器：为订阅过的标的获取最新行情并推送给 session。
+
+    - 数据适配器支持 xtdata 推送（subscribe_tick_push）时由回调驱动，仅对连续
+      _PUSH_STALE_INTERVALS 个周期没有推送的标的补充轮询；否则每个周期一次批量
+      get_current_ticks（不支持时按有限并发逐个 get_current_tick）
+    - 与上次推送相同的 tick 不重复发送；新订阅的会话先收到已缓存的最新 tick
+    - 每个会话一个有界队列（queue_size），满时丢弃最旧 tick
     """
 
-    def __init__(self, data_adapter, interval: float = 1.0, max_subscriptions: int = 200) -> None:
+    def __init__(
+        self,
+        data_adapter,
+        interval: float = 1.0,
+        max_subscriptions: int = 200,
+        *,
+        queue_size: int = 256,
+        push: bool = True,
+    ) -> None:
         self.data_adapter = data_adapter
         self.interval = max(interval, 0.2)
         self.max_subscriptions = max_subscriptions
+        self.queue_size = max(1, int(queue_size))
+        self.push_enabled = bool(push) and hasattr(data_adapter, "subscribe_tick_push")
         self._session_symbols: Dict["ClientSession", Set[str]] = defaultdict(set)
         self._symbol_sessions: Dict[str, Set["ClientSession"]] = defaultdict(set)
+        self._outboxes: Dict["ClientSession", _SessionOutbox] = {}
+        self._last_ticks: Dict[str, Dict[str, Any]] = {}
+        self._last_push: Dict[str, float] = {}
         self._lock = asyncio.Lock()
         self._task: Optional[asyncio.Task] = None
         self._running = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     async def start(self) -> None:
         if self._task:
             return
+        self._loop = asyncio.get_running_loop()
         self._running.set()
-        self._task = asyncio.create_task(self._loop(), name="tick-loop")
+        self._task = asyncio.create_task(self._loop_poll(), name="tick-loop")
 
     async def stop(self) -> None:
         self._running.clear()
@@ -37,6 +105,11 @@ class TickSubscriptionManager:
             except asyncio.CancelledError:
                 pass
             self._task = None
+        if self.push_enabled and self._symbol_sessions:
+            await self._unsubscribe_push(list(self._symbol_sessions))
+        for outbox in list(self._outboxes.values()):
+            await outbox.close()
+        self._outboxes.clear()
 
     async def subscribe(self, session: "ClientSession", symbols: Iterable[str]) -> Dict[str, int]:
         cleaned = {s.strip().upper() for s in symbols if s}
@@ -46,10 +119,25 @@ class TickSubscriptionManager:
             current = self._session_symbols.get(session, set())
             if len(current) + len(cleaned - current) > self.max_subscriptions:
                 raise ValueError(f"订阅数量超过上限 {self.max_subscriptions}")
+            added = [symbol for symbol in cleaned if symbol not in self._symbol_sessions]
+            fresh = cleaned - current
             for symbol in cleaned:
                 self._symbol_sessions[symbol].add(session)
             current.update(cleaned)
             self._session_symbols[session] = current
+            outbox = self._outboxes.get(session)
+            if outbox is None:
+                outbox = self._outboxes[session] = _SessionOutbox(session, self.queue_size)
+            # 其他会话已在跟踪的标的，行情不变时不会再推送，这里先补发缓存
+            for symbol in fresh:
+                tick = self._last_ticks.get(symbol)
+                if tick:
+                    outbox.put({"symbol": symbol, **tick})
+            if added and self.push_enabled:
+                now = asyncio.get_running_loop().time()
+                for symbol in added:
+                    self._last_push[symbol] = now
+                await self._subscribe_push(added)
         return {"count": len(current)}
 
     async def unsubscribe(self, session: "ClientSession", symbols: Optional[Iterable[str]] = None) -> Dict[str, int]:
@@ -60,6 +148,7 @@ class TickSubscriptionManager:
             if symbols is None:
                 symbols = list(current)
             removed = 0
+            emptied: List[str] = []
             for symbol in symbols:
                 symbol = symbol.strip().upper()
                 if symbol in current:
@@ -69,19 +158,76 @@ class TickSubscriptionManager:
                         bucket.remove(session)
                         if not bucket:
                             self._symbol_sessions.pop(symbol, None)
+                            self._last_ticks.pop(symbol, None)
+                            self._last_push.pop(symbol, None)
+                            emptied.append(symbol)
                     removed += 1
             if not current:
                 self._session_symbols.pop(session, None)
+                outbox = self._outboxes.pop(session, None)
+                if outbox is not None:
+                    await outbox.close()
+            if emptied and self.push_enabled:
+                await self._unsubscribe_push(emptied)
             return {"count": len(current), "removed": removed}
 
     async def remove_session(self, session: "ClientSession") -> None:
         await self.unsubscribe(session, None)
 
-    async def _loop(self) -> None:
+    def publish(self, ticks: Dict[str, Dict[str, Any]]) -> None:
+        """把 {标的: tick} 分发到订阅会话的发送队列（需在事件循环线程调用）。"""
+        for symbol, tick in ticks.items():
+            if not tick:
+                continue
+            sessions = self._symbol_sessions.get(symbol)
+            if not sessions:
+                continue
+            if self._last_ticks.get(symbol) == tick:
+                continue
+            self._last_ticks[symbol] = tick
+            payload = {"symbol": symbol, **tick}
+            for sess in sessions:
+                outbox = self._outboxes.get(sess)
+                if outbox is not None:
+                    outbox.put(payload)
+
+    def _on_push(self, ticks: Dict[str, Dict[str, Any]]) -> None:
+        # 运行在 xtquant 回调线程
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._publish_pushed, ticks)
+        except RuntimeError:
+            pass
+
+    def _publish_pushed(self, ticks: Dict[str, Dict[str, Any]]) -> None:
+        now = asyncio.get_running_loop().time()
+        for symbol in ticks:
+            if symbol in self._symbol_sessions:
+                self._last_push[symbol] = now
+        self.publish(ticks)
+
+    async def _subscribe_push(self, symbols: List[str]) -> None:
+        try:
+            await self.data_adapter.subscribe_tick_push(symbols, self._on_push)
+        except Exception as exc:
+            log.warning(f"订阅 tick 推送失败，改为轮询: {exc}")
+            self.push_enabled = False
+
+    async def _unsubscribe_push(self, symbols: List[str]) -> None:
+        try:
+            await self.data_adapter.unsubscribe_tick_push(symbols)
+        except Exception as exc:
+            log.debug(f"退订 tick 推送失败: {exc}")
+
+    async def _loop_poll(self) -> None:
         try:
             while self._running.is_set():
                 await asyncio.sleep(self.interval)
                 symbols = list(self._symbol_sessions.keys())
+                if self.push_enabled:
+                    symbols = self._stale_push_symbols(symbols)
                 if not symbols:
                     continue
                 await self._poll(symbols)
@@ -90,21 +236,33 @@ class TickSubscriptionManager:
         except Exception as exc:  # pragma: no cover - log unexpected
             log.error(f"Tick 循环异常: {exc}")
 
-    async def _poll(self, symbols: Iterable[str]) -> None:
-        for symbol in symbols:
-            sessions = list(self._symbol_sessions.get(symbol) or [])
-            if not sessions:
-                continue
+    def _stale_push_symbols(self, symbols: List[str]) -> List[str]:
+        deadline = asyncio.get_running_loop().time() - self.interval * _PUSH_STALE_INTERVALS
+        return [symbol for symbol in symbols if self._last_push.get(symbol, 0.0) <= deadline]
+
+    async def _poll(self, symbols: List[str]) -> None:
+        batch_fn = getattr(self.data_adapter, "get_current_ticks", None)
+        if batch_fn is not None:
             try:
-                tick = await self.data_adapter.get_current_tick(symbol)
+                ticks = await batch_fn(symbols)
             except Exception as exc:
-                log.warning(f"拉取 tick {symbol} 失败: {exc}")
-                continue
-            if not tick:
-                continue
-            payload = {"symbol": symbol, **tick}
-            for sess in sessions:
-                asyncio.create_task(sess.send_event("tick", payload))
+                log.warning(f"批量拉取 tick 失败: {exc}")
+                return
+            self.publish(ticks or {})
+            return
+
+        semaphore = asyncio.Semaphore(_POLL_CONCURRENCY)
+
+        async def _fetch(symbol: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self.data_adapter.get_current_tick(symbol)
+                except Exception as exc:
+                    log.warning(f"拉取 tick {symbol} 失败: {exc}")
+                    return None
+
+        results = await asyncio.gather(*(_fetch(symbol) for symbol in symbols))
+        self.publish({symbol: tick for symbol, tick in zip(symbols, results) if tick})
 
 
 # 用于静态类型提示，避免循环导入
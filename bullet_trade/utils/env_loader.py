@@ -162,6 +162,8 @@ def get_data_provider_config() -> dict:
             'token': get_env('TUSHARE_TOKEN'),
             'cache_dir': cache_dir_for('tushare'),
             'tushare_custom_url': get_env('TUSHARE_CUSTOM_URL'),
+            'fetch_workers': get_env_int('TUSHARE_FETCH_WORKERS', 1),
+            'fetch_rate_limit': get_env_float('TUSHARE_FETCH_RATE_LIMIT', 0.0),
         },
         'qmt': {
             'data_dir': get_env('QMT_DATA_PATH'),
@@ -170,6 +172,8 @@ def get_data_provider_config() -> dict:
             'cache_dir': cache_dir_for('miniqmt'),
             'tushare_token': get_env('TUSHARE_TOKEN'),
             'tushare_custom_url': get_env('TUSHARE_CUSTOM_URL'),
+            'fetch_workers': get_env_int('MINIQMT_FETCH_WORKERS', 1),
+            'fetch_rate_limit': get_env_float('MINIQMT_FETCH_RATE_LIMIT', 0.0),
         },
         'remote_qmt': {
             'host': get_env('QMT_SERVER_HOST'),
@@ -218,6 +222,10 @@ def get_system_config() -> dict:
         配置字典，包含：
         - log_level: 控制台日志级别（默认 INFO）
         - log_file_level: 文件日志级别（默认跟随 log_level）
+        - log_file_async: 文件日志是否经后台线程异步写入（默认 True）
+        - log_day_banner: 回测逐日日志模式，full 每日输出横幅，summary 只输出阶段进度（默认 full）
+        - results_spill_dir: 回测结果记录的落盘目录（默认空，不落盘）
+        - results_spill_rows: 每累计多少行落盘一块（默认 500000）
     """
     log_level = get_env('LOG_LEVEL', 'INFO')
     # LOG_FILE_LEVEL 未设置时，跟随 LOG_LEVEL
@@ -226,6 +234,10 @@ def get_system_config() -> dict:
         'log_dir': get_env('LOG_DIR', './logs'),
         'log_level': log_level,
         'log_file_level': log_file_level,
+        'log_file_async': get_env_bool('LOG_FILE_ASYNC', True),
+        'log_day_banner': (get_env('LOG_DAY_BANNER', 'full') or 'full').strip().lower(),
+        'results_spill_dir': get_env('BACKTEST_SPILL_DIR', '') or '',
+        'results_spill_rows': get_env_int('BACKTEST_SPILL_ROWS', 500000),
     }
 
 
@@ -275,12 +287,16 @@ def get_live_trade_config() -> dict:
 
     - tick_sync_interval / enabled: Tick 轮询间隔及开关（默认 2 / True）
 
+    - tick_batch_enabled: 轮询模式下每轮以 {标的: tick} 一次性调用 handle_tick（默认 False 逐个调用）
+
     - risk_check_interval / enabled: 风控后台任务（默认 300 / True）
 
     - broker_heartbeat_interval: 券商心跳检测间隔（默认 30）
 
     - runtime_dir: 运行时持久化目录（默认 './runtime'）
 
+    - order_concurrency: 实盘单批委托并发数（默认 1 逐笔提交；>1 时先卖后买、买单按资金预留并发提交）
+
     """
 
     return {
@@ -309,6 +325,7 @@ def get_live_trade_config() -> dict:
 
         'tick_sync_interval': get_env_int('TICK_SYNC_INTERVAL', 2),
         'tick_sync_enabled': get_env_bool('TICK_SYNC_ENABLED', True),
+        'tick_batch_enabled': get_env_bool('TICK_BATCH_ENABLED', False),
         'risk_check_interval': get_env_int('RISK_CHECK_INTERVAL', 300),
         'risk_check_enabled': get_env_bool('RISK_CHECK_ENABLED', False),
         'calendar_skip_weekend': get_env_bool('CALENDAR_SKIP_WEEKEND', True),
@@ -316,6 +333,7 @@ def get_live_trade_config() -> dict:
         'broker_heartbeat_interval': get_env_int('BROKER_HEARTBEAT_INTERVAL', 30),
         'runtime_dir': get_env('RUNTIME_DIR', './runtime'),
         'portfolio_refresh_throttle_ms': get_env_int('PORTFOLIO_REFRESH_THROTTLE_MS', 200),
+        'order_concurrency': get_env_int('ORDER_CONCURRENCY', 1),
         # 市价保护价默认 ±1.5%（可被 .env 覆盖）
         'market_buy_price_percent': get_env_float('MARKET_BUY_PRICE_PERCENT', 0.015),
         'market_sell_price_percent': get_env_float('MARKET_SELL_PRICE_PERCENT', -0.015),
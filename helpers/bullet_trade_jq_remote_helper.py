@@ -1,5 +1,5 @@
 """
-聚宽远程辅助模块（短连接版）
+聚宽远程辅助模块（短连接 / 常驻连接）
 
 使用方法：
 1. 将本文件复制到聚宽研究环境根目录；
@@ -11,19 +11,25 @@
    bt.cancel_order(oid)
 
 特点：
-- 每次调用都会重新建立 TCP 连接，适合聚宽频繁重启。
+- 默认每次调用都会重新建立 TCP 连接，适合聚宽频繁重启。
+- configure(..., persistent=True) 启用常驻连接：握手一次后复用连接，断线自动重连；
+  批量请求走流水线（get_order_statuses），等待成交改为接收服务端推送的订单事件，不再逐秒轮询。
 - 服务端统一处理：最小手数/步进取整、停牌检查、价格笼子、涨跌停校验、可卖数量检查。
 - 支持同步/异步：wait_timeout>0 时轮询订单状态，否则立即返回。
 - 提供 account/positions/order_status/orders/cancel/order_value/order_target 等常见聚宽风格 API。
 """
 
+import itertools
 import json
 import os
+import select
 import socket
 import ssl
 import struct
+import threading
 import time
-from typing import Any, Callable, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 
@@ -31,6 +37,15 @@ _CLIENT: Optional["_ShortLivedClient"] = None
 _DATA_CLIENT: Optional["RemoteDataClient"] = None
 _BROKER_CLIENT: Optional["RemoteBrokerClient"] = None
 
+_FEATURE_ORDER_EVENTS = "order_events"
+_TERMINAL_STATUSES = frozenset({"filled", "cancelled", "canceled", "rejected", "partly_canceled"})
+# 发出后结果未知时不自动重发的请求（避免重复委托）
+_NO_RESEND_ACTIONS = frozenset({"broker.place_order"})
+# 常驻连接缓存的订单事件上限（超出丢弃最早的订单）
+_ORDER_STATUS_LIMIT = 1024
+# wait_order 单次持锁等待的最长时间，期间其他线程可在间隙发起请求
+_WAIT_SLICE = 0.2
+
 
 def configure(
     host: str,
@@ -43,12 +58,19 @@ def configure(
     retries: int = 2,
     retry_interval: float = 0.5,
     rpc_timeout: float = 60.0,
+    persistent: bool = False,
 ) -> None:
     """
-    初始化远程访问参数；聚宽环境无法常驻进程，因此每次调用都会短连接访问。
+    初始化远程访问参数。
+
+    聚宽环境无法常驻进程，默认每次调用都会短连接访问；persistent=True 时改用常驻连接
+    （进程内复用、自动重连、订单状态由服务端推送），适合盘中持续运行的策略。
     """
     global _CLIENT, _DATA_CLIENT, _BROKER_CLIENT
-    _CLIENT = _ShortLivedClient(
+    if isinstance(_CLIENT, _PersistentClient):
+        _CLIENT.close()
+    client_cls = _PersistentClient if persistent else _ShortLivedClient
+    _CLIENT = client_cls(
         host,
         port,
         token,
@@ -387,8 +409,25 @@ class RemoteBrokerClient:
             self._wait_order(order.order_id, wait_timeout)
         return order
 
+    def get_order_statuses(self, order_ids: List[str]) -> List[Dict[str, Any]]:
+        """批量查询订单状态：同一连接流水线发送，结果顺序与 order_ids 一致。"""
+        calls = []
+        for order_id in order_ids:
+            payload = self._base_payload()
+            payload["order_id"] = order_id
+            calls.append(("broker.order_status", payload))
+        return self._client.request_many(calls)
+
     def _wait_order(self, order_id: str, timeout: float) -> None:
         start = time.time()
+        waiter = getattr(self._client, "wait_order", None)
+        if callable(waiter) and getattr(self._client, "order_events", False):
+            # 常驻连接：等待服务端推送的订单事件；连接中断时回退到轮询
+            try:
+                waiter(order_id, timeout)
+                return
+            except Exception:
+                pass
         interval = 1.0
         while time.time() - start < timeout:
             try:
@@ -439,31 +478,22 @@ class _ShortLivedClient:
         self.retries = max(0, retries)
         self.retry_interval = max(0.1, float(retry_interval))
         self.rpc_timeout = max(5.0, float(rpc_timeout))
+        self.server_features: List[str] = []
 
     def request(self, action: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self.request_many([(action, payload)])[0]
+
+    def request_many(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """同一连接上依次发送多个请求（一次握手），结果顺序与 calls 一致。"""
+        if not calls:
+            return []
         last_error: Optional[Exception] = None
         attempts = self.retries + 1
         for i in range(attempts):
             sock: Optional[socket.socket] = None
             try:
-                sock = socket.create_connection((self.host, self.port), timeout=10)
-                if self.tls_cert:
-                    context = ssl.create_default_context(cafile=self.tls_cert)
-                    sock = context.wrap_socket(sock, server_hostname=self.host)
-                sock.settimeout(self.rpc_timeout)
-                self._send(sock, {"type": "handshake", "protocol": 1, "token": self.token, "features": []})
-                ack = self._recv(sock)
-                if ack.get("type") != "handshake_ack":
-                    raise RuntimeError("远程服务拒绝握手")
-                req_id = str(id(payload) ^ int.from_bytes(os.urandom(4), "big"))
-                self._send(sock, {"type": "request", "id": req_id, "action": action, "payload": payload})
-                while True:
-                    message = self._recv(sock)
-                    msg_type = message.get("type")
-                    if msg_type == "response" and message.get("id") == req_id:
-                        return message.get("payload") or {}
-                    if msg_type == "error":
-                        raise RuntimeError(message.get("message", "server error"))
+                sock = self._open()
+                return _exchange(sock, calls)
             except Exception as exc:
                 last_error = exc
                 time.sleep(self.retry_interval)
@@ -475,11 +505,27 @@ class _ShortLivedClient:
                         pass
         raise last_error or RuntimeError("远程请求失败")
 
+    def _open(self, features: Optional[List[str]] = None) -> socket.socket:
+        """建立连接并完成握手，返回可用 socket；失败时关闭连接并抛出异常。"""
+        sock = socket.create_connection((self.host, self.port), timeout=10)
+        try:
+            if self.tls_cert:
+                context = ssl.create_default_context(cafile=self.tls_cert)
+                sock = context.wrap_socket(sock, server_hostname=self.host)
+            sock.settimeout(self.rpc_timeout)
+            self._send(sock, {"type": "handshake", "protocol": 1, "token": self.token, "features": list(features or [])})
+            ack = self._recv(sock)
+            if ack.get("type") != "handshake_ack":
+                raise RuntimeError("远程服务拒绝握手")
+        except Exception:
+            sock.close()
+            raise
+        self.server_features = list(ack.get("features") or [])
+        return sock
+
     @staticmethod
     def _send(sock: socket.socket, message: Dict[str, Any]) -> None:
-        body = json.dumps(message, ensure_ascii=False).encode("utf-8")
-        header = struct.pack(">I", len(body))
-        sock.sendall(header + body)
+        sock.sendall(_encode_frame(message))
 
     @staticmethod
     def _recv(sock: socket.socket) -> Dict[str, Any]:
@@ -499,6 +545,187 @@ class _ShortLivedClient:
         return buf
 
 
+class _PersistentClient(_ShortLivedClient):
+    """
+    常驻连接客户端：握手一次后复用同一连接，适合能长期运行的策略进程。
+
+    - 请求按 id 关联，request_many 一次写出多个请求再收齐响应（流水线）
+    - 连接断开或空闲超过 keepalive 后探活失败时自动重连；下单请求一旦发出不自动重发，避免重复委托
+    - 服务端支持 order_events 时，委托状态变化由服务端推送，wait_order 直接等待事件而非轮询
+    """
+
+    def __init__(self, *args: Any, keepalive: float = 20.0, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.keepalive = max(1.0, float(keepalive))
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.RLock()
+        self._last_io = 0.0
+        self._seq = itertools.count(1)
+        self._order_status: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.order_events = False
+
+    def request_many(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        if not calls:
+            return []
+        with self._lock:
+            last_error: Optional[Exception] = None
+            for i in range(self.retries + 1):
+                sent = False
+                try:
+                    sock = self._connection()
+                    sent = True
+                    results = _exchange(sock, calls, on_event=self._on_event, next_id=self._next_id)
+                    self._last_io = time.monotonic()
+                    return results
+                except _RemoteError:
+                    self._last_io = time.monotonic()
+                    raise
+                except Exception as exc:
+                    last_error = exc
+                    self.close()
+                    if sent and any(action in _NO_RESEND_ACTIONS for action, _ in calls):
+                        break
+                    time.sleep(self.retry_interval)
+            raise last_error or RuntimeError("远程请求失败")
+
+    def wait_order(self, order_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        等待服务端推送的订单事件直到终态，返回最终状态；超时返回 None。
+        未协商 order_events 时返回 None，由调用方回退到轮询；连接中断时抛出异常。
+        """
+        deadline = time.monotonic() + max(0.0, float(timeout))
+        while True:
+            with self._lock:
+                status = self._order_status.get(order_id)
+                if status and _is_terminal(status):
+                    return self._order_status.pop(order_id)
+                remaining = deadline - time.monotonic()
+                if not self.order_events or self._sock is None or remaining <= 0:
+                    self._order_status.pop(order_id, None)
+                    return None
+                sock = self._sock
+                # 每次最多等待一个时间片即释放锁，其他线程的请求不会被整个 timeout 阻塞
+                try:
+                    pending = sock.pending() if isinstance(sock, ssl.SSLSocket) else 0
+                    readable: List[Any] = []
+                    if not pending:
+                        readable, _, _ = select.select([sock], [], [], min(remaining, _WAIT_SLICE))
+                    message = self._recv(sock) if pending or readable else None
+                except Exception:
+                    self.close()
+                    raise
+                if message is not None:
+                    self._last_io = time.monotonic()
+                    if message.get("type") == "event":
+                        self._on_event(message)
+            # 让出锁，给等待中的请求线程机会
+            time.sleep(0)
+
+    def close(self) -> None:
+        with self._lock:
+            sock, self._sock = self._sock, None
+            self.order_events = False
+            if sock:
+                try:
+                    sock.close()
+                except Exception:
+                    pass
+
+    def _connection(self) -> socket.socket:
+        sock = self._sock
+        if sock is not None and time.monotonic() - self._last_io > self.keepalive:
+            # 长时间空闲的连接可能已被网络设备回收，先探活
+            try:
+                _exchange(sock, [], on_event=self._on_event, ping_id=self._next_id())
+            except Exception:
+                self.close()
+                sock = None
+        if sock is None:
+            sock = self._open([_FEATURE_ORDER_EVENTS])
+            self._sock = sock
+            self.order_events = _FEATURE_ORDER_EVENTS in self.server_features
+            self._order_status.clear()
+        self._last_io = time.monotonic()
+        return sock
+
+    def _on_event(self, message: Dict[str, Any]) -> None:
+        if message.get("event") != "order":
+            return
+        payload = message.get("payload") or {}
+        order_id = payload.get("order_id")
+        if order_id:
+            key = str(order_id)
+            self._order_status[key] = payload
+            self._order_status.move_to_end(key)
+            while len(self._order_status) > _ORDER_STATUS_LIMIT:
+                self._order_status.popitem(last=False)
+
+    def _next_id(self) -> str:
+        return f"p{next(self._seq)}"
+
+
+class _RemoteError(RuntimeError):
+    """服务端返回的 error 消息（连接本身仍可用）。"""
+
+
+def _is_terminal(status: Dict[str, Any]) -> bool:
+    return str(status.get("status") or "").lower() in _TERMINAL_STATUSES
+
+
+def _exchange(
+    sock: socket.socket,
+    calls: List[Tuple[str, Dict[str, Any]]],
+    *,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    next_id: Optional[Callable[[], str]] = None,
+    ping_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    流水线收发：先一次性写出全部请求（或一个 ping），再读取直到每个请求都有响应。
+    期间收到的事件交给 on_event；任一请求失败时抛出 _RemoteError（其余响应已读完，连接可继续使用）。
+    """
+    make_id = next_id or (lambda: os.urandom(6).hex())
+    ids = [make_id() for _ in calls]
+    frames = [{"type": "request", "id": rid, "action": action, "payload": payload} for rid, (action, payload) in zip(ids, calls)]
+    if ping_id is not None:
+        frames.append({"type": "ping", "id": ping_id})
+    sock.sendall(b"".join(_encode_frame(frame) for frame in frames))
+    waiting = set(ids)
+    if ping_id is not None:
+        waiting.add(ping_id)
+    results: Dict[str, Any] = {}
+    while waiting:
+        message = _ShortLivedClient._recv(sock)
+        msg_type = message.get("type")
+        msg_id = message.get("id")
+        if msg_type == "event":
+            if on_event:
+                on_event(message)
+            continue
+        if msg_id not in waiting:
+            if msg_type == "error" and msg_id is None:
+                raise _RemoteError(message.get("message", "server error"))
+            continue
+        if msg_type == "response":
+            results[msg_id] = message.get("payload") or {}
+        elif msg_type == "error":
+            results[msg_id] = _RemoteError(message.get("message", "server error"))
+        elif msg_type == "pong":
+            results[msg_id] = {}
+        else:
+            continue
+        waiting.discard(msg_id)
+    for rid in ids:
+        if isinstance(results[rid], Exception):
+            raise results[rid]
+    return [results[rid] for rid in ids]
+
+
+def _encode_frame(message: Dict[str, Any]) -> bytes:
+    body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    return struct.pack(">I", len(body)) + body
+
+
 # --------- 工具函数 ----------
 def _df_from_payload(payload: Dict[str, Any]) -> pd.DataFrame:
     if not payload or payload.get("dtype") != "dataframe":
@@ -533,6 +760,10 @@ def get_order_status(order_id: str) -> Dict[str, Any]:
     return get_broker_client().get_order_status(order_id)
 
 
+def get_order_statuses(order_ids: List[str]) -> List[Dict[str, Any]]:
+    return get_broker_client().get_order_statuses(order_ids)
+
+
 def get_open_orders() -> List[Dict[str, Any]]:
     return get_broker_client().get_open_orders()
 
@@ -555,6 +786,7 @@ __all__ = [
     "order_target_value",
     "cancel_order",
     "get_order_status",
+    "get_order_statuses",
     "get_open_orders",
     "get_account",
     "get_positions",
@@ -117,3 +117,42 @@ def _reset_core_state():
         data_api.set_current_context(None)
     except Exception:
         pass
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    """在后台线程启动 stub 类型的 qmt server，供远程连接/券商/JQ 助手的端到端用例共用。"""
+    import asyncio
+    import threading
+
+    from bullet_trade.server.adapters.base import AccountRouter
+    from bullet_trade.server.adapters.stub import build_stub_bundle
+    from bullet_trade.server.app import ServerApplication
+    from bullet_trade.server.config import AccountConfig, ServerConfig
+
+    def _run_loop(loop: asyncio.AbstractEventLoop, app: ServerApplication) -> None:
+        asyncio.set_event_loop(loop)
+        loop.create_task(app.start())
+        loop.run_forever()
+
+    port = 59321
+    config = ServerConfig(
+        server_type="stub",
+        listen="127.0.0.1",
+        port=port,
+        token="stub-token",
+        enable_data=True,
+        enable_broker=True,
+        accounts=[AccountConfig(key="default", account_id="demo")],
+    )
+    router = AccountRouter(config.accounts)
+    bundle = build_stub_bundle(config, router)
+    app = ServerApplication(config, router, bundle)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=_run_loop, args=(loop, app), daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(app.wait_started(), loop).result(timeout=5)
+    yield config
+    asyncio.run_coroutine_threadsafe(app.shutdown(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
@@ -3,7 +3,7 @@ import uuid
 from pathlib import Path
 
 
-from bullet_trade.core.globals import Logger
+from bullet_trade.core.globals import Logger, lazy, wrap_file_handler
 
 
 def test_configure_file_logging_switches_directory(tmp_path, monkeypatch):
@@ -59,3 +59,88 @@ def test_configure_file_logging_accepts_file_path(tmp_path, monkeypatch):
     assert handler is not None
     assert Path(handler.baseFilename) == log_file.resolve()
     assert handler.level == logging.ERROR
+
+
+def test_lazy_messages_and_async_file_sink(tmp_path, monkeypatch):
+    token = uuid.uuid4().hex
+    real_get_logger = logging.getLogger
+
+    def _fake_get_logger(name=None):
+        target = name or ''
+        if target.startswith('jq_strategy'):
+            logger = real_get_logger(f"{target}_{token}")
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+            return logger
+        return real_get_logger(name)
+
+    monkeypatch.setattr('bullet_trade.core.globals.logging.getLogger', _fake_get_logger)
+    monkeypatch.setenv('LOG_FILE_ASYNC', 'true')
+    logger = Logger()
+    log_file = tmp_path / "async.log"
+    logger.configure_file_logging(file_path=str(log_file), level_name='INFO')
+    logger.set_level('strategy', 'info')
+
+    calls = []
+
+    def _expensive():
+        calls.append(1)
+        return "debug detail"
+
+    assert not logger.is_enabled_for('debug')
+    logger.debug(lazy(_expensive))
+    assert calls == []
+
+    # 普通可调用对象不会被求值，按 str() 原样输出
+    logger.info(_expensive)
+    assert calls == []
+
+    logger.info(lambda: "lazy info")
+    logger.info("formatted %s=%d", "x", 3)
+    logger.flush()
+    content = log_file.read_text(encoding='utf-8')
+    assert "lazy info" in content
+    assert "formatted x=3" in content
+    assert "debug detail" not in content
+    logger.remove_file_handler()
+
+
+def test_wrap_file_handler_follows_system_config_and_flushes_concurrently(tmp_path, monkeypatch):
+    import threading
+
+    plain = logging.FileHandler(tmp_path / "sync.log", encoding='utf-8')
+    monkeypatch.setattr(
+        'bullet_trade.utils.env_loader.get_system_config', lambda: {'log_file_async': False}
+    )
+    assert wrap_file_handler(plain) is plain
+    plain.close()
+
+    monkeypatch.setattr(
+        'bullet_trade.utils.env_loader.get_system_config', lambda: {'log_file_async': True}
+    )
+    target = logging.FileHandler(tmp_path / "async.log", encoding='utf-8')
+    sink = wrap_file_handler(target)
+    assert sink is not target
+    record_logger = logging.getLogger(f"flush_race_{uuid.uuid4().hex}")
+    record_logger.propagate = False
+    record_logger.addHandler(sink)
+    record_logger.setLevel(logging.INFO)
+
+    errors = []
+
+    def _worker(n):
+        try:
+            for i in range(20):
+                record_logger.info("worker %d line %d", n, i)
+                sink.flush()
+        except Exception as exc:  # pragma: no cover - 失败时记录
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sink.close()
+    assert errors == []
+    assert len((tmp_path / "async.log").read_text(encoding='utf-8').splitlines()) == 80
@@ -19,7 +19,9 @@ from bullet_trade.core.event_bus import EventBus
 from bullet_trade.core.live_engine import LiveEngine, LivePortfolioProxy, TradingCalendarGuard
 from bullet_trade.core.live_runtime import load_subscription_state, save_g
 from bullet_trade.core.globals import g, reset_globals
-from bullet_trade.core.orders import order, clear_order_queue
+from bullet_trade.core.models import Position
+from bullet_trade.core.orders import order, clear_order_queue, get_order_queue
+from bullet_trade.core.risk_control import RiskController
 from bullet_trade.core.runtime import set_current_engine
 
 
@@ -578,6 +580,144 @@ async def test_live_engine_tick_snapshot_and_unsubscribe(tmp_path):
     await engine._shutdown()
 
 
+class BatchTickBroker(DummyBroker):
+    def __init__(self):
+        super().__init__()
+        self.batch_calls: list[list[str]] = []
+
+    def get_current_ticks(self, symbols):
+        self.batch_calls.append(list(symbols))
+        return {sym: {"sid": sym, "last_price": 2.0} for sym in symbols}
+
+    def get_current_tick(self, symbol: str):  # pragma: no cover - 应走批量接口
+        raise AssertionError("batch path expected")
+
+
+@pytest.mark.asyncio
+async def test_tick_loop_fetches_batch_and_delivers_cross_section(tmp_path):
+    strategy = _write_strategy(tmp_path)
+    cfg = {
+        "runtime_dir": str(tmp_path / "runtime"),
+        "g_autosave_enabled": False,
+        "account_sync_enabled": False,
+        "order_sync_enabled": False,
+        "tick_sync_enabled": True,
+        "tick_sync_interval": 1,
+        "tick_batch_enabled": True,
+        "risk_check_enabled": False,
+        "broker_heartbeat_interval": 0,
+        "scheduler_market_periods": "09:30-11:30,13:00-15:00",
+    }
+    engine = LiveEngine(
+        strategy_file=strategy,
+        broker_factory=BatchTickBroker,
+        live_config=cfg,
+        now_provider=lambda: datetime(2025, 1, 2, 9, 0),
+    )
+    loop = asyncio.get_running_loop()
+    engine._loop = loop
+    engine._stop_event = asyncio.Event()
+    engine.event_bus = EventBus(loop)
+    engine.async_scheduler = AsyncScheduler()
+    await engine._bootstrap()
+
+    received = []
+
+    async def _handler(ctx, ticks):
+        received.append(ticks)
+        engine._stop_event.set()
+
+    engine.handle_tick_func = _handler
+    engine._provider_tick_callback_bound = False
+    engine._tick_symbols = {"000001.XSHE", "600000.XSHG", "510300.XSHG"}
+    await asyncio.wait_for(engine._tick_loop(), timeout=5)
+
+    # 每轮一次批量调用覆盖全部订阅标的
+    assert engine.broker.batch_calls  # type: ignore[attr-defined]
+    assert all(sorted(call) == sorted(engine._tick_symbols) for call in engine.broker.batch_calls)  # type: ignore[attr-defined]
+    assert set(received[0]) == engine._tick_symbols
+    assert engine._latest_ticks["600000.XSHG"]["last_price"] == 2.0
+    await engine._shutdown()
+
+
+@pytest.mark.asyncio
+async def test_poll_tick_snapshots_falls_back_to_parallel_fetch(tmp_path, monkeypatch):
+    strategy = _write_strategy(tmp_path)
+    cfg = {
+        "runtime_dir": str(tmp_path / "runtime"),
+        "g_autosave_enabled": False,
+        "account_sync_enabled": False,
+        "order_sync_enabled": False,
+        "tick_sync_enabled": False,
+        "risk_check_enabled": False,
+        "broker_heartbeat_interval": 0,
+        "scheduler_market_periods": "09:30-11:30,13:00-15:00",
+    }
+    engine = LiveEngine(
+        strategy_file=strategy,
+        broker_factory=DummyBroker,
+        live_config=cfg,
+        now_provider=lambda: datetime(2025, 1, 2, 9, 0),
+    )
+    loop = asyncio.get_running_loop()
+    engine._loop = loop
+    engine._stop_event = asyncio.Event()
+    engine.event_bus = EventBus(loop)
+    engine.async_scheduler = AsyncScheduler()
+    await engine._bootstrap()
+    monkeypatch.setattr("bullet_trade.core.live_engine.get_data_provider", lambda: None)
+
+    engine.broker._tick_snapshots = {  # type: ignore[attr-defined]
+        "000001.XSHE": {"sid": "000001.XSHE", "last_price": 10.0},
+        "600000.XSHG": {"sid": "600000.XSHG", "last_price": 8.0},
+    }
+    ticks = await engine._poll_tick_snapshots(["000001.XSHE", "600000.XSHG", "000002.XSHE"])
+    assert set(ticks) == {"000001.XSHE", "600000.XSHG"}
+    await engine._shutdown()
+
+
+@pytest.mark.asyncio
+async def test_poll_tick_snapshots_keeps_per_symbol_broker_source(tmp_path, monkeypatch):
+    strategy = _write_strategy(tmp_path)
+    cfg = {
+        "runtime_dir": str(tmp_path / "runtime"),
+        "g_autosave_enabled": False,
+        "account_sync_enabled": False,
+        "order_sync_enabled": False,
+        "tick_sync_enabled": False,
+        "risk_check_enabled": False,
+        "broker_heartbeat_interval": 0,
+        "scheduler_market_periods": "09:30-11:30,13:00-15:00",
+    }
+    engine = LiveEngine(
+        strategy_file=strategy,
+        broker_factory=DummyBroker,
+        live_config=cfg,
+        now_provider=lambda: datetime(2025, 1, 2, 9, 0),
+    )
+    loop = asyncio.get_running_loop()
+    engine._loop = loop
+    engine._stop_event = asyncio.Event()
+    engine.event_bus = EventBus(loop)
+    engine.async_scheduler = AsyncScheduler()
+    await engine._bootstrap()
+
+    class BatchProvider:
+        def get_current_ticks(self, symbols):  # pragma: no cover - 券商有逐个接口时不应使用
+            raise AssertionError("provider batch must not replace broker ticks")
+
+        def get_current_tick(self, symbol):
+            return {"sid": symbol, "last_price": 99.0}
+
+    monkeypatch.setattr("bullet_trade.core.live_engine.get_data_provider", lambda: BatchProvider())
+    engine.broker._tick_snapshots = {"000001.XSHE": {"sid": "000001.XSHE", "last_price": 10.0}}  # type: ignore[attr-defined]
+    ticks = await engine._poll_tick_snapshots(["000001.XSHE", "600000.XSHG"])
+    # 券商有快照的用券商，没有的与逐个获取一致回退到数据源
+    assert ticks["000001.XSHE"]["last_price"] == 10.0
+    assert ticks["600000.XSHG"]["last_price"] == 99.0
+    await engine._shutdown()
+
+
 @pytest.mark.asyncio
 async def test_handle_tick_hook_receives_context(tmp_path):
     strategy = _write_strategy(tmp_path)
@@ -803,3 +943,193 @@ def test_live_engine_run_returns_nonzero_on_error(tmp_path, monkeypatch, caplog)
     exit_code = engine.run()
     assert exit_code == 2
     assert "missing xtquant" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_concurrent_orders_sell_first_and_reserve_cash(monkeypatch, tmp_path):
+    strategy = _write_strategy(tmp_path)
+    cfg = {
+        "runtime_dir": str(tmp_path / "runtime"),
+        "g_autosave_enabled": False,
+        "account_sync_enabled": False,
+        "order_sync_enabled": False,
+        "tick_sync_enabled": False,
+        "risk_check_enabled": False,
+        "broker_heartbeat_interval": 0,
+        "order_concurrency": 4,
+    }
+
+    class ConcurrentBroker(DummyBroker):
+        def __init__(self):
+            super().__init__()
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self.sold = False
+
+        async def _track(self):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.05)
+            self.in_flight -= 1
+
+        async def buy(self, security, amount, price=None, wait_timeout=None, *, market=False):
+            assert self.sold, "买单应在卖单回款之后提交"
+            await self._track()
+            return await super().buy(security, amount, price, wait_timeout=wait_timeout, market=market)
+
+        async def sell(self, security, amount, price=None, wait_timeout=None, *, market=False):
+            await self._track()
+            self.sold = True
+            return await super().sell(security, amount, price, wait_timeout=wait_timeout, market=market)
+
+        def supports_account_sync(self) -> bool:
+            return False
+
+    engine = LiveEngine(strategy_file=strategy, broker_factory=ConcurrentBroker, live_config=cfg)
+    assert engine.config.order_concurrency == 4
+    engine.broker = ConcurrentBroker()
+    engine._risk = None
+    engine.context.portfolio.available_cash = 3_500
+    engine.context.portfolio.total_value = 10_000
+    engine.context.portfolio.positions["600000.XSHG"] = Position(
+        security="600000.XSHG", total_amount=100, closeable_amount=100, avg_cost=10.0
+    )
+
+    class Snap:
+        paused = False
+        last_price = 10.0
+        high_limit = 11.0
+        low_limit = 9.0
+
+    monkeypatch.setattr("bullet_trade.core.live_engine.get_current_data", lambda: {
+        code: Snap() for code in ("600000.XSHG", "000001.XSHE", "000002.XSHE", "000004.XSHE", "000005.XSHE")
+    })
+
+    clear_order_queue()
+    for code in ("000001.XSHE", "000002.XSHE", "000004.XSHE", "000005.XSHE"):
+        order(code, 100, price=10.0)
+    order("600000.XSHG", -100, price=10.0)
+
+    await engine._process_orders(engine.context.current_dt)
+
+    sides = [item[3] for item in engine.broker.orders]
+    assert sides[0] == "sell"
+    # 可用资金 3500 只够预留 3 笔 1000 元的买单
+    assert sides.count("buy") == 3
+    # 3 笔买单同时在途，说明是并发而非逐笔提交
+    assert engine.broker.max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_orders_respect_daily_trade_limit(monkeypatch, tmp_path):
+    strategy = _write_strategy(tmp_path)
+    cfg = {
+        "runtime_dir": str(tmp_path / "runtime"),
+        "g_autosave_enabled": False,
+        "account_sync_enabled": False,
+        "order_sync_enabled": False,
+        "tick_sync_enabled": False,
+        "risk_check_enabled": False,
+        "broker_heartbeat_interval": 0,
+        "order_concurrency": 8,
+    }
+
+    class FlakyBroker(DummyBroker):
+        async def buy(self, security, amount, price=None, wait_timeout=None, *, market=False):
+            await asyncio.sleep(0.01)
+            if security == "000001.XSHE":
+                raise RuntimeError("柜台拒单")
+            return await super().buy(security, amount, price, wait_timeout=wait_timeout, market=market)
+
+        def supports_account_sync(self) -> bool:
+            return False
+
+    engine = LiveEngine(strategy_file=strategy, broker_factory=FlakyBroker, live_config=cfg)
+    engine.broker = FlakyBroker()
+    engine._risk = RiskController(config={
+        "max_order_value": 1_000_000,
+        "max_daily_trade_value": 1_000_000,
+        "max_daily_trades": 3,
+        "max_stock_count": 100,
+        "max_position_ratio": 100,
+        "stop_loss_ratio": 10,
+    })
+    engine.context.portfolio.available_cash = 100_000
+    engine.context.portfolio.total_value = 100_000
+
+    class Snap:
+        paused = False
+        last_price = 10.0
+        high_limit = 11.0
+        low_limit = 9.0
+
+    codes = ("000001.XSHE", "000002.XSHE", "000004.XSHE", "000005.XSHE", "000006.XSHE")
+    monkeypatch.setattr("bullet_trade.core.live_engine.get_current_data", lambda: {code: Snap() for code in codes})
+
+    clear_order_queue()
+    for code in codes:
+        order(code, 100, price=10.0)
+    await engine._process_orders(engine.context.current_dt)
+
+    # 同批 5 笔买单只有前 3 笔通过风控，其中 1 笔提交失败后回滚
+    assert len(engine.broker.orders) == 2
+    assert engine._risk.stats.daily_trades == 2
+    assert engine._risk.stats.daily_trade_value == pytest.approx(2_000.0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_failed_buy_releases_its_pending_position(monkeypatch, tmp_path):
+    strategy = _write_strategy(tmp_path)
+    cfg = {
+        "runtime_dir": str(tmp_path / "runtime"),
+        "g_autosave_enabled": False,
+        "account_sync_enabled": False,
+        "order_sync_enabled": False,
+        "tick_sync_enabled": False,
+        "risk_check_enabled": False,
+        "broker_heartbeat_interval": 0,
+        "order_concurrency": 8,
+    }
+
+    class FlakyBroker(DummyBroker):
+        async def buy(self, security, amount, price=None, wait_timeout=None, *, market=False):
+            if security in ("000001.XSHE", "000002.XSHE"):
+                raise RuntimeError("柜台拒单")
+            return await super().buy(security, amount, price, wait_timeout=wait_timeout, market=market)
+
+        def supports_account_sync(self) -> bool:
+            return False
+
+    engine = LiveEngine(strategy_file=strategy, broker_factory=FlakyBroker, live_config=cfg)
+    engine.broker = FlakyBroker()
+    engine._risk = RiskController(config={
+        "max_order_value": 1_000_000,
+        "max_daily_trade_value": 1_000_000,
+        "max_daily_trades": 100,
+        "max_stock_count": 100,
+        "max_position_ratio": 100,
+        "stop_loss_ratio": 10,
+    })
+    engine.context.portfolio.available_cash = 100_000
+    engine.context.portfolio.total_value = 100_000
+
+    class Snap:
+        paused = False
+        last_price = 10.0
+        high_limit = 11.0
+        low_limit = 9.0
+
+    codes = ("000001.XSHE", "000002.XSHE", "000004.XSHE")
+    current_data = {code: Snap() for code in codes}
+
+    clear_order_queue()
+    for code in codes:
+        order(code, 100, price=10.0)
+    orders = list(get_order_queue())
+    clear_order_queue()
+    # 000002 已由此前的委托占用名额，本单失败不应撤回
+    pending = {"000002.XSHE"}
+    await engine._process_orders_concurrently(orders, current_data, set(), pending)
+
+    assert pending == {"000002.XSHE", "000004.XSHE"}
+    assert [item[0] for item in engine.broker.orders] == ["000004.XSHE"]
@@ -1,5 +1,6 @@
 import logging
 import os
+import threading
 from types import SimpleNamespace
 
 import pytest
@@ -11,6 +12,13 @@ def teardown_function():
     # 重置 handler，避免测试间串扰
     notifications.set_message_handler(None)
     notifications._ENV_LOADED = False
+    notifications._dispatcher = None
+
+
+def _fresh_dispatcher(monkeypatch, **env):
+    for key, value in {"NOTIFY_COALESCE_SECONDS": "0", "NOTIFY_RETRY_BACKOFF": "0", **env}.items():
+        monkeypatch.setenv(key, value)
+    monkeypatch.setattr(notifications, "_dispatcher", None)
 
 
 def test_send_msg_logs_and_handler(monkeypatch, caplog):
@@ -48,8 +56,10 @@ def test_send_msg_triggers_webhook(monkeypatch):
         )
 
     monkeypatch.setattr(notifications, "requests", SimpleNamespace(post=fake_post))
+    _fresh_dispatcher(monkeypatch)
 
     notifications.send_msg("hello world")
+    assert notifications.flush_messages(timeout=5)
 
     assert (
         request_payload["url"]
@@ -59,6 +69,58 @@ def test_send_msg_triggers_webhook(monkeypatch):
     assert request_payload["timeout"] == 5
 
 
+def test_send_msg_does_not_block_and_coalesces_bursts(monkeypatch):
+    monkeypatch.setenv("MESSAGE_KEY", "dummy-key")
+    monkeypatch.setattr(notifications, "load_env", lambda: None)
+    _fresh_dispatcher(monkeypatch, NOTIFY_COALESCE_SECONDS="0.2")
+
+    posts = []
+    release = threading.Event()
+
+    def slow_post(url, json=None, timeout=None):
+        release.wait(5)
+        posts.append(json["text"]["content"])
+        return SimpleNamespace(raise_for_status=lambda: None, json=lambda: {"errcode": 0})
+
+    monkeypatch.setattr(notifications, "requests", SimpleNamespace(post=slow_post))
+
+    for i in range(5):
+        notifications.send_msg(f"msg-{i}")
+    # webhook 请求仍被阻塞，send_msg 已全部返回且消息都在队列中
+    assert posts == []
+    assert notifications.get_notification_stats()["enqueued"] == 5
+    release.set()
+    assert notifications.flush_messages(timeout=5)
+
+    assert posts == ["\n".join(f"msg-{i}" for i in range(5))]
+    stats = notifications.get_notification_stats()
+    assert (stats["delivered"], stats["requests"], stats["coalesced"], stats["pending"]) == (5, 1, 4, 0)
+
+
+def test_send_msg_retries_and_drops_oldest_when_full(monkeypatch):
+    monkeypatch.setenv("MESSAGE_KEY", "dummy-key")
+    monkeypatch.setattr(notifications, "load_env", lambda: None)
+    _fresh_dispatcher(monkeypatch, NOTIFY_QUEUE_SIZE="2", NOTIFY_COALESCE_SECONDS="0.2")
+
+    responses = [{"errcode": 45009}, {"errcode": 0}]
+    posts = []
+
+    def flaky_post(url, json=None, timeout=None):
+        posts.append(json["text"]["content"])
+        body = responses.pop(0) if responses else {"errcode": 0}
+        return SimpleNamespace(raise_for_status=lambda: None, json=lambda: body)
+
+    monkeypatch.setattr(notifications, "requests", SimpleNamespace(post=flaky_post))
+
+    for i in range(3):
+        notifications.send_msg(f"msg-{i}")
+    assert notifications.flush_messages(timeout=5)
+
+    assert posts == ["msg-1\nmsg-2", "msg-1\nmsg-2"]
+    stats = notifications.get_notification_stats()
+    assert (stats["dropped"], stats["retries"], stats["delivered"], stats["failed"]) == (1, 1, 2, 0)
+
+
 @pytest.mark.requires_network
 def test_send_msg_wechat_live(monkeypatch):
     key = os.getenv("MESSAGE_KEY")
@@ -69,3 +131,6 @@ def test_send_msg_wechat_live(monkeypatch):
     # 使用独立 handler 确保不会重复触发其它通道
     notifications.set_message_handler(None)
     notifications.send_msg("BulletTrade send_msg smoke test")
+    assert notifications.flush_messages(timeout=30)
+    stats = notifications.get_notification_stats()
+    assert (stats["delivered"], stats["failed"]) == (1, 0), stats["last_error"]
@@ -0,0 +1,105 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from bullet_trade.server.protocol import HEADER_SIZE, encode_message
+from bullet_trade.server.session import ClientSession, request_lane
+
+
+class _Writer:
+    def __init__(self):
+        self.messages = []
+        self._closing = False
+
+    def write(self, frame):
+        self.messages.append(json.loads(frame[HEADER_SIZE:].decode("utf-8")))
+
+    async def drain(self):
+        return None
+
+    def is_closing(self):
+        return self._closing
+
+    def close(self):
+        self._closing = True
+
+    async def wait_closed(self):
+        return None
+
+
+class _App:
+    def __init__(self, concurrency=2, max_pending=64):
+        self.config = SimpleNamespace(session_concurrency=concurrency, session_max_pending=max_pending)
+        self.active_data = 0
+        self.peak_data = 0
+        self.trade_order = []
+
+    def log_access(self, *args, **kwargs):
+        pass
+
+    async def handle_request(self, session, action, payload):
+        if action == "data.history":
+            self.active_data += 1
+            self.peak_data = max(self.peak_data, self.active_data)
+            await asyncio.sleep(0.2)
+            self.active_data -= 1
+            return {"rows": payload["n"]}
+        self.trade_order.append(payload["n"])
+        await asyncio.sleep(0.01)
+        return {"order": payload["n"]}
+
+
+def _feed(reader, messages):
+    for msg in messages:
+        reader.feed_data(encode_message(msg))
+    reader.feed_eof()
+
+
+def test_request_lanes():
+    assert request_lane("broker.place_order") == "trade"
+    assert request_lane("data.subscribe") == "control"
+    assert request_lane("admin.health") == "control"
+    assert request_lane("data.history") == "data"
+
+
+@pytest.mark.asyncio
+async def test_orders_not_blocked_by_history_pulls():
+    app = _App(concurrency=2)
+    reader = asyncio.StreamReader()
+    writer = _Writer()
+    session = ClientSession(app, reader, writer, "test")
+    session._active = True
+    messages = [{"type": "request", "id": f"h{i}", "action": "data.history", "payload": {"n": i}} for i in range(4)]
+    messages += [{"type": "request", "id": f"o{i}", "action": "broker.place_order", "payload": {"n": i}} for i in range(3)]
+    _feed(reader, messages)
+
+    with pytest.raises(asyncio.IncompleteReadError):
+        await session._loop()
+    await asyncio.wait_for(asyncio.gather(*list(session._inflight)), timeout=2)
+
+    order_ids = [m["id"] for m in writer.messages]
+    assert order_ids[:3] == ["o0", "o1", "o2"]
+    assert sorted(order_ids[3:]) == ["h0", "h1", "h2", "h3"]
+    assert app.trade_order == [0, 1, 2]
+    assert app.peak_data == 2
+
+
+@pytest.mark.asyncio
+async def test_backpressure_stops_reading_when_pending_limit_reached():
+    app = _App(concurrency=8, max_pending=2)
+    reader = asyncio.StreamReader()
+    writer = _Writer()
+    session = ClientSession(app, reader, writer, "test")
+    session._active = True
+    _feed(reader, [{"type": "request", "id": f"h{i}", "action": "data.history", "payload": {"n": i}} for i in range(5)])
+
+    loop_task = asyncio.create_task(session._loop())
+    await asyncio.sleep(0.05)
+    assert len(session._inflight) == 2
+    assert app.peak_data == 2
+    with pytest.raises(asyncio.IncompleteReadError):
+        await asyncio.wait_for(loop_task, timeout=2)
+    await asyncio.gather(*list(session._inflight))
+    assert len(writer.messages) == 5
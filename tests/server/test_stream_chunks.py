@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from bullet_trade.remote import RemoteQmtConnection
+from bullet_trade.server.adapters.qmt import dataframe_to_payload
+from bullet_trade.server.session import ClientSession
+
+ROWS = 2500
+CHUNK_ROWS = 1000
+
+
+def _history_frame():
+    index = pd.date_range("2024-01-02 09:31", periods=ROWS, freq="min")
+    return pd.DataFrame({"time": index, "close": [float(i) for i in range(ROWS)], "code": ["000001.XSHE"] * ROWS})
+
+
+class _App:
+    def __init__(self):
+        self.config = SimpleNamespace(token="t", stream_chunk_rows=CHUNK_ROWS)
+
+    def active_features(self):
+        return ["history"]
+
+    def register_session(self, session):
+        pass
+
+    async def unregister_session(self, session):
+        pass
+
+    def log_access(self, *args, **kwargs):
+        pass
+
+    async def handle_request(self, session, action, payload):
+        if action == "data.history":
+            return dataframe_to_payload(_history_frame(), lazy=True)
+        return {"ok": True}
+
+
+@pytest.fixture(scope="module")
+def server_port():
+    loop = asyncio.new_event_loop()
+    app = _App()
+    ready = threading.Event()
+    holder = {}
+
+    async def _serve():
+        server = await asyncio.start_server(
+            lambda r, w: ClientSession(app, r, w, "test").run(), "127.0.0.1", 0
+        )
+        holder["port"] = server.sockets[0].getsockname()[1]
+        ready.set()
+
+    def _run():
+        asyncio.set_event_loop(loop)
+        loop.create_task(_serve())
+        loop.run_forever()
+
+    thread = threading.Thread(target=_run, daemon=True)
+    thread.start()
+    ready.wait(5)
+    yield holder["port"]
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+
+
+@pytest.mark.parametrize("wire_format", ["columnar", "json"])
+def test_chunked_history_is_reassembled(server_port, wire_format):
+    conn = RemoteQmtConnection("127.0.0.1", server_port, "t", wire_format=wire_format)
+    conn.start()
+    try:
+        assert "stream" in conn.server_features
+        resp = conn.request("data.history", {})
+        if wire_format == "columnar":
+            df = resp["frame"]
+        else:
+            df = pd.DataFrame(resp["records"], columns=resp["columns"])
+        assert len(df) == ROWS
+        assert list(df["close"]) == [float(i) for i in range(ROWS)]
+        assert conn.request("data.other", {}) == {"ok": True}
+    finally:
+        conn.close()
+
+
+def test_request_stream_yields_chunks(server_port):
+    conn = RemoteQmtConnection("127.0.0.1", server_port, "t")
+    conn.start()
+    try:
+        parts = list(conn.request_stream("data.history", {}))
+        assert [len(p["frame"]) for p in parts] == [1000, 1000, 500]
+        assert parts[-1]["frame"]["close"].iloc[-1] == ROWS - 1
+        # 未分块的响应只产出一次
+        assert list(conn.request_stream("data.other", {})) == [{"ok": True}]
+    finally:
+        conn.close()
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from bullet_trade.server.tick import TickSubscriptionManager
+
+
+class _Session:
+    def __init__(self, session_id, delay=0.0):
+        self.session_id = session_id
+        self.delay = delay
+        self.events = []
+
+    async def send_event(self, event, payload):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.events.append((event, payload))
+
+
+class _BatchAdapter:
+    def __init__(self):
+        self.batch_calls = []
+        self.prices = {}
+
+    async def get_current_ticks(self, symbols):
+        self.batch_calls.append(list(symbols))
+        return {s: {"last_price": self.prices.get(s, 10.0), "dt": "2025-01-02 09:30:00"} for s in symbols}
+
+    async def get_current_tick(self, symbol):  # pragma: no cover - 不应被调用
+        raise AssertionError("应走批量接口")
+
+
+class _PushAdapter:
+    def __init__(self):
+        self.subscribed = []
+        self.unsubscribed = []
+        self.handler = None
+
+    async def subscribe_tick_push(self, symbols, handler):
+        self.subscribed.extend(symbols)
+        self.handler = handler
+
+    async def unsubscribe_tick_push(self, symbols):
+        self.unsubscribed.extend(symbols)
+
+
+@pytest.mark.asyncio
+async def test_poll_uses_one_batch_call_and_skips_unchanged_ticks():
+    adapter = _BatchAdapter()
+    manager = TickSubscriptionManager(adapter, push=False)
+    session = _Session("s1")
+    await manager.subscribe(session, ["000001.XSHE", "600000.XSHG"])
+
+    await manager._poll(list(manager._symbol_sessions))
+    await manager._poll(list(manager._symbol_sessions))
+    adapter.prices["000001.XSHE"] = 10.5
+    await manager._poll(list(manager._symbol_sessions))
+    await asyncio.sleep(0.05)
+
+    assert len(adapter.batch_calls) == 3
+    assert all(len(call) == 2 for call in adapter.batch_calls)
+    symbols = [payload["symbol"] for _, payload in session.events]
+    assert sorted(symbols) == ["000001.XSHE", "000001.XSHE", "600000.XSHG"]
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_slow_session_queue_drops_oldest():
+    manager = TickSubscriptionManager(_BatchAdapter(), push=False, queue_size=3)
+    slow = _Session("slow", delay=0.2)
+    await manager.subscribe(slow, ["000001.XSHE"])
+
+    for i in range(10):
+        manager.publish({"000001.XSHE": {"last_price": 10.0 + i}})
+    outbox = manager._outboxes[slow]
+    assert len(outbox.queue) <= 3
+    assert outbox.dropped >= 6
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_push_adapter_drives_fanout_without_polling():
+    adapter = _PushAdapter()
+    manager = TickSubscriptionManager(adapter)
+    await manager.start()
+    session = _Session("s1")
+    await manager.subscribe(session, ["000001.xshe"])
+    assert adapter.subscribed == ["000001.XSHE"]
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, adapter.handler, {"000001.XSHE": {"last_price": 11.0}})
+    await asyncio.sleep(0.05)
+    assert session.events == [("tick", {"symbol": "000001.XSHE", "last_price": 11.0})]
+
+    await manager.unsubscribe(session)
+    assert adapter.unsubscribed == ["000001.XSHE"]
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_new_session_receives_cached_tick_for_tracked_symbol():
+    adapter = _BatchAdapter()
+    manager = TickSubscriptionManager(adapter, push=False)
+    first = _Session("s1")
+    second = _Session("s2")
+    await manager.subscribe(first, ["000001.XSHE"])
+    await manager._poll(["000001.XSHE"])
+
+    # 行情未变，去重后不会再推送；新会话应直接拿到缓存的最新 tick
+    await manager.subscribe(second, ["000001.XSHE"])
+    await manager._poll(["000001.XSHE"])
+    await asyncio.sleep(0.05)
+
+    expected = [("tick", {"symbol": "000001.XSHE", "last_price": 10.0, "dt": "2025-01-02 09:30:00"})]
+    assert first.events == expected
+    assert second.events == expected
+    await manager.stop()
+
+
+class _PushBatchAdapter(_PushAdapter, _BatchAdapter):
+    def __init__(self):
+        _PushAdapter.__init__(self)
+        _BatchAdapter.__init__(self)
+
+
+@pytest.mark.asyncio
+async def test_silent_push_symbols_fall_back_to_polling():
+    adapter = _PushBatchAdapter()
+    manager = TickSubscriptionManager(adapter)
+    await manager.start()
+    session = _Session("s1")
+    await manager.subscribe(session, ["000001.XSHE", "600000.XSHG"])
+    assert manager._stale_push_symbols(list(manager._symbol_sessions)) == []
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, adapter.handler, {"000001.XSHE": {"last_price": 11.0}})
+    await asyncio.sleep(0.05)
+    # 模拟 600000 已连续多个周期没有推送
+    manager._last_push["600000.XSHG"] -= manager.interval * 10
+    stale = manager._stale_push_symbols(sorted(manager._symbol_sessions))
+    assert stale == ["600000.XSHG"]
+
+    await manager._poll(stale)
+    await asyncio.sleep(0.05)
+    assert adapter.batch_calls == [["600000.XSHG"]]
+    assert sorted(payload["symbol"] for _, payload in session.events) == ["000001.XSHE", "600000.XSHG"]
+    await manager.stop()
@@ -1,7 +1,6 @@
-import pytest
-
 from helpers import bullet_trade_jq_remote_helper as helper
-from tests.test_remote_server import stub_server  # 复用 stub server fixture
+
+# stub_server fixture 来自 tests/conftest.py
 
 
 def test_helper_e2e_with_stub(stub_server):
@@ -28,3 +27,72 @@ def test_helper_e2e_with_stub(stub_server):
 
     cancel_resp = helper.cancel_order(oid)
     assert cancel_resp.get("value") is True or cancel_resp.get("success", True) is True
+
+
+def test_helper_persistent_client_pushes_order_events(stub_server):
+    helper.configure(
+        host=stub_server.listen,
+        port=stub_server.port,
+        token=stub_server.token,
+        account_key=stub_server.accounts[0].key if stub_server.accounts else "default",
+        persistent=True,
+    )
+    client = helper._CLIENT
+    try:
+        assert helper.get_account().available_cash == 1_000_000
+        sock = client._sock
+        assert sock is not None and client.order_events
+
+        first = helper.order("000001.XSHE", 100, price=10.0, wait_timeout=0)
+        second = helper.order("000002.XSHE", 200, price=10.0, wait_timeout=0)
+        # 流水线批量查询，仍复用同一连接
+        statuses = helper.get_order_statuses([first, second])
+        assert [s.get("order_id") for s in statuses] == [first, second]
+        assert client._sock is sock
+
+        helper.cancel_order(first)
+        final = client.wait_order(first, timeout=3)
+        assert final is not None and final.get("status") == "cancelled"
+
+        # 连接被断开后自动重连
+        client._sock.close()
+        assert helper.get_order_status(second).get("order_id") == second
+        assert client._sock is not sock
+    finally:
+        client.close()
+
+
+def test_persistent_wait_order_releases_lock_and_bounds_events(stub_server):
+    import threading
+
+    helper.configure(
+        host=stub_server.listen,
+        port=stub_server.port,
+        token=stub_server.token,
+        account_key=stub_server.accounts[0].key if stub_server.accounts else "default",
+        persistent=True,
+    )
+    client = helper._CLIENT
+    try:
+        oid = helper.order("000001.XSHE", 100, price=10.0, wait_timeout=0)
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(client.wait_order(oid, timeout=3)))
+        waiter.start()
+        # 等待期间其他请求不被阻塞
+        assert helper.get_account().available_cash == 1_000_000
+        assert waiter.is_alive()
+        helper.cancel_order(oid)
+        waiter.join(5)
+        assert results and results[0].get("status") == "cancelled"
+
+        # 超时后不再保留该订单的事件
+        other = helper.order("000002.XSHE", 100, price=10.0, wait_timeout=0)
+        assert client.wait_order(other, timeout=0.3) is None
+        assert other not in client._order_status
+
+        for i in range(helper._ORDER_STATUS_LIMIT + 10):
+            client._on_event({"event": "order", "payload": {"order_id": f"x{i}", "status": "filled"}})
+        assert len(client._order_status) == helper._ORDER_STATUS_LIMIT
+        assert "x0" not in client._order_status
+    finally:
+        client.close()
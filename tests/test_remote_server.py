@@ -1,5 +1,4 @@
 import asyncio
-import threading
 import time
 
 import pandas as pd
@@ -8,10 +7,7 @@ import pytest
 from bullet_trade.broker import RemoteQmtBroker
 from bullet_trade.remote import RemoteQmtConnection
 from bullet_trade.server.adapters import register_adapter
-from bullet_trade.server.adapters.stub import build_stub_bundle  # noqa: F401
-from bullet_trade.server.adapters.base import AccountRouter
-from bullet_trade.server.app import ServerApplication
-from bullet_trade.server.config import AccountConfig, ServerConfig
+from bullet_trade.server.config import ServerConfig
 
 """
 这些测试使用 stub server 验证 RemoteQmtConnection/RemoteQmtBroker 的端到端行为。
@@ -25,39 +21,9 @@ QMT_SERVER_SUB_ACCOUNT=demo@main
 QMT_SERVER_TLS_CERT=/path/to/ca.pem  # 如启用了 TLS
 
 并根据需要补充 DEFAULT_DATA_PROVIDER/DEFAULT_BROKER=qmt-remote。
-"""
-
 
-@pytest.fixture(scope="module")
-def stub_server():
-    port = 59321
-    config = ServerConfig(
-        server_type="stub",
-        listen="127.0.0.1",
-        port=port,
-        token="stub-token",
-        enable_data=True,
-        enable_broker=True,
-        accounts=[AccountConfig(key="default", account_id="demo")],
-    )
-    router = AccountRouter(config.accounts)
-    # 注册 stub builder（import 时已经执行）
-    bundle = build_stub_bundle(config, router)
-    app = ServerApplication(config, router, bundle)
-    loop = asyncio.new_event_loop()
-    thread = threading.Thread(target=_run_loop, args=(loop, app), daemon=True)
-    thread.start()
-    asyncio.run_coroutine_threadsafe(app.wait_started(), loop).result(timeout=5)
-    yield config
-    asyncio.run_coroutine_threadsafe(app.shutdown(), loop).result(timeout=5)
-    loop.call_soon_threadsafe(loop.stop)
-    thread.join(timeout=5)
-
-
-def _run_loop(loop: asyncio.AbstractEventLoop, app: ServerApplication) -> None:
-    asyncio.set_event_loop(loop)
-    loop.create_task(app.start())
-    loop.run_forever()
+stub_server fixture 定义在 tests/conftest.py，与 JQ 远程助手的用例共用。
+"""
 
 
 def _make_connection(cfg: ServerConfig) -> RemoteQmtConnection:
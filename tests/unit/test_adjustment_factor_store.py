@@ -0,0 +1,86 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bullet_trade.data.adjustment import AdjustmentFactorStore, event_multipliers
+from bullet_trade.data.providers.tushare import TushareProvider
+
+
+DATES = pd.to_datetime(["2025-05-20", "2025-06-11", "2025-06-12", "2025-06-13", "2025-06-30"])
+
+
+@pytest.mark.unit
+def test_event_multipliers_match_forward_adjust_formula():
+    close = pd.Series([12.0, 12.5, 11.0, 11.5, 12.2], index=DATES)
+    events = [
+        {"date": date(2025, 6, 12), "bonus_pre_tax": 12.0, "per_base": 10, "scale_factor": 1.0},
+        {"date": date(2025, 6, 30), "bonus_pre_tax": 0.0, "per_base": 10, "scale_factor": 2.0},
+    ]
+
+    multipliers = event_multipliers(DATES, events, close=close)
+
+    cash = (12.5 - 1.2) / 12.5
+    np.testing.assert_allclose(multipliers, [cash * 0.5, cash * 0.5, 0.5, 0.5, 1.0])
+
+
+@pytest.mark.unit
+def test_store_loads_once_and_rescales_for_any_reference_date():
+    calls = []
+    factors = pd.Series([1.0, 1.0, 1.1, 1.1, 2.2], index=DATES)
+
+    def _loader(security, start, end):
+        calls.append((security, start, end))
+        return factors
+
+    store = AdjustmentFactorStore(_loader)
+    raw = pd.DataFrame({"close": [10.0, 10.0, 10.0, 10.0, 10.0], "volume": [100.0] * 5}, index=DATES)
+
+    as_of_13 = store.rescale(raw.iloc[:4], "000001.XSHE", "2025-06-13", volume_columns=("volume",))
+    as_of_30 = store.rescale(raw, "000001.XSHE", "2025-06-30")
+    # 参考日之后的分钟线同样按日因子缩放
+    minutes = pd.DataFrame({"close": [10.0]}, index=pd.to_datetime(["2025-06-12 10:31"]))
+    minute_view = store.rescale(minutes, "000001.XSHE", date(2025, 6, 12))
+
+    assert len(calls) == 1
+    np.testing.assert_allclose(as_of_13["close"], [10 / 1.1, 10 / 1.1, 10.0, 10.0])
+    np.testing.assert_allclose(as_of_13["volume"], [110.0, 110.0, 100.0, 100.0])
+    np.testing.assert_allclose(as_of_30["close"], [10 / 2.2, 10 / 2.2, 5.0, 5.0, 10.0])
+    assert minute_view["close"].iloc[0] == pytest.approx(10.0)
+
+
+@pytest.mark.unit
+def test_store_returns_none_without_factors():
+    store = AdjustmentFactorStore(lambda *_: None)
+    raw = pd.DataFrame({"close": [10.0]}, index=DATES[:1])
+    assert store.rescale(raw, "000001.XSHE", DATES[0]) is None
+
+
+@pytest.mark.unit
+def test_tushare_real_price_reuses_raw_cache_across_reference_dates(tmp_path, monkeypatch):
+    provider = TushareProvider({"cache_dir": str(tmp_path)})
+    raw_calls = []
+
+    def _fake_single(security, start_date, end_date, frequency, fields, skip_paused, fq, count, pre_factor_ref_date):
+        raw_calls.append((fq, pre_factor_ref_date))
+        return pd.DataFrame({"close": [10.0, 10.0, 11.0]}, index=DATES[1:4])
+
+    monkeypatch.setattr(provider, "_get_price_single", _fake_single)
+    monkeypatch.setattr(
+        provider,
+        "_fetch_adj_factor",
+        lambda security, start, end: pd.DataFrame(
+            {"trade_date": ["20250611", "20250612", "20250613"], "adj_factor": [1.0, 1.25, 1.25]}
+        ),
+    )
+
+    first = provider.get_price("000001.XSHE", start_date="2025-06-11", end_date="2025-06-13", fq="pre",
+                               pre_factor_ref_date="2025-06-12")
+    second = provider.get_price("000001.XSHE", start_date="2025-06-11", end_date="2025-06-13", fq="pre",
+                                pre_factor_ref_date="2025-06-13")
+
+    assert all(fq == "none" and ref is None for fq, ref in raw_calls)
+    assert len(raw_calls) == 1
+    assert first["close"].tolist() == pytest.approx([8.0, 10.0, 11.0])
+    assert second["close"].tolist() == pytest.approx([8.0, 10.0, 11.0])
@@ -0,0 +1,159 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from bullet_trade.core.exceptions import FutureDataError
+from bullet_trade.core.settings import reset_settings, set_option
+from bullet_trade.data import api as data_api
+from bullet_trade.data.bar_store import BarStore
+
+
+TRADE_DAYS = pd.bdate_range("2024-01-02", "2024-01-31")
+
+
+class CountingProvider:
+    """按交易日生成日线（close=序号），记录 get_price 调用次数。"""
+
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def auth(self, *args, **kwargs):
+        return True
+
+    def get_price(self, security, start_date=None, end_date=None, frequency="daily",
+                  fields=None, count=None, panel=True, fq="pre", **kwargs):
+        self.calls += 1
+        fields = list(fields) if fields else ["open", "close", "high", "low", "volume", "money"]
+        days = TRADE_DAYS
+        end_ts = pd.Timestamp(end_date).normalize()
+        days = days[days <= end_ts]
+        if count:
+            days = days[-count:]
+        elif start_date is not None:
+            days = days[days >= pd.Timestamp(start_date).normalize()]
+        base = 0.0 if fq in (None, "none") else 1000.0
+        rows = {}
+        for field in fields:
+            if field == "paused":
+                rows[field] = [0.0] * len(days)
+            else:
+                rows[field] = [base + TRADE_DAYS.get_loc(d) for d in days]
+        return pd.DataFrame(rows, index=days)
+
+    def get_trade_days(self, start_date=None, end_date=None, count=None):
+        return list(TRADE_DAYS)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    reset_settings()
+    fake = CountingProvider()
+    monkeypatch.setattr(data_api, "_provider", fake, raising=False)
+    monkeypatch.setattr(data_api, "_auth_attempted", True, raising=False)
+    yield fake
+    data_api.set_bar_store(None)
+    data_api.set_current_context(None)
+    reset_settings()
+
+
+def _load_store(provider, start="2024-01-02", end="2024-01-31", fq_modes=("none", "pre")):
+    store = BarStore(provider, ["000001.XSHE", "600000.XSHG"], start, end, fq_modes=fq_modes).load()
+    data_api.set_bar_store(store)
+    return store
+
+
+def test_bar_store_slices_by_count_and_start(provider):
+    store = _load_store(provider)
+    loaded_calls = provider.calls
+
+    df = store.get_price("000001.XSHE", datetime(2024, 1, 10, 15, 0), fields=["close"], fq="none", count=3)
+    assert list(df["close"]) == [4.0, 5.0, 6.0]
+    assert df.index[-1] == pd.Timestamp("2024-01-10")
+
+    df = store.get_price(
+        "000001.XSHE", datetime(2024, 1, 5), fields=["close"], fq="pre", start_dt=datetime(2024, 1, 3)
+    )
+    assert list(df["close"]) == [1001.0, 1002.0, 1003.0]
+
+    wide = store.get_price(["000001.XSHE", "600000.XSHG"], datetime(2024, 1, 4), fields=["close"], fq="none", count=2)
+    assert list(wide.columns) == [("close", "000001.XSHE"), ("close", "600000.XSHG")]
+
+    long_df = store.get_price(
+        ["000001.XSHE", "600000.XSHG"], datetime(2024, 1, 4), fields=["close"], fq="none", count=2, panel=False
+    )
+    assert list(long_df.columns) == ["time", "code", "close"]
+    assert len(long_df) == 4
+    assert provider.calls == loaded_calls
+
+
+def test_bar_store_returns_none_when_not_covered(provider):
+    store = _load_store(provider, start="2024-01-08")
+    assert store.get_price("000001.XSHE", datetime(2024, 1, 9), fields=["close"], fq="none", count=5) is None
+    assert store.get_price("000002.XSHE", datetime(2024, 1, 9), fields=["close"], fq="none", count=1) is None
+    assert store.get_price("000001.XSHE", datetime(2024, 1, 9), fields=["avg"], fq="none", count=1) is None
+    assert store.misses == 3
+
+
+def test_api_get_price_uses_store_and_falls_back(provider):
+    _load_store(provider)
+    data_api.set_current_context(SimpleNamespace(current_dt=datetime(2024, 1, 10, 15, 30)))
+    loaded_calls = provider.calls
+
+    df = data_api.get_price("000001.XSHE", end_date=datetime(2024, 1, 31), fields=["close"], count=2, fq="pre")
+    assert list(df["close"]) == [1005.0, 1006.0]
+    assert provider.calls == loaded_calls
+
+    data_api.get_price("000001.XSHE", end_date=datetime(2024, 1, 10), fields=["close"], count=2, skip_paused=True)
+    assert provider.calls == loaded_calls + 1
+
+
+def test_avoid_future_guard_still_enforced(provider):
+    _load_store(provider)
+    set_option("avoid_future_data", True)
+    data_api.set_current_context(SimpleNamespace(current_dt=datetime(2024, 1, 10, 10, 0)))
+    with pytest.raises(FutureDataError):
+        data_api.get_price("000001.XSHE", end_date=datetime(2024, 1, 10, 15, 0), fields=["close"], count=1)
+
+
+def test_current_data_reads_from_store(provider):
+    _load_store(provider)
+    loaded_calls = provider.calls
+    context = SimpleNamespace(current_dt=datetime(2024, 1, 10, 9, 26))
+    current = data_api.BacktestCurrentData(context)
+    assert current["000001.XSHE"].last_price == pytest.approx(1006.0)
+    assert provider.calls == loaded_calls
+
+
+def test_real_price_only_uses_raw_bars_on_current_day(provider):
+    set_option("use_real_price", True)
+    _load_store(provider, fq_modes=("none",))
+    data_api.set_current_context(SimpleNamespace(current_dt=datetime(2024, 1, 10, 15, 30)))
+    loaded_calls = provider.calls
+
+    df = data_api.get_price("000001.XSHE", fields=["close"], count=1, fq="pre")
+    assert list(df["close"]) == [6.0]
+    assert provider.calls == loaded_calls
+
+    data_api.get_price("000001.XSHE", fields=["close"], count=2, fq="pre")
+    assert provider.calls == loaded_calls + 1
+
+
+def test_exported_store_attaches_read_only(provider, tmp_path):
+    store = _load_store(provider)
+    store.export(str(tmp_path / "shared"))
+    attached = BarStore.attach(str(tmp_path / "shared"))
+
+    assert attached.covers("2024-01-02", datetime(2024, 1, 31, 15, 0))
+    for fq in ("none", "pre"):
+        expected = store.get_price("600000.XSHG", datetime(2024, 1, 10), fields=["close", "paused"], fq=fq, count=4)
+        actual = attached.get_price("600000.XSHG", datetime(2024, 1, 10), fields=["close", "paused"], fq=fq, count=4)
+        pd.testing.assert_frame_equal(actual, expected)
+    assert attached.get_price("600000.XSHG", datetime(2024, 2, 1), fields=["close"], fq="none", count=1) is None
+
+    block = attached._blocks[("000001.XSHE", "daily", "none")]
+    with pytest.raises(ValueError):
+        block.values[0, 0] = 1.0
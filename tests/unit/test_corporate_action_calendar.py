@@ -0,0 +1,121 @@
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from bullet_trade.core.engine import BacktestEngine
+from bullet_trade.core.globals import reset_globals
+from bullet_trade.core.models import Context, Portfolio, Position
+from bullet_trade.core.settings import reset_settings
+from bullet_trade.data import api as data_api
+from bullet_trade.data.corporate_actions import CorporateActionCalendar
+from bullet_trade.data.providers.base import DataProvider
+
+DAYS = [d.date() for d in pd.bdate_range("2024-06-03", "2024-07-31")]
+# 000001 除权日停牌（QMT 风格：停牌日无数据），600000 除权日正常交易（JQ 风格 paused 字段）
+EVENTS = {
+    "000001.XSHE": [
+        {"security": "000001.XSHE", "date": date(2024, 6, 14), "security_type": "stock",
+         "scale_factor": 1.0, "bonus_pre_tax": 7.19, "per_base": 10},
+    ],
+    "600000.XSHG": [
+        {"security": "600000.XSHG", "date": date(2024, 7, 15), "security_type": "stock",
+         "scale_factor": 1.3, "bonus_pre_tax": 4.14, "per_base": 10},
+    ],
+}
+SUSPENDED = {"000001.XSHE": {date(2024, 6, 14)}}
+
+
+class CorpProvider(DataProvider):
+    name = "corp-test"
+
+    def __init__(self):
+        self.dividend_calls = 0
+        self.price_calls = 0
+
+    def auth(self, *_, **__):
+        return None
+
+    def get_split_dividend(self, security, start_date=None, end_date=None):
+        self.dividend_calls += 1
+        return [ev for ev in EVENTS.get(security, []) if start_date <= ev["date"] <= end_date]
+
+    def get_price(self, security, start_date=None, end_date=None, frequency="daily", fields=None,
+                  skip_paused=False, fq="pre", count=None, panel=True, fill_paused=True,
+                  pre_factor_ref_date=None, prefer_engine=False):
+        self.price_calls += 1
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        off = SUSPENDED.get(security, set())
+        days = [d for d in DAYS if start <= pd.Timestamp(d) <= end and d not in off]
+        return pd.DataFrame(
+            {"volume": [1000.0] * len(days), "paused": [0.0] * len(days), "close": [10.0] * len(days)},
+            index=pd.DatetimeIndex([pd.Timestamp(d) for d in days]),
+        )
+
+    def get_trade_days(self, *_, **__):
+        return DAYS
+
+    def get_all_securities(self, *_, **__):
+        return pd.DataFrame()
+
+    def get_index_stocks(self, *_, **__):
+        return []
+
+    def get_security_info(self, security):
+        return {"type": "stock"}
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake = CorpProvider()
+    monkeypatch.setattr(data_api, "_provider", fake, raising=False)
+    monkeypatch.setattr(data_api, "_auth_attempted", True, raising=False)
+    monkeypatch.setattr(data_api, "_security_info_cache", {}, raising=False)
+    yield fake
+    data_api.set_current_context(None)
+    reset_settings()
+
+
+def _run_days(use_calendar):
+    reset_globals()
+    reset_settings()
+    engine = BacktestEngine(initial_cash=100_000)
+    portfolio = Portfolio(total_value=100_000, available_cash=100_000, transferable_cash=100_000,
+                          locked_cash=0.0, starting_cash=100_000)
+    engine.context = Context(portfolio=portfolio, current_dt=datetime(2024, 6, 3, 9, 0))
+    for code in EVENTS:
+        pos = Position(security=code, total_amount=1000, closeable_amount=1000, avg_cost=10.0)
+        pos.update_price(10.0)
+        portfolio.positions[code] = pos
+    if use_calendar:
+        engine._corporate_actions = CorporateActionCalendar(data_api._provider, DAYS[0], DAYS[-1])
+    applied = []
+    for day in DAYS:
+        engine.context.current_dt = datetime.combine(day, datetime.min.time())
+        before = len(engine._processed_dividend_keys)
+        engine._apply_dividends_for_day(engine.context.current_dt)
+        if len(engine._processed_dividend_keys) > before:
+            applied.append(day)
+    snapshot = {code: (p.total_amount, round(p.avg_cost, 6)) for code, p in portfolio.positions.items()}
+    return applied, snapshot, round(portfolio.available_cash, 6)
+
+
+def test_calendar_matches_daily_queries_with_fewer_calls(provider):
+    expected = _run_days(False)
+    daily_calls = provider.dividend_calls + provider.price_calls
+    provider.dividend_calls = provider.price_calls = 0
+    actual = _run_days(True)
+
+    assert actual == expected
+    # 停牌的除权日顺延到复牌日（6/17），正常交易的当天处理
+    assert expected[0] == [date(2024, 6, 17), date(2024, 7, 15)]
+    assert provider.dividend_calls == 2
+    assert provider.dividend_calls + provider.price_calls < daily_calls / 10
+
+
+def test_calendar_falls_back_outside_range(provider):
+    calendar = CorporateActionCalendar(provider, DAYS[0], DAYS[-1])
+    assert calendar.events("000001.XSHE", DAYS[0] - timedelta(days=30), DAYS[0]) is None
+    assert calendar.is_paused("000001.XSHE", date(2024, 6, 14)) is True
+    assert calendar.is_paused("000001.XSHE", date(2024, 6, 13)) is False
+    assert calendar.is_paused("000001.XSHE", DAYS[-1] + timedelta(days=5)) is None
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from bullet_trade.data.providers.fetch_pool import RateLimiter, fetch_many
+from bullet_trade.data.providers.tushare import TushareProvider
+
+
+@pytest.mark.unit
+def test_fetch_many_keeps_input_order_and_runs_concurrently():
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def _fetch(key):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.02 if key % 2 else 0.005)
+        with lock:
+            active["now"] -= 1
+        return key * 10
+
+    keys = [5, 3, 1, 4, 2, 3]
+    result = fetch_many(keys, _fetch, max_workers=3)
+    assert list(result.keys()) == [5, 3, 1, 4, 2]
+    assert list(result.values()) == [50, 30, 10, 40, 20]
+    assert 1 < active["peak"] <= 3
+
+
+@pytest.mark.unit
+def test_fetch_many_propagates_first_error():
+    def _fetch(key):
+        if key == "bad":
+            raise ValueError("boom")
+        return key
+
+    with pytest.raises(ValueError):
+        fetch_many(["a", "bad", "c"], _fetch, max_workers=2)
+
+
+@pytest.mark.unit
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(50.0)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.07
+
+
+@pytest.mark.unit
+def test_tushare_parallel_get_price_matches_serial_layout(monkeypatch):
+    provider = TushareProvider({"cache_dir": None, "fetch_workers": 4})
+
+    def _single(security, **kwargs):
+        time.sleep(0.01)
+        return pd.DataFrame({"close": [float(security[:6])]}, index=pd.to_datetime(["2024-01-02"]))
+
+    monkeypatch.setattr(provider, "_get_price_single", _single)
+    codes = ["600000.XSHG", "000001.XSHE", "000002.XSHE"]
+
+    wide = provider.get_price(codes, end_date="2024-01-02", count=1, fields=["close"])
+    assert list(wide.columns.get_level_values(0)) == codes
+
+    long_df = provider.get_price(codes, end_date="2024-01-02", count=1, fields=["close"], panel=False)
+    assert list(long_df["code"]) == codes
+    assert list(long_df["close"]) == [600000.0, 1.0, 2.0]
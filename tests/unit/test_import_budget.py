@@ -0,0 +1,46 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ("matplotlib", "jqdatasdk", "xtquant", "tushare", "requests", "pandas")
+
+_PROBE = """
+import json, sys
+{statement}
+print(json.dumps({{"loaded": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def _probe(statement):
+    code = _PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.unit
+def test_import_package_is_cheap():
+    result = _probe("import bullet_trade")
+    # 只检查加载了哪些模块，不断言耗时，避免负载高的 CI 机器上偶发失败
+    assert result["loaded"] == []
+
+
+@pytest.mark.unit
+def test_cli_and_optimizer_worker_skip_plotting_and_provider_sdk():
+    assert _probe("import bullet_trade.cli.main")["loaded"] == []
+    # 优化器子进程以 spawn 方式重新导入该模块，不应加载绘图库与数据源 SDK
+    result = _probe("import bullet_trade.core.optimizer")
+    assert result["loaded"] == ["pandas"]
+
+
+@pytest.mark.unit
+def test_lazy_exports_resolve():
+    result = _probe(
+        "import bullet_trade as bt\n"
+        "assert bt.get_price is bt.data.api.get_price\n"
+        "assert bt.BacktestEngine.__name__ == 'BacktestEngine'\n"
+        "assert callable(bt.calculate_metrics)"
+    )
+    assert "jqdatasdk" not in result["loaded"]
+    assert "matplotlib" not in result["loaded"]
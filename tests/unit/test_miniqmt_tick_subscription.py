@@ -0,0 +1,55 @@
+import pytest
+
+from bullet_trade.data.providers import miniqmt
+from bullet_trade.data.providers.miniqmt import MiniQMTProvider
+
+pytestmark = pytest.mark.unit
+
+
+class FakeXtData:
+    def __init__(self):
+        self.next_seq = 100
+        self.active = {}
+
+    def subscribe_quote(self, code, period="tick", callback=None):
+        self.next_seq += 1
+        self.active[self.next_seq] = code
+        return self.next_seq
+
+    def unsubscribe_quote(self, seq):
+        # 与 xtdata 一致：只接受订阅号
+        if not isinstance(seq, int):
+            raise TypeError("seq must be int")
+        self.active.pop(seq)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake_xt = FakeXtData()
+    monkeypatch.setattr(miniqmt.MiniQMTProvider, "_ensure_xtdata", staticmethod(lambda: fake_xt))
+    monkeypatch.delenv("DATA_CACHE_DIR", raising=False)
+    prov = MiniQMTProvider({"cache_dir": None})
+    return prov, fake_xt
+
+
+def test_unsubscribe_releases_subscription_by_seq(provider):
+    prov, xt = provider
+    prov.subscribe_ticks(["000001.XSHE", "600000.XSHG"])
+    # 重复订阅不产生第二份 xtdata 订阅
+    prov.subscribe_ticks(["000001.XSHE"])
+    assert sorted(xt.active.values()) == ["000001.SZ", "600000.SH"]
+
+    prov.unsubscribe_ticks(["000001.XSHE"])
+    assert list(xt.active.values()) == ["600000.SH"]
+
+    prov.unsubscribe_ticks()
+    assert xt.active == {}
+
+
+def test_unsubscribe_failure_is_logged(provider, caplog):
+    prov, xt = provider
+    prov.subscribe_ticks(["000001.XSHE"])
+    xt.active.clear()
+    with caplog.at_level("WARNING", logger=miniqmt.logger.name):
+        prov.unsubscribe_ticks(["000001.XSHE"])
+    assert "退订 tick" in caplog.text
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from bullet_trade.core import optimizer
+
+
+def _fake_task_factory(calls, interrupt_at=None):
+    def _fake(task):
+        params = task["combo_params"]
+        calls.append(params["a"])
+        if interrupt_at is not None and len(calls) == interrupt_at:
+            raise KeyboardInterrupt
+        return {**params, "收益回撤比": float(params["a"]), "错误": ""}
+
+    return _fake
+
+
+def _run(tmp_path, **kwargs):
+    return optimizer.run_param_grid(
+        strategy_file=str(tmp_path / "strategy.py"),
+        start_date="2024-01-01",
+        end_date="2024-03-01",
+        param_grid={"a": [1, 2, 3, 4, 5]},
+        processes=1,
+        show_progress=False,
+        top_n=0,
+        **kwargs,
+    )
+
+
+@pytest.mark.unit
+def test_journal_resumes_only_unfinished_combos(tmp_path, monkeypatch):
+    journal = tmp_path / "sweep.jsonl"
+    calls = []
+    monkeypatch.setattr(optimizer, "_worker_task", _fake_task_factory(calls, interrupt_at=3))
+    partial = _run(tmp_path, journal=str(journal))
+    assert len(partial) == 2
+
+    # 模拟进程被强杀留下的半行记录
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"key": "trunc')
+
+    calls.clear()
+    monkeypatch.setattr(optimizer, "_worker_task", _fake_task_factory(calls))
+    df = _run(tmp_path, journal=str(journal))
+    assert sorted(calls) == [3, 4, 5]
+    assert list(df["a"]) == [5, 4, 3, 2, 1]
+
+
+@pytest.mark.unit
+def test_journal_reruns_failed_combos(tmp_path, monkeypatch):
+    journal = tmp_path / "sweep.jsonl"
+    key = optimizer._task_key({
+        "strategy_file": str(tmp_path / "strategy.py"),
+        "start_date": "2024-01-01",
+        "end_date": "2024-03-01",
+        "frequency": "day",
+        "initial_cash": 1000000,
+        "benchmark": None,
+        "initial_positions": None,
+        "extras_base": {},
+        "combo_params": {"a": 2},
+    })
+    journal.write_text(json.dumps({"key": key, "row": {"a": 2, "错误": "ValueError: x"}}) + "\n", encoding="utf-8")
+
+    calls = []
+    monkeypatch.setattr(optimizer, "_worker_task", _fake_task_factory(calls))
+    _run(tmp_path, journal=str(journal))
+    assert sorted(calls) == [1, 2, 3, 4, 5]
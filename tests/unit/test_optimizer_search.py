@@ -0,0 +1,78 @@
+import pytest
+
+from bullet_trade.core import optimizer
+
+
+GRID = {"a": list(range(20)), "b": list(range(10))}
+
+
+@pytest.fixture
+def fake_backtests(monkeypatch):
+    calls = []
+
+    def _fake(task):
+        params = task["combo_params"]
+        calls.append((params["a"], params["b"], task["end_date"]))
+        score = -((params["a"] - 13) ** 2) - (params["b"] - 4) ** 2
+        return {**params, "收益回撤比": float(score), "结束日期": task["end_date"], "错误": ""}
+
+    monkeypatch.setattr(optimizer, "_worker_task", _fake)
+    return calls
+
+
+def _search(**kwargs):
+    return optimizer.run_param_grid(
+        strategy_file="strategy.py",
+        start_date="2020-01-01",
+        end_date="2023-01-01",
+        param_grid=GRID,
+        processes=1,
+        show_progress=False,
+        top_n=0,
+        seed=7,
+        **kwargs,
+    )
+
+
+@pytest.mark.unit
+def test_random_search_samples_unique_combos(fake_backtests):
+    df = _search(search="random", n_trials=30)
+    assert len(df) == 30
+    assert len({(a, b) for a, b, _ in fake_backtests}) == 30
+
+
+@pytest.mark.unit
+def test_halving_promotes_best_to_full_range(fake_backtests):
+    df = _search(search="halving", n_trials=27, eta=3)
+    windows = [end for _, _, end in fake_backtests]
+    assert windows.count("2020-05-01") == 27
+    assert windows.count("2020-12-31") == 9
+    assert windows.count("2023-01-01") == 3
+    assert set(df["结束日期"]) == {"2023-01-01"}
+    assert df["收益回撤比"].iloc[0] == max(
+        -((a - 13) ** 2) - (b - 4) ** 2 for a, b, end in fake_backtests if end == "2020-05-01"
+    )
+
+
+@pytest.mark.unit
+def test_hyperband_outputs_only_full_range_rows(fake_backtests):
+    df = _search(search="hyperband", eta=3)
+    assert set(df["结束日期"]) == {"2023-01-01"}
+    assert len(fake_backtests) > len(df)
+
+
+@pytest.mark.unit
+def test_tpe_concentrates_near_optimum(fake_backtests):
+    df = _search(search="tpe", n_trials=60)
+    assert len(df) == 60
+    assert df["收益回撤比"].iloc[0] >= -2
+    late = fake_backtests[-20:]
+    early = fake_backtests[:20]
+    dist = lambda rows: sum(abs(a - 13) + abs(b - 4) for a, b, _ in rows) / len(rows)
+    assert dist(late) < dist(early)
+
+
+@pytest.mark.unit
+def test_unknown_search_mode_rejected():
+    with pytest.raises(ValueError):
+        _search(search="anneal")
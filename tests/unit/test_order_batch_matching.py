@@ -0,0 +1,143 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from bullet_trade.core.engine import BacktestEngine
+from bullet_trade.core.globals import reset_globals
+from bullet_trade.core.models import Context, Portfolio, Position
+from bullet_trade.core.orders import clear_order_queue, order, order_target, order_value
+from bullet_trade.core.runtime import set_current_engine
+from bullet_trade.core.settings import reset_settings, set_option, set_slippage, StepRelatedSlippage
+from bullet_trade.data import api as data_api
+from bullet_trade.data.providers.base import DataProvider
+
+
+PRICES = {
+    "601318.XSHG": 77.913,
+    "600000.XSHG": 7.456,
+    "000001.XSHE": 10.234,
+    "159949.XSHE": 1.2345,
+    "511880.XSHG": 100.215,
+}
+INFO = {
+    "601318.XSHG": {"type": "stock"},
+    "600000.XSHG": {"type": "stock"},
+    "000001.XSHE": {"type": "stock"},
+    "159949.XSHE": {"type": "fund", "subtype": "etf"},
+    "511880.XSHG": {"type": "fund", "subtype": "money_market_fund"},
+}
+
+
+class BatchProvider(DataProvider):
+    name = "batch-test"
+
+    def __init__(self):
+        self.price_calls = 0
+
+    def auth(self, *_, **__):
+        return None
+
+    def get_price(self, security, start_date=None, end_date=None, frequency="daily", fields=None,
+                  skip_paused=False, fq="pre", count=None, panel=True, fill_paused=True,
+                  pre_factor_ref_date=None, prefer_engine=False):
+        self.price_calls += 1
+        index = [pd.Timestamp(end_date)]
+
+        def _frame(code):
+            price = PRICES[code]
+            return pd.DataFrame(
+                {
+                    "open": [price],
+                    "close": [price],
+                    "high_limit": [round(price * 1.1, 2)],
+                    "low_limit": [round(price * 0.9, 2)],
+                    "paused": [0.0],
+                },
+                index=index,
+            )[list(fields) if fields else ["open", "close"]]
+
+        if isinstance(security, (list, tuple)):
+            return pd.concat({code: _frame(code) for code in security}, axis=1)
+        return _frame(security)
+
+    def get_trade_days(self, *_, **__):
+        return []
+
+    def get_all_securities(self, *_, **__):
+        return pd.DataFrame()
+
+    def get_index_stocks(self, *_, **__):
+        return []
+
+    def get_split_dividend(self, *_, **__):
+        return []
+
+    def get_security_info(self, security):
+        return INFO.get(security, {})
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake = BatchProvider()
+    monkeypatch.setattr(data_api, "_provider", fake, raising=False)
+    monkeypatch.setattr(data_api, "_auth_attempted", True, raising=False)
+    monkeypatch.setattr(data_api, "_security_info_cache", {}, raising=False)
+    yield fake
+    set_current_engine(None)
+    data_api.set_current_context(None)
+    clear_order_queue()
+    reset_settings()
+
+
+def _run_rebalance(batched: bool, monkeypatch, slippage=None):
+    reset_globals()
+    reset_settings()
+    clear_order_queue()
+    set_option("order_match_mode", "bar_end")
+    if slippage is not None:
+        set_slippage(slippage)
+    engine = BacktestEngine(initial_cash=1_000_000)
+    if not batched:
+        monkeypatch.setattr(engine, "_prepare_order_quotes", lambda *args, **kwargs: {})
+    portfolio = Portfolio(
+        total_value=1_000_000,
+        available_cash=1_000_000,
+        transferable_cash=1_000_000,
+        locked_cash=0.0,
+        starting_cash=1_000_000,
+    )
+    engine.context = Context(portfolio=portfolio, current_dt=datetime(2021, 1, 5, 10, 0))
+    position = Position(security="000001.XSHE", total_amount=1050, closeable_amount=1050, avg_cost=9.0)
+    position.update_price(10.234)
+    portfolio.positions["000001.XSHE"] = position
+    set_current_engine(engine)
+    data_api.set_current_context(engine.context)
+
+    order("000001.XSHE", -1050)
+    order_value("601318.XSHG", 300_000)
+    order_value("600000.XSHG", 250_000)
+    order_value("159949.XSHE", 120_000)
+    order_value("511880.XSHG", 200_000)
+    order_target("600000.XSHG", 10_000)
+    order_value("601318.XSHG", 500_000)
+    engine._process_orders(engine.context.current_dt)
+
+    trades = [(t.security, t.amount, t.price, t.commission, t.tax) for t in engine.trades]
+    snapshot = {
+        code: (pos.total_amount, pos.closeable_amount, round(pos.avg_cost, 8))
+        for code, pos in portfolio.positions.items()
+    }
+    return trades, snapshot, round(portfolio.available_cash, 6)
+
+
+@pytest.mark.parametrize("slippage", [None, StepRelatedSlippage(2)])
+def test_batched_matching_matches_per_order_path(provider, monkeypatch, slippage):
+    expected = _run_rebalance(False, monkeypatch, slippage)
+    serial_calls = provider.price_calls
+    provider.price_calls = 0
+    actual = _run_rebalance(True, monkeypatch, slippage)
+
+    assert actual == expected
+    assert len(expected[0]) == 6
+    assert provider.price_calls < serial_calls
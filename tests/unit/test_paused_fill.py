@@ -0,0 +1,100 @@
+"""
+MiniQMTProvider._fill_paused_days：停牌日填充与交易日历缓存，附带一个长历史的微基准。
+"""
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bullet_trade.data.providers.miniqmt import MiniQMTProvider
+
+
+class _CalendarXt:
+    def __init__(self, days):
+        self.days = pd.DatetimeIndex(days)
+        self.calls = 0
+
+    def get_trading_dates(self, market, start_time="", end_time="", count=-1):
+        self.calls += 1
+        lo = pd.Timestamp(start_time) if start_time else self.days[0]
+        hi = pd.Timestamp(end_time) if end_time else self.days[-1]
+        picked = self.days[(self.days >= lo) & (self.days <= hi)]
+        # xtdata 返回本地零点的毫秒时间戳
+        return [int(datetime(d.year, d.month, d.day).timestamp() * 1000) for d in picked]
+
+
+def _bars(days):
+    closes = np.arange(1, len(days) + 1, dtype=float)
+    return pd.DataFrame(
+        {
+            "open": closes - 0.5,
+            "high": closes + 0.5,
+            "low": closes - 1.0,
+            "close": closes,
+            "volume": np.full(len(days), 100.0),
+            "money": closes * 100.0,
+        },
+        index=pd.DatetimeIndex(days),
+    )
+
+
+@pytest.mark.unit
+def test_fill_paused_days_uses_previous_close(tmp_path):
+    provider = MiniQMTProvider({"cache_dir": str(tmp_path)})
+    calendar = pd.bdate_range("2022-01-10", "2022-01-21")
+    xt = _CalendarXt(calendar)
+    traded = calendar.delete([3, 4, 7])  # 01-13、01-14、01-19 停牌
+    df = _bars(traded)
+
+    filled = provider._fill_paused_days(df, "2022-01-10", "2022-01-21", xt)
+
+    assert list(filled.index) == list(calendar)
+    paused = filled.loc[["2022-01-13", "2022-01-14", "2022-01-19"]]
+    assert (paused["paused"] == 1.0).all()
+    assert (paused["volume"] == 0.0).all() and (paused["money"] == 0.0).all()
+    assert paused.loc["2022-01-13", ["open", "high", "low", "close"]].tolist() == [3.0] * 4
+    assert paused.loc["2022-01-14", "close"] == 3.0
+    assert paused.loc["2022-01-19", "close"] == 5.0
+    assert (filled.loc[traded, "paused"] == 0.0).all()
+
+
+@pytest.mark.unit
+def test_fill_paused_days_extends_to_requested_end_and_caches_calendar(tmp_path):
+    provider = MiniQMTProvider({"cache_dir": str(tmp_path)})
+    calendar = pd.bdate_range("2022-01-10", "2022-01-21")
+    xt = _CalendarXt(calendar)
+    df = _bars(calendar[:8])
+
+    filled = provider._fill_paused_days(df, None, "2022-01-21", xt)
+    provider._fill_paused_days(df, None, "2022-01-20", xt)
+    provider._fill_paused_days(df.iloc[2:], None, "2022-01-21", xt)
+
+    assert filled.index[-1] == pd.Timestamp("2022-01-21")
+    assert filled["close"].iloc[-2:].tolist() == [8.0, 8.0]
+    assert xt.calls == 1
+
+
+@pytest.mark.unit
+def test_fill_paused_days_benchmark_long_history(tmp_path):
+    """微基准：约 20 年日线、每 3 个交易日停牌 1 天，旧实现逐日筛选为平方级。"""
+    provider = MiniQMTProvider({"cache_dir": str(tmp_path)})
+    calendar = pd.bdate_range("2004-01-01", "2023-12-29")
+    xt = _CalendarXt(calendar)
+    traded = calendar[np.arange(len(calendar)) % 3 != 0]
+    df = _bars(traded)
+
+    started = time.perf_counter()
+    filled = provider._fill_paused_days(df, None, None, xt)
+    elapsed = time.perf_counter() - started
+
+    # 耗时只打印供参考，不作断言（负载高的 CI 机器上会偶发失败）
+    print(f"\n_fill_paused_days: {len(df)} 行, 填充 {len(filled) - len(df)} 个停牌日, 耗时 {elapsed * 1000:.1f} ms")
+    assert len(filled) == len(calendar) - 1  # 首日停牌且之前无数据，不在 df 日期范围内
+    assert int(filled["paused"].sum()) == len(filled) - len(df)
+    assert filled.index.is_monotonic_increasing
+    paused_rows = filled[filled["paused"] == 1]
+    # 停牌日沿用前一交易日收盘价
+    prev_close = filled["close"].shift(1).loc[paused_rows.index]
+    assert (paused_rows["close"] == prev_close).all()
@@ -0,0 +1,140 @@
+import logging
+import math
+import pickle
+import random
+
+import pytest
+
+from bullet_trade.core import models
+from bullet_trade.core.globals import log
+from bullet_trade.core.models import Order, Portfolio, Position, PositionBook, SecurityUnitData, Trade
+
+
+pytestmark = pytest.mark.unit
+
+
+def _exact(portfolio):
+    return math.fsum(pos.value for pos in portfolio.positions.values())
+
+
+def test_positions_value_tracks_updates_and_membership():
+    portfolio = Portfolio()
+    assert isinstance(portfolio.positions, PositionBook)
+
+    pos = Position(security="000001.XSHE")
+    portfolio.positions[pos.security] = pos
+    pos.update_position(1000, 10.0)
+    pos.update_price(10.5)
+    other = Position(security="600000.XSHG", total_amount=200)
+    other.update_price(8.0)
+    portfolio.positions[other.security] = other
+    portfolio.update_value()
+    assert portfolio.positions_value == pytest.approx(10500.0 + 1600.0)
+
+    # 直接写 value（停牌沿用昨收等路径）同样计入
+    other.value = 1700.0
+    portfolio.update_value()
+    assert portfolio.positions_value == pytest.approx(10500.0 + 1700.0)
+
+    del portfolio.positions[pos.security]
+    portfolio.update_value()
+    assert portfolio.positions_value == pytest.approx(1700.0)
+    # 移出后的持仓不再影响合计
+    pos.update_price(99.0)
+    portfolio.update_value()
+    assert portfolio.positions_value == pytest.approx(1700.0)
+
+    portfolio.positions.clear()
+    portfolio.update_value()
+    assert portfolio.positions_value == 0.0
+    assert portfolio.total_value == portfolio.available_cash
+
+
+def test_replaced_positions_dict_is_rewrapped():
+    portfolio = Portfolio()
+    portfolio.positions = {"A": Position(security="A", value=5.0)}
+    portfolio.update_value()
+    assert isinstance(portfolio.positions, PositionBook)
+    assert portfolio.positions_value == 5.0
+
+
+def test_random_walk_matches_full_sum():
+    rng = random.Random(7)
+    portfolio = Portfolio()
+    codes = [f"{i:06d}.XSHE" for i in range(30)]
+    for step in range(5000):
+        code = rng.choice(codes)
+        positions = portfolio.positions
+        action = rng.random()
+        if code not in positions:
+            positions[code] = Position(security=code)
+            positions[code].update_position(rng.randint(1, 50) * 100, rng.uniform(5, 50))
+        elif action < 0.1:
+            positions.pop(code)
+        else:
+            positions[code].update_price(rng.uniform(5, 50))
+        if step % 100 == 0:
+            portfolio.update_value()
+            assert portfolio.positions_value == pytest.approx(_exact(portfolio), rel=1e-9)
+    portfolio.update_value()
+    assert portfolio.positions_value == pytest.approx(_exact(portfolio), rel=1e-9)
+
+
+def test_debug_check_resyncs_drift(monkeypatch):
+    monkeypatch.setattr(models, "VALUE_CHECK_INTERVAL", 1)
+    monkeypatch.setattr(log, "is_enabled_for", lambda level: level == logging.DEBUG)
+    warnings = []
+    monkeypatch.setattr(log, "warning", lambda msg, *a, **k: warnings.append(msg))
+    portfolio = Portfolio()
+    portfolio.positions["A"] = Position(security="A", value=100.0)
+    portfolio.positions._total += 1.0  # 模拟累积误差
+    portfolio.update_value()
+    assert portfolio.positions_value == 100.0
+    assert warnings
+
+
+def test_hot_models_use_slots_and_pickle():
+    for obj in (
+        Position(security="A"),
+        Trade("1", "A", 100, 10.0, None),
+        Order("1", "A", 100),
+        SecurityUnitData(security="A"),
+    ):
+        assert not hasattr(obj, "__dict__")
+        assert pickle.loads(pickle.dumps(obj)) == obj
+
+    order = Order("1", "A", 100)
+    assert not hasattr(order, "_target_value")
+    order._target_value = 1000.0
+    order._broker_order_id = "X1"
+    assert order._target_value == 1000.0
+
+    portfolio = Portfolio()
+    pos = Position(security="A", total_amount=100)
+    portfolio.positions["A"] = pos
+    pos.update_price(10.0)
+    restored = pickle.loads(pickle.dumps(portfolio))
+    restored.positions["A"].update_price(11.0)
+    restored.update_value()
+    portfolio.update_value()
+    assert restored.positions_value == pytest.approx(1100.0)
+    assert portfolio.positions_value == pytest.approx(1000.0)
+
+
+def test_non_finite_value_does_not_poison_total():
+    portfolio = Portfolio()
+    pos = Position(security="A", total_amount=100)
+    portfolio.positions["A"] = pos
+    pos.update_price(float("nan"))
+    portfolio.update_value()
+    assert math.isnan(portfolio.positions_value)
+
+    pos.update_price(2.0)
+    portfolio.update_value()
+    assert portfolio.positions_value == pytest.approx(200.0)
+
+    other = Position(security="B", value=float("inf"))
+    portfolio.positions["B"] = other
+    del portfolio.positions["B"]
+    portfolio.update_value()
+    assert portfolio.positions_value == pytest.approx(200.0)
@@ -0,0 +1,123 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from bullet_trade.data.cache import CacheManager
+
+
+DAYS = pd.bdate_range("2023-01-02", "2023-12-29")
+
+
+class FakeFetcher:
+    """按交易日生成日线/分钟线，记录实际拉取次数。"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, kw):
+        self.calls.append(dict(kw))
+        end = pd.Timestamp(kw["end_date"])
+        if kw.get("frequency") == "minute":
+            index = pd.DatetimeIndex(
+                [d + pd.Timedelta(hours=9, minutes=31) + pd.Timedelta(minutes=i) for d in DAYS for i in range(3)]
+            )
+            index = index[index <= end]
+        else:
+            index = DAYS[DAYS <= end.normalize()]
+        if kw.get("count"):
+            index = index[-int(kw["count"]):]
+        else:
+            index = index[index >= pd.Timestamp(kw["start_date"])]
+        return pd.DataFrame({"close": [ts.dayofyear + ts.minute / 100.0 for ts in index]}, index=index)
+
+
+def _kwargs(**overrides):
+    kw = {
+        "security": "000001.XSHE",
+        "start_date": None,
+        "end_date": None,
+        "frequency": "daily",
+        "fields": ["close"],
+        "skip_paused": False,
+        "fq": "none",
+        "count": None,
+    }
+    kw.update(overrides)
+    return kw
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_CACHE_PREFETCH_DAYS", "30")
+    return CacheManager("fake", cache_dir=str(tmp_path))
+
+
+def test_count_requests_reuse_prefetched_segment(cache):
+    fetch = FakeFetcher()
+    first = cache.cached_price_call("get_price", _kwargs(end_date=datetime(2023, 3, 1, 15), count=5), fetch)
+    assert len(first) == 5
+    calls_after_first = len(fetch.calls)
+
+    for day in pd.bdate_range("2023-03-02", "2023-03-20"):
+        df = cache.cached_price_call("get_price", _kwargs(end_date=day.to_pydatetime(), count=5), fetch)
+        assert df.index[-1] == day
+        assert len(df) == 5
+    assert len(fetch.calls) == calls_after_first
+
+
+def test_range_request_only_fetches_missing_gap(cache, monkeypatch):
+    monkeypatch.setattr(cache, "segment_prefetch_days", 0)
+    fetch = FakeFetcher()
+    cache.cached_price_call("get_price", _kwargs(start_date="2023-02-01", end_date="2023-02-28"), fetch)
+    fetch.calls.clear()
+
+    df = cache.cached_price_call("get_price", _kwargs(start_date="2023-02-10", end_date="2023-03-10"), fetch)
+    assert df.index[0] == pd.Timestamp("2023-02-10")
+    assert df.index[-1] == pd.Timestamp("2023-03-10")
+    assert len(fetch.calls) == 1
+    assert pd.Timestamp(fetch.calls[0]["start_date"]) == pd.Timestamp("2023-03-01")
+
+    fetch.calls.clear()
+    cache.cached_price_call("get_price", _kwargs(start_date="2023-02-15", end_date="2023-03-01"), fetch)
+    assert fetch.calls == []
+
+
+def test_segments_persist_across_instances(cache, tmp_path):
+    fetch = FakeFetcher()
+    cache.cached_price_call(
+        "get_price", _kwargs(frequency="minute", end_date=datetime(2023, 5, 4, 9, 32), count=4), fetch
+    )
+    reopened = CacheManager("fake", cache_dir=str(tmp_path))
+    fetch.calls.clear()
+    df = reopened.cached_price_call(
+        "get_price", _kwargs(frequency="minute", end_date=datetime(2023, 5, 5, 9, 33), count=2), fetch
+    )
+    assert list(df.index) == [pd.Timestamp("2023-05-05 09:32"), pd.Timestamp("2023-05-05 09:33")]
+    assert fetch.calls == []
+
+
+def test_non_segment_requests_use_exact_cache(cache):
+    kwargs = _kwargs(security=["000001.XSHE", "600000.XSHG"], end_date=datetime(2023, 3, 1), count=1)
+    cache.cached_price_call("get_price", kwargs, lambda kw: pd.DataFrame({"x": [1]}))
+    assert cache._segments == {}
+
+
+def test_adjusted_requests_are_not_stitched_across_factor_changes(cache):
+    class AdjustingFetcher(FakeFetcher):
+        """前复权结果按取数时的最新因子缩放，两次取数之间发生一次除权。"""
+
+        scale = 1.0
+
+        def __call__(self, kw):
+            df = super().__call__(kw)
+            return df * self.scale
+
+    fetch = AdjustingFetcher()
+    cache.cached_price_call("get_price", _kwargs(fq="pre", start_date="2023-02-01", end_date="2023-02-28"), fetch)
+    fetch.scale = 0.5
+    df = cache.cached_price_call("get_price", _kwargs(fq="pre", start_date="2023-02-01", end_date="2023-03-31"), fetch)
+
+    expected = FakeFetcher()(_kwargs(start_date="2023-02-01", end_date="2023-03-31")) * 0.5
+    pd.testing.assert_frame_equal(df, expected)
+    assert cache._segments == {}
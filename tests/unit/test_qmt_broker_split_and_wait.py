@@ -1,4 +1,6 @@
+import threading
 import time
+from types import SimpleNamespace
 
 import pytest
 
@@ -60,6 +62,47 @@ async def test_sync_wait_breaks_early(monkeypatch):
     assert time.time() - t0 < 1.0
 
 
+@pytest.mark.asyncio
+async def test_sync_wait_resolves_on_order_callback(monkeypatch):
+    broker = QmtBroker(account_id="test")
+    broker._connected = True
+    broker._xt_callback = object()  # 已接入回调：不应立即轮询
+
+    queries = []
+
+    async def _status(oid):
+        queries.append(oid)
+        return {}
+
+    broker.get_order_status = _status  # type: ignore
+
+    def _push():
+        time.sleep(0.1)
+        broker._on_order_callback(
+            SimpleNamespace(order_id=7, order_status="filled", stock_code="000001.SZ", price=10.0, order_volume=100, traded_volume=100)
+        )
+
+    threading.Thread(target=_push, daemon=True).start()
+    t0 = time.time()
+    await broker._maybe_wait("7", override_timeout=5)
+    assert time.time() - t0 < 1.0
+    assert queries == []
+    # 终态已由回调写入，查询直接返回缓存快照
+    broker.get_order_status = QmtBroker.get_order_status.__get__(broker)  # type: ignore
+    snapshot = await broker.get_order_status("7")
+    assert snapshot["status"] == "filled" and snapshot["filled"] == 100
+
+
+def test_trade_callbacks_accumulate_to_filled():
+    broker = QmtBroker(account_id="test")
+    broker._on_order_callback(SimpleNamespace(order_id=9, order_status="open", stock_code="600000.SH", price=8.0, order_volume=300))
+    broker._on_trade_callback(SimpleNamespace(order_id=9, traded_volume=100, traded_price=8.0))
+    assert broker._order_states.get("9")["status"] == "open"
+    broker._on_trade_callback(SimpleNamespace(order_id=9, traded_volume=200, traded_price=8.01))
+    state = broker._order_states.get("9")
+    assert state["status"] == "filled" and state["filled"] == 300
+
+
 def test_qmt_symbol_mapping_roundtrip():
     broker = QmtBroker(account_id="test")
     assert broker._map_security("000001.XSHE") == "000001.SZ"
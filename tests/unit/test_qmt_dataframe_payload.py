@@ -19,3 +19,84 @@ def test_dataframe_to_payload_handles_datetime():
     payload = dataframe_to_payload(df)
     encoded = json.dumps(payload)
     assert "2025-01-01" in encoded
+
+
+def _roundtrip(message, **kwargs):
+    import asyncio
+
+    from bullet_trade.server.protocol import encode_message, read_message
+
+    async def _read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_message(message, **kwargs))
+        reader.feed_eof()
+        return await read_message(reader)
+
+    return asyncio.run(_read())
+
+
+def _history_frame(rows=1000):
+    index = pd.date_range("2024-01-02 09:31", periods=rows, freq="min")
+    return pd.DataFrame(
+        {
+            "time": index,
+            "close": [10.0 + i * 0.01 for i in range(rows)],
+            "volume": list(range(rows)),
+            "paused": [False] * rows,
+            "code": ["000001.XSHE"] * rows,
+        }
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("compress", [False, True])
+def test_columnar_roundtrip_preserves_frame(compress):
+    df = _history_frame(5000)
+    message = {"type": "response", "id": "r1", "payload": dataframe_to_payload(df, lazy=True)}
+    decoded = _roundtrip(message, columnar=True, compress=compress)
+
+    assert decoded["id"] == "r1"
+    assert decoded["payload"]["columns"] == list(df.columns)
+    pd.testing.assert_frame_equal(decoded["payload"]["frame"], df)
+
+
+@pytest.mark.unit
+def test_columnar_is_smaller_than_json_and_json_fallback_matches_records():
+    from bullet_trade.server.protocol import encode_message
+
+    df = _history_frame(2000)
+    message = {"type": "response", "id": "r2", "payload": dataframe_to_payload(df, lazy=True)}
+    assert len(encode_message(message, columnar=True)) < len(encode_message(message))
+
+    decoded = _roundtrip(message)
+    assert decoded["payload"] == json.loads(json.dumps(dataframe_to_payload(df)))
+    assert decoded["payload"]["records"][0][0] == "2024-01-02T09:31:00"
+
+
+@pytest.mark.unit
+def test_columnar_handles_named_index_and_timezones():
+    df = pd.DataFrame(
+        {"ts": pd.date_range("2024-01-01", periods=3, tz="Asia/Shanghai"), "v": [1.5, None, 3.0]},
+        index=pd.Index(["a", "b", "c"], name="code"),
+    )
+    decoded = _roundtrip({"type": "response", "id": "r3", "payload": dataframe_to_payload(df, lazy=True)}, columnar=True)
+    pd.testing.assert_frame_equal(decoded["payload"]["frame"], df.reset_index())
+
+
+@pytest.mark.unit
+def test_json_fallback_and_columnar_decode_to_same_frame():
+    from bullet_trade.server.columnar import frame_from_payload
+
+    df = _history_frame(50)
+    df["ts"] = pd.date_range("2024-01-01", periods=50, tz="Asia/Shanghai")
+    message = {"type": "response", "id": "r4", "payload": dataframe_to_payload(df, lazy=True)}
+    via_columnar = frame_from_payload(_roundtrip(message, columnar=True)["payload"])
+    via_json = frame_from_payload(_roundtrip(message)["payload"])
+
+    assert via_json["time"].dtype == "datetime64[ns]"
+    pd.testing.assert_frame_equal(via_json, via_columnar)
+
+    # 旧版 server 不带 datetime_columns 时按 time 列还原
+    legacy = _roundtrip(message)["payload"]
+    legacy.pop("datetime_columns")
+    assert frame_from_payload(legacy)["time"].dtype == "datetime64[ns]"
@@ -0,0 +1,87 @@
+"""
+回测结果列式记录：ColumnBuffer / TradeLog
+"""
+
+import pickle
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from bullet_trade.core.models import Trade
+from bullet_trade.core.recording import DAILY_POSITION_COLUMNS, DAILY_RECORD_COLUMNS, ColumnBuffer, TradeLog
+
+pytestmark = pytest.mark.unit
+
+
+def _fill_positions(buffer, days=40, codes=("000001.XSHE", "600000.XSHG", "510300.XSHG")):
+    start = datetime(2024, 1, 2, 15, 0)
+    for d in range(days):
+        for k, code in enumerate(codes):
+            buffer.append(start + timedelta(days=d), code, 100 * (k + 1), 100 * k, 10.0 + k, 10.5, 11.0 + d, 1100.0 * (k + 1))
+
+
+def test_column_buffer_grows_and_behaves_like_record_list():
+    buffer = ColumnBuffer(DAILY_RECORD_COLUMNS, capacity=1)
+    start = datetime(2024, 1, 2, 15, 0)
+    for i in range(200):
+        buffer.append(start + timedelta(days=i), 1e6 + i, 5e5, 5e5 + i, float(i), i / 1e4)
+
+    assert len(buffer) == 200
+    assert buffer[-1]["returns_pct"] == pytest.approx(199 / 1e4)
+    assert buffer[0]["date"] == start
+    frame = buffer.to_frame()
+    assert list(frame.columns) == [name for name, _ in DAILY_RECORD_COLUMNS]
+    assert frame["date"].dtype == "datetime64[ns]"
+    assert frame["total_value"].iloc[-1] == pytest.approx(1e6 + 199)
+
+
+def test_column_buffer_spills_chunks_and_reassembles(tmp_path):
+    in_memory = ColumnBuffer(DAILY_POSITION_COLUMNS)
+    spilled = ColumnBuffer(DAILY_POSITION_COLUMNS, spill_dir=str(tmp_path), spill_rows=25)
+    _fill_positions(in_memory)
+    _fill_positions(spilled)
+
+    assert len(spilled) == len(in_memory) == 120
+    assert spilled._size < 25
+    assert any(tmp_path.iterdir())
+    pd.testing.assert_frame_equal(spilled.to_frame(), in_memory.to_frame())
+    assert spilled[3] == in_memory[3]
+    assert spilled[-1] == in_memory[-1]
+    restored = pickle.loads(pickle.dumps(spilled))
+    pd.testing.assert_frame_equal(restored.to_frame(), in_memory.to_frame())
+
+
+def test_spilled_rows_read_each_chunk_once(tmp_path, monkeypatch):
+    from bullet_trade.core import recording
+
+    in_memory = ColumnBuffer(DAILY_POSITION_COLUMNS)
+    spilled = ColumnBuffer(DAILY_POSITION_COLUMNS, spill_dir=str(tmp_path), spill_rows=25)
+    _fill_positions(in_memory)
+    _fill_positions(spilled)
+    reads = []
+    read_chunk = recording._read_chunk
+    monkeypatch.setattr(recording, "_read_chunk", lambda path: reads.append(path) or read_chunk(path))
+
+    assert list(spilled) == list(in_memory)
+    assert len(reads) == len(spilled._chunks)
+    reads.clear()
+    assert [spilled[i] for i in range(len(spilled))] == list(in_memory)
+    assert len(reads) == len(spilled._chunks)
+
+
+def test_trade_log_round_trips_trades():
+    trades = [
+        Trade(order_id=f"o{i}", security="000001.XSHE", amount=100 if i % 2 == 0 else -100, price=10.0 + i,
+              time=datetime(2024, 1, 2, 9, 31) + timedelta(minutes=i), commission=5.0, tax=0.5 * (i % 2))
+        for i in range(5)
+    ]
+    log = TradeLog(capacity=2)
+    log.extend(trades)
+
+    assert log == trades
+    assert log[-1] == trades[-1]
+    assert log[1:3] == trades[1:3]
+    assert [t.order_id for t in log] == [t.order_id for t in trades]
+    log.clear()
+    assert not log
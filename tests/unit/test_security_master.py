@@ -0,0 +1,134 @@
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from bullet_trade.data import api as data_api
+from bullet_trade.data.providers.base import DataProvider
+from bullet_trade.data.security_master import SECURITY_MASTER_FILE, SecurityMaster
+
+LISTED = date(2020, 1, 6)
+NOT_DELISTED = date(2200, 1, 1)
+
+
+class InfoProvider(DataProvider):
+    name = "info-test"
+
+    def __init__(self, cache_dir=None):
+        self.calls = []
+        self._cache = SimpleNamespace(enabled=bool(cache_dir), cache_dir=cache_dir or "")
+
+    def auth(self, *_, **__):
+        return None
+
+    def get_security_info(self, security, date=None):
+        self.calls.append((security, date))
+        return {
+            "type": "etf" if security.startswith("5") else "stock",
+            "display_name": security,
+            "start_date": LISTED,
+            "end_date": NOT_DELISTED,
+        }
+
+    def get_price(self, *_, **__):
+        return pd.DataFrame()
+
+    def get_trade_days(self, *_, **__):
+        return []
+
+    def get_all_securities(self, *_, **__):
+        return pd.DataFrame()
+
+    def get_index_stocks(self, *_, **__):
+        return []
+
+    def get_split_dividend(self, *_, **__):
+        return []
+
+
+@pytest.fixture
+def use_provider(monkeypatch):
+    def _use(provider):
+        monkeypatch.setattr(data_api, "_provider", provider, raising=False)
+        monkeypatch.setattr(data_api, "_auth_attempted", True, raising=False)
+        monkeypatch.setattr(data_api, "_security_info_cache", {}, raising=False)
+        return provider
+
+    yield _use
+    data_api.reset_security_overrides()
+
+
+def test_one_provider_call_per_listing_interval(use_provider):
+    provider = use_provider(InfoProvider())
+    day = datetime(2021, 1, 4)
+    for offset in range(300):
+        info = data_api.get_security_info("510300.XSHG", date=day + timedelta(days=offset))
+        assert info.type == "etf"
+    assert len(provider.calls) == 1
+
+    before = data_api.get_security_info("510300.XSHG", date=datetime(2019, 6, 3))
+    assert len(provider.calls) == 2
+    data_api.get_security_info("510300.XSHG", date=datetime(2018, 1, 2))
+    assert len(provider.calls) == 2
+    assert before.code == "510300.XSHG"
+
+
+def test_overrides_apply_without_refetch(use_provider):
+    provider = use_provider(InfoProvider())
+    assert data_api.get_security_info("600000.XSHG", date=datetime(2022, 3, 1)).category == "stock"
+    data_api.set_security_overrides({"by_code": {"600000.XSHG": {"category": "fund", "tplus": 0}}})
+    info = data_api.get_security_info("600000.XSHG", date=datetime(2022, 3, 2))
+    assert (info.category, info.tplus) == ("fund", 0)
+    assert len(provider.calls) == 1
+
+
+def test_index_persists_in_cache_dir(use_provider, tmp_path):
+    use_provider(InfoProvider(str(tmp_path)))
+    data_api.get_security_info("000001.XSHE", date=datetime(2022, 3, 1))
+    data_api.save_security_master()
+    assert (tmp_path / SECURITY_MASTER_FILE).exists()
+
+    reopened = use_provider(InfoProvider(str(tmp_path)))
+    assert data_api.get_security_info("000001.XSHE", date=datetime(2023, 5, 8)).type == "stock"
+    assert reopened.calls == []
+
+
+def test_interval_stops_at_fetch_date():
+    master = SecurityMaster()
+    info = {"start_date": date(2020, 1, 6), "end_date": date(2200, 1, 1)}
+    key = master.add("000001.XSHE", date(2021, 1, 4), info, fetched_on=date(2021, 6, 30))
+    assert key == date(2020, 1, 6)
+    assert master.lookup("000001.XSHE", date(2021, 6, 30)) == (key, info)
+    assert master.lookup("000001.XSHE", date(2021, 7, 1)) is None
+    assert master.lookup("000001.XSHE", date(2019, 12, 31)) is None
+
+
+class EmptyInfoProvider(InfoProvider):
+    def get_security_info(self, security, date=None):
+        self.calls.append((security, date))
+        return {}
+
+
+def test_empty_info_is_retried_and_not_persisted(use_provider, tmp_path):
+    provider = use_provider(EmptyInfoProvider(str(tmp_path)))
+    for _ in range(2):
+        info = data_api.get_security_info("000001.XSHE", date=datetime(2022, 3, 1))
+        assert info.code == "000001.XSHE"
+    assert len(provider.calls) == 2
+    assert data_api._security_info_cache == {}
+    data_api.save_security_master()
+    assert not (tmp_path / SECURITY_MASTER_FILE).exists()
+
+
+def test_failed_save_removes_temp_file(tmp_path, monkeypatch):
+    master = SecurityMaster()
+    master.add("000001.XSHE", date(2021, 1, 4), {"start_date": LISTED}, fetched_on=date(2021, 6, 30))
+
+    def _boom(*_, **__):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("bullet_trade.data.security_master.pickle.dump", _boom)
+    master.save(str(tmp_path / SECURITY_MASTER_FILE))
+    assert list(tmp_path.iterdir()) == []
+    assert master.dirty
@@ -0,0 +1,87 @@
+"""
+TradeLedger：成交账本的均价、卖出盈亏、拆分/分红与各指标口径
+"""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from bullet_trade.core import analysis
+from bullet_trade.core.analysis import TradeLedger, _compute_trade_profit_loss_ratio, _compute_trade_win_stats
+from bullet_trade.core.models import Trade
+
+pytestmark = pytest.mark.unit
+
+
+def _trade(code, amount, price, ts, commission=0.0, tax=0.0):
+    return Trade(order_id=ts, security=code, amount=amount, price=price, time=datetime.fromisoformat(ts),
+                 commission=commission, tax=tax)
+
+
+def test_ledger_average_cost_and_sell_pnl_out_of_order():
+    trades = [
+        _trade("A", -200, 12.0, "2024-01-04 10:00", commission=1.0, tax=2.0),
+        _trade("A", 100, 10.0, "2024-01-02 10:00", commission=1.0),
+        _trade("B", 100, 5.0, "2024-01-02 10:00"),
+        _trade("A", 100, 11.0, "2024-01-03 10:00", commission=1.0),
+        _trade("B", -100, 4.0, "2024-01-05 10:00"),
+    ]
+    ledger = TradeLedger(trades)
+
+    a = ledger.trades[ledger.trades["security"] == "A"]
+    assert a["avg_cost"].tolist() == [0.0, 10.0, 10.5]
+    assert a["pnl"].iloc[-1] == pytest.approx((12.0 - 10.5) * 200 - 3.0)
+    assert ledger.win_stats() == {"交易胜率": 50.0, "交易盈利次数": 1, "交易亏损次数": 1}
+    assert ledger.profit_loss_ratio() == pytest.approx(297.0 / 100.0)
+    assert ledger.instruments.loc["A", "realized"] == pytest.approx(297.0 - 2.0)
+    assert ledger.instruments.loc["A", "round_trips"] == 1
+    assert ledger.open_counts().to_dict() == {"A": 2, "B": 1}
+
+
+def test_ledger_applies_split_and_dividend_events():
+    trades = [
+        _trade("A", 100, 10.0, "2024-01-02 10:00"),
+        _trade("A", -200, 6.0, "2024-01-10 10:00"),
+    ]
+    events = [
+        {"event_type": "拆分/送转", "code": "A", "scale_factor": 2.0, "strategy_time": datetime(2024, 1, 5, 9, 0)},
+        {"event_type": "现金分红", "code": "A", "cash_in": 30.0, "event_date": "2024-01-06"},
+        {"event_type": "现金分红", "code": "C", "cash_in": 5.0, "event_date": "2024-01-06"},
+    ]
+    ledger = TradeLedger(trades, events)
+
+    assert ledger.trades["avg_cost"].iloc[-1] == pytest.approx(5.0)
+    assert ledger.sell_pnl.tolist() == pytest.approx([200.0])
+    assert ledger.instrument_pnl().to_dict() == pytest.approx({"A": 230.0, "C": 5.0})
+
+
+def test_ledger_reads_reloaded_csv_records():
+    records = [
+        {"时间": "2024-01-02 10:00:00", "标的": "A", "数量": 100, "价格": 10.0, "手续费": 5.0, "印花税": 0.0},
+        {"时间": "2024-01-03 10:00:00", "标的": "A", "数量": -100, "价格": 9.0, "手续费": 5.0, "印花税": 1.0},
+    ]
+    assert _compute_trade_win_stats(records)["交易亏损次数"] == 1
+    assert _compute_trade_profit_loss_ratio(records) == 0.0
+
+
+def test_from_results_reuses_ledger_for_same_results():
+    trades = [_trade("A", 100, 10.0, "2024-01-02 10:00")]
+    results = {"trades": trades, "events": []}
+    first = TradeLedger.from_results(results)
+    assert TradeLedger.from_results(results) is first
+    trades.append(_trade("A", -100, 11.0, "2024-01-03 10:00"))
+    assert TradeLedger.from_results(results) is not first
+
+
+def test_export_instrument_pnl_uses_ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis, "_ledger_memo", None)
+    results = {
+        "trades": [_trade("A", 100, 10.0, "2024-01-02 10:00", commission=1.0), _trade("A", -100, 12.0, "2024-01-03 10:00")],
+        "events": [],
+    }
+    csv_path = tmp_path / "instrument_pnl.csv"
+    analysis.export_instrument_pnl(results, csv_path=str(csv_path))
+    df = pd.read_csv(csv_path, encoding="utf-8-sig")
+    assert df.loc[0, "标的"] == "A"
+    assert df.loc[0, "盈亏(元)"] == pytest.approx(199.0)